@@ -1,7 +1,9 @@
 import React, { useState, useEffect } from 'react';
 import { Form, Button, Alert, Spinner, Row, Col } from 'react-bootstrap';
 import { useApi } from '../hooks/useApi';
-import { SlideshowItem, Display } from '../types';
+import { useOptionalSSEContext } from '../hooks/useSSE';
+import { apiClient } from '../utils/apiClient';
+import { SlideshowItem, Display, ApiResponse, MediaBlob, MediaTranscode, UploadedFileInfo } from '../types';
 
 interface SlideshowItemFormProps {
   slideshowId: number;
@@ -24,8 +26,33 @@ interface SlideshowItemFormState {
   // Skedda/iCal calendar fields
   ical_url: string;
   ical_refresh_minutes: number;
+  // Calendar grid: hours shown and slot length in minutes
+  ical_day_start_hour: number;
+  ical_day_end_hour: number;
+  ical_slot_minutes: number;
 }
 
+// Default calendar grid: 7 AM to 11 PM in 30-minute slots
+const DEFAULT_DAY_START_HOUR = 7;
+const DEFAULT_DAY_END_HOUR = 23;
+const DEFAULT_SLOT_MINUTES = 30;
+
+const formatHour = (hour: number): string => {
+  if (hour === 0 || hour === 24) {
+    return '12 AM (midnight)';
+  }
+  if (hour === 12) {
+    return '12 PM (noon)';
+  }
+  return hour < 12 ? `${hour} AM` : `${hour - 12} PM`;
+};
+
+// Files larger than this are uploaded in resumable chunks
+const RESUMABLE_UPLOAD_THRESHOLD = 50 * 1024 * 1024;
+
+// How often to poll for video probe results when no SSE connection is open
+const PROBE_POLL_INTERVAL_MS = 5000;
+
 /**
  * Extract a title from a filename by removing the extension.
  * @param filename - The filename (e.g., "my-image.jpg")
@@ -86,12 +113,23 @@ const SlideshowItemForm: React.FC<SlideshowItemFormProps> = ({
     scale_factor: null,
     ical_url: '',
     ical_refresh_minutes: 15,
+    ical_day_start_hour: DEFAULT_DAY_START_HOUR,
+    ical_day_end_hour: DEFAULT_DAY_END_HOUR,
+    ical_slot_minutes: DEFAULT_SLOT_MINUTES,
   });
 
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState<string | null>(null);
   const [validationErrors, setValidationErrors] = useState<Record<string, string>>({});
   const [uploadingFile, setUploadingFile] = useState(false);
+  const [uploadProgress, setUploadProgress] = useState<number | null>(null);
+  // Media blob of an uploaded video still being probed in the background
+  const [probingMediaId, setProbingMediaId] = useState<number | null>(null);
+  // Progress (0-1) of converting an uploaded video with an unsupported codec
+  const [transcodeProgress, setTranscodeProgress] = useState<number | null>(null);
+  const sse = useOptionalSSEContext();
+  const addSSEListener = sse?.addEventListener;
+  const sseConnected = sse?.connectionState === 'connected';
   // Track if duration was auto-detected from video (makes field read-only)
   const [videoDurationDetected, setVideoDurationDetected] = useState(false);
   // Track preview iframe state for URL slides
@@ -105,6 +143,64 @@ const SlideshowItemForm: React.FC<SlideshowItemFormProps> = ({
   const [displays, setDisplays] = useState<Display[]>([]);
   const [selectedDisplayId, setSelectedDisplayId] = useState<number | null>(null);
 
+  // Apply background probe results for an uploaded video, pushed over SSE
+  // when connected and polled otherwise
+  useEffect(() => {
+    if (probingMediaId === null) return;
+
+    let finished = false;
+    const applyTranscodeProgress = (transcode: MediaTranscode) => {
+      if (!finished && transcode.media_blob_id === probingMediaId && transcode.kind === 'primary') {
+        setTranscodeProgress(transcode.progress);
+      }
+    };
+    const applyProbeResult = (media: MediaBlob) => {
+      if (finished || media.id !== probingMediaId) return;
+      if (media.probe_status === 'pending') return;
+      if (media.probe_status === 'transcoding') {
+        const primary = media.transcodes?.find(t => t.kind === 'primary');
+        setTranscodeProgress(primary ? primary.progress : 0);
+        return;
+      }
+      finished = true;
+      setProbingMediaId(null);
+      setTranscodeProgress(null);
+
+      if (media.probe_status === 'rejected') {
+        setError(media.probe_error || 'Unsupported video format');
+        setFormData(prev => ({ ...prev, content_file_path: '' }));
+        return;
+      }
+      if (media.duration) {
+        setFormData(prev => ({ ...prev, display_duration: Math.round(media.duration as number) }));
+        setVideoDurationDetected(true);
+      }
+    };
+
+    const removeListener = addSSEListener?.('media.probed', (event) => {
+      applyProbeResult(event.data as MediaBlob);
+    });
+    const removeTranscodeListener = addSSEListener?.('media.transcode', (event) => {
+      applyTranscodeProgress(event.data as MediaTranscode);
+    });
+    const checkProbeResult = async () => {
+      const response = await apiClient.getMediaBlob(probingMediaId);
+      if (response.success && response.data) {
+        applyProbeResult(response.data);
+      }
+    };
+    // The probe may have finished before the listener was added
+    checkProbeResult();
+    const pollInterval = sseConnected ? null : setInterval(checkProbeResult, PROBE_POLL_INTERVAL_MS);
+
+    return () => {
+      finished = true;
+      removeListener?.();
+      removeTranscodeListener?.();
+      if (pollInterval) clearInterval(pollInterval);
+    };
+  }, [probingMediaId, addSSEListener, sseConnected]);
+
   useEffect(() => {
     if (item) {
       setFormData({
@@ -118,6 +214,9 @@ const SlideshowItemForm: React.FC<SlideshowItemFormProps> = ({
         scale_factor: item.scale_factor ?? null,
         ical_url: item.ical_url || '',
         ical_refresh_minutes: item.ical_refresh_minutes ?? 15,
+        ical_day_start_hour: item.ical_day_start_hour ?? DEFAULT_DAY_START_HOUR,
+        ical_day_end_hour: item.ical_day_end_hour ?? DEFAULT_DAY_END_HOUR,
+        ical_slot_minutes: item.ical_slot_minutes ?? DEFAULT_SLOT_MINUTES,
       });
     }
   }, [item]);
@@ -199,6 +298,9 @@ const SlideshowItemForm: React.FC<SlideshowItemFormProps> = ({
           errors.ical_url = 'Please enter a valid URL';
         }
       }
+      if (formData.ical_day_end_hour <= formData.ical_day_start_hour) {
+        errors.ical_day_end_hour = 'The calendar must end after it starts';
+      }
     }
 
     // Check for video URL validation errors (when using URL, not file)
@@ -269,6 +371,9 @@ const SlideshowItemForm: React.FC<SlideshowItemFormProps> = ({
       if (formData.content_type === 'skedda') {
         submitData.ical_url = formData.ical_url.trim();
         submitData.ical_refresh_minutes = formData.ical_refresh_minutes;
+        submitData.ical_day_start_hour = formData.ical_day_start_hour;
+        submitData.ical_day_end_hour = formData.ical_day_end_hour;
+        submitData.ical_slot_minutes = formData.ical_slot_minutes;
       }
 
       let response;
@@ -310,24 +415,34 @@ const SlideshowItemForm: React.FC<SlideshowItemFormProps> = ({
       setUploadingFile(true);
       setError(null);
 
-      const uploadFormData = new FormData();
-      uploadFormData.append('file', file);
-      uploadFormData.append('slideshow_id', slideshowId.toString());
+      let response: ApiResponse;
+      if (file.size > RESUMABLE_UPLOAD_THRESHOLD) {
+        // Large files are sent in chunks so a dropped connection resumes
+        // instead of restarting the whole upload
+        setUploadProgress(0);
+        response = await apiClient.uploadFileResumable(
+          file,
+          file.type.startsWith('image/') ? 'image' : 'video',
+          slideshowId,
+          (uploaded, total) => setUploadProgress(Math.round((uploaded / total) * 100))
+        );
+      } else {
+        const uploadFormData = new FormData();
+        uploadFormData.append('file', file);
+        uploadFormData.append('slideshow_id', slideshowId.toString());
 
-      const endpoint = file.type.startsWith('image/') ?
-        '/api/v1/uploads/image' :
-        '/api/v1/uploads/video';
+        const endpoint = file.type.startsWith('image/') ?
+          '/api/v1/uploads/image' :
+          '/api/v1/uploads/video';
 
-      const response = await apiCall(endpoint, {
-        method: 'POST',
-        body: uploadFormData,
-      });
+        response = await apiCall(endpoint, {
+          method: 'POST',
+          body: uploadFormData,
+        });
+      }
 
       if (response.success) {
-        const uploadData = response.data as {
-          file_path: string;
-          duration_seconds?: number;
-        };
+        const uploadData = response.data as UploadedFileInfo;
         const isVideo = file.type.startsWith('video/');
 
         setFormData(prev => {
@@ -354,6 +469,15 @@ const SlideshowItemForm: React.FC<SlideshowItemFormProps> = ({
         if (isVideo && uploadData.duration_seconds) {
           setVideoDurationDetected(true);
         }
+
+        // Codec checks and duration detection finish in the background
+        if (
+          isVideo &&
+          (uploadData.probe_status === 'pending' || uploadData.probe_status === 'transcoding') &&
+          uploadData.media_blob_id
+        ) {
+          setProbingMediaId(uploadData.media_blob_id);
+        }
       } else {
         setError(response.error || 'Failed to upload file');
       }
@@ -362,6 +486,7 @@ const SlideshowItemForm: React.FC<SlideshowItemFormProps> = ({
       console.error('Error uploading file:', err);
     } finally {
       setUploadingFile(false);
+      setUploadProgress(null);
     }
   };
 
@@ -711,7 +836,7 @@ const SlideshowItemForm: React.FC<SlideshowItemFormProps> = ({
               {uploadingFile && (
                 <div className="mt-2">
                   <Spinner animation="border" size="sm" className="me-2" />
-                  Uploading...
+                  Uploading{uploadProgress !== null ? ` (${uploadProgress}%)` : ''}...
                 </div>
               )}
               {formData.content_file_path && !item && (
@@ -722,6 +847,14 @@ const SlideshowItemForm: React.FC<SlideshowItemFormProps> = ({
                   </span>
                 </div>
               )}
+              {probingMediaId !== null && (
+                <div className="mt-2 text-muted">
+                  <Spinner animation="border" size="sm" className="me-2" />
+                  {transcodeProgress === null
+                    ? 'Checking video format...'
+                    : `Converting video for web browsers... ${Math.round(transcodeProgress * 100)}%`}
+                </div>
+              )}
               {validationErrors.content && (
                 <div className="invalid-feedback d-block">
                   {validationErrors.content}
@@ -829,6 +962,58 @@ const SlideshowItemForm: React.FC<SlideshowItemFormProps> = ({
                 How often to refresh the calendar data from the feed
               </Form.Text>
             </Form.Group>
+
+            <Row>
+              <Col md={4}>
+                <Form.Group className="mb-3">
+                  <Form.Label htmlFor="ical_day_start_hour">Day Starts</Form.Label>
+                  <Form.Select
+                    id="ical_day_start_hour"
+                    value={formData.ical_day_start_hour}
+                    onChange={(e) => handleInputChange('ical_day_start_hour', parseInt(e.target.value))}
+                  >
+                    {Array.from({ length: 24 }, (_, hour) => (
+                      <option key={hour} value={hour}>{formatHour(hour)}</option>
+                    ))}
+                  </Form.Select>
+                </Form.Group>
+              </Col>
+              <Col md={4}>
+                <Form.Group className="mb-3">
+                  <Form.Label htmlFor="ical_day_end_hour">Day Ends</Form.Label>
+                  <Form.Select
+                    id="ical_day_end_hour"
+                    value={formData.ical_day_end_hour}
+                    onChange={(e) => handleInputChange('ical_day_end_hour', parseInt(e.target.value))}
+                    isInvalid={!!validationErrors.ical_day_end_hour}
+                  >
+                    {Array.from({ length: 24 }, (_, i) => i + 1).map((hour) => (
+                      <option key={hour} value={hour}>{formatHour(hour)}</option>
+                    ))}
+                  </Form.Select>
+                  <Form.Control.Feedback type="invalid">
+                    {validationErrors.ical_day_end_hour}
+                  </Form.Control.Feedback>
+                </Form.Group>
+              </Col>
+              <Col md={4}>
+                <Form.Group className="mb-3">
+                  <Form.Label htmlFor="ical_slot_minutes">Time Slots</Form.Label>
+                  <Form.Select
+                    id="ical_slot_minutes"
+                    value={formData.ical_slot_minutes}
+                    onChange={(e) => handleInputChange('ical_slot_minutes', parseInt(e.target.value))}
+                  >
+                    <option value={5}>5 minutes</option>
+                    <option value={10}>10 minutes</option>
+                    <option value={15}>15 minutes</option>
+                    <option value={20}>20 minutes</option>
+                    <option value={30}>30 minutes (default)</option>
+                    <option value={60}>1 hour</option>
+                  </Form.Select>
+                </Form.Group>
+              </Col>
+            </Row>
           </>
         );
 
@@ -879,6 +1064,9 @@ const SlideshowItemForm: React.FC<SlideshowItemFormProps> = ({
                 // Reset skedda fields when changing away from skedda type
                 handleInputChange('ical_url', '');
                 handleInputChange('ical_refresh_minutes', 15);
+                handleInputChange('ical_day_start_hour', DEFAULT_DAY_START_HOUR);
+                handleInputChange('ical_day_end_hour', DEFAULT_DAY_END_HOUR);
+                handleInputChange('ical_slot_minutes', DEFAULT_SLOT_MINUTES);
                 // Reset video duration detection flag (but keep user-entered duration)
                 setVideoDurationDetected(false);
                 // Reset video URL validation state
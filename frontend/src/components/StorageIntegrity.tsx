@@ -0,0 +1,202 @@
+import React, { useState, useEffect, useCallback } from 'react';
+import { Alert, Badge, Button, Col, Form, Row, Spinner, Table } from 'react-bootstrap';
+import apiClient from '../utils/apiClient';
+import type { StorageIntegrity as StorageIntegrityData, StorageScanIssueKind } from '../types';
+
+const ISSUE_LABELS: Record<StorageScanIssueKind, { label: string; variant: string }> = {
+  orphaned: { label: 'Orphaned', variant: 'secondary' },
+  missing: { label: 'Missing', variant: 'danger' },
+  checksum_mismatch: { label: 'Checksum mismatch', variant: 'danger' },
+  unreadable: { label: 'Unreadable', variant: 'warning' },
+};
+
+// Poll while a scan is running
+const RUNNING_POLL_INTERVAL_MS = 5000;
+
+const formatBytes = (size: number): string => {
+  const units = ['B', 'KB', 'MB', 'GB'];
+  for (const unit of units) {
+    if (size < 1024) {
+      return `${size.toFixed(1)} ${unit}`;
+    }
+    size /= 1024;
+  }
+  return `${size.toFixed(1)} TB`;
+};
+
+const formatDate = (value: string | null): string =>
+  value ? new Date(value).toLocaleString() : '-';
+
+/**
+ * Results of the latest background storage integrity scan, with a control
+ * to start a new scan.
+ */
+const StorageIntegrity: React.FC = () => {
+  const [data, setData] = useState<StorageIntegrityData | null>(null);
+  const [loading, setLoading] = useState(true);
+  const [starting, setStarting] = useState(false);
+  const [verifyChecksums, setVerifyChecksums] = useState(false);
+  const [error, setError] = useState<string | null>(null);
+
+  const loadIntegrity = useCallback(async () => {
+    const response = await apiClient.getStorageIntegrity();
+    if (response.success && response.data) {
+      setData(response.data);
+      setError(null);
+    } else {
+      setError(response.error || 'Failed to load storage integrity');
+    }
+    setLoading(false);
+  }, []);
+
+  useEffect(() => {
+    loadIntegrity();
+  }, [loadIntegrity]);
+
+  useEffect(() => {
+    if (!data?.running_scan) {
+      return undefined;
+    }
+    const timer = setInterval(loadIntegrity, RUNNING_POLL_INTERVAL_MS);
+    return () => clearInterval(timer);
+  }, [data?.running_scan, loadIntegrity]);
+
+  const handleStartScan = async () => {
+    setStarting(true);
+    const response = await apiClient.startStorageScan(verifyChecksums);
+    if (!response.success) {
+      setError(response.error || 'Failed to start storage scan');
+    }
+    setStarting(false);
+    await loadIntegrity();
+  };
+
+  if (loading) {
+    return (
+      <div className="text-center py-4">
+        <Spinner animation="border" />
+      </div>
+    );
+  }
+
+  const scan = data?.latest_scan;
+
+  return (
+    <div>
+      {error && (
+        <Alert variant="danger" dismissible onClose={() => setError(null)}>
+          {error}
+        </Alert>
+      )}
+
+      <Row className="align-items-center mb-3">
+        <Col>
+          {data?.running_scan ? (
+            <span>
+              <Spinner animation="border" size="sm" className="me-2" />
+              Scan in progress since {formatDate(data.running_scan.started_at)}
+            </span>
+          ) : (
+            <span className="text-muted">
+              {scan ? `Last scan ${formatDate(scan.completed_at)}` : 'No scans have run yet'}
+            </span>
+          )}
+        </Col>
+        <Col xs="auto">
+          <Form.Check
+            type="switch"
+            id="verify-checksums"
+            label="Verify checksums"
+            checked={verifyChecksums}
+            onChange={(e) => setVerifyChecksums(e.target.checked)}
+          />
+        </Col>
+        <Col xs="auto">
+          <Button
+            variant="primary"
+            onClick={handleStartScan}
+            disabled={starting || Boolean(data?.running_scan)}
+          >
+            <i className="bi bi-search"></i> Run scan
+          </Button>
+        </Col>
+      </Row>
+
+      {scan && (
+        <>
+          {scan.status === 'failed' && (
+            <Alert variant="danger">Scan failed: {scan.error}</Alert>
+          )}
+          <Row className="mb-3 text-center">
+            <Col>
+              <h5>{scan.directories_scanned}</h5>
+              <small className="text-muted">Directories listed</small>
+            </Col>
+            <Col>
+              <h5>{scan.directories_skipped}</h5>
+              <small className="text-muted">Directories unchanged</small>
+            </Col>
+            <Col>
+              <h5>
+                +{scan.files_added} / ~{scan.files_updated} / -{scan.files_removed}
+              </h5>
+              <small className="text-muted">Files added / changed / removed</small>
+            </Col>
+            <Col>
+              <h5>{scan.checksums_verified}</h5>
+              <small className="text-muted">
+                Checksums verified ({formatBytes(scan.bytes_verified)})
+              </small>
+            </Col>
+            <Col>
+              <h5 className={scan.issue_count ? 'text-danger' : 'text-success'}>
+                {scan.issue_count}
+              </h5>
+              <small className="text-muted">Issues</small>
+            </Col>
+          </Row>
+
+          {data && data.issues.length > 0 ? (
+            <Table striped size="sm" responsive>
+              <thead>
+                <tr>
+                  <th>Issue</th>
+                  <th>Path</th>
+                  <th>Size</th>
+                  <th>Slideshow</th>
+                  <th>Detail</th>
+                </tr>
+              </thead>
+              <tbody>
+                {data.issues.map((issue) => (
+                  <tr key={issue.id}>
+                    <td>
+                      <Badge bg={ISSUE_LABELS[issue.kind].variant}>
+                        {ISSUE_LABELS[issue.kind].label}
+                      </Badge>
+                    </td>
+                    <td className="text-break">{issue.path}</td>
+                    <td>{issue.file_size !== null ? formatBytes(issue.file_size) : '-'}</td>
+                    <td>{issue.slideshow_id ?? '-'}</td>
+                    <td className="text-break">{issue.detail}</td>
+                  </tr>
+                ))}
+              </tbody>
+            </Table>
+          ) : (
+            <p className="text-success mb-0">
+              <i className="bi bi-check-circle-fill"></i> No storage issues found
+            </p>
+          )}
+          {data && scan.issue_count > data.issues.length && (
+            <p className="text-muted small">
+              Showing {data.issues.length} of {scan.issue_count} issues
+            </p>
+          )}
+        </>
+      )}
+    </div>
+  );
+};
+
+export default StorageIntegrity;
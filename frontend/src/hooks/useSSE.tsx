@@ -255,7 +255,8 @@ export function useSSE(endpoint: string, options?: {
       const eventTypes = [
         'connected', 'ping', 'display.status_changed', 'display.assignment_changed',
         'display.configuration_changed', 'slideshow.updated', 'slideshow.created',
-        'slideshow.deleted', 'system.notification'
+        'slideshow.deleted', 'system.notification', 'media.probed',
+        'media.transcode'
       ];
 
       eventTypes.forEach(eventType => {
@@ -514,6 +515,12 @@ export function useSSEContext() {
   return context;
 }
 
+// Hook to use SSE context where a provider may not be present
+// eslint-disable-next-line react-refresh/only-export-components
+export function useOptionalSSEContext() {
+  return useContext(SSEContext);
+}
+
 // Hook to track network/online status
 // eslint-disable-next-line react-refresh/only-export-components
 export function useNetworkStatus() {
@@ -3,6 +3,7 @@ import { Container, Row, Col, Card, Alert, Spinner, Tabs, Tab } from 'react-boot
 import SSEDebugger from '../components/SSEDebugger';
 import EnhancedDisplayStatus from '../components/EnhancedDisplayStatus';
 import LiveDataIndicator from '../components/LiveDataIndicator';
+import StorageIntegrity from '../components/StorageIntegrity';
 
 const SystemMonitoring: React.FC = () => {
   const [error, setError] = useState<string | null>(null);
@@ -126,6 +127,22 @@ const SystemMonitoring: React.FC = () => {
                 </Card.Body>
               </Card>
             </Tab>
+
+            <Tab eventKey="storage" title="Storage Integrity">
+              <Card>
+                <Card.Header>
+                  <h5 className="mb-0">
+                    <i className="bi bi-hdd"></i> Storage Integrity
+                  </h5>
+                  <p className="text-muted mb-0 mt-1">
+                    Orphaned, missing and corrupted media found by background storage scans
+                  </p>
+                </Card.Header>
+                <Card.Body>
+                  <StorageIntegrity />
+                </Card.Body>
+              </Card>
+            </Tab>
           </Tabs>
         </Col>
       </Row>
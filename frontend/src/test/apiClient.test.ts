@@ -205,6 +205,49 @@ describe('API Client', () => {
     });
   });
 
+  describe('Resumable Uploads', () => {
+    it('gives chunks a timeout scaled to their size', async () => {
+      const chunkSize = 8 * 1024 * 1024;
+      const file = new File([new Uint8Array(chunkSize)], 'clip.mp4');
+      const setTimeoutSpy = vi.spyOn(globalThis, 'setTimeout');
+
+      mockFetch
+        .mockResolvedValueOnce({
+          ok: true,
+          json: async () => ({
+            success: true,
+            data: { upload_id: 'abc', chunk_size: chunkSize, offset: 0 }
+          })
+        })
+        .mockResolvedValueOnce({
+          ok: true,
+          json: async () => ({
+            success: true,
+            data: { upload_id: 'abc', chunk_size: chunkSize, offset: chunkSize }
+          })
+        })
+        .mockResolvedValueOnce({
+          ok: true,
+          json: async () => ({
+            success: true,
+            data: { file_path: 'media/videos/ab/abc.mp4' }
+          })
+        });
+
+      try {
+        const result = await apiClient.uploadFileResumable(file, 'video', 1);
+
+        expect(result.success).toBe(true);
+        const delays = setTimeoutSpy.mock.calls.map((call) => call[1]);
+        // Created and completed with the default timeout; the 8 MB chunk
+        // gets 128 seconds at 64 KB/s
+        expect(delays).toEqual([10000, 128000, 10000]);
+      } finally {
+        setTimeoutSpy.mockRestore();
+      }
+    });
+  });
+
   describe('Error Handling', () => {
     it('handles network errors', async () => {
       // Non-retryable network error (doesn't match retry patterns)
@@ -98,6 +98,10 @@ export interface SlideshowItem {
   // Skedda/iCal calendar fields
   ical_feed_id?: number | null;
   ical_refresh_minutes?: number | null;
+  // Calendar grid hours and slot length; null uses 7 AM-11 PM, 30 minutes
+  ical_day_start_hour?: number | null;
+  ical_day_end_hour?: number | null;
+  ical_slot_minutes?: number | null;
   ical_url?: string; // URL from linked feed, for display/editing
   created_at: string;
   updated_at: string;
@@ -119,12 +123,16 @@ export interface SkeddaEvent {
   end_time: string; // "14:00"
   start_slot: number;
   row_span: number;
+  // Side-by-side lane among concurrent bookings of the space
+  lane: number;
+  lane_count: number;
 }
 
 export interface SkeddaCalendarData {
   date: string; // "2026-01-28"
   date_display: string; // "Wednesday, January 28, 2026"
   spaces: string[];
+  slot_minutes: number;
   time_slots: SkeddaTimeSlot[];
   events: SkeddaEvent[];
   last_updated: string | null;
@@ -169,6 +177,9 @@ export interface SlideshowItemFormData {
   // Skedda-specific fields
   ical_url?: string;
   ical_refresh_minutes?: number;
+  ical_day_start_hour?: number;
+  ical_day_end_hour?: number;
+  ical_slot_minutes?: number;
 }
 
 // Profile form types
@@ -192,3 +203,101 @@ export interface VideoUrlValidationResult {
     container_format: string | null;
   } | null;
 }
+
+export interface UploadedFileInfo {
+  file_path: string;
+  url: string;
+  original_filename?: string;
+  file_size?: number;
+  checksum?: string;
+  duration_seconds?: number;
+  media_blob_id?: number;
+  probe_status?: MediaProbeStatus | null;
+}
+
+export type MediaProbeStatus = 'pending' | 'transcoding' | 'ready' | 'rejected' | 'failed';
+
+export interface MediaTranscode {
+  id: number;
+  media_blob_id: number;
+  kind: 'primary' | 'rendition';
+  format: 'mp4' | 'webm';
+  max_height: number;
+  bitrate_kbps: number;
+  status: 'queued' | 'running' | 'completed' | 'failed' | 'cancelled';
+  progress: number;
+  file_path: string;
+  file_size: number | null;
+  error: string | null;
+  url?: string | null;
+}
+
+export interface MediaBlob {
+  id: number;
+  checksum: string;
+  content_type: 'image' | 'video';
+  file_path: string;
+  url?: string;
+  file_size: number;
+  mime_type: string | null;
+  duration: number | null;
+  probe_status: MediaProbeStatus | null;
+  codec_info: {
+    video_codec: string | null;
+    audio_codec: string | null;
+    container_format: string | null;
+  } | null;
+  probe_error: string | null;
+  transcodes?: MediaTranscode[];
+}
+
+export interface ResumableUploadStatus {
+  upload_id: string;
+  filename: string;
+  content_type: 'image' | 'video';
+  slideshow_id: number;
+  size: number;
+  offset: number;
+  complete: boolean;
+  chunk_size: number;
+  created_at: string;
+}
+
+export type StorageScanIssueKind = 'orphaned' | 'missing' | 'checksum_mismatch' | 'unreadable';
+
+export interface StorageScan {
+  id: number;
+  status: 'running' | 'completed' | 'failed';
+  verify_checksums: boolean;
+  directories_scanned: number;
+  directories_skipped: number;
+  files_scanned: number;
+  files_added: number;
+  files_updated: number;
+  files_removed: number;
+  checksums_verified: number;
+  bytes_verified: number;
+  issue_count: number;
+  error: string | null;
+  started_at: string | null;
+  updated_at: string | null;
+  completed_at: string | null;
+}
+
+export interface StorageScanIssue {
+  id: number;
+  scan_id: number;
+  kind: StorageScanIssueKind;
+  path: string | null;
+  file_size: number | null;
+  slideshow_item_id: number | null;
+  slideshow_id: number | null;
+  media_blob_id: number | null;
+  detail: string | null;
+}
+
+export interface StorageIntegrity {
+  latest_scan: StorageScan | null;
+  running_scan: StorageScan | null;
+  issues: StorageScanIssue[];
+}
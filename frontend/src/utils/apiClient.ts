@@ -7,7 +7,11 @@ import type {
   SlideshowFormData,
   SlideshowItemFormData,
   AssignmentHistory,
-  VideoUrlValidationResult
+  VideoUrlValidationResult,
+  UploadedFileInfo,
+  ResumableUploadStatus,
+  MediaBlob,
+  StorageIntegrity
 } from '../types';
 
 /**
@@ -21,11 +25,13 @@ interface RetryConfig {
 }
 
 /**
- * Extended request options with retry configuration.
+ * Extended request options with retry configuration and timeout.
  */
 interface ExtendedRequestInit extends RequestInit {
   retry?: boolean;
   retryConfig?: Partial<RetryConfig>;
+  // Milliseconds before the request is aborted (defaults to the client's)
+  timeout?: number;
 }
 
 /**
@@ -38,6 +44,13 @@ const DEFAULT_RETRY_CONFIG: RetryConfig = {
   retryOn: [408, 429, 500, 502, 503, 504], // Timeout, rate limit, server errors
 };
 
+/**
+ * Slowest upload speed (bytes per second) a resumable upload chunk may
+ * take before it is aborted and resumed; chunks get a timeout scaled to
+ * their size, so 8 MB chunks are allowed about two minutes.
+ */
+const MIN_UPLOAD_BYTES_PER_SECOND = 64 * 1024;
+
 /**
  * Calculate delay with exponential backoff and jitter.
  */
@@ -98,7 +111,12 @@ class ApiClient {
     options: ExtendedRequestInit = {}
   ): Promise<ApiResponse<T>> {
     const url = `${this.baseURL}${endpoint}`;
-    const { retry = true, retryConfig: customRetryConfig, ...fetchOptions } = options;
+    const {
+      retry = true,
+      retryConfig: customRetryConfig,
+      timeout = this.timeout,
+      ...fetchOptions
+    } = options;
 
     const retryConfig = { ...this.defaultRetryConfig, ...customRetryConfig };
 
@@ -117,7 +135,7 @@ class ApiClient {
     for (let attempt = 0; attempt <= retryConfig.maxRetries; attempt++) {
       try {
         const controller = new AbortController();
-        const timeoutId = setTimeout(() => controller.abort(), this.timeout);
+        const timeoutId = setTimeout(() => controller.abort(), timeout);
 
         const response = await fetch(url, {
           ...config,
@@ -225,7 +243,7 @@ class ApiClient {
    */
   private async requestNoRetry<T>(
     endpoint: string,
-    options: RequestInit = {}
+    options: ExtendedRequestInit = {}
   ): Promise<ApiResponse<T>> {
     return this.request<T>(endpoint, { ...options, retry: false });
   }
@@ -444,6 +462,93 @@ class ApiClient {
     });
   }
 
+  /**
+   * Upload a large file in chunks using the resumable upload API.
+   *
+   * After a failed or interrupted chunk, the offset the server actually
+   * received is fetched and the upload continues from there, so a dropped
+   * connection only costs the chunk in flight instead of the whole file.
+   * Each chunk's timeout is scaled to its size (see
+   * MIN_UPLOAD_BYTES_PER_SECOND) rather than the client's default, which
+   * slow connections could not send a whole chunk within.
+   */
+  async uploadFileResumable(
+    file: File,
+    contentType: 'image' | 'video',
+    slideshowId: number,
+    onProgress?: (uploadedBytes: number, totalBytes: number) => void,
+    maxChunkRetries = 5
+  ): Promise<ApiResponse<UploadedFileInfo>> {
+    const created = await this.requestNoRetry<ResumableUploadStatus>('/api/v1/uploads/resumable', {
+      method: 'POST',
+      body: JSON.stringify({
+        filename: file.name,
+        content_type: contentType,
+        slideshow_id: slideshowId,
+        size: file.size,
+      }),
+    });
+    if (!created.success || !created.data) {
+      return { success: false, error: created.error || 'Failed to start upload' };
+    }
+
+    const { upload_id: uploadId, chunk_size: chunkSize } = created.data;
+    const endpoint = `/api/v1/uploads/resumable/${uploadId}`;
+    let offset = 0;
+    let failures = 0;
+
+    while (offset < file.size) {
+      const chunk = file.slice(offset, offset + chunkSize);
+      const response = await this.requestNoRetry<ResumableUploadStatus>(endpoint, {
+        method: 'PATCH',
+        body: chunk,
+        headers: {
+          'Content-Type': 'application/offset+octet-stream',
+          'Upload-Offset': offset.toString(),
+        },
+        timeout: Math.max(
+          this.timeout,
+          (chunk.size / MIN_UPLOAD_BYTES_PER_SECOND) * 1000
+        ),
+      });
+
+      if (response.success && response.data) {
+        offset = response.data.offset;
+        failures = 0;
+        onProgress?.(offset, file.size);
+        continue;
+      }
+
+      failures += 1;
+      if (failures > maxChunkRetries) {
+        return { success: false, error: response.error || 'Upload failed' };
+      }
+      await sleep(
+        calculateBackoff(
+          failures - 1,
+          this.defaultRetryConfig.baseDelay,
+          this.defaultRetryConfig.maxDelay
+        )
+      );
+
+      // Resume from whatever the server received before the failure
+      const status = await this.request<ResumableUploadStatus>(endpoint);
+      if (status.success && status.data) {
+        offset = status.data.offset;
+        onProgress?.(offset, file.size);
+      }
+    }
+
+    return this.requestNoRetry<UploadedFileInfo>(`${endpoint}/complete`, {
+      method: 'POST',
+    });
+  }
+
+  // Media methods
+  async getMediaBlob(mediaBlobId: number): Promise<ApiResponse<MediaBlob>> {
+    return this.request<MediaBlob>(`/api/v1/media/${mediaBlobId}`);
+  }
+
   // Video URL validation
   async validateVideoUrl(url: string): Promise<ApiResponse<VideoUrlValidationResult>> {
     // Use a longer timeout for video URL validation since ffprobe needs to probe the remote URL
@@ -525,6 +630,21 @@ class ApiClient {
       method: 'POST',
     });
   }
+
+  // Admin storage integrity methods
+  async getStorageIntegrity(limit?: number): Promise<ApiResponse<StorageIntegrity>> {
+    const query = limit ? `?limit=${limit}` : '';
+    return this.request<StorageIntegrity>(`/api/v1/admin/storage/integrity${query}`);
+  }
+
+  async startStorageScan(verifyChecksums?: boolean): Promise<ApiResponse<null>> {
+    return this.requestNoRetry<null>('/api/v1/admin/storage/integrity/scan', {
+      method: 'POST',
+      body: JSON.stringify(
+        verifyChecksums === undefined ? {} : { verify_checksums: verifyChecksums }
+      ),
+    });
+  }
 }
 
 // Create singleton instance
@@ -9,28 +9,47 @@ This module contains all version 1 REST API endpoints:
 All endpoints require authentication and return consistent JSON responses.
 """
 
-from typing import Any, Callable, Dict, Optional, Tuple
+from typing import Any, Callable, Dict, Optional, Tuple, cast
 
 from flask import Blueprint, Response, current_app, request, session
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 from werkzeug.exceptions import Unauthorized
 
 from ..auth.decorators import get_current_user
 from ..exceptions import (
     AuthenticationError,
     NotFoundError,
+    RateLimitError,
+    StorageError,
     ValidationError,
 )
-from ..ical_service import get_or_create_feed, refresh_all_feeds, refresh_feed
+from ..ical_service import get_or_create_feed, refresh_feed, start_refresh_job
+from ..media_store import attach_item_media, store_upload
 from ..models import (
     AssignmentHistory,
     Display,
     DisplayConfigurationTemplate,
+    ICalRefreshJob,
+    MediaBlob,
+    MediaTranscode,
     Slideshow,
     SlideshowItem,
+    StorageScan,
+    StorageScanIssue,
     User,
     db,
 )
+from ..rate_limit import RateLimiter
+from ..resumable_upload import (
+    abort_upload,
+    append_chunk,
+    complete_upload,
+    create_upload,
+    get_upload,
+    parse_chunk_checksum,
+)
+from ..skedda_layout import DayLayout
 from ..sse import (
     create_display_event,
     create_slideshow_event,
@@ -39,12 +58,18 @@ from ..sse import (
     require_sse_auth,
     sse_manager,
 )
-from ..storage import get_storage_manager
+from ..storage import StorageManager, get_storage_manager, streaming_upload
+from ..storage_scan import get_running_scan, schedule_storage_scan
+from ..telemetry import get_telemetry_series, record_heartbeat
+from ..transcode import cancel_transcode, queue_transcodes, transcoding_enabled
 from .helpers import api_error, api_response
 
 # Create API v1 blueprint
 api_v1_bp = Blueprint("api_v1", __name__)
 
+# Calendar grid settings of Skedda slideshow items
+SKEDDA_LAYOUT_FIELDS = ("ical_day_start_hour", "ical_day_end_hour", "ical_slot_minutes")
+
 
 # =============================================================================
 # Authentication Decorator for API
@@ -199,10 +224,9 @@ def get_slideshow_by_id(slideshow_id: int) -> Tuple[Response, int]:
 
     # Get slideshow data with items
     result = slideshow.to_dict()
-    if include_inactive:
-        result["items"] = [item.to_dict() for item in slideshow.items]
-    else:
-        result["items"] = [item.to_dict() for item in slideshow.items if item.is_active]
+    result["items"] = [
+        item.to_dict() for item in _get_items_for_listing(slideshow, include_inactive)
+    ]
 
     return api_response(result, "Slideshow retrieved successfully")
 
@@ -395,16 +419,10 @@ def list_slideshow_items(slideshow_id: int) -> Tuple[Response, int]:
             request.args.get("include_inactive", "false").lower() == "true"
         )
 
-        # Ensure ical_feed relationship is loaded for skedda items so
-        # to_dict() includes ical_url (same pattern as update endpoint).
-        for item in slideshow.items:
-            if item.content_type == "skedda" and item.ical_feed_id:
-                _ = item.ical_feed  # Trigger lazy load
-
-        if include_inactive:
-            items = [item.to_dict() for item in slideshow.items]
-        else:
-            items = [item.to_dict() for item in slideshow.items if item.is_active]
+        items = [
+            item.to_dict()
+            for item in _get_items_for_listing(slideshow, include_inactive)
+        ]
 
         return api_response(items, "Slideshow items retrieved successfully")
 
@@ -415,6 +433,72 @@ def list_slideshow_items(slideshow_id: int) -> Tuple[Response, int]:
         return api_error("Failed to retrieve slideshow items", 500)
 
 
+def _get_items_for_listing(
+    slideshow: Slideshow, include_inactive: bool
+) -> list[SlideshowItem]:
+    """Get a slideshow's items in order, with what their to_dict() reads.
+
+    Without a display, to_dict() still looks up the converted copy of each
+    video, so media blobs and their transcodes are loaded in one query
+    each rather than two per video, along with the iCal feeds of Skedda
+    items for their ical_url.
+
+    Args:
+        slideshow: Slideshow whose items are listed
+        include_inactive: Include inactive items
+
+    Returns:
+        Items ordered by order_index
+    """
+    query = SlideshowItem.query.filter_by(slideshow_id=slideshow.id)
+    if not include_inactive:
+        query = query.filter_by(is_active=True)
+    return cast(
+        list[SlideshowItem],
+        query.options(
+            selectinload(SlideshowItem.media_blob).selectinload(MediaBlob.transcodes),
+            selectinload(SlideshowItem.ical_feed),
+        )
+        .order_by(SlideshowItem.order_index)
+        .all(),
+    )
+
+
+def _skedda_layout_settings(
+    data: Dict[str, Any], item: Optional[SlideshowItem] = None
+) -> Dict[str, Optional[int]]:
+    """Read the calendar grid settings of a Skedda item from request data.
+
+    Args:
+        data: Request data; settings it leaves out keep the item's values
+        item: Item being updated, or None for a new item
+
+    Returns:
+        Dictionary of ical_day_start_hour, ical_day_end_hour and
+        ical_slot_minutes (None uses the default)
+
+    Raises:
+        ValueError: If a setting is invalid or the grid would be empty
+    """
+    settings: Dict[str, Optional[int]] = {
+        field: getattr(item, field) if item else None for field in SKEDDA_LAYOUT_FIELDS
+    }
+    for field in SKEDDA_LAYOUT_FIELDS:
+        if field in data:
+            value = data[field]
+            if value is not None and (
+                not isinstance(value, int) or isinstance(value, bool)
+            ):
+                raise ValueError(f"{field} must be an integer")
+            settings[field] = value
+    DayLayout.from_settings(
+        settings["ical_day_start_hour"],
+        settings["ical_day_end_hour"],
+        settings["ical_slot_minutes"],
+    )
+    return settings
+
+
 @api_v1_bp.route("/slideshows/<int:slideshow_id>/items", methods=["POST"])
 @api_auth_required
 def create_slideshow_item(slideshow_id: int) -> Tuple[Response, int]:
@@ -473,6 +557,7 @@ def create_slideshow_item(slideshow_id: int) -> Tuple[Response, int]:
         # Handle skedda (iCal) content type
         ical_feed_id = None
         ical_refresh_minutes = None
+        layout_settings: Dict[str, Optional[int]] = {}
         if content_type == "skedda":
             ical_url = data.get("ical_url", "").strip() if data.get("ical_url") else ""
             if not ical_url:
@@ -498,6 +583,11 @@ def create_slideshow_item(slideshow_id: int) -> Tuple[Response, int]:
                         "Refresh interval must be between 1 and 1440 minutes", 400
                     )
 
+            try:
+                layout_settings = _skedda_layout_settings(data)
+            except ValueError as e:
+                return api_error(str(e), 400)
+
             # Trigger initial fetch to validate URL works
             if not refresh_feed(feed):
                 error_msg = feed.last_error or "Failed to fetch iCal data from URL"
@@ -526,9 +616,15 @@ def create_slideshow_item(slideshow_id: int) -> Tuple[Response, int]:
             scale_factor=scale_factor,
             ical_feed_id=ical_feed_id,
             ical_refresh_minutes=ical_refresh_minutes,
+            **layout_settings,
         )
 
         db.session.add(item)
+        try:
+            attach_item_media(item)
+        except ValidationError as e:
+            db.session.rollback()
+            return api_error(e.message, 400)
         db.session.commit()
 
         # For skedda items, ensure the ical_feed relationship is loaded so to_dict()
@@ -687,6 +783,15 @@ def update_slideshow_item(item_id: int) -> Tuple[Response, int]:
                         )
                 item.ical_refresh_minutes = ical_refresh_minutes
 
+            # Update the calendar grid if any of its settings are provided
+            if any(field in data for field in SKEDDA_LAYOUT_FIELDS):
+                try:
+                    layout_settings = _skedda_layout_settings(data, item)
+                except ValueError as e:
+                    return api_error(str(e), 400)
+                for field, value in layout_settings.items():
+                    setattr(item, field, value)
+
             # Validate required feed exists if changing to skedda type
             if (
                 "content_type" in data
@@ -695,6 +800,13 @@ def update_slideshow_item(item_id: int) -> Tuple[Response, int]:
             ):
                 return api_error("iCal URL is required for skedda content type", 400)
 
+        if "content_file_path" in data or "content_type" in data:
+            try:
+                attach_item_media(item)
+            except ValidationError as e:
+                db.session.rollback()
+                return api_error(e.message, 400)
+
         item.updated_by_id = current_user.id
         db.session.commit()
 
@@ -840,6 +952,31 @@ def reorder_slideshow_item(item_id: int) -> Tuple[Response, int]:
         return api_error("Failed to reorder slideshow item", 500)
 
 
+def _skedda_data_response(
+    data: dict[str, Any], etag: str, message: str
+) -> Tuple[Response, int]:
+    """Respond with Skedda calendar data, or 304 if the client has it.
+
+    Clients must revalidate the ETag on every request, so browsers send
+    If-None-Match automatically and reuse their copy while it is current.
+
+    Args:
+        data: Formatted calendar data
+        etag: ETag of the calendar data
+        message: Success message
+
+    Returns:
+        Tuple of (Flask Response, status code)
+    """
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response, _ = api_response(data, message)
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response, response.status_code
+
+
 @api_v1_bp.route("/slideshow-items/<int:item_id>/skedda-data", methods=["GET"])
 @api_auth_required
 def get_slideshow_item_skedda_data(item_id: int) -> Tuple[Response, int]:
@@ -850,7 +987,7 @@ def get_slideshow_item_skedda_data(item_id: int) -> Tuple[Response, int]:
     """
     from datetime import datetime
 
-    from ..ical_service import get_skedda_calendar_data
+    from ..ical_service import get_skedda_calendar
 
     try:
         current_user = get_current_user()
@@ -874,9 +1011,11 @@ def get_slideshow_item_skedda_data(item_id: int) -> Tuple[Response, int]:
                 return api_error("Invalid date format. Use YYYY-MM-DD", 400)
 
         # Get formatted calendar data
-        data = get_skedda_calendar_data(item, target_date=target_date)
+        data, etag = get_skedda_calendar(item, target_date=target_date)
 
-        return api_response(data, "Skedda calendar data retrieved successfully")
+        return _skedda_data_response(
+            data, etag, "Skedda calendar data retrieved successfully"
+        )
 
     except ValueError as e:
         return api_error(str(e), 400)
@@ -888,18 +1027,22 @@ def get_slideshow_item_skedda_data(item_id: int) -> Tuple[Response, int]:
 @api_v1_bp.route("/ical-feeds/refresh", methods=["POST"])
 @api_auth_required
 def refresh_all_ical_feeds() -> Tuple[Response, int]:
-    """Refresh all iCal feeds in the database.
+    """Start refreshing all iCal feeds in the background.
 
     This endpoint can be called by external schedulers (cron, systemd timer, etc.)
-    to proactively refresh all calendar data.
+    to proactively refresh all calendar data. Feeds are fetched concurrently;
+    poll ``GET /api/v1/ical-feeds/refresh/<job_id>`` for progress. If a refresh
+    is already in progress, that job is returned instead of starting another.
 
     Returns:
-        JSON with refresh results:
+        JSON with the refresh job (202):
         {
-            "refreshed": 3,
-            "errors": [
-                {"feed_id": 2, "url": "...", "error": "Connection timeout"}
-            ]
+            "id": 4,
+            "status": "running",
+            "feed_count": 20,
+            "feeds_done": 7,
+            "progress": 0.35,
+            ...
         }
     """
     try:
@@ -907,24 +1050,44 @@ def refresh_all_ical_feeds() -> Tuple[Response, int]:
         if not current_user:
             return api_error("Authentication required", 401)
 
-        result = refresh_all_feeds()
+        job, started = start_refresh_job(user_id=current_user.id)
 
-        if result["errors"]:
-            current_app.logger.warning(
-                f"iCal feed refresh completed with {len(result['errors'])} errors"
-            )
-        else:
-            current_app.logger.info(
-                f"iCal feed refresh completed: {result['refreshed']} feeds refreshed"
+        if not started:
+            return api_response(
+                job.to_dict(), "iCal feeds refresh already in progress", 202
             )
 
-        return api_response(result, "iCal feeds refresh completed")
+        current_app.logger.info(
+            f"User {current_user.username} started iCal feed refresh job {job.id}"
+        )
+        return api_response(job.to_dict(), "iCal feeds refresh started", 202)
 
     except Exception as e:
+        db.session.rollback()
         current_app.logger.error(f"Error refreshing iCal feeds: {e}")
         return api_error("Failed to refresh iCal feeds", 500)
 
 
+@api_v1_bp.route("/ical-feeds/refresh/<int:job_id>", methods=["GET"])
+@api_auth_required
+def get_ical_refresh_job(job_id: int) -> Tuple[Response, int]:
+    """Get the progress and results of an iCal feed refresh job.
+
+    When the job has completed, ``feeds_refreshed`` counts the feeds
+    refreshed, ``feeds_skipped`` those already being refreshed elsewhere,
+    and ``errors`` lists the feeds that failed.
+    """
+    job = db.session.get(ICalRefreshJob, job_id)
+    if not job:
+        raise NotFoundError(
+            "Refresh job not found",
+            resource_type="ical_refresh_job",
+            resource_id=job_id,
+        )
+
+    return api_response(job.to_dict(), "iCal feeds refresh job retrieved")
+
+
 # =============================================================================
 # Display Management API Endpoints
 # =============================================================================
@@ -1004,6 +1167,71 @@ def get_display_status(display_id: int) -> Tuple[Response, int]:
         return api_error("Failed to retrieve display status", 500)
 
 
+@api_v1_bp.route("/displays/<int:display_id>/telemetry", methods=["GET"])
+@api_auth_required
+def get_display_telemetry(display_id: int) -> Tuple[Response, int]:
+    """Get aggregated telemetry time series for a display.
+
+    Query parameters:
+        kind: heartbeat (default), render, or error
+        hours: Length of the window ending now (default 24, max 2160)
+        bucket: Bucket size in seconds (default 300, minimum 60)
+
+    Returns:
+        JSON with the display ID, kind, window and a list of buckets with
+        start, count, avg, min, max (and uptime for heartbeats)
+    """
+    try:
+        from datetime import datetime, timedelta, timezone
+
+        from ..models import DisplayTelemetry
+
+        current_user = get_current_user()
+        if not current_user:
+            return api_error("Authentication required", 401)
+
+        display = db.session.get(Display, display_id)
+        if not display:
+            return api_error(f"Display with ID {display_id} not found", 404)
+
+        kind = request.args.get("kind", "heartbeat")
+        if kind not in DisplayTelemetry.KINDS:
+            return api_error(
+                f"Invalid kind. Must be one of: {', '.join(DisplayTelemetry.KINDS)}",
+                400,
+            )
+
+        try:
+            hours = float(request.args.get("hours", 24))
+            bucket_seconds = int(request.args.get("bucket", 300))
+        except ValueError:
+            return api_error("hours and bucket must be numeric", 400)
+        if hours <= 0 or hours > 2160:
+            return api_error("hours must be between 0 and 2160", 400)
+        if bucket_seconds < 60:
+            return api_error("bucket must be at least 60 seconds", 400)
+
+        end = datetime.now(timezone.utc)
+        start = end - timedelta(hours=hours)
+        series = get_telemetry_series(display, kind, start, end, bucket_seconds)
+
+        return api_response(
+            {
+                "display_id": display.id,
+                "kind": kind,
+                "start": start.isoformat(),
+                "end": end.isoformat(),
+                "bucket_seconds": bucket_seconds,
+                "series": series,
+            },
+            f"Telemetry for display '{display.name}' retrieved successfully",
+        )
+
+    except Exception as e:
+        current_app.logger.error(f"Error getting display telemetry: {e}")
+        return api_error("Failed to retrieve display telemetry", 500)
+
+
 @api_v1_bp.route("/displays", methods=["POST"])
 @api_auth_required
 def create_display() -> Tuple[Response, int]:
@@ -2357,6 +2585,7 @@ def reset_user_password(user_id: int) -> Tuple[Response, int]:
 
 @api_v1_bp.route("/uploads/image", methods=["POST"])
 @api_auth_required
+@streaming_upload("image")
 def upload_image() -> Tuple[Response, int]:
     """Upload an image file."""
     try:
@@ -2391,14 +2620,10 @@ def upload_image() -> Tuple[Response, int]:
         # Get storage manager and upload file
         storage = get_storage_manager()
 
-        # Validate file
-        is_valid, error_message = storage.validate_file(file, "image")
-        if not is_valid:
-            return api_error(error_message, 400)
-
-        # Save file
-        success, message, file_info = storage.save_file(
-            file, "image", current_user.id, slideshow_id_int
+        # Validate and store the file (it was streamed to storage while the
+        # request body was parsed); identical content is stored only once
+        success, message, file_info = store_upload(
+            file, "image", current_user.id, slideshow_id_int, storage
         )
 
         if not success or file_info is None:
@@ -2414,6 +2639,8 @@ def upload_image() -> Tuple[Response, int]:
 
         return api_response(file_info, "Image uploaded successfully", 201)
 
+    except StorageError:
+        raise
     except Exception as e:
         current_app.logger.error(f"Error uploading image: {e}")
         return api_error("Failed to upload image", 500)
@@ -2421,6 +2648,7 @@ def upload_image() -> Tuple[Response, int]:
 
 @api_v1_bp.route("/uploads/video", methods=["POST"])
 @api_auth_required
+@streaming_upload("video")
 def upload_video() -> Tuple[Response, int]:
     """Upload a video file."""
     try:
@@ -2455,14 +2683,10 @@ def upload_video() -> Tuple[Response, int]:
         # Get storage manager and upload file
         storage = get_storage_manager()
 
-        # Validate file
-        is_valid, error_message = storage.validate_file(file, "video")
-        if not is_valid:
-            return api_error(error_message, 400)
-
-        # Save file
-        success, message, file_info = storage.save_file(
-            file, "video", current_user.id, slideshow_id_int
+        # Validate and store the file (it was streamed to storage while the
+        # request body was parsed); identical content is stored only once
+        success, message, file_info = store_upload(
+            file, "video", current_user.id, slideshow_id_int, storage
         )
 
         if not success or file_info is None:
@@ -2476,13 +2700,303 @@ def upload_video() -> Tuple[Response, int]:
             f"to slideshow {slideshow.name}"
         )
 
+        if file_info.get("probe_status") == "pending":
+            # Codec and duration are pushed as a media.probed SSE event
+            return api_response(file_info, "Video uploaded; processing", 201)
         return api_response(file_info, "Video uploaded successfully", 201)
 
+    except StorageError:
+        raise
     except Exception as e:
         current_app.logger.error(f"Error uploading video: {e}")
         return api_error("Failed to upload video", 500)
 
 
+@api_v1_bp.route("/media/<int:blob_id>", methods=["GET"])
+@api_auth_required
+def get_media_blob(blob_id: int) -> Tuple[Response, int]:
+    """Get a stored media file, with its probe results, derivatives and transcodes."""
+    blob = _get_media_blob_or_404(blob_id)
+
+    storage = get_storage_manager()
+    data = blob.to_dict()
+    data["url"] = storage.get_file_url(blob.file_path)
+    data["derivatives"] = [
+        {**derivative.to_dict(), "url": storage.get_file_url(derivative.file_path)}
+        for derivative in blob.derivatives
+    ]
+    data["transcodes"] = [
+        _transcode_info(transcode, storage) for transcode in blob.transcodes
+    ]
+    return api_response(data, "Media retrieved successfully")
+
+
+def _get_media_blob_or_404(blob_id: int) -> MediaBlob:
+    """Get a media blob by ID.
+
+    Raises:
+        NotFoundError: If the blob does not exist
+    """
+    blob = db.session.get(MediaBlob, blob_id)
+    if blob is None:
+        raise NotFoundError(
+            "Media not found", resource_type="media", resource_id=blob_id
+        )
+    return blob
+
+
+def _transcode_info(
+    transcode: MediaTranscode, storage: StorageManager
+) -> Dict[str, Any]:
+    """Serialize a transcode job, with the URL of a completed output."""
+    data = transcode.to_dict()
+    data["url"] = (
+        storage.get_file_url(transcode.file_path)
+        if transcode.status == "completed"
+        else None
+    )
+    return data
+
+
+def _get_int_in_range(data: Dict[str, Any], field: str, low: int, high: int) -> int:
+    """Validate an integer field of a request body.
+
+    Raises:
+        ValidationError: If the value is not an integer between low and high
+    """
+    value = data.get(field)
+    if (
+        not isinstance(value, int)
+        or isinstance(value, bool)
+        or not (low <= value <= high)
+    ):
+        raise ValidationError(
+            f"{field} must be an integer between {low} and {high}", field=field
+        )
+    return value
+
+
+@api_v1_bp.route("/media/<int:blob_id>/transcodes", methods=["POST"])
+@api_auth_required
+def create_media_transcodes(blob_id: int) -> Tuple[Response, int]:
+    """Queue lower-bitrate renditions of a stored video.
+
+    Request body (optional; defaults to VIDEO_TRANSCODE_RENDITIONS):
+        {
+            "max_height": 480,
+            "bitrate_kbps": 1000
+        }
+
+    Renditions that already exist are only queued again if they failed or
+    were cancelled. Progress is pushed as ``media.transcode`` SSE events.
+    """
+    if not transcoding_enabled():
+        raise ValidationError("Video transcoding is not enabled")
+
+    blob = _get_media_blob_or_404(blob_id)
+    if blob.content_type != "video" or blob.probe_status == "rejected":
+        raise ValidationError("Only playable videos can be transcoded")
+
+    storage = get_storage_manager()
+    if not (storage.base_path / blob.file_path).exists():
+        raise NotFoundError(
+            "Media file not found", resource_type="media", resource_id=blob_id
+        )
+
+    data = request.get_json(silent=True) or {}
+    renditions = None
+    if "max_height" in data or "bitrate_kbps" in data:
+        renditions = [
+            (
+                _get_int_in_range(data, "max_height", 144, 4320),
+                _get_int_in_range(data, "bitrate_kbps", 100, 50000),
+            )
+        ]
+
+    jobs = queue_transcodes(blob, storage, renditions=renditions)
+    return api_response(
+        [_transcode_info(job, storage) for job in jobs],
+        f"Queued {len(jobs)} transcodes",
+        202,
+    )
+
+
+@api_v1_bp.route(
+    "/media/<int:blob_id>/transcodes/<int:transcode_id>/cancel", methods=["POST"]
+)
+@api_auth_required
+def cancel_media_transcode(blob_id: int, transcode_id: int) -> Tuple[Response, int]:
+    """Cancel a queued or running transcode of a stored video.
+
+    Cancelling the conversion of a video with an unsupported codec rejects
+    the video. Returns 409 if the transcode has already finished.
+    """
+    blob = _get_media_blob_or_404(blob_id)
+    if not any(transcode.id == transcode_id for transcode in blob.transcodes):
+        raise NotFoundError(
+            "Transcode not found", resource_type="transcode", resource_id=transcode_id
+        )
+
+    job = cancel_transcode(transcode_id)
+    return api_response(
+        _transcode_info(job, get_storage_manager()), "Transcode cancelled"
+    )
+
+
+def _get_upload_slideshow_id(value: Any) -> int:
+    """Validate the slideshow_id for an upload.
+
+    Args:
+        value: slideshow_id from the request
+
+    Returns:
+        ID of an active slideshow
+
+    Raises:
+        ValidationError: If the slideshow_id is missing or invalid
+        NotFoundError: If the slideshow does not exist
+    """
+    if value in (None, ""):
+        raise ValidationError("slideshow_id is required", field="slideshow_id")
+    try:
+        slideshow_id = int(value)
+    # fmt: off
+    except (TypeError, ValueError):
+        # fmt: on
+        raise ValidationError("Invalid slideshow_id", field="slideshow_id")
+
+    slideshow = db.session.get(Slideshow, slideshow_id)
+    if not slideshow or not slideshow.is_active:
+        raise NotFoundError(
+            "Slideshow not found", resource_type="slideshow", resource_id=slideshow_id
+        )
+    return slideshow_id
+
+
+@api_v1_bp.route("/uploads/resumable", methods=["POST"])
+@api_auth_required
+def create_resumable_upload() -> Tuple[Response, int]:
+    """Start a resumable (chunked) upload.
+
+    Request body:
+        {
+            "filename": "video.mp4",
+            "content_type": "video",
+            "slideshow_id": 1,
+            "size": 104857600,
+            "checksum": "<optional SHA-256 hex digest of the whole file>"
+        }
+
+    The response contains the upload_id, the current offset (0) and the
+    suggested chunk_size.
+    """
+    current_user = get_current_user()
+    assert current_user is not None  # Guaranteed by @api_auth_required
+
+    data = request.get_json(silent=True)
+    if not data:
+        raise ValidationError("No data provided")
+
+    slideshow_id = _get_upload_slideshow_id(data.get("slideshow_id"))
+
+    size = data.get("size")
+    if not isinstance(size, int) or isinstance(size, bool):
+        raise ValidationError("size must be an integer", field="size")
+
+    status = create_upload(
+        filename=str(data.get("filename") or ""),
+        content_type=str(data.get("content_type") or ""),
+        size=size,
+        user_id=current_user.id,
+        slideshow_id=slideshow_id,
+        checksum=data.get("checksum"),
+    )
+    response, status_code = api_response(status, "Upload created", 201)
+    response.headers["Upload-Offset"] = str(status["offset"])
+    response.headers["Location"] = f"/api/v1/uploads/resumable/{status['upload_id']}"
+    return response, status_code
+
+
+@api_v1_bp.route("/uploads/resumable/<upload_id>", methods=["GET"])
+@api_auth_required
+def get_resumable_upload(upload_id: str) -> Tuple[Response, int]:
+    """Get the status and current offset of a resumable upload."""
+    current_user = get_current_user()
+    assert current_user is not None  # Guaranteed by @api_auth_required
+
+    status = get_upload(upload_id, current_user.id)
+    response, status_code = api_response(status, "Upload status retrieved")
+    response.headers["Upload-Offset"] = str(status["offset"])
+    response.headers["Cache-Control"] = "no-store"
+    return response, status_code
+
+
+@api_v1_bp.route("/uploads/resumable/<upload_id>", methods=["PATCH"])
+@api_auth_required
+def append_resumable_upload(upload_id: str) -> Tuple[Response, int]:
+    """Append a chunk to a resumable upload.
+
+    The raw request body is the chunk. The ``Upload-Offset`` header must
+    equal the upload's current offset; a mismatch returns 409 with the
+    current offset so the client can resume from it. An optional
+    ``Upload-Checksum: <algorithm> <base64 digest>`` header is verified
+    before the chunk is accepted.
+    """
+    current_user = get_current_user()
+    assert current_user is not None  # Guaranteed by @api_auth_required
+
+    try:
+        offset = int(request.headers.get("Upload-Offset", ""))
+    except ValueError:
+        raise ValidationError("Upload-Offset header is required")
+    if request.content_length is None:
+        raise ValidationError("Content-Length header is required")
+
+    status = append_chunk(
+        upload_id,
+        current_user.id,
+        offset,
+        request.stream,
+        request.content_length,
+        chunk_checksum=parse_chunk_checksum(request.headers.get("Upload-Checksum")),
+    )
+    response, status_code = api_response(status, "Chunk received")
+    response.headers["Upload-Offset"] = str(status["offset"])
+    return response, status_code
+
+
+@api_v1_bp.route("/uploads/resumable/<upload_id>/complete", methods=["POST"])
+@api_auth_required
+def complete_resumable_upload(upload_id: str) -> Tuple[Response, int]:
+    """Finish a resumable upload and store the assembled file.
+
+    Returns the same file information as the single-request upload
+    endpoints.
+    """
+    current_user = get_current_user()
+    assert current_user is not None  # Guaranteed by @api_auth_required
+
+    file_info = complete_upload(upload_id, current_user.id)
+    file_info["url"] = get_storage_manager().get_file_url(file_info["file_path"])
+
+    current_app.logger.info(
+        f"User {current_user.username} uploaded {file_info['content_type']} "
+        f"{file_info['original_filename']} in chunks"
+    )
+    return api_response(file_info, "File uploaded successfully", 201)
+
+
+@api_v1_bp.route("/uploads/resumable/<upload_id>", methods=["DELETE"])
+@api_auth_required
+def delete_resumable_upload(upload_id: str) -> Tuple[Response, int]:
+    """Cancel a resumable upload and discard the data received so far."""
+    current_user = get_current_user()
+    assert current_user is not None  # Guaranteed by @api_auth_required
+
+    abort_upload(upload_id, current_user.id)
+    return api_response(None, "Upload cancelled")
+
+
 @api_v1_bp.route("/validate/video-url", methods=["POST"])
 @api_auth_required
 def validate_video_url() -> Tuple[Response, int]:
@@ -2608,6 +3122,73 @@ def delete_file(file_id: int) -> Tuple[Response, int]:
     return api_error("File deletion endpoint not yet implemented", 501)
 
 
+@api_v1_bp.route("/admin/storage/integrity", methods=["GET"])
+@api_admin_required
+def get_storage_integrity() -> Tuple[Response, int]:
+    """Get the results of the latest storage integrity scan (admin only).
+
+    Query parameters:
+        limit: Maximum number of issues to return (default: 100, max: 1000)
+        kind: Only return issues of this kind (orphaned, missing,
+            checksum_mismatch or unreadable)
+    """
+    limit = min(request.args.get("limit", 100, type=int), 1000)
+    kind = request.args.get("kind")
+
+    running = get_running_scan()
+    latest = (
+        StorageScan.query.filter(StorageScan.status != "running")
+        .order_by(StorageScan.id.desc())
+        .first()
+    )
+
+    issues = []
+    if latest is not None:
+        query = StorageScanIssue.query.filter_by(scan_id=latest.id)
+        if kind:
+            query = query.filter_by(kind=kind)
+        issues = [
+            issue.to_dict()
+            for issue in query.order_by(StorageScanIssue.id).limit(limit).all()
+        ]
+
+    return api_response(
+        {
+            "latest_scan": latest.to_dict() if latest else None,
+            "running_scan": running.to_dict() if running else None,
+            "issues": issues,
+        },
+        "Storage integrity retrieved successfully",
+    )
+
+
+@api_v1_bp.route("/admin/storage/integrity/scan", methods=["POST"])
+@api_admin_required
+def start_storage_scan() -> Tuple[Response, int]:
+    """Start a storage integrity scan (admin only).
+
+    Request body (optional):
+        verify_checksums: Verify file checksums (defaults to
+            STORAGE_SCAN_VERIFY_CHECKSUMS)
+    """
+    data = request.get_json(silent=True) or {}
+    verify_checksums = data.get("verify_checksums")
+    if verify_checksums is not None and not isinstance(verify_checksums, bool):
+        raise ValidationError(
+            "verify_checksums must be a boolean", field="verify_checksums"
+        )
+
+    if not schedule_storage_scan(verify_checksums=verify_checksums):
+        return api_error("A storage scan is already in progress", 409)
+
+    current_user = get_current_user()
+    assert current_user is not None
+    current_app.logger.info(
+        f"User {current_user.username} started a storage integrity scan"
+    )
+    return api_response(None, "Storage scan started", 202)
+
+
 # =============================================================================
 # Server-Sent Events (SSE) Endpoints
 # =============================================================================
@@ -2666,6 +3247,17 @@ def display_events_stream(display_name: str) -> Response | Tuple[Response, int]:
         return api_error("Failed to establish SSE connection", 500)
 
 
+def _skedda_rate_limiter() -> RateLimiter:
+    """Get the per-display Skedda calendar rate limiter of the application."""
+    limiter = current_app.extensions.get("skedda_rate_limiter")
+    if limiter is None:
+        limiter = current_app.extensions.setdefault(
+            "skedda_rate_limiter",
+            RateLimiter(float(current_app.config.get("SKEDDA_DATA_RATE_LIMIT", 60))),
+        )
+    return limiter
+
+
 @api_v1_bp.route(
     "/display/<string:display_name>/skedda-data/<int:item_id>", methods=["GET"]
 )
@@ -2674,59 +3266,43 @@ def get_display_skedda_data(display_name: str, item_id: int) -> Tuple[Response,
 
     This endpoint does not require authentication - it's meant for public
     kiosk displays. It validates that the item belongs to the display's
-    currently assigned slideshow.
+    currently assigned slideshow. Each display may make
+    SKEDDA_DATA_RATE_LIMIT requests per minute; further requests are
+    refused with 429 and a Retry-After header.
 
     Query parameters:
         date (optional): Date to display in YYYY-MM-DD format, defaults to today
     """
     from datetime import datetime
 
-    from ..ical_service import get_skedda_calendar_data
+    from ..ical_service import get_skedda_calendar
 
     try:
-        # Expire all cached objects in the session to ensure fresh reads from database.
-        # This helps with cross-process visibility issues in SQLite WAL mode,
-        # particularly during E2E tests with forked server processes.
-        db.session.expire_all()
+        # End the session's transaction, if any, so the lookups below run in
+        # a new one: it sees everything committed before this request, also
+        # by other processes in SQLite WAL mode, and the lookups agree
+        db.session.rollback()
 
-        # Look up display by name
-        # Note: In rare cases with SQLite WAL mode and forked processes, filter_by
-        # queries can have visibility issues. If the initial query fails, fall back
-        # to querying all records and searching manually.
         display = Display.query.filter_by(name=display_name).first()
-        if not display:
-            # Fallback: Query all displays and search manually
-            all_displays = Display.query.all()
-            for d in all_displays:
-                if d.name == display_name:
-                    display = d
-                    break
         if not display:
             return api_error("Display not found", 404)
 
+        retry_after = _skedda_rate_limiter().retry_after(display.id)
+        if retry_after is not None:
+            raise RateLimitError(
+                f"Too many calendar requests for display {display_name}",
+                retry_after=retry_after,
+            )
+
         # Check that display has a slideshow assigned
         if not display.current_slideshow_id:
             return api_error("Display has no slideshow assigned", 400)
 
-        # Get the slideshow with fallback
-        slideshow = Slideshow.query.get(display.current_slideshow_id)
-        if not slideshow:
-            all_slideshows = Slideshow.query.all()
-            for s in all_slideshows:
-                if s.id == display.current_slideshow_id:
-                    slideshow = s
-                    break
+        slideshow = db.session.get(Slideshow, display.current_slideshow_id)
         if not slideshow:
             return api_error("Slideshow not found", 404)
 
-        # Get the slideshow item with fallback
-        item = SlideshowItem.query.filter_by(id=item_id).first()
-        if not item:
-            all_items = SlideshowItem.query.all()
-            for i in all_items:
-                if i.id == item_id:
-                    item = i
-                    break
+        item = db.session.get(SlideshowItem, item_id)
         if not item:
             return api_error("Slideshow item not found", 404)
 
@@ -2751,11 +3327,15 @@ def get_display_skedda_data(display_name: str, item_id: int) -> Tuple[Response,
                 return api_error("Invalid date format. Use YYYY-MM-DD", 400)
 
         # Get the calendar data (pass the item, not just the feed_id)
-        # target_date=None lets get_skedda_calendar_data use local timezone
-        calendar_data = get_skedda_calendar_data(item, target_date)
+        # target_date=None lets get_skedda_calendar use local timezone
+        calendar_data, etag = get_skedda_calendar(item, target_date)
 
-        return api_response(calendar_data, "Skedda calendar data retrieved")
+        return _skedda_data_response(
+            calendar_data, etag, "Skedda calendar data retrieved"
+        )
 
+    except RateLimitError:
+        raise
     except Exception as e:
         current_app.logger.error(
             f"Error getting display skedda data for {display_name}/{item_id}: {e}"
@@ -3075,6 +3655,7 @@ def update_display_heartbeat(display_id: int) -> Tuple[Response, int]:
 
         # Check if display was previously offline
         was_online = display.is_online
+        previous_seen_at = display.last_seen_at
 
         # Update heartbeat timestamp
         display.last_seen_at = datetime.now(timezone.utc)
@@ -3105,6 +3686,9 @@ def update_display_heartbeat(display_id: int) -> Tuple[Response, int]:
 
         db.session.commit()
 
+        # Buffer telemetry; it is written in batches, not per heartbeat
+        record_heartbeat(display, previous_seen_at)
+
         # Check if display came online and broadcast SSE event
         is_now_online = display.is_online
         if not was_online and is_now_online:
@@ -141,10 +141,16 @@ def create_app(config_name: Optional[str] = None) -> Flask:
 
     app.register_blueprint(auth_bp, url_prefix="/auth")
 
+    # Initialize the background scheduler (started on first request)
+    from .scheduler import init_scheduler
+
+    init_scheduler(app)
+
     # Register health check blueprint (before other blueprints for priority)
-    from .health import health_bp
+    from .health import health_bp, init_health_checks
 
     app.register_blueprint(health_bp)
+    init_health_checks(app)
 
     # Register metrics blueprint and initialize metrics collection
     from .metrics import init_metrics, metrics_bp
@@ -176,9 +182,20 @@ def create_app(config_name: Optional[str] = None) -> Flask:
     # File serving endpoint
     @app.route("/uploads/<path:filename>")
     def uploaded_file(filename: str) -> Response:
-        """Serve uploaded files."""
+        """Serve uploaded files.
+
+        Caching headers, byte ranges and offloading to a fronting web
+        server are described in media_serving.
+        """
         from urllib.parse import unquote_plus
 
+        from .media_serving import (
+            apply_cache_policy,
+            get_cache_policy,
+            serve_offloaded,
+            serve_range,
+        )
+
         # Decode the URL-encoded filename
         decoded_filename = unquote_plus(filename)
 
@@ -186,17 +203,75 @@ def create_app(config_name: Optional[str] = None) -> Flask:
         # Flask's send_from_directory can have issues with relative paths depending
         # on the working directory state when the request is handled
         upload_folder = os.path.abspath(app.config["UPLOAD_FOLDER"])
+        policy = get_cache_policy(decoded_filename)
+
+        response = serve_offloaded(upload_folder, decoded_filename, policy)
+        if response is None:
+            response = serve_range(upload_folder, decoded_filename, policy)
+        if response is not None:
+            return response
 
         try:
-            return send_from_directory(upload_folder, decoded_filename)
+            response = send_from_directory(
+                upload_folder,
+                decoded_filename,
+                etag=policy.etag or True,
+                max_age=policy.max_age,
+            )
         except FileNotFoundError:
             abort(404)
+        return apply_cache_policy(response, policy)
 
     # Initialize storage system
     from .storage import init_storage
 
     init_storage(app)
 
+    # Size the background video probe worker pool
+    from .media_probe import init_media_probe
+
+    init_media_probe(app)
+
+    # Size the background image derivative worker pool
+    from .image_derivatives import init_image_derivatives
+
+    init_image_derivatives(app)
+
+    # Size the background video transcode worker pool
+    from .transcode import init_transcoding
+
+    init_transcoding(app)
+
+    # Schedule purging of unreferenced media
+    from .media_store import init_media_store
+
+    init_media_store(app)
+
+    # Schedule pruning of cached video probe results
+    from .probe_cache import init_probe_cache
+
+    init_probe_cache(app)
+
+    # Schedule background storage integrity scans
+    from .storage_scan import init_storage_scan
+
+    init_storage_scan(app)
+
+    # Schedule background refreshes of iCal feeds
+    from .ical_service import init_ical_refresh
+
+    init_ical_refresh(app)
+
+    # Schedule cleanup of abandoned resumable uploads
+    from .resumable_upload import init_resumable_uploads
+
+    init_resumable_uploads(app)
+
+    # Initialize display telemetry buffering and retention jobs
+    from .telemetry import init_telemetry
+
+    init_telemetry(app)
+
     # Context processor for NewRelic browser monitoring
     # When the NewRelic agent is active, this injects browser timing scripts
     # into all templates. When inactive, returns empty strings.
@@ -61,6 +61,26 @@ def create_slideshow(name: str, description: str) -> None:
     click.echo(f'Created slideshow "{name}" with ID {slideshow.id}')
 
 
+@cli.command()
+@click.option(
+    "--days",
+    type=float,
+    help="Days of past events to keep (defaults to ICAL_EVENT_RETENTION_DAYS).",
+)
+@click.option(
+    "--batch-size",
+    type=click.IntRange(min=1),
+    help="Events deleted per transaction.",
+)
+@with_appcontext
+def prune_ical_events(days: float, batch_size: int) -> None:
+    """Delete iCal events that ended before the retention period."""
+    from ..ical_service import prune_ical_events as prune
+
+    deleted = prune(retention_days=days, batch_size=batch_size)
+    click.echo(f"Pruned {deleted} iCal events.")
+
+
 def main() -> None:
     """Entry point for the CLI when called directly."""
     cli()
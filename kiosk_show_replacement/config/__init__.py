@@ -136,6 +136,121 @@ class Config:
     }
     ALLOWED_EXTENSIONS = ALLOWED_IMAGE_EXTENSIONS | ALLOWED_VIDEO_EXTENSIONS
 
+    # Unreferenced content-addressed media is deleted by storage cleanup only
+    # after this many hours (uploads are referenced by a later request); a
+    # scheduled job purges it every MEDIA_ORPHAN_PURGE_INTERVAL seconds
+    MEDIA_ORPHAN_GRACE_HOURS = float(os.environ.get("MEDIA_ORPHAN_GRACE_HOURS", "24"))
+    MEDIA_ORPHAN_PURGE_INTERVAL = float(
+        os.environ.get("MEDIA_ORPHAN_PURGE_INTERVAL", "3600")
+    )
+
+    # Storage statistics are read from a catalog of uploaded files. A storage
+    # integrity scan reconciles it with the upload folder at startup and this
+    # often (seconds), listing changed directories on STORAGE_SCAN_THREADS
+    # threads, on a background thread (STORAGE_SCAN_WORKERS=0 scans inline).
+    # With STORAGE_SCAN_VERIFY_CHECKSUMS, files not verified in the last
+    # STORAGE_SCAN_VERIFY_INTERVAL_HOURS are re-hashed, reading at most
+    # STORAGE_SCAN_VERIFY_BYTES_PER_SECOND
+    STORAGE_SCAN_INTERVAL = float(os.environ.get("STORAGE_SCAN_INTERVAL", "3600"))
+    STORAGE_SCAN_WORKERS = int(os.environ.get("STORAGE_SCAN_WORKERS", "1"))
+    STORAGE_SCAN_THREADS = int(os.environ.get("STORAGE_SCAN_THREADS", "4"))
+    STORAGE_SCAN_VERIFY_CHECKSUMS = os.environ.get(
+        "STORAGE_SCAN_VERIFY_CHECKSUMS", "false"
+    ).lower() in ("true", "1", "yes")
+    STORAGE_SCAN_VERIFY_INTERVAL_HOURS = float(
+        os.environ.get("STORAGE_SCAN_VERIFY_INTERVAL_HOURS", "168")
+    )
+    STORAGE_SCAN_VERIFY_BYTES_PER_SECOND = int(
+        os.environ.get("STORAGE_SCAN_VERIFY_BYTES_PER_SECOND", "10485760")
+    )
+
+    # Uploaded videos are probed with ffprobe on this many background
+    # threads (0 probes inline during the upload request); at most
+    # MEDIA_PROBE_QUEUE_SIZE further probes wait before probing falls back
+    # to inline
+    MEDIA_PROBE_WORKERS = int(os.environ.get("MEDIA_PROBE_WORKERS", "2"))
+    MEDIA_PROBE_QUEUE_SIZE = int(os.environ.get("MEDIA_PROBE_QUEUE_SIZE", "50"))
+
+    # Uploaded images are resized to each of these long-edge sizes (pixels)
+    # that is smaller than the original, on this many background threads
+    # (0 resizes inline during the upload request); displays are sent the
+    # smallest variant that fills their resolution. An empty size list
+    # disables resizing. The format is webp or, if Pillow supports it, avif.
+    IMAGE_DERIVATIVE_SIZES = os.environ.get(
+        "IMAGE_DERIVATIVE_SIZES", "1280,1920,2560,3840"
+    )
+    IMAGE_DERIVATIVE_FORMAT = os.environ.get("IMAGE_DERIVATIVE_FORMAT", "webp")
+    IMAGE_DERIVATIVE_QUALITY = int(os.environ.get("IMAGE_DERIVATIVE_QUALITY", "80"))
+    IMAGE_DERIVATIVE_WORKERS = int(os.environ.get("IMAGE_DERIVATIVE_WORKERS", "1"))
+    IMAGE_DERIVATIVE_QUEUE_SIZE = int(
+        os.environ.get("IMAGE_DERIVATIVE_QUEUE_SIZE", "50")
+    )
+
+    # Uploads named after their content checksum (under media/) are cached
+    # by clients for MEDIA_CACHE_MAX_AGE seconds and marked immutable;
+    # other uploads for UPLOAD_CACHE_MAX_AGE. To have a fronting web server
+    # send the files, set MEDIA_ACCEL_REDIRECT_PREFIX to an nginx internal
+    # location aliased to UPLOAD_FOLDER, or USE_X_SENDFILE for Apache or
+    # lighttpd.
+    MEDIA_CACHE_MAX_AGE = int(os.environ.get("MEDIA_CACHE_MAX_AGE", "31536000"))
+    UPLOAD_CACHE_MAX_AGE = int(os.environ.get("UPLOAD_CACHE_MAX_AGE", "3600"))
+    MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get("MEDIA_ACCEL_REDIRECT_PREFIX", "")
+    USE_X_SENDFILE = os.environ.get("USE_X_SENDFILE", "false").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+
+    # Opt-in: videos with codecs browsers cannot play are converted with
+    # ffmpeg (to H.264/MP4 or VP9/WebM, fitted to MAX_HEIGHT at BITRATE_KBPS)
+    # instead of being rejected. RENDITIONS lists extra lower-bitrate copies
+    # as "height:kbps" pairs (e.g. "720:2500,480:1000") made for every
+    # uploaded video; displays play the smallest rendition covering their
+    # resolution. Jobs run on WORKERS threads with QUEUE_SIZE more waiting
+    # and are stopped after TIMEOUT seconds; jobs beyond that stay queued
+    # and are handed to the workers every DISPATCH_INTERVAL seconds (0
+    # workers runs no transcodes in this process)
+    VIDEO_TRANSCODE_ENABLED = os.environ.get(
+        "VIDEO_TRANSCODE_ENABLED", "false"
+    ).lower() in ("true", "1", "yes")
+    VIDEO_TRANSCODE_FORMAT = os.environ.get("VIDEO_TRANSCODE_FORMAT", "mp4")
+    VIDEO_TRANSCODE_MAX_HEIGHT = int(
+        os.environ.get("VIDEO_TRANSCODE_MAX_HEIGHT", "1080")
+    )
+    VIDEO_TRANSCODE_BITRATE_KBPS = int(
+        os.environ.get("VIDEO_TRANSCODE_BITRATE_KBPS", "5000")
+    )
+    VIDEO_TRANSCODE_RENDITIONS = os.environ.get("VIDEO_TRANSCODE_RENDITIONS", "")
+    VIDEO_TRANSCODE_WORKERS = int(os.environ.get("VIDEO_TRANSCODE_WORKERS", "1"))
+    VIDEO_TRANSCODE_QUEUE_SIZE = int(os.environ.get("VIDEO_TRANSCODE_QUEUE_SIZE", "10"))
+    VIDEO_TRANSCODE_TIMEOUT = int(os.environ.get("VIDEO_TRANSCODE_TIMEOUT", "7200"))
+    VIDEO_TRANSCODE_DISPATCH_INTERVAL = float(
+        os.environ.get("VIDEO_TRANSCODE_DISPATCH_INTERVAL", "30")
+    )
+
+    # ffprobe results are cached by file checksum and by URL (0 entries
+    # disables the cache); entries unchecked for the TTL are dropped, and
+    # cached URLs are trusted for REVALIDATE_SECONDS before their
+    # ETag/Last-Modified headers are checked again
+    VIDEO_PROBE_CACHE_MAX_ENTRIES = int(
+        os.environ.get("VIDEO_PROBE_CACHE_MAX_ENTRIES", "5000")
+    )
+    VIDEO_PROBE_CACHE_TTL_HOURS = float(
+        os.environ.get("VIDEO_PROBE_CACHE_TTL_HOURS", "720")
+    )  # 30 days
+    VIDEO_PROBE_CACHE_REVALIDATE_SECONDS = float(
+        os.environ.get("VIDEO_PROBE_CACHE_REVALIDATE_SECONDS", "300")
+    )
+
+    # Resumable (chunked) uploads: suggested chunk size for clients, and
+    # hours without new data before an unfinished upload is discarded
+    RESUMABLE_UPLOAD_CHUNK_SIZE = int(
+        os.environ.get("RESUMABLE_UPLOAD_CHUNK_SIZE", str(8 * 1024 * 1024))
+    )  # 8MB
+    RESUMABLE_UPLOAD_EXPIRY_HOURS = float(
+        os.environ.get("RESUMABLE_UPLOAD_EXPIRY_HOURS", "24")
+    )
+
     # Session settings
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
 
@@ -147,6 +262,98 @@ class Config:
     # CORS settings
     CORS_ORIGINS = os.environ.get("CORS_ORIGINS", "*").split(",")
 
+    # Slow request / slow query logging thresholds (milliseconds, 0 disables)
+    SLOW_REQUEST_THRESHOLD_MS = float(
+        os.environ.get("SLOW_REQUEST_THRESHOLD_MS", "1000")
+    )
+    SLOW_QUERY_THRESHOLD_MS = float(os.environ.get("SLOW_QUERY_THRESHOLD_MS", "250"))
+    # Number of slowest SQL statements included in a slow request record
+    SLOW_REQUEST_TOP_QUERIES = int(os.environ.get("SLOW_REQUEST_TOP_QUERIES", "5"))
+
+    # Asynchronous log writing - records are formatted and written in batches
+    # on a background thread; records are dropped (and counted) when the
+    # bounded queue is full
+    LOG_ASYNC = os.environ.get("LOG_ASYNC", "true").lower() in ("true", "1", "yes")
+    LOG_QUEUE_SIZE = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+    LOG_BATCH_SIZE = int(os.environ.get("LOG_BATCH_SIZE", "100"))
+    LOG_FLUSH_INTERVAL = float(os.environ.get("LOG_FLUSH_INTERVAL", "0.5"))
+
+    # Background scheduler for periodic maintenance jobs
+    SCHEDULER_ENABLED = os.environ.get("SCHEDULER_ENABLED", "true").lower() in (
+        "true",
+        "1",
+        "yes",
+    )
+
+    # Health checks run on the scheduler; probes serve cached results up to
+    # HEALTH_CHECK_MAX_STALENESS seconds old before re-checking inline
+    HEALTH_CHECK_INTERVAL = float(os.environ.get("HEALTH_CHECK_INTERVAL", "15"))
+    HEALTH_CHECK_MAX_STALENESS = float(
+        os.environ.get("HEALTH_CHECK_MAX_STALENESS", "60")
+    )
+
+    # Display telemetry - samples are buffered in memory and written in
+    # batches; raw samples are downsampled into rollups and expired
+    TELEMETRY_FLUSH_INTERVAL = float(os.environ.get("TELEMETRY_FLUSH_INTERVAL", "10"))
+    TELEMETRY_BUFFER_SIZE = int(os.environ.get("TELEMETRY_BUFFER_SIZE", "10000"))
+    TELEMETRY_DOWNSAMPLE_INTERVAL = float(
+        os.environ.get("TELEMETRY_DOWNSAMPLE_INTERVAL", "3600")
+    )
+    TELEMETRY_RAW_RETENTION_HOURS = float(
+        os.environ.get("TELEMETRY_RAW_RETENTION_HOURS", "48")
+    )
+    TELEMETRY_ROLLUP_SECONDS = int(os.environ.get("TELEMETRY_ROLLUP_SECONDS", "3600"))
+    TELEMETRY_ROLLUP_RETENTION_DAYS = float(
+        os.environ.get("TELEMETRY_ROLLUP_RETENTION_DAYS", "90")
+    )
+
+    # iCal (Skedda) feeds are refreshed in the background: every
+    # ICAL_REFRESH_CHECK_INTERVAL seconds, feeds whose refresh interval ends
+    # within ICAL_REFRESH_AHEAD_SECONDS are refreshed on ICAL_REFRESH_WORKERS
+    # threads (0 refreshes them on the scheduler thread)
+    ICAL_REFRESH_CHECK_INTERVAL = float(
+        os.environ.get("ICAL_REFRESH_CHECK_INTERVAL", "60")
+    )
+    ICAL_REFRESH_AHEAD_SECONDS = float(
+        os.environ.get("ICAL_REFRESH_AHEAD_SECONDS", "60")
+    )
+    ICAL_REFRESH_WORKERS = int(os.environ.get("ICAL_REFRESH_WORKERS", "2"))
+    # Refreshing all feeds (POST /api/v1/ical-feeds/refresh) fetches up to
+    # ICAL_FETCH_CONCURRENCY feeds at once, at most ICAL_FETCH_PER_HOST from
+    # the same host, and gives up on feeds not fetched within
+    # ICAL_REFRESH_ALL_DEADLINE seconds
+    ICAL_FETCH_CONCURRENCY = int(os.environ.get("ICAL_FETCH_CONCURRENCY", "8"))
+    ICAL_FETCH_PER_HOST = int(os.environ.get("ICAL_FETCH_PER_HOST", "2"))
+    ICAL_REFRESH_ALL_DEADLINE = float(
+        os.environ.get("ICAL_REFRESH_ALL_DEADLINE", "120")
+    )
+    # Only events from ICAL_EVENT_WINDOW_PAST_DAYS days ago to
+    # ICAL_EVENT_WINDOW_FUTURE_DAYS days ahead are parsed and stored (0
+    # keeps every past or future event); stored events that leave the
+    # window are kept until ICAL_EVENT_RETENTION_DAYS
+    ICAL_EVENT_WINDOW_PAST_DAYS = int(
+        os.environ.get("ICAL_EVENT_WINDOW_PAST_DAYS", "7")
+    )
+    ICAL_EVENT_WINDOW_FUTURE_DAYS = int(
+        os.environ.get("ICAL_EVENT_WINDOW_FUTURE_DAYS", "60")
+    )
+    # Formatted Skedda calendars kept in memory per process, one per feed
+    # and day (0 formats every request)
+    ICAL_CALENDAR_CACHE_SIZE = int(os.environ.get("ICAL_CALENDAR_CACHE_SIZE", "256"))
+    # Calendar requests each display may make per minute to the public
+    # Skedda endpoint, per process (0 does not limit them)
+    SKEDDA_DATA_RATE_LIMIT = float(os.environ.get("SKEDDA_DATA_RATE_LIMIT", "60"))
+    # Past iCal events are deleted ICAL_EVENT_RETENTION_DAYS days after they
+    # end (0 keeps them), every ICAL_EVENT_PRUNE_INTERVAL seconds, in
+    # transactions of ICAL_EVENT_PRUNE_BATCH_SIZE events
+    ICAL_EVENT_RETENTION_DAYS = float(os.environ.get("ICAL_EVENT_RETENTION_DAYS", "30"))
+    ICAL_EVENT_PRUNE_INTERVAL = float(
+        os.environ.get("ICAL_EVENT_PRUNE_INTERVAL", "3600")
+    )
+    ICAL_EVENT_PRUNE_BATCH_SIZE = int(
+        os.environ.get("ICAL_EVENT_PRUNE_BATCH_SIZE", "500")
+    )
+
 
 class DevelopmentConfig(Config):
     """Development configuration."""
@@ -184,6 +391,19 @@ class TestingConfig(Config):
     # Use DATABASE_URL if explicitly set (for integration tests), otherwise in-memory
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL", "sqlite:///:memory:")
     WTF_CSRF_ENABLED = False
+    # No background threads, always-fresh health checks, and no cached
+    # video probe results
+    SCHEDULER_ENABLED = False
+    HEALTH_CHECK_MAX_STALENESS = 0
+    MEDIA_PROBE_WORKERS = 0
+    IMAGE_DERIVATIVE_WORKERS = 0
+    VIDEO_TRANSCODE_WORKERS = 0
+    STORAGE_SCAN_WORKERS = 0
+    ICAL_REFRESH_WORKERS = 0
+    VIDEO_PROBE_CACHE_MAX_ENTRIES = 0
+    # Keep iCal events of any date, as test calendars use fixed dates
+    ICAL_EVENT_WINDOW_PAST_DAYS = 0
+    ICAL_EVENT_WINDOW_FUTURE_DAYS = 0
 
 
 config = {
@@ -11,6 +11,7 @@ This module handles the core display functionality for kiosk devices including:
 Designed for reliability on kiosk hardware with minimal JavaScript dependencies.
 """
 
+import math
 from datetime import datetime, timezone
 from typing import Any, Dict, Optional, Tuple, Union, cast
 
@@ -21,9 +22,12 @@ from flask import (
     render_template,
     request,
 )
+from sqlalchemy.orm import selectinload
 from werkzeug.wrappers import Response
 
-from ..models import Display, Slideshow, SlideshowItem, db
+from ..metrics import metrics_collector, record_playback_sample
+from ..models import Display, MediaBlob, Slideshow, SlideshowItem, db
+from ..telemetry import record_heartbeat, record_telemetry
 
 # Import SSE broadcasting functions
 try:
@@ -61,7 +65,7 @@ def display_info(display_name: str) -> str:
 
     slideshow = get_display_slideshow(display)
     slides = get_slideshow_items(slideshow.id) if slideshow else []
-    slides_data = [slide.to_dict() for slide in slides]
+    slides_data = [slide.to_dict(display=display) for slide in slides]
 
     return render_template(
         "display/index.html",
@@ -120,8 +124,9 @@ def display_interface(display_name: str) -> Union[str, Response]:
         },
     )
 
-    # Convert slides to JSON-serializable format
-    slides_data = [slide.to_dict() for slide in slides]
+    # Convert slides to JSON-serializable format, with images sized for
+    # this display
+    slides_data = [slide.to_dict(display=display) for slide in slides]
 
     # Render slideshow display
     return render_template(
@@ -157,6 +162,7 @@ def update_heartbeat(display_name: str) -> Union[Response, Tuple[Response, int]]
 
         # Check if display was previously offline
         was_online = display.is_online
+        previous_seen_at = display.last_seen_at
 
         # Update heartbeat timestamp
         display.last_seen_at = datetime.now(timezone.utc)
@@ -188,6 +194,9 @@ def update_heartbeat(display_name: str) -> Union[Response, Tuple[Response, int]]
 
         db.session.commit()
 
+        # Buffer telemetry; it is written in batches, not per heartbeat
+        record_heartbeat(display, previous_seen_at)
+
         # Check if display came online and broadcast SSE event
         is_now_online = display.is_online
         if not was_online and is_now_online:
@@ -239,6 +248,188 @@ def update_heartbeat(display_name: str) -> Union[Response, Tuple[Response, int]]
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+@display_bp.route("/<string:display_name>/telemetry", methods=["POST"])
+def submit_telemetry(display_name: str) -> Union[Response, Tuple[Response, int]]:
+    """
+    Accept a batch of client-side playback telemetry from a display.
+
+    Samples are buffered and written to the database in batches.
+
+    Expected JSON payload:
+    {
+        "events": [
+            {"kind": "render", "value": 42.5},
+            {"kind": "error", "detail": "Failed to load video"}
+        ]
+    }
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get("events"), list):
+            return (
+                jsonify({"status": "error", "message": "Expected an events list"}),
+                400,
+            )
+
+        display = Display.query.filter_by(name=display_name).first()
+        if not display:
+            return jsonify({"status": "error", "message": "Display not found"}), 404
+
+        max_events = current_app.config.get("TELEMETRY_MAX_EVENTS_PER_REQUEST", 100)
+        accepted = 0
+        for event in data["events"][:max_events]:
+            if not isinstance(event, dict) or event.get("kind") not in (
+                "render",
+                "error",
+            ):
+                continue
+            value = _beacon_number(event.get("value"), maximum=600000)
+            if value is None and event.get("value") is not None:
+                continue
+            detail = event.get("detail")
+            if record_telemetry(
+                display.id,
+                event["kind"],
+                value=value,
+                detail=str(detail) if detail is not None else None,
+            ):
+                accepted += 1
+
+        return jsonify({"status": "success", "accepted": accepted})
+
+    except Exception as e:
+        current_app.logger.error(
+            "Failed to record display telemetry",
+            extra={
+                "display_name": display_name,
+                "error": str(e),
+                "action": "telemetry_error",
+            },
+        )
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
+def _beacon_number(
+    value: Any, maximum: float, default: Optional[float] = None
+) -> Optional[float]:
+    """Parse a numeric beacon field, rejecting negative or implausible values.
+
+    NaN and Infinity (which JSON parsing accepts) are rejected as well.
+    """
+    if value is None or isinstance(value, bool):
+        return default
+    try:
+        number = float(value)
+    # fmt: off
+    except (TypeError, ValueError):
+        # fmt: on
+        return default
+    if not math.isfinite(number) or number < 0 or number > maximum:
+        return default
+    return number
+
+
+@display_bp.route("/<string:display_name>/beacon", methods=["POST"])
+def submit_playback_beacon(
+    display_name: str,
+) -> Union[Response, Tuple[Response, int]]:
+    """
+    Accept a batch of client-side playback metrics from a display.
+
+    Samples are aggregated into Prometheus histograms/counters per display
+    and per content item; load times and errors are also buffered into the
+    display telemetry store. Samples for items that do not exist are ignored
+    so clients cannot create arbitrary metric labels.
+
+    Expected JSON payload (all sample fields except item_id are optional):
+    {
+        "samples": [
+            {"item_id": 12, "load_ms": 340, "cache": "miss"},
+            {"item_id": 13, "dropped_frames": 4},
+            {"item_id": 13, "missed_transition": true},
+            {"item_id": 14, "error": "Failed to load video"}
+        ],
+        "js_heap_bytes": 31457280
+    }
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict) or not isinstance(data.get("samples"), list):
+            return (
+                jsonify({"status": "error", "message": "Expected a samples list"}),
+                400,
+            )
+
+        display = Display.query.filter_by(name=display_name).first()
+        if not display:
+            return jsonify({"status": "error", "message": "Display not found"}), 404
+
+        max_samples = current_app.config.get("TELEMETRY_MAX_EVENTS_PER_REQUEST", 100)
+        samples = [s for s in data["samples"][:max_samples] if isinstance(s, dict)]
+
+        # Resolve all referenced items with a single query
+        item_ids = {
+            s["item_id"]
+            for s in samples
+            if isinstance(s.get("item_id"), int) and not isinstance(s["item_id"], bool)
+        }
+        known_items = set()
+        if item_ids:
+            known_items = {
+                item_id
+                for (item_id,) in db.session.query(SlideshowItem.id).filter(
+                    SlideshowItem.id.in_(item_ids)
+                )
+            }
+
+        accepted = 0
+        for sample in samples:
+            item_id = sample.get("item_id")
+            if item_id not in known_items:
+                continue
+
+            load_ms = _beacon_number(sample.get("load_ms"), maximum=600000)
+            dropped = _beacon_number(sample.get("dropped_frames"), 1000000, 0)
+            cache = sample.get("cache")
+            error = sample.get("error")
+
+            record_playback_sample(
+                display.name,
+                item_id=item_id,
+                load_ms=load_ms,
+                cache_hit=(cache == "hit") if cache in ("hit", "miss") else None,
+                dropped_frames=int(dropped or 0),
+                missed_transition=sample.get("missed_transition") is True,
+                error=bool(error),
+            )
+            if load_ms is not None:
+                record_telemetry(
+                    display.id, "render", value=load_ms, detail=f"item:{item_id}"
+                )
+            if error:
+                record_telemetry(
+                    display.id, "error", detail=f"item:{item_id} {str(error)}"
+                )
+            accepted += 1
+
+        heap_bytes = _beacon_number(data.get("js_heap_bytes"), maximum=2**40)
+        if heap_bytes is not None:
+            metrics_collector.set_display_js_heap(display.name, int(heap_bytes))
+
+        return jsonify({"status": "success", "accepted": accepted})
+
+    except Exception as e:
+        current_app.logger.error(
+            "Failed to record playback beacon",
+            extra={
+                "display_name": display_name,
+                "error": str(e),
+                "action": "beacon_error",
+            },
+        )
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+
 @display_bp.route("/<string:display_name>/status")
 def display_status(display_name: str) -> Union[Response, Tuple[Response, int]]:
     """Get current display status and configuration."""
@@ -249,6 +440,20 @@ def display_status(display_name: str) -> Union[Response, Tuple[Response, int]]:
         display = get_or_create_display(display_name)
 
     slideshow = get_display_slideshow(display)
+    if slideshow:
+        # Load the items with their resized media, as get_slideshow_items does
+        media_blob = selectinload(Slideshow.items).selectinload(
+            SlideshowItem.media_blob
+        )
+        slideshow = db.session.get(
+            Slideshow,
+            slideshow.id,
+            options=[
+                media_blob.selectinload(MediaBlob.derivatives),
+                media_blob.selectinload(MediaBlob.transcodes),
+            ],
+            populate_existing=True,
+        )
 
     status_data = {
         "name": display.name,
@@ -260,7 +465,11 @@ def display_status(display_name: str) -> Union[Response, Tuple[Response, int]]:
         "last_seen_at": (
             display.last_seen_at.isoformat() if display.last_seen_at else None
         ),
-        "slideshow": slideshow.to_dict(include_items=True) if slideshow else None,
+        "slideshow": (
+            slideshow.to_dict(include_items=True, display=display)
+            if slideshow
+            else None
+        ),
         "created_at": display.created_at.isoformat(),
     }
 
@@ -285,7 +494,7 @@ def current_slideshow(display_name: str) -> Union[Response, Tuple[Response, int]
     return jsonify(
         {
             "slideshow": slideshow.to_dict(),
-            "slides": [slide.to_dict() for slide in slides],
+            "slides": [slide.to_dict(display=display) for slide in slides],
             "display": {
                 "id": display.id,
                 "name": display.name,
@@ -445,7 +654,7 @@ def display_slideshow_for_display(
         "display/slideshow.html",
         display=display,
         slideshow=slideshow,
-        slides=[slide.to_dict() for slide in slides],
+        slides=[slide.to_dict(display=display) for slide in slides],
     )
 
 
@@ -539,11 +748,16 @@ def get_display_slideshow(display: Display) -> Optional[Slideshow]:
 
 
 def get_slideshow_items(slideshow_id: int) -> list[SlideshowItem]:
-    """Get active slideshow items in order."""
+    """Get active slideshow items in order, with their resized media."""
+    media_blob = selectinload(SlideshowItem.media_blob)
     return cast(
         list[SlideshowItem],
         (
             SlideshowItem.query.filter_by(slideshow_id=slideshow_id, is_active=True)
+            .options(
+                media_blob.selectinload(MediaBlob.derivatives),
+                media_blob.selectinload(MediaBlob.transcodes),
+            )
             .order_by(SlideshowItem.order_index)
             .all()
         ),
@@ -0,0 +1,472 @@
+"""
+Catalog of uploaded files for the Kiosk Show Replacement application.
+
+Storage statistics and integrity checks used to walk the upload folder and
+stat every file on each request. Instead, every uploaded image and video
+on disk has a stored_files row (path, size, checksum, owner, slideshow and
+modification time), so they are indexed database queries:
+
+- StorageManager records files as it stores them and removes the rows of
+  files it deletes; derivatives and transcodes are recorded when they are
+  written, and media cleanup removes the rows of deleted blobs and their
+  variants.
+- The background storage scan (see storage_scan) lists directories that
+  changed since it last looked at them and adds, updates or removes rows
+  for files changed outside the application (including files uploaded
+  before the catalog existed); reconcile_catalog() does a full pass.
+
+Catalogued directories are the older per-slideshow ``images/`` and
+``videos/`` directories, content-addressed ``media/images/`` and
+``media/videos/``, and the resized images and transcoded videos made from
+them in ``media/derivatives/`` and ``media/transcodes/``. Catalog writes made while storing or deleting a file
+use their own database session, so they never commit or roll back the
+caller's session, and failures are only logged: the next reconciliation
+repairs the catalog.
+"""
+
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from flask import current_app, has_app_context
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session, scoped_session
+
+from .exceptions import StorageError
+from .models import StoredFile, db
+from .storage_resilience import calculate_checksum
+
+logger = logging.getLogger(__name__)
+
+# Catalogued directories (relative to the upload folder) and their content type
+CATALOG_DIRECTORIES = {
+    "images": "image",
+    "videos": "video",
+    "media/images": "image",
+    "media/videos": "video",
+    "media/derivatives": "image",
+    "media/transcodes": "video",
+}
+
+# Files uploaded before content-addressed storage: <type>/<user>/<slideshow>/<name>
+LEGACY_PATH = re.compile(
+    r"^(?:images|videos)/(?P<owner_id>\d+)/(?P<slideshow_id>\d+)/[^/]+$"
+)
+
+# Content-addressed files are named after their SHA-256 checksum
+CONTENT_ADDRESSED_NAME = re.compile(r"^(?P<checksum>[0-9a-f]{64})(?:\.[0-9A-Za-z]+)?$")
+
+# Paths per IN (...) clause when matching files against the catalog
+PATH_BATCH_SIZE = 500
+
+
+def _utc_mtime(stat: os.stat_result) -> datetime:
+    """Return a file's modification time as a naive UTC datetime."""
+    return datetime.fromtimestamp(stat.st_mtime, timezone.utc).replace(tzinfo=None)
+
+
+def _mtime_changed(recorded: Optional[datetime], stat: os.stat_result) -> bool:
+    """Whether a file was modified since it was catalogued.
+
+    Databases that store whole seconds truncate the recorded time, so
+    differences under a second are ignored.
+    """
+    if recorded is None:
+        return True
+    return abs((recorded - _utc_mtime(stat)).total_seconds()) >= 1
+
+
+def classify_path(path: str) -> Optional[Tuple[str, Optional[int], Optional[int]]]:
+    """Get the catalog attributes implied by a file's location.
+
+    Args:
+        path: Path of the file relative to the upload folder
+
+    Returns:
+        Tuple of (content_type, owner_id, slideshow_id), where the IDs are
+        only known for files in the per-slideshow directories, or None if
+        the file is not catalogued
+    """
+    parts = path.split("/")
+    if parts[-1].startswith("."):
+        return None
+    directory = "/".join(parts[:2]) if parts[0] == "media" else parts[0]
+    content_type = CATALOG_DIRECTORIES.get(directory)
+    if content_type is None or len(parts) < 2:
+        return None
+    match = LEGACY_PATH.match(path)
+    if match is not None:
+        return (
+            content_type,
+            int(match.group("owner_id")),
+            int(match.group("slideshow_id")),
+        )
+    return content_type, None, None
+
+
+def _checksum_from_name(path: str) -> Optional[str]:
+    """Return the checksum a content-addressed file is named after, if any."""
+    if not path.startswith("media/"):
+        return None
+    match = CONTENT_ADDRESSED_NAME.match(path.rsplit("/", 1)[-1])
+    return match.group("checksum") if match else None
+
+
+def record_file(
+    base_path: Path,
+    file_path: Path,
+    checksum: Optional[str] = None,
+    owner_id: Optional[int] = None,
+    slideshow_id: Optional[int] = None,
+) -> None:
+    """Add or update the catalog entry of a stored file.
+
+    A file that is already catalogued keeps its owner and slideshow, so
+    uploading the same content again does not reattribute it.
+
+    Args:
+        base_path: Upload folder holding the file
+        file_path: Path of the stored file
+        checksum: SHA-256 checksum of the file content, if known
+        owner_id: ID of the user who uploaded the file
+        slideshow_id: ID of the slideshow the file was uploaded for
+    """
+    if not has_app_context():
+        return
+    try:
+        path = Path(file_path).relative_to(base_path).as_posix()
+    except ValueError:
+        return
+    attributes = classify_path(path)
+    if attributes is None:
+        return
+    content_type, path_owner_id, path_slideshow_id = attributes
+    try:
+        stat = os.stat(file_path)
+    except OSError as e:
+        logger.warning(f"Failed to catalog {path}: {e}")
+        return
+
+    try:
+        with Session(db.engine) as session:
+            entry = session.execute(
+                select(StoredFile).where(StoredFile.path == path)
+            ).scalar_one_or_none()
+            if entry is None:
+                entry = StoredFile(path=path)
+                session.add(entry)
+            if entry.owner_id is None:
+                entry.owner_id = owner_id if owner_id is not None else path_owner_id
+            if entry.slideshow_id is None:
+                entry.slideshow_id = (
+                    slideshow_id if slideshow_id is not None else path_slideshow_id
+                )
+            entry.content_type = content_type
+            entry.file_size = stat.st_size
+            entry.checksum = checksum or _checksum_from_name(path) or entry.checksum
+            entry.mtime = _utc_mtime(stat)
+            session.commit()
+    except IntegrityError:
+        # Another request or the reconciliation job catalogued it first
+        logger.debug(f"Catalog entry for {path} was stored concurrently")
+    except SQLAlchemyError as e:
+        logger.warning(f"Failed to catalog {path}: {e}")
+
+
+def forget_files(
+    paths: Iterable[str],
+    session: Optional[Union[Session, "scoped_session[Session]"]] = None,
+) -> None:
+    """Remove the catalog entries of deleted files.
+
+    Args:
+        paths: Paths of the files relative to the upload folder
+        session: Session to delete the entries in, which the caller commits;
+            by default they are deleted and committed in a separate session
+    """
+    paths = [path for path in paths if path]
+    if not paths or not has_app_context():
+        return
+    statement = delete(StoredFile).where(StoredFile.path.in_(paths))
+    if session is not None:
+        session.execute(statement)
+        return
+    try:
+        with Session(db.engine) as own_session:
+            own_session.execute(statement)
+            own_session.commit()
+    except SQLAlchemyError as e:
+        logger.warning(f"Failed to remove {len(paths)} catalog entries: {e}")
+
+
+def find_uncatalogued(paths: Iterable[str]) -> List[str]:
+    """Find which of the given files are not in the catalog.
+
+    Args:
+        paths: Paths of files relative to the upload folder
+
+    Returns:
+        The paths without a catalog entry, in their original order
+    """
+    paths = list(dict.fromkeys(paths))
+    catalogued = set()
+    for start in range(0, len(paths), PATH_BATCH_SIZE):
+        batch = paths[start : start + PATH_BATCH_SIZE]
+        catalogued.update(
+            db.session.execute(
+                select(StoredFile.path).where(StoredFile.path.in_(batch))
+            ).scalars()
+        )
+    return [path for path in paths if path not in catalogued]
+
+
+def get_catalog_stats() -> Dict[str, Any]:
+    """Get storage statistics from the catalog.
+
+    Returns:
+        Dictionary with total, image and video file counts and sizes, and
+        the number of distinct users and slideshows files are attributed to
+    """
+    totals = {
+        content_type: (count, int(size))
+        for content_type, count, size in db.session.execute(
+            select(
+                StoredFile.content_type,
+                func.count(StoredFile.id),
+                func.coalesce(func.sum(StoredFile.file_size), 0),
+            ).group_by(StoredFile.content_type)
+        )
+    }
+    users, slideshows = db.session.execute(
+        select(
+            func.count(func.distinct(StoredFile.owner_id)),
+            func.count(func.distinct(StoredFile.slideshow_id)),
+        )
+    ).one()
+
+    image_files, image_size = totals.get("image", (0, 0))
+    video_files, video_size = totals.get("video", (0, 0))
+    return {
+        "total_size": image_size + video_size,
+        "image_size": image_size,
+        "video_size": video_size,
+        "total_files": image_files + video_files,
+        "image_files": image_files,
+        "video_files": video_files,
+        "users_with_files": users,
+        "slideshows_with_files": slideshows,
+    }
+
+
+def list_directory(
+    base_path: Path, directory: str
+) -> Tuple[Dict[str, os.stat_result], List[str]]:
+    """List the catalogued files and the subdirectories of a directory.
+
+    Hidden entries are skipped.
+
+    Args:
+        base_path: Upload folder
+        directory: Path of the directory relative to the upload folder
+
+    Returns:
+        Tuple of (files, subdirectories): files maps the path of each
+        catalogued file directly in the directory to its stat result, and
+        subdirectories lists the paths of its subdirectories, all relative
+        to the upload folder
+
+    Raises:
+        FileNotFoundError: If the directory does not exist
+    """
+    files: Dict[str, os.stat_result] = {}
+    subdirectories: List[str] = []
+    with os.scandir(os.path.join(base_path, directory)) as entries:
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            path = f"{directory}/{entry.name}"
+            if entry.is_dir(follow_symlinks=False):
+                subdirectories.append(path)
+            elif entry.is_file(follow_symlinks=False) and classify_path(path):
+                files[path] = entry.stat(follow_symlinks=False)
+    return files, sorted(subdirectories)
+
+
+def _file_checksum(file_path: str, path: str) -> Optional[str]:
+    """Get the checksum of a file found by reconciliation."""
+    checksum = _checksum_from_name(path)
+    if checksum is not None:
+        return checksum
+    try:
+        return calculate_checksum(Path(file_path))
+    except StorageError as e:
+        logger.warning(f"Failed to checksum {path}: {e}")
+        return None
+
+
+def reconcile_directory(
+    base_path: Path, directory: str, files: Dict[str, os.stat_result]
+) -> Dict[str, int]:
+    """Bring the catalog entries of one directory in line with its files.
+
+    Files missing from the catalog are added, entries whose file changed
+    size or modification time are updated, and entries of files no longer
+    in the directory are removed. Checksums are only calculated for new or
+    changed files not named after their checksum. The caller commits the
+    session.
+
+    Args:
+        base_path: Upload folder
+        directory: Path of the directory relative to the upload folder
+        files: Files in the directory, as returned by list_directory()
+
+    Returns:
+        Dictionary with the number of files scanned, added, updated and
+        removed
+    """
+    prefix = f"{directory}/"
+    known = {
+        row.path: row
+        for row in db.session.execute(
+            select(
+                StoredFile.id, StoredFile.path, StoredFile.file_size, StoredFile.mtime
+            ).where(StoredFile.path.startswith(prefix, autoescape=True))
+        )
+        if "/" not in row.path[len(prefix) :]
+    }
+    result = {"scanned": len(files), "added": 0, "updated": 0, "removed": 0}
+    new_entries: List[StoredFile] = []
+
+    for path, stat in files.items():
+        file_path = os.path.join(base_path, path)
+        row = known.pop(path, None)
+        if row is not None:
+            if row.file_size == stat.st_size and not _mtime_changed(row.mtime, stat):
+                continue
+            db.session.execute(
+                update(StoredFile)
+                .where(StoredFile.id == row.id)
+                .values(
+                    file_size=stat.st_size,
+                    checksum=_file_checksum(file_path, path),
+                    mtime=_utc_mtime(stat),
+                    cataloged_at=datetime.now(timezone.utc),
+                )
+            )
+            result["updated"] += 1
+            continue
+
+        attributes = classify_path(path)
+        if attributes is None:
+            continue
+        content_type, owner_id, slideshow_id = attributes
+        new_entries.append(
+            StoredFile(
+                path=path,
+                content_type=content_type,
+                file_size=stat.st_size,
+                checksum=_file_checksum(file_path, path),
+                owner_id=owner_id,
+                slideshow_id=slideshow_id,
+                mtime=_utc_mtime(stat),
+            )
+        )
+
+    # Files stored while the directory was being listed are already recorded
+    uncatalogued = set(find_uncatalogued(e.path for e in new_entries))
+    new_entries = [e for e in new_entries if e.path in uncatalogued]
+    db.session.add_all(new_entries)
+    result["added"] = len(new_entries)
+
+    if known:
+        db.session.execute(
+            delete(StoredFile).where(
+                StoredFile.id.in_([row.id for row in known.values()])
+            )
+        )
+        result["removed"] = len(known)
+    return result
+
+
+def forget_directory(directory: str) -> int:
+    """Remove the catalog entries of every file below a deleted directory.
+
+    The caller commits the session.
+
+    Args:
+        directory: Path of the directory relative to the upload folder
+
+    Returns:
+        Number of entries removed
+    """
+    result = db.session.execute(
+        delete(StoredFile).where(
+            StoredFile.path.startswith(f"{directory}/", autoescape=True)
+        )
+    )
+    return result.rowcount or 0
+
+
+def reconcile_catalog(base_path: Optional[Path] = None) -> Dict[str, int]:
+    """Bring the whole catalog in line with the files in the upload folder.
+
+    Every catalogued directory is listed and reconciled (see
+    reconcile_directory()), and entries in directories that no longer exist
+    are removed. The storage scan (see storage_scan) does the same
+    incrementally, only listing directories that changed.
+
+    Args:
+        base_path: Upload folder (defaults to UPLOAD_FOLDER)
+
+    Returns:
+        Dictionary with the number of files scanned, added, updated and
+        removed
+    """
+    if base_path is None:
+        base_path = Path(current_app.config.get("UPLOAD_FOLDER", "instance/uploads"))
+    result = {"scanned": 0, "added": 0, "updated": 0, "removed": 0}
+
+    try:
+        pending = list(CATALOG_DIRECTORIES)
+        listed = set()
+        while pending:
+            directory = pending.pop()
+            try:
+                files, subdirectories = list_directory(base_path, directory)
+            except FileNotFoundError:
+                continue
+            listed.add(directory)
+            for key, count in reconcile_directory(base_path, directory, files).items():
+                result[key] += count
+            pending.extend(subdirectories)
+
+        # Entries in directories that no longer exist
+        stale_ids = [
+            row.id
+            for row in db.session.execute(select(StoredFile.id, StoredFile.path))
+            if row.path.rsplit("/", 1)[0] not in listed
+        ]
+        for start in range(0, len(stale_ids), PATH_BATCH_SIZE):
+            db.session.execute(
+                delete(StoredFile).where(
+                    StoredFile.id.in_(stale_ids[start : start + PATH_BATCH_SIZE])
+                )
+            )
+        result["removed"] += len(stale_ids)
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Failed to reconcile file catalog: {e}")
+        return {**result, "added": 0, "updated": 0, "removed": 0}
+
+    if result["added"] or result["updated"] or result["removed"]:
+        logger.info(
+            f"Reconciled file catalog: {result['added']} added, "
+            f"{result['updated']} updated, {result['removed']} removed "
+            f"of {result['scanned']} files"
+        )
+    return result
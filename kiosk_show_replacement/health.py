@@ -10,19 +10,112 @@ Endpoints:
 - /health/storage - Storage availability and disk space
 - /health/ready - Readiness probe (can accept traffic)
 - /health/live - Liveness probe (is running)
+
+Database and storage checks run on a background schedule and probes return
+the cached verdict. If the cached result is older than
+HEALTH_CHECK_MAX_STALENESS seconds (e.g. the scheduler is not running) the
+check is re-run inline. Pass ``?deep=1`` to force fresh checks.
 """
 
 import os
 import shutil
+import threading
 import time
 from datetime import datetime, timezone
-from typing import Any, Dict, Tuple
+from typing import Any, Callable, Dict, Optional, Tuple
 
-from flask import Blueprint, Response, current_app, jsonify
+from flask import Blueprint, Flask, Response, current_app, jsonify, request
 
 health_bp = Blueprint("health", __name__)
 
 
+class HealthCheckCache:
+    """Thread-safe cache of the most recent health check results."""
+
+    def __init__(self) -> None:
+        """Initialize an empty cache."""
+        self._results: Dict[str, Tuple[float, Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        # Serializes check execution so concurrent stale probes run a
+        # check once instead of once per probe
+        self._refresh_lock = threading.Lock()
+
+    def get(self, name: str, max_age: float) -> Optional[Dict[str, Any]]:
+        """Get a cached result if it is fresh enough.
+
+        Args:
+            name: Check name
+            max_age: Maximum age in seconds (0 or less never returns a result)
+
+        Returns:
+            Copy of the cached result, or None if missing or stale
+        """
+        with self._lock:
+            entry = self._results.get(name)
+        if entry is None or max_age <= 0:
+            return None
+        checked_at, result = entry
+        age = time.monotonic() - checked_at
+        if age > max_age:
+            return None
+        cached = dict(result)
+        cached["cached"] = True
+        cached["age_seconds"] = round(age, 2)
+        return cached
+
+    def set(self, name: str, result: Dict[str, Any]) -> None:
+        """Store a check result.
+
+        Args:
+            name: Check name
+            result: Check result dictionary
+        """
+        with self._lock:
+            self._results[name] = (time.monotonic(), dict(result))
+
+    def clear(self) -> None:
+        """Remove all cached results."""
+        with self._lock:
+            self._results.clear()
+
+    def run(
+        self,
+        name: str,
+        check: Callable[[], Dict[str, Any]],
+        max_age: float,
+        force: bool = False,
+    ) -> Dict[str, Any]:
+        """Return a cached result, running the check if it is stale.
+
+        Args:
+            name: Check name
+            check: Function performing the check
+            max_age: Maximum age in seconds of a usable cached result
+            force: Always run the check, ignoring the cache
+
+        Returns:
+            Check result dictionary (a copy safe to modify)
+        """
+        if not force:
+            cached = self.get(name, max_age)
+            if cached is not None:
+                return cached
+
+        with self._refresh_lock:
+            # Another thread may have refreshed while we waited
+            if not force:
+                cached = self.get(name, max_age)
+                if cached is not None:
+                    return cached
+            result = check()
+            self.set(name, result)
+
+        fresh = dict(result)
+        fresh["cached"] = False
+        fresh["age_seconds"] = 0.0
+        return fresh
+
+
 def _get_timestamp() -> str:
     """Get current timestamp in ISO format."""
     return datetime.now(timezone.utc).isoformat()
@@ -175,6 +268,66 @@ def _check_storage() -> Dict[str, Any]:
         }
 
 
+def _get_cache() -> HealthCheckCache:
+    """Get the health check cache for the current application."""
+    cache = current_app.extensions.get("health_cache")
+    if cache is None:
+        cache = current_app.extensions.setdefault("health_cache", HealthCheckCache())
+    return cache
+
+
+def _is_deep_request() -> bool:
+    """Whether the current request asked for fresh (deep) checks."""
+    return request.args.get("deep", "").lower() in ("1", "true", "yes")
+
+
+def _run_check(name: str, deep: bool = False) -> Dict[str, Any]:
+    """Run a named health check, using the cached result when fresh enough.
+
+    Args:
+        name: Check name ("database" or "storage")
+        deep: Bypass the cache and run the check now
+
+    Returns:
+        Check result dictionary
+    """
+    # Resolve check functions at call time so they can be patched in tests
+    checks: Dict[str, Callable[[], Dict[str, Any]]] = {
+        "database": _check_database,
+        "storage": _check_storage,
+    }
+    max_age = float(current_app.config.get("HEALTH_CHECK_MAX_STALENESS", 60))
+    return _get_cache().run(name, checks[name], max_age, force=deep)
+
+
+def refresh_health_checks() -> None:
+    """Run all health checks and update the cache.
+
+    Called periodically by the background scheduler within an app context.
+    """
+    for name in ("database", "storage"):
+        _run_check(name, deep=True)
+
+
+def init_health_checks(app: Flask) -> None:
+    """Initialize cached health checks and schedule background refreshes.
+
+    Args:
+        app: Flask application instance
+    """
+    from .scheduler import get_scheduler
+
+    app.extensions["health_cache"] = HealthCheckCache()
+
+    scheduler = get_scheduler(app)
+    if scheduler is not None:
+        scheduler.add_job(
+            "health_checks",
+            float(app.config.get("HEALTH_CHECK_INTERVAL", 15)),
+            refresh_health_checks,
+        )
+
+
 def _get_overall_status(checks: Dict[str, Dict[str, Any]]) -> str:
     """Determine overall health status from individual checks.
 
@@ -198,7 +351,8 @@ def _get_overall_status(checks: Dict[str, Dict[str, Any]]) -> str:
 def health_check() -> Tuple[Response, int]:
     """Overall health check endpoint.
 
-    Returns 200 if healthy/degraded, 503 if unhealthy.
+    Returns 200 if healthy/degraded, 503 if unhealthy. Results come from the
+    health check cache unless ``?deep=1`` is given.
 
     Response format:
     {
@@ -213,9 +367,10 @@ def health_check() -> Tuple[Response, int]:
     """
     from . import __version__
 
+    deep = _is_deep_request()
     checks = {
-        "database": _check_database(),
-        "storage": _check_storage(),
+        "database": _run_check("database", deep),
+        "storage": _run_check("storage", deep),
     }
 
     status = _get_overall_status(checks)
@@ -238,7 +393,7 @@ def health_database() -> Tuple[Response, int]:
     Returns 200 if database is accessible and initialized, 503 otherwise.
     Includes detailed information about database initialization status.
     """
-    result = _check_database()
+    result = _run_check("database", _is_deep_request())
     result["timestamp"] = _get_timestamp()
 
     # Return 200 only if database is healthy AND initialized
@@ -258,7 +413,7 @@ def health_storage() -> Tuple[Response, int]:
 
     Returns 200 if storage is healthy/degraded, 503 if unhealthy.
     """
-    result = _check_storage()
+    result = _run_check("storage", _is_deep_request())
     result["timestamp"] = _get_timestamp()
 
     status_code = 200 if result["status"] != "unhealthy" else 503
@@ -270,11 +425,12 @@ def health_ready() -> Tuple[Response, int]:
     """Readiness probe for Kubernetes.
 
     Indicates whether the application is ready to receive traffic.
-    Checks database connectivity and initialization status.
+    Checks database connectivity and initialization status, using the cached
+    result unless ``?deep=1`` is given.
 
     Returns 200 if ready, 503 if not ready.
     """
-    db_check = _check_database()
+    db_check = _run_check("database", _is_deep_request())
 
     if db_check["status"] == "healthy":
         return (
@@ -4,20 +4,38 @@ ICS/iCal parser module for the Kiosk.show Replacement application.
 This module provides functions for parsing iCal/ICS content, with specific
 support for Skedda calendar format. It extracts events and their metadata
 into a structured format suitable for database storage and display rendering.
+
+ICS content is read line by line, one top-level component at a time, so
+that events outside the requested date window are skipped from the dates
+in their raw DTSTART and DTEND lines, before any icalendar component is
+built for them.
 """
 
+import io
 import re
-from datetime import datetime, timezone
-from typing import Any, Optional
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Iterator, Optional
+
+from icalendar import Event, Timezone  # type: ignore[import-untyped]
 
-from icalendar import Calendar  # type: ignore[import-untyped]
+# Slack when comparing the unparsed dates of an event with the window, since
+# its time zone is only applied once it is parsed (days)
+WINDOW_MARGIN_DAYS = 1
 
 
-def parse_ics_data(ics_content: str) -> list[dict[str, Any]]:
+def parse_ics_data(
+    ics_content: str,
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+) -> list[dict[str, Any]]:
     """Parse ICS content and extract events.
 
     Args:
         ics_content: Raw ICS/iCal content as a string
+        window_start: If given, events ending at or before this time are
+            skipped
+        window_end: If given, events starting at or after this time are
+            skipped
 
     Returns:
         List of event dictionaries with keys:
@@ -36,22 +54,168 @@ def parse_ics_data(ics_content: str) -> list[dict[str, Any]]:
     if not ics_content or not ics_content.strip():
         raise ValueError("Empty ICS content")
 
+    events = []
+    # Events using a time zone whose VTIMEZONE has not been read yet
+    deferred = []
+    known_tzids: set[str] = set()
+
+    for name, lines in _iter_components(ics_content):
+        if name == "VTIMEZONE":
+            # Parsing a VTIMEZONE registers its TZID with icalendar, so that
+            # event times referencing it are resolved
+            known_tzids.add(str(_from_ical(Timezone, lines).get("tzid", "")))
+            continue
+        if name != "VEVENT":
+            continue
+
+        start_day, end_day, tzids = _scan_event_dates(lines)
+        if _outside_window(start_day, end_day, window_start, window_end):
+            continue
+        if tzids - known_tzids:
+            deferred.append(lines)
+            continue
+        _append_event(events, lines, window_start, window_end)
+
+    for lines in deferred:
+        _append_event(events, lines, window_start, window_end)
+
+    return events
+
+
+def _unfold_lines(ics_content: str) -> Iterator[str]:
+    """Yield the content lines of ICS content, joining folded lines."""
+    current: Optional[str] = None
+    for raw_line in io.StringIO(ics_content):
+        line = raw_line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and current is not None:
+            current += line[1:]
+            continue
+        if current is not None:
+            yield current
+        current = line
+    if current is not None:
+        yield current
+
+
+def _iter_components(ics_content: str) -> Iterator[tuple[str, list[str]]]:
+    """Yield the top-level components of a calendar with their content lines.
+
+    Args:
+        ics_content: Raw ICS/iCal content as a string
+
+    Yields:
+        Tuples of (upper-case component name, content lines)
+
+    Raises:
+        ValueError: If the content is not a complete VCALENDAR
+    """
+    lines = (line for line in _unfold_lines(ics_content) if line.strip())
+    first = next(lines, "")
+    if first.strip().upper() != "BEGIN:VCALENDAR":
+        raise ValueError("Failed to parse ICS content: expected BEGIN:VCALENDAR")
+
+    name = ""
+    component: Optional[list[str]] = None
+    depth = 0
+    for line in lines:
+        upper = line.upper()
+        if component is None:
+            if upper.startswith("BEGIN:"):
+                name = upper[6:].strip()
+                component = [line]
+                depth = 1
+            elif upper.startswith("END:VCALENDAR"):
+                return
+            continue
+
+        component.append(line)
+        if upper.startswith("BEGIN:"):
+            depth += 1
+        elif upper.startswith("END:"):
+            depth -= 1
+            if depth == 0:
+                yield name, component
+                component = None
+
+    raise ValueError("Failed to parse ICS content: missing END:VCALENDAR")
+
+
+def _from_ical(component_class: Any, lines: list[str]) -> Any:
+    """Build an icalendar component from its content lines."""
     try:
-        cal = Calendar.from_ical(ics_content)
+        return component_class.from_ical("\r\n".join(lines) + "\r\n")
     except Exception as e:
         raise ValueError(f"Failed to parse ICS content: {e}") from e
 
-    events = []
 
-    for component in cal.walk():
-        if component.name != "VEVENT":
-            continue
+def _scan_event_dates(
+    lines: list[str],
+) -> tuple[Optional[date], Optional[date], set[str]]:
+    """Read the dates of an event from its raw DTSTART and DTEND lines.
 
-        event = _parse_vevent(component)
-        if event:
-            events.append(event)
+    Args:
+        lines: Content lines of a VEVENT
 
-    return events
+    Returns:
+        Tuple of (start date, end date, TZIDs referenced); a date is None if
+        its line is missing or not understood
+    """
+    start_day = end_day = None
+    tzids = set()
+    for line in lines:
+        name, _, value = line.partition(":")
+        prop, *params = name.split(";")
+        prop = prop.upper()
+        if prop not in ("DTSTART", "DTEND"):
+            continue
+        for param in params:
+            key, _, param_value = param.partition("=")
+            if key.upper() == "TZID":
+                tzids.add(param_value.strip('"'))
+        try:
+            day = datetime.strptime(value[:8], "%Y%m%d").date()
+        except ValueError:
+            continue
+        if prop == "DTSTART":
+            start_day = day
+        else:
+            end_day = day
+    return start_day, end_day, tzids
+
+
+def _outside_window(
+    start_day: Optional[date],
+    end_day: Optional[date],
+    window_start: Optional[datetime],
+    window_end: Optional[datetime],
+) -> bool:
+    """Whether an event's raw dates put it clearly outside the window."""
+    margin = timedelta(days=WINDOW_MARGIN_DAYS)
+    last_day = end_day or start_day
+    if window_start is not None and last_day is not None:
+        if last_day < window_start.date() - margin:
+            return True
+    if window_end is not None and start_day is not None:
+        if start_day > window_end.date() + margin:
+            return True
+    return False
+
+
+def _append_event(
+    events: list[dict[str, Any]],
+    lines: list[str],
+    window_start: Optional[datetime],
+    window_end: Optional[datetime],
+) -> None:
+    """Parse a VEVENT and add it to the events if it overlaps the window."""
+    event = _parse_vevent(_from_ical(Event, lines))
+    if event is None:
+        return
+    if window_start is not None and event["end_time"] <= window_start:
+        return
+    if window_end is not None and event["start_time"] >= window_end:
+        return
+    events.append(event)
 
 
 def _parse_vevent(component: Any) -> Optional[dict[str, Any]]:
@@ -114,8 +278,6 @@ def _to_utc_datetime(dt: Any) -> Optional[datetime]:
     Returns:
         UTC datetime or None if conversion fails
     """
-    from datetime import date
-
     if dt is None:
         return None
 
@@ -4,19 +4,72 @@ ICS/iCal service module for the Kiosk.show Replacement application.
 This module provides services for fetching, caching, and querying iCal/ICS
 calendar data. It handles HTTP fetching, database synchronization, and
 formatting calendar data for frontend display.
+
+Feeds are refreshed in the background: a scheduler job runs every
+ICAL_REFRESH_CHECK_INTERVAL seconds and refreshes each feed shown by an
+active Skedda item ICAL_REFRESH_AHEAD_SECONDS before its refresh interval
+ends, on ICAL_REFRESH_WORKERS threads. Calendar reads never fetch; they
+serve the events last stored in the database. A feed is refreshed by one
+thread or process at a time, and each successful refresh is pushed to
+admin and display connections as a ``skedda.updated`` SSE event.
+
+Fetches are conditional: the ETag and Last-Modified validators of the last
+stored content are sent with each request, and a 304 Not Modified response
+or content with the same SHA-256 as the last stored content only marks the
+feed as fetched, without parsing it or touching its events.
+
+Only events within a window around today (see get_event_window()) are
+parsed and stored. The window moves once a day, so the first refresh of a
+feed each day downloads and syncs it in full. Stored events outside the
+window are not compared with the feed, so past events stay until
+prune_ical_events() deletes them after ICAL_EVENT_RETENTION_DAYS.
+
+Formatted Skedda calendars are cached per process by feed, local date and
+feed revision (the feed's events_revision, which only changes when a sync
+or the pruning writes events), so displays showing the same calendar share
+one computation and keep their ETag across refreshes that change nothing.
+A refresh stores today's calendar for the feed ahead of the next poll. The
+``last_updated`` time of the feed's last successful fetch is not part of
+the cached calendar; it is added to each response.
 """
 
+import hashlib
 import json
 import logging
+import threading
+import time as time_module
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
 from datetime import date, datetime, time, timedelta, timezone, tzinfo
-from typing import Any, Optional, cast
+from functools import partial
+from typing import Any, Callable, Optional, cast
+from urllib.parse import urlsplit
 
 import requests
-from sqlalchemy import and_
-from sqlalchemy.exc import IntegrityError
+from flask import Flask, current_app
+from sqlalchemy import and_, delete, func, insert, or_, select, update
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import selectinload
 
 from .ical_parser import parse_ics_data, parse_skedda_summary
-from .models import ICalEvent, ICalFeed, SlideshowItem, db
+from .leases import claim_lease, release_lease, renew_lease
+from .media_probe import MediaProbePool
+from .metrics import record_ical_event_prune
+from .models import (
+    Display,
+    ICalEvent,
+    ICalEventResource,
+    ICalFeed,
+    ICalRefreshJob,
+    SlideshowItem,
+    db,
+)
+from .skedda_layout import DEFAULT_LAYOUT, DayLayout, layout_day, time_slot_table
+from .sse import create_skedda_event, sse_manager
 
 logger = logging.getLogger(__name__)
 
@@ -26,28 +79,211 @@ DEFAULT_FETCH_TIMEOUT = 30
 # Default refresh interval if not specified (minutes)
 DEFAULT_REFRESH_MINUTES = 15
 
+# A refresh claim older than this is assumed abandoned by a crashed worker
+# and may be taken over (seconds)
+REFRESH_LEASE_SECONDS = 300
 
-def fetch_ics_from_url(url: str, timeout: int = DEFAULT_FETCH_TIMEOUT) -> Optional[str]:
-    """Fetch ICS content from a URL.
+# Job lease held while pruning past events, renewed after each batch
+PRUNE_LEASE = "ical_event_prune"
+PRUNE_LEASE_SECONDS = 300
+
+# Parsed event fields stored in ical_events columns, compared to find
+# changed events; resources are stored in ical_event_resources
+EVENT_FIELDS = (
+    "summary",
+    "description",
+    "start_time",
+    "end_time",
+    "attendee_name",
+    "attendee_email",
+)
+
+# Rows deleted per statement when syncing a feed
+SYNC_BATCH_SIZE = 500
+
+# Feed refreshes waiting for a worker beyond the running ones
+REFRESH_QUEUE_SIZE = 100
+
+# Background feed refresh workers, sized by init_ical_refresh()
+refresh_pool = MediaProbePool(
+    max_workers=2, max_queue=REFRESH_QUEUE_SIZE, thread_name_prefix="ical-refresh"
+)
+
+# Refresh-all jobs run one at a time on their own thread; their feeds are
+# fetched by a separate short-lived thread pool
+job_pool = MediaProbePool(max_workers=1, max_queue=0, thread_name_prefix="ical-job")
+
+# Feeds queued on or being refreshed by this process's refresh pool
+_queued_feeds: set[int] = set()
+_queued_feeds_lock = threading.Lock()
+
+# Formatted calendars are cached by (feed ID, local date, day layout)
+CalendarKey = tuple[int, date, DayLayout]
+
+
+class SkeddaCalendarCache:
+    """Thread-safe LRU cache of formatted Skedda calendars.
+
+    Entries are keyed by (feed ID, local date, day layout) and hold the
+    calendar of one feed revision; a lookup with a newer revision rebuilds
+    the entry.
+    """
+
+    def __init__(self, max_entries: int = 256) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum number of calendars kept (0 disables caching)
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[CalendarKey, tuple[str, dict[str, Any], str]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+        # Serializes building so concurrent misses for the same calendar
+        # compute it once instead of once per display
+        self._build_lock = threading.Lock()
+
+    def get(
+        self, key: CalendarKey, revision: str
+    ) -> Optional[tuple[dict[str, Any], str]]:
+        """Get a cached calendar if it is of the given revision.
+
+        Args:
+            key: (feed ID, local date, day layout) of the calendar
+            revision: Current revision of the feed
+
+        Returns:
+            Tuple of (calendar data, ETag), or None if missing or outdated
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != revision:
+                return None
+            self._entries.move_to_end(key)
+            return entry[1], entry[2]
+
+    def set(self, key: CalendarKey, revision: str, data: dict[str, Any]) -> str:
+        """Store a calendar, evicting the least recently used ones.
+
+        Args:
+            key: (feed ID, local date, day layout) of the calendar
+            revision: Revision of the feed the calendar was built from
+            data: Formatted calendar data
+
+        Returns:
+            ETag of the calendar
+        """
+        etag = skedda_calendar_etag(key, revision)
+        if self.max_entries <= 0:
+            return etag
+        with self._lock:
+            self._entries[key] = (revision, data, etag)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return etag
+
+    def get_or_build(
+        self,
+        key: CalendarKey,
+        revision: str,
+        build: Callable[[], dict[str, Any]],
+    ) -> tuple[dict[str, Any], str]:
+        """Return a cached calendar, building it if missing or outdated.
+
+        Args:
+            key: (feed ID, local date, day layout) of the calendar
+            revision: Current revision of the feed
+            build: Function formatting the calendar
+
+        Returns:
+            Tuple of (calendar data, ETag); the data is shared with other
+            callers and must not be modified
+        """
+        cached = self.get(key, revision)
+        if cached is not None:
+            return cached
+
+        with self._build_lock:
+            # Another thread may have built it while we waited
+            cached = self.get(key, revision)
+            if cached is not None:
+                return cached
+            data = build()
+            return data, self.set(key, revision, data)
+
+    def clear(self) -> None:
+        """Remove all cached calendars."""
+        with self._lock:
+            self._entries.clear()
+
+
+def _utcnow() -> datetime:
+    """Return the current time as a naive UTC datetime, as stored in the DB."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+@dataclass(frozen=True)
+class ICSFetchResult:
+    """Result of a successful conditional ICS fetch.
+
+    Attributes:
+        content: ICS content, or None if the server answered 304 Not Modified
+        etag: ETag validator to send with the next request
+        last_modified: Last-Modified validator to send with the next request
+    """
+
+    content: Optional[str]
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    @property
+    def not_modified(self) -> bool:
+        """Whether the feed is unchanged since the validators were issued."""
+        return self.content is None
+
+
+def fetch_ics(
+    url: str,
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+    timeout: float = DEFAULT_FETCH_TIMEOUT,
+) -> Optional[ICSFetchResult]:
+    """Fetch ICS content from a URL, unless it is unchanged.
 
     Args:
         url: URL of the ICS feed
+        etag: ETag from the last fetch, sent as If-None-Match
+        last_modified: Last-Modified from the last fetch, sent as
+            If-Modified-Since
         timeout: Request timeout in seconds
 
     Returns:
-        ICS content as string, or None if fetch failed
+        Fetch result, or None if fetch failed
     """
+    headers = {
+        "User-Agent": "KioskShowReplacement/1.0",
+        "Accept": "text/calendar, application/ics, */*",
+    }
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
     try:
-        response = requests.get(
-            url,
-            timeout=timeout,
-            headers={
-                "User-Agent": "KioskShowReplacement/1.0",
-                "Accept": "text/calendar, application/ics, */*",
-            },
-        )
+        response = requests.get(url, timeout=timeout, headers=headers)
+        if response.status_code == 304:
+            return ICSFetchResult(
+                content=None,
+                etag=response.headers.get("ETag", etag),
+                last_modified=response.headers.get("Last-Modified", last_modified),
+            )
         response.raise_for_status()
-        return response.text
+        return ICSFetchResult(
+            content=response.text,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        )
     except requests.exceptions.Timeout:
         logger.warning(f"Timeout fetching ICS from {url}")
         return None
@@ -56,6 +292,22 @@ def fetch_ics_from_url(url: str, timeout: int = DEFAULT_FETCH_TIMEOUT) -> Option
         return None
 
 
+def fetch_ics_from_url(
+    url: str, timeout: float = DEFAULT_FETCH_TIMEOUT
+) -> Optional[str]:
+    """Fetch ICS content from a URL.
+
+    Args:
+        url: URL of the ICS feed
+        timeout: Request timeout in seconds
+
+    Returns:
+        ICS content as string, or None if fetch failed
+    """
+    result = fetch_ics(url, timeout=timeout)
+    return result.content if result is not None else None
+
+
 def get_or_create_feed(url: str) -> ICalFeed:
     """Get an existing feed by URL or create a new one.
 
@@ -141,78 +393,684 @@ def refresh_feed(feed: ICalFeed) -> bool:
     """
     logger.info(f"Refreshing ICS feed: {feed.url}")
 
-    ics_content = fetch_ics_from_url(feed.url)
-    if ics_content is None:
+    etag, last_modified = _feed_validators(feed)
+    return apply_feed_content(
+        feed, fetch_ics(feed.url, etag=etag, last_modified=last_modified)
+    )
+
+
+def get_event_window() -> tuple[Optional[datetime], Optional[datetime]]:
+    """Get the window of event times stored for feeds.
+
+    Events are kept from ICAL_EVENT_WINDOW_PAST_DAYS days before today to
+    ICAL_EVENT_WINDOW_FUTURE_DAYS days after it; either set to 0 leaves
+    that side of the window open. The window is aligned to UTC days, so it
+    only moves once a day.
+
+    Returns:
+        Tuple of (window start, window end) as UTC datetimes, None if open
+    """
+    config = current_app.config
+    past_days = int(config.get("ICAL_EVENT_WINDOW_PAST_DAYS", 7))
+    future_days = int(config.get("ICAL_EVENT_WINDOW_FUTURE_DAYS", 60))
+    today = datetime.combine(_utcnow().date(), time.min, tzinfo=timezone.utc)
+    window_start = today - timedelta(days=past_days) if past_days > 0 else None
+    window_end = today + timedelta(days=future_days + 1) if future_days > 0 else None
+    return window_start, window_end
+
+
+def _synced_for_current_window(feed: ICalFeed) -> bool:
+    """Whether a feed's stored events were synced for today's event window."""
+    if get_event_window() == (None, None):
+        return True
+    return (
+        feed.last_fetched is not None and feed.last_fetched.date() == _utcnow().date()
+    )
+
+
+def _feed_validators(feed: ICalFeed) -> tuple[Optional[str], Optional[str]]:
+    """Get the validators to send when fetching a feed.
+
+    None are sent on the first refresh after the event window moved, as
+    the feed must then be downloaded and synced again even if unchanged.
+
+    Returns:
+        Tuple of (ETag, Last-Modified)
+    """
+    if not _synced_for_current_window(feed):
+        return None, None
+    return feed.etag, feed.last_modified
+
+
+def apply_feed_content(feed: ICalFeed, fetched: Optional[ICSFetchResult]) -> bool:
+    """Parse fetched ICS content and store its events for a feed.
+
+    Records the outcome on the feed, releases its refresh claim and
+    announces a successful refresh with a ``skedda.updated`` SSE event.
+    Content that is unchanged since the last refresh is not parsed, and
+    its events are left as they are.
+
+    Args:
+        feed: ICalFeed instance
+        fetched: Result of the fetch, or None if the fetch failed
+
+    Returns:
+        True if the feed's events are up to date, False otherwise
+    """
+    if fetched is None:
         feed.last_error = (
             f"Failed to fetch ICS from URL at {datetime.now(timezone.utc).isoformat()}"
         )
+        feed.refresh_started_at = None
         db.session.commit()
         return False
 
+    content_hash = None
+    if fetched.content is not None:
+        content_hash = hashlib.sha256(fetched.content.encode("utf-8")).hexdigest()
+    if fetched.not_modified or (
+        content_hash == feed.content_hash and _synced_for_current_window(feed)
+    ):
+        feed.etag = fetched.etag
+        feed.last_modified = fetched.last_modified
+        feed.last_fetched = datetime.now(timezone.utc)
+        feed.last_error = None
+        feed.refresh_started_at = None
+        db.session.commit()
+        logger.info(f"ICS feed {feed.url} is unchanged")
+        _warm_after_refresh(feed)
+        return True
+
     try:
-        events = parse_ics_data(ics_content)
+        window_start, window_end = get_event_window()
+        events = parse_ics_data(
+            cast(str, fetched.content),
+            window_start=window_start,
+            window_end=window_end,
+        )
     except ValueError as e:
         feed.last_error = f"Failed to parse ICS content: {e}"
+        feed.refresh_started_at = None
         db.session.commit()
         logger.warning(f"Failed to parse ICS from {feed.url}: {e}")
         return False
 
-    sync_feed_events(feed, events)
+    sync_feed_events(feed, events, window_start, window_end)
+    feed.etag = fetched.etag
+    feed.last_modified = fetched.last_modified
+    feed.content_hash = content_hash
     feed.last_fetched = datetime.now(timezone.utc)
     feed.last_error = None
+    feed.refresh_started_at = None
     db.session.commit()
 
     logger.info(f"Refreshed ICS feed {feed.url}: {len(events)} events")
+    # Cache the calendar before displays are told to fetch it again
+    _warm_after_refresh(feed)
+    broadcast_skedda_update(feed)
     return True
 
 
-def sync_feed_events(feed: ICalFeed, events: list[dict[str, Any]]) -> None:
+def _warm_after_refresh(feed: ICalFeed) -> None:
+    """Cache today's calendar of a refreshed feed, logging any failure."""
+    try:
+        warm_skedda_calendar(feed)
+    except Exception:
+        logger.exception(f"Error caching calendar of ICS feed {feed.id}")
+
+
+def claim_feed_refresh(feed_id: int) -> bool:
+    """Claim a feed for refreshing.
+
+    The claim is a conditional update of the feed's refresh_started_at, so
+    it also excludes refreshes by other processes. refresh_feed() releases
+    it; a claim older than REFRESH_LEASE_SECONDS is taken over.
+
+    Args:
+        feed_id: ID of the feed to claim
+
+    Returns:
+        True if the feed was claimed, False if it is being refreshed
+    """
+    now = _utcnow()
+    result = db.session.execute(
+        update(ICalFeed)
+        .where(
+            ICalFeed.id == feed_id,
+            or_(
+                ICalFeed.refresh_started_at.is_(None),
+                ICalFeed.refresh_started_at
+                < now - timedelta(seconds=REFRESH_LEASE_SECONDS),
+            ),
+        )
+        .values(refresh_started_at=now)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return bool(result.rowcount == 1)
+
+
+def _release_feed_claim(feed_id: int) -> None:
+    """Release a feed's refresh claim without refreshing it."""
+    db.session.execute(
+        update(ICalFeed)
+        .where(ICalFeed.id == feed_id)
+        .values(refresh_started_at=None)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+
+def refresh_feed_single_flight(feed_id: int) -> Optional[bool]:
+    """Refresh a feed unless another thread or process is refreshing it.
+
+    Args:
+        feed_id: ID of the feed to refresh
+
+    Returns:
+        The result of refresh_feed(), or None if the feed was not refreshed
+        because it is already being refreshed or no longer exists
+    """
+    if not claim_feed_refresh(feed_id):
+        logger.debug(f"ICS feed {feed_id} is already being refreshed")
+        return None
+
+    feed = db.session.get(ICalFeed, feed_id)
+    if feed is None:
+        return None
+    try:
+        return refresh_feed(feed)
+    except Exception:
+        db.session.rollback()
+        _release_feed_claim(feed_id)
+        raise
+
+
+def broadcast_skedda_update(feed: ICalFeed) -> int:
+    """Push a ``skedda.updated`` event for a refreshed feed.
+
+    The event goes to admin connections and to the displays whose assigned
+    slideshow has an active Skedda item showing the feed.
+
+    Args:
+        feed: Refreshed ICalFeed instance
+
+    Returns:
+        Number of connections that received the event
+    """
+    items = SlideshowItem.query.filter_by(
+        ical_feed_id=feed.id, content_type="skedda", is_active=True
+    ).all()
+    event = create_skedda_event(
+        "updated",
+        feed.id,
+        {
+            "slideshow_item_ids": [item.id for item in items],
+            "last_updated": (
+                feed.last_fetched.replace(tzinfo=timezone.utc).isoformat()
+                if feed.last_fetched
+                else None
+            ),
+        },
+    )
+    count = sse_manager.broadcast_event(event, connection_type="admin")
+
+    slideshow_ids = {item.slideshow_id for item in items}
+    if not slideshow_ids:
+        return count
+    display_ids = set(
+        db.session.execute(
+            select(Display.id).where(Display.current_slideshow_id.in_(slideshow_ids))
+        )
+        .scalars()
+        .all()
+    )
+    with sse_manager.connections_lock:
+        for conn in sse_manager.connections.values():
+            if getattr(conn, "display_id", None) in display_ids:
+                conn.add_event(event)
+                count += 1
+    return count
+
+
+def _run_in_app_context(app: Flask, feed_id: int) -> None:
+    """Refresh a feed on a refresh worker thread."""
+    try:
+        with app.app_context():
+            refresh_feed_single_flight(feed_id)
+    finally:
+        with _queued_feeds_lock:
+            _queued_feeds.discard(feed_id)
+
+
+def schedule_feed_refresh(feed_id: int) -> bool:
+    """Queue a feed refresh on the background refresh workers.
+
+    A feed already queued or being refreshed by this process is not queued
+    again.
+
+    Args:
+        feed_id: ID of the feed to refresh
+
+    Returns:
+        True if the feed is queued, False if the pool is disabled or full
+    """
+    app = current_app._get_current_object()  # type: ignore[attr-defined]
+    # The pool is shared by every app in the process; each app's own setting
+    # decides whether it refreshes in the background
+    if int(app.config.get("ICAL_REFRESH_WORKERS", 2)) <= 0:
+        return False
+
+    with _queued_feeds_lock:
+        if feed_id in _queued_feeds:
+            return True
+        _queued_feeds.add(feed_id)
+    if refresh_pool.submit(_run_in_app_context, app, feed_id):
+        return True
+    with _queued_feeds_lock:
+        _queued_feeds.discard(feed_id)
+    return False
+
+
+def get_due_feeds(ahead_seconds: float = 0) -> list[int]:
+    """Get the feeds due for a refresh.
+
+    Only feeds shown by an active Skedda item are refreshed. A feed's
+    refresh interval is the shortest of its items' intervals.
+
+    Args:
+        ahead_seconds: Treat feeds as due this long before their refresh
+            interval ends
+
+    Returns:
+        IDs of feeds never fetched or whose refresh interval ends within
+        ahead_seconds
+    """
+    rows = db.session.execute(
+        select(
+            ICalFeed.id,
+            ICalFeed.last_fetched,
+            func.min(SlideshowItem.ical_refresh_minutes),
+        )
+        .join(SlideshowItem, SlideshowItem.ical_feed_id == ICalFeed.id)
+        .where(
+            SlideshowItem.content_type == "skedda",
+            SlideshowItem.is_active.is_(True),
+        )
+        .group_by(ICalFeed.id, ICalFeed.last_fetched)
+        .order_by(ICalFeed.last_fetched)
+    ).all()
+
+    now = _utcnow()
+    due = []
+    for feed_id, last_fetched, refresh_minutes in rows:
+        if last_fetched is not None:
+            if last_fetched.tzinfo is not None:
+                last_fetched = last_fetched.astimezone(timezone.utc)
+                last_fetched = last_fetched.replace(tzinfo=None)
+            expires = last_fetched + timedelta(
+                minutes=refresh_minutes or DEFAULT_REFRESH_MINUTES
+            )
+            if expires - timedelta(seconds=ahead_seconds) > now:
+                continue
+        due.append(feed_id)
+    return due
+
+
+def refresh_due_feeds() -> int:
+    """Refresh the feeds whose refresh interval is about to end.
+
+    Feeds are refreshed on the background refresh workers, or in the
+    calling thread if they are disabled or full.
+
+    Returns:
+        Number of feeds queued or refreshed
+    """
+    ahead = float(current_app.config.get("ICAL_REFRESH_AHEAD_SECONDS", 60))
+    count = 0
+    for feed_id in get_due_feeds(ahead):
+        if schedule_feed_refresh(feed_id):
+            count += 1
+            continue
+        try:
+            if refresh_feed_single_flight(feed_id) is not None:
+                count += 1
+        except Exception:
+            logger.exception(f"Error refreshing ICS feed {feed_id}")
+    return count
+
+
+def prune_ical_events(
+    retention_days: Optional[float] = None, batch_size: Optional[int] = None
+) -> int:
+    """Delete iCal events that ended more than a retention period ago.
+
+    Feeds are pruned one at a time in batches of ``batch_size`` events, each
+    deleted and committed in its own short transaction and found through
+    the (feed_id, start_time) index, so writers are never blocked for long.
+    Each batch increments the feed's events_revision, so cached calendars
+    showing the deleted events are rebuilt. Only one process prunes at a
+    time, holding the "ical_event_prune" job lease (see leases).
+
+    Args:
+        retention_days: Days of past events to keep (defaults to
+            ICAL_EVENT_RETENTION_DAYS; 0 or less keeps every event)
+        batch_size: Events deleted per transaction (defaults to
+            ICAL_EVENT_PRUNE_BATCH_SIZE)
+
+    Returns:
+        Number of events deleted (0 if another process is pruning)
+    """
+    if retention_days is None:
+        retention_days = float(current_app.config.get("ICAL_EVENT_RETENTION_DAYS", 30))
+    if batch_size is None:
+        batch_size = int(current_app.config.get("ICAL_EVENT_PRUNE_BATCH_SIZE", 500))
+    if retention_days <= 0:
+        return 0
+
+    token = claim_lease(PRUNE_LEASE, PRUNE_LEASE_SECONDS)
+    if token is None:
+        logger.info("iCal event pruning is running in another process")
+        return 0
+    try:
+        return _prune_events(token, retention_days, batch_size)
+    finally:
+        release_lease(PRUNE_LEASE, token)
+
+
+def _prune_events(token: str, retention_days: float, batch_size: int) -> int:
+    """Prune past iCal events while holding the pruning lease.
+
+    Args:
+        token: Claim of the pruning lease
+        retention_days: Days of past events to keep
+        batch_size: Events deleted per transaction
+
+    Returns:
+        Number of events deleted
+    """
+    # Stored times are naive UTC
+    cutoff = (_utcnow() - timedelta(days=retention_days)).replace(tzinfo=None)
+    started = time_module.monotonic()
+    deleted = 0
+    try:
+        feed_ids = db.session.execute(select(ICalFeed.id)).scalars().all()
+        for feed_id in feed_ids:
+            while True:
+                # An event ending before the cutoff also starts before it
+                ids = (
+                    db.session.execute(
+                        select(ICalEvent.id)
+                        .where(
+                            ICalEvent.feed_id == feed_id,
+                            ICalEvent.start_time < cutoff,
+                            ICalEvent.end_time < cutoff,
+                        )
+                        .limit(batch_size)
+                    )
+                    .scalars()
+                    .all()
+                )
+                if not ids:
+                    break
+                db.session.execute(
+                    delete(ICalEventResource).where(ICalEventResource.event_id.in_(ids))
+                )
+                db.session.execute(delete(ICalEvent).where(ICalEvent.id.in_(ids)))
+                db.session.execute(
+                    update(ICalFeed)
+                    .where(ICalFeed.id == feed_id)
+                    .values(events_revision=ICalFeed.events_revision + 1)
+                )
+                db.session.commit()
+                deleted += len(ids)
+                if not renew_lease(PRUNE_LEASE, token, PRUNE_LEASE_SECONDS):
+                    logger.warning(
+                        "iCal event pruning was taken over by another process"
+                    )
+                    record_ical_event_prune(
+                        deleted, time_module.monotonic() - started, True
+                    )
+                    return deleted
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Failed to prune iCal events: {e}")
+        record_ical_event_prune(deleted, time_module.monotonic() - started, False)
+        return deleted
+
+    record_ical_event_prune(deleted, time_module.monotonic() - started, True)
+    if deleted:
+        logger.info(f"Pruned {deleted} iCal events that ended before {cutoff}")
+    return deleted
+
+
+def init_ical_refresh(app: Flask) -> None:
+    """Set up the refresh pool and calendar cache, and schedule feed jobs.
+
+    Feeds are refreshed in the background and their past events pruned.
+
+    Args:
+        app: Flask application instance
+    """
+    from .scheduler import get_scheduler
+
+    refresh_pool.configure(
+        max_workers=int(app.config.get("ICAL_REFRESH_WORKERS", 2)),
+        max_queue=REFRESH_QUEUE_SIZE,
+    )
+    app.extensions["skedda_calendar_cache"] = SkeddaCalendarCache(
+        int(app.config.get("ICAL_CALENDAR_CACHE_SIZE", 256))
+    )
+
+    scheduler = get_scheduler(app)
+    if scheduler is not None:
+        scheduler.add_job(
+            "ical_feed_refresh",
+            float(app.config.get("ICAL_REFRESH_CHECK_INTERVAL", 60)),
+            refresh_due_feeds,
+        )
+        scheduler.add_job(
+            "ical_event_prune",
+            float(app.config.get("ICAL_EVENT_PRUNE_INTERVAL", 3600)),
+            prune_ical_events,
+        )
+
+
+def _event_row(feed_id: int, event_data: dict[str, Any]) -> dict[str, Any]:
+    """Build the ical_events column values for a parsed event.
+
+    Times are stored as naive UTC datetimes, so that they compare equal to
+    the values read back from the database.
+    """
+    row = {"feed_id": feed_id, "uid": event_data["uid"]}
+    for name in EVENT_FIELDS:
+        value = event_data[name]
+        if isinstance(value, datetime) and value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        row[name] = value
+    return row
+
+
+def _upsert_event_rows(
+    new_rows: list[dict[str, Any]], changed_rows: list[dict[str, Any]]
+) -> None:
+    """Write new and changed event rows for a feed.
+
+    On SQLite, PostgreSQL and MySQL/MariaDB both are written by a single
+    INSERT ... ON CONFLICT / ON DUPLICATE KEY UPDATE statement on the
+    (feed_id, uid) unique constraint, which also covers a row inserted by
+    another writer since the feed's events were read. Other databases get
+    a bulk INSERT and a bulk UPDATE by primary key.
+
+    Args:
+        new_rows: Column values of events not yet stored
+        changed_rows: Column values, including ``id``, of stored events
+            whose fields changed
+    """
+    now = _utcnow()
+    rows = [
+        {**row, "created_at": now, "updated_at": now} for row in new_rows + changed_rows
+    ]
+    for row in rows:
+        row.pop("id", None)
+    table = cast(Any, ICalEvent.__table__)
+    dialect = db.session.get_bind().dialect.name
+    updated = EVENT_FIELDS + ("updated_at",)
+
+    if dialect in ("sqlite", "postgresql"):
+        insert_stmt = (
+            sqlite_insert(table) if dialect == "sqlite" else postgresql_insert(table)
+        )
+        db.session.execute(
+            insert_stmt.on_conflict_do_update(
+                index_elements=["feed_id", "uid"],
+                set_={name: insert_stmt.excluded[name] for name in updated},
+            ),
+            rows,
+        )
+    elif dialect in ("mysql", "mariadb"):
+        mysql_stmt = mysql_insert(table)
+        db.session.execute(
+            mysql_stmt.on_duplicate_key_update(
+                {name: mysql_stmt.inserted[name] for name in updated}
+            ),
+            rows,
+        )
+    else:
+        if new_rows:
+            db.session.execute(insert(table), rows[: len(new_rows)])
+        if changed_rows:
+            db.session.execute(
+                update(ICalEvent).execution_options(synchronize_session=False),
+                [{**row, "updated_at": now} for row in changed_rows],
+            )
+
+
+def _delete_in_batches(model: Any, column: Any, ids: list[int]) -> None:
+    """Delete the rows of a model whose column value is one of the IDs."""
+    for start in range(0, len(ids), SYNC_BATCH_SIZE):
+        db.session.execute(
+            delete(model)
+            .where(column.in_(ids[start : start + SYNC_BATCH_SIZE]))
+            .execution_options(synchronize_session=False)
+        )
+
+
+def sync_feed_events(
+    feed: ICalFeed,
+    events: list[dict[str, Any]],
+    window_start: Optional[datetime] = None,
+    window_end: Optional[datetime] = None,
+) -> None:
     """Synchronize parsed events with the database.
 
     This performs an upsert operation: existing events are updated,
     new events are created, and events no longer in the feed are deleted.
+    The feed's stored events and their resources are read in two queries
+    and compared with the parsed events, and only the differences are
+    written, with one statement per kind of change rather than one per
+    event. The feed's events_revision is incremented when anything is
+    written.
+
+    Stored events outside the window the events were parsed for are kept,
+    as the feed was not read for them; past events are left to the
+    retention pruning (see prune_ical_events()).
 
     Args:
         feed: ICalFeed instance
         events: List of parsed event dictionaries from parse_ics_data()
+        window_start: Start of the window passed to parse_ics_data()
+        window_end: End of the window passed to parse_ics_data()
     """
-    # Build a set of UIDs from the new events
-    new_uids = {e["uid"] for e in events}
-
-    # Delete events that are no longer in the feed
-    ICalEvent.query.filter(
-        and_(ICalEvent.feed_id == feed.id, ~ICalEvent.uid.in_(new_uids))
-    ).delete(synchronize_session=False)
-
-    # Upsert each event
-    for event_data in events:
-        existing = ICalEvent.query.filter_by(
-            feed_id=feed.id, uid=event_data["uid"]
-        ).first()
-
-        if existing:
-            # Update existing event
-            existing.summary = event_data["summary"]
-            existing.description = event_data["description"]
-            existing.start_time = event_data["start_time"]
-            existing.end_time = event_data["end_time"]
-            existing.resources = json.dumps(event_data["resources"])
-            existing.attendee_name = event_data["attendee_name"]
-            existing.attendee_email = event_data["attendee_email"]
-        else:
-            # Create new event
-            new_event = ICalEvent(
-                feed_id=feed.id,
-                uid=event_data["uid"],
-                summary=event_data["summary"],
-                description=event_data["description"],
-                start_time=event_data["start_time"],
-                end_time=event_data["end_time"],
-                resources=json.dumps(event_data["resources"]),
-                attendee_name=event_data["attendee_name"],
-                attendee_email=event_data["attendee_email"],
+    # Later events with a repeated UID replace earlier ones
+    parsed = {e["uid"]: e for e in events}
+
+    columns = [getattr(ICalEvent, name) for name in EVENT_FIELDS]
+    existing = {
+        row["uid"]: row
+        for row in db.session.execute(
+            select(ICalEvent.id, ICalEvent.uid, *columns).where(
+                ICalEvent.feed_id == feed.id
+            )
+        ).mappings()
+    }
+    stored_resources: dict[int, set[str]] = {}
+    for event_id, name in db.session.execute(
+        select(ICalEventResource.event_id, ICalEventResource.name)
+        .join(ICalEvent, ICalEvent.id == ICalEventResource.event_id)
+        .where(ICalEvent.feed_id == feed.id)
+    ):
+        stored_resources.setdefault(event_id, set()).add(name)
+
+    new_rows = []
+    changed_rows = []
+    # UIDs of events whose resources are written
+    resources_changed = []
+    for uid, event_data in parsed.items():
+        row = _event_row(feed.id, event_data)
+        resources = set(event_data["resources"])
+        stored = existing.get(uid)
+        if stored is None:
+            new_rows.append(row)
+            if resources:
+                resources_changed.append(uid)
+            continue
+        if resources != stored_resources.get(stored["id"], set()):
+            resources_changed.append(uid)
+            changed_rows.append({**row, "id": stored["id"]})
+        elif any(stored[name] != row[name] for name in EVENT_FIELDS):
+            changed_rows.append({**row, "id": stored["id"]})
+
+    # Delete events in the window that are no longer in the feed, and the
+    # resources of those and of events whose resources changed. Stored times
+    # are naive UTC.
+    start = window_start.replace(tzinfo=None) if window_start else None
+    end = window_end.replace(tzinfo=None) if window_end else None
+    stale_ids = [
+        row["id"]
+        for uid, row in existing.items()
+        if uid not in parsed
+        and (start is None or row["end_time"] > start)
+        and (end is None or row["start_time"] < end)
+    ]
+    cleared_ids = [
+        event_id
+        for event_id in stale_ids
+        + [existing[uid]["id"] for uid in resources_changed if uid in existing]
+        if event_id in stored_resources
+    ]
+    _delete_in_batches(ICalEventResource, ICalEventResource.event_id, cleared_ids)
+    _delete_in_batches(ICalEvent, ICalEvent.id, stale_ids)
+
+    if new_rows or changed_rows:
+        _upsert_event_rows(new_rows, changed_rows)
+
+    if resources_changed:
+        event_ids = {uid: row["id"] for uid, row in existing.items()}
+        if new_rows:
+            event_ids.update(
+                db.session.execute(
+                    select(ICalEvent.uid, ICalEvent.id).where(
+                        ICalEvent.feed_id == feed.id
+                    )
+                ).all()
             )
-            db.session.add(new_event)
+        db.session.execute(
+            insert(ICalEventResource),
+            [
+                {"event_id": event_ids[uid], "name": name}
+                for uid in resources_changed
+                for name in sorted(set(parsed[uid]["resources"]))
+            ],
+        )
+
+    if new_rows or changed_rows or stale_ids or resources_changed:
+        feed.events_revision = ICalFeed.events_revision + 1
+
+    logger.debug(
+        f"Synced ICS feed {feed.id}: {len(new_rows)} added, "
+        f"{len(changed_rows)} updated, {len(stale_ids)} deleted"
+    )
 
 
 def get_events_for_date(
@@ -249,6 +1107,7 @@ def get_events_for_date(
                 ICalEvent.end_time > day_start,
             )
         )
+        .options(selectinload(ICalEvent.resource_entries))
         .order_by(ICalEvent.start_time)
         .all()
     )
@@ -265,20 +1124,67 @@ def get_all_feed_spaces(feed: ICalFeed) -> list[str]:
     Returns:
         Sorted list of unique space/resource names
     """
-    events = ICalEvent.query.filter(
-        ICalEvent.feed_id == feed.id,
-        ICalEvent.resources.isnot(None),
-    ).all()
+    return list(
+        db.session.scalars(
+            select(ICalEventResource.name)
+            .join(ICalEvent, ICalEvent.id == ICalEventResource.event_id)
+            .where(ICalEvent.feed_id == feed.id)
+            .distinct()
+            .order_by(ICalEventResource.name)
+        )
+    )
 
-    spaces_set: set[str] = set()
-    for event in events:
-        try:
-            resources = json.loads(event.resources) if event.resources else []
-            spaces_set.update(resources)
-        except (json.JSONDecodeError, TypeError):
-            pass
 
-    return sorted(spaces_set)
+def get_skedda_calendar(
+    slide: SlideshowItem, target_date: Optional[date] = None
+) -> tuple[dict[str, Any], str]:
+    """Get formatted Skedda calendar data for a slideshow item, with its ETag.
+
+    The calendar is served from the per-process calendar cache when it was
+    already formatted for the feed's current revision; see
+    get_skedda_calendar_data() for its format. Its ``last_updated`` time is
+    added to a copy of the cached calendar and is not covered by the ETag,
+    which only changes with the stored events.
+
+    Args:
+        slide: SlideshowItem with content_type='skedda'
+        target_date: Date to display (defaults to today in local timezone)
+
+    Returns:
+        Tuple of (calendar data, ETag); nested values of the data are
+        shared with other callers and must not be modified
+
+    Raises:
+        ValueError: If slide is not a skedda type or has no feed
+    """
+    if slide.content_type != "skedda":
+        raise ValueError(f"Slide {slide.id} is not a skedda type")
+
+    if not slide.ical_feed_id or not slide.ical_feed:
+        raise ValueError(f"Slide {slide.id} has no iCal feed configured")
+
+    feed = slide.ical_feed
+    refresh_minutes = slide.ical_refresh_minutes or DEFAULT_REFRESH_MINUTES
+
+    # Serve the stored snapshot; the scheduler normally refreshes feeds
+    # before they go stale, so this only catches feeds it has not reached
+    if needs_refresh(feed, refresh_minutes):
+        schedule_feed_refresh(feed.id)
+
+    local_tz = _get_local_tz()
+
+    # Use today in local timezone if no date specified
+    if target_date is None:
+        target_date = datetime.now(local_tz).date()
+
+    day = target_date
+    layout = DayLayout.for_item(slide)
+    data, etag = _get_skedda_cache().get_or_build(
+        (feed.id, day, layout),
+        feed_revision(feed),
+        lambda: format_skedda_calendar(feed, day, local_tz, layout),
+    )
+    return {**data, "last_updated": _feed_last_updated(feed)}, etag
 
 
 def get_skedda_calendar_data(
@@ -287,7 +1193,12 @@ def get_skedda_calendar_data(
     """Get formatted Skedda calendar data for a slideshow item.
 
     This is the main function for the frontend to retrieve calendar data.
-    It handles cache refresh and formats the data for display.
+    It formats the events last stored for the feed; a stale feed is queued
+    for a background refresh, which is announced by a ``skedda.updated``
+    SSE event, but never fetched while the caller waits.
+
+    The day is laid out on the item's time grid (see skedda_layout), and
+    overlapping bookings of a space are given side-by-side lanes.
 
     Args:
         slide: SlideshowItem with content_type='skedda'
@@ -299,6 +1210,7 @@ def get_skedda_calendar_data(
             "date": "2026-01-28",
             "date_display": "Wednesday, January 28, 2026",
             "spaces": ["CNC Milling Machine", "Laser Cutter", ...],
+            "slot_minutes": 30,
             "time_slots": [
                 {"time": "07:00", "display": "7:00 AM"},
                 ...
@@ -312,7 +1224,9 @@ def get_skedda_calendar_data(
                     "start_time": "12:00",
                     "end_time": "14:00",
                     "start_slot": 10,
-                    "row_span": 4
+                    "row_span": 4,
+                    "lane": 0,
+                    "lane_count": 1
                 },
                 ...
             ],
@@ -322,25 +1236,27 @@ def get_skedda_calendar_data(
     Raises:
         ValueError: If slide is not a skedda type or has no feed
     """
-    if slide.content_type != "skedda":
-        raise ValueError(f"Slide {slide.id} is not a skedda type")
+    return get_skedda_calendar(slide, target_date)[0]
 
-    if not slide.ical_feed_id or not slide.ical_feed:
-        raise ValueError(f"Slide {slide.id} has no iCal feed configured")
 
-    feed = slide.ical_feed
-    refresh_minutes = slide.ical_refresh_minutes or DEFAULT_REFRESH_MINUTES
-
-    # Refresh if needed
-    refresh_feed_if_needed(feed, refresh_minutes)
-
-    # Determine local timezone for display
-    local_tz = _get_local_tz()
+def format_skedda_calendar(
+    feed: ICalFeed,
+    target_date: date,
+    local_tz: tzinfo,
+    layout: DayLayout = DEFAULT_LAYOUT,
+) -> dict[str, Any]:
+    """Format a feed's stored events for one day of a Skedda calendar.
 
-    # Use today in local timezone if no date specified
-    if target_date is None:
-        target_date = datetime.now(local_tz).date()
+    Args:
+        feed: ICalFeed instance
+        target_date: Local date to display
+        local_tz: Timezone events are displayed in
+        layout: Time grid of the calendar
 
+    Returns:
+        Calendar data as described in get_skedda_calendar_data(), without
+        ``last_updated``
+    """
     # Get events for the date using local timezone boundaries
     events = get_events_for_date(feed, target_date, tz=local_tz)
 
@@ -348,79 +1264,132 @@ def get_skedda_calendar_data(
     # so that columns appear even for spaces with no bookings today
     spaces: list[str] = get_all_feed_spaces(feed)
 
-    # Generate time slots (30-minute intervals, 7 AM to 11 PM)
-    time_slots = []
-    for hour in range(7, 23):  # 7 AM to 10:30 PM
-        for minute in [0, 30]:
-            slot_time = time(hour, minute)
-            time_slots.append(
-                {
-                    "time": slot_time.strftime("%H:%M"),
-                    "display": slot_time.strftime("%-I:%M %p"),
-                }
-            )
-
-    # Format events for display
-    formatted_events = []
-    for event in events:
-        try:
-            resources = json.loads(event.resources) if event.resources else []
-        except (json.JSONDecodeError, TypeError) as e:
-            logger.warning(
-                "Invalid resources JSON for event %s (uid=%s): %s",
-                event.id,
-                event.uid,
-                e,
-            )
-            resources = []
-
-        # Parse Skedda summary for display info
-        person_name, description, _ = parse_skedda_summary(event.summary)
-
-        # If no person name from summary, use attendee name
-        if not person_name and event.attendee_name:
-            person_name = event.attendee_name
-
-        # Convert event times from UTC to local timezone for display
-        local_start = event.start_time.replace(tzinfo=timezone.utc).astimezone(local_tz)
-        local_end = event.end_time.replace(tzinfo=timezone.utc).astimezone(local_tz)
-
-        # Calculate slot positions using local times
-        start_slot = _time_to_slot_index(local_start)
-        end_slot = _time_to_slot_index(local_end)
-        row_span = max(1, end_slot - start_slot)
-
-        # Create an event entry for each space
-        for space in resources:
-            if space in spaces:
-                formatted_events.append(
-                    {
-                        "id": event.id,
-                        "uid": event.uid,
-                        "space": space,
-                        "person_name": person_name or "",
-                        "description": description or event.summary,
-                        "start_time": local_start.strftime("%H:%M"),
-                        "end_time": local_end.strftime("%H:%M"),
-                        "start_slot": start_slot,
-                        "row_span": row_span,
-                    }
-                )
-
     return {
         "date": target_date.isoformat(),
         "date_display": target_date.strftime("%A, %B %d, %Y"),
         "spaces": spaces,
-        "time_slots": time_slots,
-        "events": formatted_events,
-        "last_updated": (
-            feed.last_fetched.replace(tzinfo=timezone.utc).isoformat()
-            if feed.last_fetched
-            else None
+        "slot_minutes": layout.slot_minutes,
+        "time_slots": time_slot_table(layout),
+        "events": layout_day(
+            events, spaces, target_date, layout, local_tz, _describe_event
         ),
     }
 
 
+def _feed_last_updated(feed: ICalFeed) -> Optional[str]:
+    """Get the time of a feed's last successful fetch as ISO 8601 UTC."""
+    if feed.last_fetched is None:
+        return None
+    return feed.last_fetched.replace(tzinfo=timezone.utc).isoformat()
+
+
+def _describe_event(event: ICalEvent) -> tuple[str, str]:
+    """Get the person name and description shown for a Skedda booking.
+
+    Args:
+        event: ICalEvent instance
+
+    Returns:
+        Tuple of (person name, description); the person name is empty for
+        bookings without one, such as recurring ones
+    """
+    person_name, description, _ = parse_skedda_summary(event.summary)
+
+    # If no person name from summary, use attendee name
+    if not person_name and event.attendee_name:
+        person_name = event.attendee_name
+
+    return person_name or "", description or event.summary
+
+
+def feed_revision(feed: ICalFeed) -> str:
+    """Get the revision of a feed's stored events.
+
+    The feed's events_revision is only incremented when a sync or the
+    pruning writes events, so refreshes answered with 304 Not Modified or
+    unchanged content keep the revision.
+
+    Args:
+        feed: ICalFeed instance
+
+    Returns:
+        Revision string, the same in every process
+    """
+    return str(feed.events_revision or 0)
+
+
+def skedda_calendar_etag(key: CalendarKey, revision: str) -> str:
+    """Get the ETag of a formatted Skedda calendar.
+
+    The ETag is derived from the cache key rather than the calendar data,
+    so all processes agree on it without formatting the calendar.
+
+    Args:
+        key: (feed ID, local date, day layout) of the calendar
+        revision: Revision of the feed
+
+    Returns:
+        ETag value (without quotes)
+    """
+    feed_id, target_date, layout = key
+    value = (
+        f"{feed_id}:{target_date.isoformat()}:{layout.start_hour}:"
+        f"{layout.end_hour}:{layout.slot_minutes}:{revision}"
+    )
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:32]
+
+
+def _get_skedda_cache() -> SkeddaCalendarCache:
+    """Get the Skedda calendar cache for the current application."""
+    cache = current_app.extensions.get("skedda_calendar_cache")
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            "skedda_calendar_cache",
+            SkeddaCalendarCache(
+                int(current_app.config.get("ICAL_CALENDAR_CACHE_SIZE", 256))
+            ),
+        )
+    return cache
+
+
+def warm_skedda_calendar(feed: ICalFeed) -> None:
+    """Format and cache today's calendar of a freshly refreshed feed.
+
+    A calendar is cached for each day layout of the active Skedda items
+    showing the feed.
+
+    Args:
+        feed: ICalFeed instance
+    """
+    cache = _get_skedda_cache()
+    if cache.max_entries <= 0:
+        return
+    settings = db.session.execute(
+        select(
+            SlideshowItem.ical_day_start_hour,
+            SlideshowItem.ical_day_end_hour,
+            SlideshowItem.ical_slot_minutes,
+        )
+        .where(
+            SlideshowItem.ical_feed_id == feed.id,
+            SlideshowItem.content_type == "skedda",
+            SlideshowItem.is_active.is_(True),
+        )
+        .distinct()
+    ).all()
+    layouts = {DayLayout.from_settings(*row) for row in settings}
+
+    local_tz = _get_local_tz()
+    today = datetime.now(local_tz).date()
+    revision = feed_revision(feed)
+    for layout in layouts:
+        cache.get_or_build(
+            (feed.id, today, layout),
+            revision,
+            partial(format_skedda_calendar, feed, today, local_tz, layout),
+        )
+
+
 def _get_local_tz() -> tzinfo:
     """Get the system local timezone.
 
@@ -436,64 +1405,247 @@ def _get_local_tz() -> tzinfo:
     return local
 
 
-def _time_to_slot_index(dt: datetime) -> int:
-    """Convert a datetime to a slot index (30-minute intervals starting at 7 AM).
+def _fetch_with_limits(
+    url: str,
+    etag: Optional[str],
+    last_modified: Optional[str],
+    host_limit: threading.Semaphore,
+    deadline: float,
+) -> Optional[ICSFetchResult]:
+    """Fetch a feed on a fetch thread, within its host's connection limit.
 
     Args:
-        dt: Datetime to convert
+        url: URL of the ICS feed
+        etag: ETag from the feed's last fetch
+        last_modified: Last-Modified from the feed's last fetch
+        host_limit: Semaphore limiting concurrent fetches from the URL's host
+        deadline: Monotonic clock time by which fetches must finish
 
     Returns:
-        Slot index (0 = 7:00 AM, 1 = 7:30 AM, etc.)
-    """
-    # Extract hour and minute
-    hour = dt.hour
-    minute = dt.minute
+        Fetch result, or None if fetch failed
 
-    # Calculate slot index (7 AM = slot 0)
-    if hour < 7:
-        return 0
-    if hour >= 23:
-        return 32  # 10:30 PM is the last slot
+    Raises:
+        TimeoutError: If the deadline passed before the fetch could start
+    """
+    with host_limit:
+        remaining = deadline - time_module.monotonic()
+        if remaining <= 0:
+            raise TimeoutError("Refresh deadline passed before the feed was fetched")
+        return fetch_ics(
+            url,
+            etag=etag,
+            last_modified=last_modified,
+            timeout=min(DEFAULT_FETCH_TIMEOUT, remaining),
+        )
 
-    slot = (hour - 7) * 2
-    if minute >= 30:
-        slot += 1
 
-    return slot
+def refresh_all_feeds(
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> dict[str, Any]:
+    """Refresh all ICS feeds in the database.
 
+    Feeds are fetched on up to ICAL_FETCH_CONCURRENCY threads, with at most
+    ICAL_FETCH_PER_HOST fetches from the same host at once. Each fetched
+    feed is parsed and stored on the calling thread as soon as it arrives.
+    Feeds not fetched within ICAL_REFRESH_ALL_DEADLINE seconds are reported
+    as errors, and feeds already being refreshed elsewhere are skipped.
 
-def refresh_all_feeds() -> dict[str, Any]:
-    """Refresh all ICS feeds in the database.
+    Args:
+        progress: Called with (feeds done, feed count) as each feed finishes
 
     Returns:
         Dictionary with refresh results:
         {
             "refreshed": 3,
+            "skipped": 0,
             "errors": [
                 {"feed_id": 2, "url": "...", "error": "..."},
                 ...
             ]
         }
     """
-    feeds = ICalFeed.query.all()
+    config = current_app.config
+    concurrency = max(1, int(config.get("ICAL_FETCH_CONCURRENCY", 8)))
+    per_host = max(1, int(config.get("ICAL_FETCH_PER_HOST", 2)))
+    deadline = time_module.monotonic() + float(
+        config.get("ICAL_REFRESH_ALL_DEADLINE", 120)
+    )
+
+    feeds = ICalFeed.query.order_by(ICalFeed.id).all()
+    claimed = [feed for feed in feeds if claim_feed_refresh(feed.id)]
     refreshed = 0
-    errors = []
+    errors: list[dict[str, Any]] = []
+    done = len(feeds) - len(claimed)
+    if progress is not None and done:
+        progress(done, len(feeds))
+
+    host_limits: dict[str, threading.Semaphore] = {}
+    executor = ThreadPoolExecutor(
+        max_workers=min(concurrency, len(claimed)) or 1,
+        thread_name_prefix="ical-fetch",
+    )
+    futures = {}
+    for feed in claimed:
+        host = urlsplit(feed.url).netloc.lower()
+        host_limit = host_limits.setdefault(host, threading.Semaphore(per_host))
+        etag, last_modified = _feed_validators(feed)
+        future = executor.submit(
+            _fetch_with_limits,
+            feed.url,
+            etag,
+            last_modified,
+            host_limit,
+            deadline,
+        )
+        futures[future] = feed
 
-    for feed in feeds:
-        try:
-            if refresh_feed(feed):
-                refreshed += 1
-        except Exception as e:
-            logger.exception(f"Error refreshing feed {feed.id}")
-            errors.append(
-                {
-                    "feed_id": feed.id,
-                    "url": feed.url,
-                    "error": str(e),
-                }
+    pending = set(futures)
+    try:
+        while pending:
+            finished, pending = wait(
+                pending,
+                timeout=max(0.0, deadline - time_module.monotonic()),
+                return_when=FIRST_COMPLETED,
             )
+            if not finished:
+                break
+            for future in finished:
+                feed = futures[future]
+                try:
+                    if apply_feed_content(feed, future.result()):
+                        refreshed += 1
+                    else:
+                        errors.append(
+                            {
+                                "feed_id": feed.id,
+                                "url": feed.url,
+                                "error": feed.last_error,
+                            }
+                        )
+                except Exception as e:
+                    logger.exception(f"Error refreshing feed {feed.id}")
+                    db.session.rollback()
+                    _release_feed_claim(feed.id)
+                    errors.append(
+                        {"feed_id": feed.id, "url": feed.url, "error": str(e)}
+                    )
+                done += 1
+                if progress is not None:
+                    progress(done, len(feeds))
+    finally:
+        # Fetches still running past the deadline are abandoned; their
+        # threads end when the fetch times out
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    for future in pending:
+        feed = futures[future]
+        logger.warning(f"Deadline passed before ICS feed {feed.id} was refreshed")
+        _release_feed_claim(feed.id)
+        errors.append(
+            {
+                "feed_id": feed.id,
+                "url": feed.url,
+                "error": "Refresh deadline exceeded",
+            }
+        )
+    if progress is not None and pending:
+        progress(len(feeds), len(feeds))
 
     return {
         "refreshed": refreshed,
+        "skipped": len(feeds) - len(claimed),
         "errors": errors,
     }
+
+
+def get_active_refresh_job() -> Optional[ICalRefreshJob]:
+    """Get the refresh-all job in progress, if any.
+
+    Returns:
+        The most recent queued or running job updated within
+        REFRESH_LEASE_SECONDS, or None
+    """
+    job = (
+        ICalRefreshJob.query.filter(ICalRefreshJob.status.in_(("queued", "running")))
+        .order_by(ICalRefreshJob.id.desc())
+        .first()
+    )
+    if job is None:
+        return None
+    updated_at = job.updated_at
+    if updated_at.tzinfo is not None:
+        updated_at = updated_at.astimezone(timezone.utc).replace(tzinfo=None)
+    if _utcnow() - updated_at > timedelta(seconds=REFRESH_LEASE_SECONDS):
+        return None
+    return cast(ICalRefreshJob, job)
+
+
+def run_refresh_job(job_id: int) -> None:
+    """Run a refresh-all job, recording its progress and results.
+
+    Args:
+        job_id: ID of the ICalRefreshJob to run
+    """
+    job = db.session.get(ICalRefreshJob, job_id)
+    if job is None:
+        return
+    job.status = "running"
+    db.session.commit()
+
+    def record_progress(done: int, total: int) -> None:
+        job.feeds_done = done
+        job.feed_count = total
+        db.session.commit()
+
+    try:
+        result = refresh_all_feeds(progress=record_progress)
+        job.feeds_refreshed = result["refreshed"]
+        job.feeds_skipped = result["skipped"]
+        job.errors = json.dumps(result["errors"])
+        job.status = "completed"
+        logger.info(
+            f"iCal refresh job {job_id} completed: {result['refreshed']} feeds "
+            f"refreshed, {result['skipped']} skipped, {len(result['errors'])} errors"
+        )
+    except Exception as e:
+        db.session.rollback()
+        logger.exception(f"iCal refresh job {job_id} failed")
+        job.status = "failed"
+        job.error = str(e)
+    job.completed_at = datetime.now(timezone.utc)
+    db.session.commit()
+
+
+def _run_job_in_app_context(app: Flask, job_id: int) -> None:
+    """Run a refresh-all job on the job thread."""
+    with app.app_context():
+        run_refresh_job(job_id)
+
+
+def start_refresh_job(user_id: Optional[int] = None) -> tuple[ICalRefreshJob, bool]:
+    """Start refreshing all feeds in the background.
+
+    With ICAL_REFRESH_WORKERS set to 0 the job runs before this returns.
+
+    Args:
+        user_id: ID of the user starting the refresh
+
+    Returns:
+        Tuple of (job, started): the new job, or the job already in progress
+        with started False
+    """
+    active = get_active_refresh_job()
+    if active is not None:
+        return active, False
+
+    job = ICalRefreshJob(
+        status="queued", feed_count=ICalFeed.query.count(), created_by_id=user_id
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()  # type: ignore[attr-defined]
+    background = int(app.config.get("ICAL_REFRESH_WORKERS", 2)) > 0
+    if not (background and job_pool.submit(_run_job_in_app_context, app, job.id)):
+        run_refresh_job(job.id)
+    return job, True
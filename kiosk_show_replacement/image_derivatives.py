@@ -0,0 +1,362 @@
+"""
+Resized image variants for kiosk displays.
+
+Uploaded photos are often far larger than the displays showing them (a
+6000px, 20MB camera JPEG on a 1920x1080 kiosk). After an image is stored,
+a background worker generates resized and recompressed copies of it
+(MediaDerivative rows) fitted to each of the long-edge sizes in
+IMAGE_DERIVATIVE_SIZES that is smaller than the original, encoded as
+IMAGE_DERIVATIVE_FORMAT (WebP by default, or AVIF where Pillow supports
+it). When slides are sent to a display, SlideshowItem.to_dict() points
+display_url at the smallest variant that fills the display's resolution
+(see MediaBlob.best_derivative()); the original is used until derivatives
+exist or when no variant is large enough.
+
+Derivatives are stored under ``<UPLOAD_FOLDER>/media/derivatives/`` and
+deleted with their blob. With IMAGE_DERIVATIVE_WORKERS set to 0, or while
+the job queue is full, derivatives are generated in the calling thread.
+Under eventlet (gunicorn's eventlet workers) the resizing itself runs on
+eventlet's thread pool, so it never blocks the worker's other requests.
+"""
+
+import logging
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, List, Optional, TypeVar, cast
+
+from flask import Flask, current_app
+from PIL import Image, ImageOps, UnidentifiedImageError, features
+from sqlalchemy.exc import IntegrityError
+
+from .exceptions import StorageError
+from .file_catalog import record_file
+from .media_probe import MediaProbePool
+from .models import MediaBlob, MediaDerivative, db
+from .storage import StorageManager, get_storage_manager
+from .storage_resilience import AtomicFileWriter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Directory (under the media directory) holding derivatives
+DERIVATIVE_DIRECTORY = "derivatives"
+
+# Default long-edge sizes (pixels) matching common kiosk resolutions
+DEFAULT_DERIVATIVE_SIZES = (1280, 1920, 2560, 3840)
+
+# Pillow feature name for each supported output format
+SUPPORTED_FORMATS = {"webp": "webp", "avif": "avif"}
+
+# Global pool instance
+derivative_pool = MediaProbePool(
+    max_workers=1, max_queue=50, thread_name_prefix="image-derivative"
+)
+
+
+def get_derivative_sizes() -> List[int]:
+    """Get the configured long-edge sizes, smallest first.
+
+    Returns:
+        List of sizes in pixels (empty if derivatives are disabled)
+    """
+    sizes = current_app.config.get("IMAGE_DERIVATIVE_SIZES", DEFAULT_DERIVATIVE_SIZES)
+    if isinstance(sizes, str):
+        sizes = [s for s in sizes.replace(" ", "").split(",") if s]
+    return sorted({int(size) for size in sizes if int(size) > 0})
+
+
+def get_derivative_format() -> str:
+    """Get the configured output format, falling back to WebP if unsupported.
+
+    Returns:
+        Format name ('webp' or 'avif')
+    """
+    fmt = str(current_app.config.get("IMAGE_DERIVATIVE_FORMAT", "webp")).lower()
+    if fmt not in SUPPORTED_FORMATS or not features.check(SUPPORTED_FORMATS[fmt]):
+        if fmt != "webp":
+            logger.warning(
+                f"Image derivative format '{fmt}' is not supported by Pillow; "
+                f"using webp"
+            )
+        fmt = "webp"
+    return fmt
+
+
+def get_derivative_path(
+    storage: StorageManager, checksum: str, max_size: int, fmt: str
+) -> Path:
+    """Get the path for a derivative of a blob.
+
+    Args:
+        storage: Storage manager holding the blob
+        checksum: SHA-256 checksum of the original image
+        max_size: Long-edge size of the derivative
+        fmt: Output format
+
+    Returns:
+        Path object for the derivative file
+    """
+    return (
+        storage.base_path
+        / storage.MEDIA_DIRECTORY
+        / DERIVATIVE_DIRECTORY
+        / checksum[:2]
+        / f"{checksum}_{max_size}.{fmt}"
+    )
+
+
+def _prepare_mode(image: Image.Image) -> Image.Image:
+    """Convert an image to a mode the output encoders accept."""
+    if image.mode in ("RGB", "RGBA"):
+        return image
+    if image.mode in ("P", "LA", "PA") or "transparency" in image.info:
+        return image.convert("RGBA")
+    return image.convert("RGB")
+
+
+@dataclass
+class _Variant:
+    """A resized variant written by _render_variants()."""
+
+    max_size: int
+    width: int
+    height: int
+    path: Path
+    file_size: int
+
+
+def _render_variants(
+    storage: StorageManager,
+    source_path: Path,
+    checksum: str,
+    original_size: int,
+    sizes: List[int],
+    fmt: str,
+    quality: int,
+) -> List[_Variant]:
+    """Resize an image and write its variants.
+
+    This only uses its arguments, not the application or database, so it
+    can run on an operating system thread (see _run_off_hub()).
+
+    Args:
+        storage: Storage manager holding the image
+        source_path: Path of the original image
+        checksum: SHA-256 checksum of the original image
+        original_size: Size of the original file in bytes
+        sizes: Long-edge sizes wanted
+        fmt: Output format
+        quality: Encoder quality
+
+    Returns:
+        The variants written; sizes at or above the original's long edge
+        and variants not smaller than the original file are skipped
+    """
+    variants: List[_Variant] = []
+    with Image.open(source_path) as original:
+        if getattr(original, "is_animated", False):
+            logger.debug(f"Skipping derivatives of animated image {source_path}")
+            return []
+
+        long_edge = max(original.size)
+        wanted = [size for size in sizes if size < long_edge]
+        if not wanted:
+            return []
+
+        # Let JPEG decoding scale down while decompressing; the result
+        # stays at least as large as the biggest size still needed
+        original.draft("RGB", (max(wanted), max(wanted)))
+        image = _prepare_mode(ImageOps.exif_transpose(original))
+
+        for size in wanted:
+            variant = image.copy()
+            variant.thumbnail((size, size), Image.Resampling.LANCZOS)
+            target = get_derivative_path(storage, checksum, size, fmt)
+            with AtomicFileWriter(target) as output:
+                variant.save(output, format=fmt.upper(), quality=quality)
+
+            file_size = target.stat().st_size
+            if file_size >= original_size:
+                # Recompressing did not help; the original serves as well
+                target.unlink(missing_ok=True)
+                continue
+            variants.append(
+                _Variant(size, variant.width, variant.height, target, file_size)
+            )
+    return variants
+
+
+def _run_off_hub(func: Callable[..., T], *args: Any) -> T:
+    """Run CPU-bound work without blocking an eventlet hub.
+
+    Under gunicorn's eventlet workers (the Docker image's default) the
+    standard library is monkey patched, so the pool's worker threads are
+    green threads sharing one operating system thread, and resizing an
+    image there would stall every request and SSE connection of the
+    worker. The work is then run on eventlet's pool of real threads;
+    otherwise it runs in the calling thread.
+
+    Args:
+        func: Function to call
+        *args: Arguments passed to func
+
+    Returns:
+        The function's result
+    """
+    if "eventlet" in sys.modules:
+        from eventlet import patcher, tpool
+
+        if patcher.is_monkey_patched("thread"):
+            return cast(T, tpool.execute(func, *args))
+    return func(*args)
+
+
+def generate_derivatives(
+    blob_id: int, storage: Optional[StorageManager] = None
+) -> List[MediaDerivative]:
+    """Generate the missing derivatives of an image blob.
+
+    Sizes at or above the original's long edge are skipped, as are
+    variants that would not be smaller than the original file. Animated
+    images and formats Pillow cannot read are left as they are.
+
+    Args:
+        blob_id: ID of the image blob
+        storage: Storage manager holding the file (defaults to the global one)
+
+    Returns:
+        The derivatives created
+    """
+    storage = storage or get_storage_manager()
+    blob = db.session.get(MediaBlob, blob_id)
+    if blob is None or blob.content_type != "image":
+        return []
+
+    sizes = get_derivative_sizes()
+    fmt = get_derivative_format()
+    existing = {(d.max_size, d.format) for d in blob.derivatives}
+    source_path = storage.base_path / blob.file_path
+    quality = int(current_app.config.get("IMAGE_DERIVATIVE_QUALITY", 80))
+    wanted = [size for size in sizes if (size, fmt) not in existing]
+    if not wanted:
+        return []
+
+    try:
+        variants = _run_off_hub(
+            _render_variants,
+            storage,
+            source_path,
+            blob.checksum,
+            blob.file_size,
+            wanted,
+            fmt,
+            quality,
+        )
+    except (
+        OSError,
+        UnidentifiedImageError,
+        Image.DecompressionBombError,
+        StorageError,
+    ) as e:
+        logger.warning(f"Could not generate derivatives of {source_path}: {e}")
+        db.session.rollback()
+        return []
+
+    created: List[MediaDerivative] = []
+    for variant in variants:
+        derivative = MediaDerivative(
+            media_blob_id=blob.id,
+            format=fmt,
+            max_size=variant.max_size,
+            width=variant.width,
+            height=variant.height,
+            file_path=variant.path.relative_to(storage.base_path).as_posix(),
+            file_size=variant.file_size,
+        )
+        db.session.add(derivative)
+        created.append(derivative)
+
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another worker generated the same derivatives concurrently
+        db.session.rollback()
+        return []
+
+    for variant in variants:
+        record_file(storage.base_path, variant.path)
+    if created:
+        logger.info(
+            f"Generated {len(created)} derivatives of media blob "
+            f"{blob.checksum[:12]} ({blob.file_size} bytes originally, "
+            f"{created[-1].file_size} bytes at {created[-1].max_size}px)"
+        )
+    return created
+
+
+def delete_derivative_files(
+    blob: MediaBlob, storage: Optional[StorageManager] = None
+) -> None:
+    """Delete the files of a blob's derivatives.
+
+    The rows are deleted with the blob (the relationship cascades).
+
+    Args:
+        blob: Media blob being deleted
+        storage: Storage manager holding the files (defaults to the global one)
+    """
+    storage = storage or get_storage_manager()
+    for derivative in blob.derivatives:
+        file_path = storage.base_path / derivative.file_path
+        try:
+            file_path.unlink(missing_ok=True)
+        except OSError as e:
+            logger.error(f"Failed to delete image derivative {file_path}: {e}")
+
+
+def _run_in_app_context(app: Flask, blob_id: int, storage: StorageManager) -> None:
+    """Generate derivatives on a worker thread."""
+    with app.app_context():
+        generate_derivatives(blob_id, storage)
+
+
+def schedule_derivatives(
+    blob: MediaBlob, storage: Optional[StorageManager] = None
+) -> None:
+    """Generate an image blob's derivatives, in the background when possible.
+
+    Args:
+        blob: Media blob of the uploaded image
+        storage: Storage manager holding the file (defaults to the global one)
+    """
+    if not get_derivative_sizes():
+        return
+    storage = storage or get_storage_manager()
+
+    app = current_app._get_current_object()  # type: ignore[attr-defined]
+    background = int(app.config.get("IMAGE_DERIVATIVE_WORKERS", 1)) > 0
+    if background and derivative_pool.submit(
+        _run_in_app_context, app, blob.id, storage
+    ):
+        return
+
+    if background and derivative_pool.enabled:
+        logger.warning(
+            f"Image derivative queue is full; resizing media blob "
+            f"{blob.checksum[:12]} inline"
+        )
+    generate_derivatives(blob.id, storage)
+
+
+def init_image_derivatives(app: Flask) -> None:
+    """Size the image derivative worker pool from configuration.
+
+    Args:
+        app: Flask application instance
+    """
+    derivative_pool.configure(
+        max_workers=int(app.config.get("IMAGE_DERIVATIVE_WORKERS", 1)),
+        max_queue=int(app.config.get("IMAGE_DERIVATIVE_QUEUE_SIZE", 50)),
+    )
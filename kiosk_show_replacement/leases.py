@@ -0,0 +1,103 @@
+"""
+Cross-process job leases for the Kiosk Show Replacement application.
+
+Every application process runs its own scheduler, so a maintenance job
+that must run in one process at a time first claims the JobLease row
+named after it. Claims are conditional updates of that row (inserted on
+first use), which the database applies atomically, so two processes can
+never both hold a lease. A holder renews its lease while it works; a
+lease not renewed before it expires is taken over, so a job whose process
+died is picked up again.
+"""
+
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+
+from .models import JobLease, db
+
+
+def _utcnow() -> datetime:
+    """Return the current time as a naive UTC datetime, as stored in the DB."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def claim_lease(name: str, seconds: float) -> Optional[str]:
+    """Claim a lease unless another holder's claim is still valid.
+
+    Commits the current session.
+
+    Args:
+        name: Lease name
+        seconds: Seconds the claim is valid for unless renewed
+
+    Returns:
+        Token identifying the claim, or None if the lease is held
+    """
+    token = uuid.uuid4().hex
+    now = _utcnow()
+    expires_at = now + timedelta(seconds=seconds)
+    result = db.session.execute(
+        update(JobLease)
+        .where(JobLease.name == name, JobLease.expires_at <= now)
+        .values(holder=token, expires_at=expires_at)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    if result.rowcount == 1:
+        return token
+    if db.session.get(JobLease, name) is not None:
+        return None
+
+    db.session.add(JobLease(name=name, holder=token, expires_at=expires_at))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another process created and claimed it first
+        db.session.rollback()
+        return None
+    return token
+
+
+def renew_lease(name: str, token: str, seconds: float) -> bool:
+    """Extend a claim.
+
+    Commits the current session.
+
+    Args:
+        name: Lease name
+        token: Token returned by claim_lease()
+        seconds: Seconds from now the claim is valid for
+
+    Returns:
+        True if the claim was extended, False if it was taken over
+    """
+    result = db.session.execute(
+        update(JobLease)
+        .where(JobLease.name == name, JobLease.holder == token)
+        .values(expires_at=_utcnow() + timedelta(seconds=seconds))
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return bool(result.rowcount == 1)
+
+
+def release_lease(name: str, token: str) -> None:
+    """Give up a claim so the job can run again at once.
+
+    Commits the current session.
+
+    Args:
+        name: Lease name
+        token: Token returned by claim_lease()
+    """
+    db.session.execute(
+        update(JobLease)
+        .where(JobLease.name == name, JobLease.holder == token)
+        .values(expires_at=_utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
@@ -3,19 +3,41 @@ Structured logging configuration for the Kiosk Show Replacement application.
 
 This module provides:
 - JSON formatted logging for production environments
+- Asynchronous, batched log writing on a background thread
 - Correlation ID inclusion in all log entries
 - Request/response logging middleware
+- Slow request and slow SQL statement logging with timing breakdowns
 - Log level configuration
 """
 
+import heapq
 import json
 import logging
+import queue
+import re
 import sys
+import threading
 import time
 from datetime import datetime, timezone
-from typing import Any, Dict
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
 
-from flask import Flask, Response, g, has_request_context, request
+from flask import (
+    Flask,
+    Response,
+    before_render_template,
+    current_app,
+    g,
+    has_app_context,
+    has_request_context,
+    request,
+    template_rendered,
+)
+from flask.json.provider import DefaultJSONProvider
+
+logger = logging.getLogger(__name__)
+
+# Maximum length of a SQL statement included in slow request/query log records
+MAX_LOGGED_STATEMENT_LENGTH = 500
 
 
 class CorrelationIdFilter(logging.Filter):
@@ -53,8 +75,12 @@ class JsonFormatter(logging.Formatter):
         Returns:
             JSON-formatted log string
         """
+        # Use the record creation time rather than the formatting time so
+        # timestamps stay accurate when records are formatted asynchronously
         log_entry: Dict[str, Any] = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": datetime.fromtimestamp(
+                record.created, timezone.utc
+            ).isoformat(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -128,6 +154,192 @@ class StandardFormatter(logging.Formatter):
         )
 
 
+class AsyncBatchingHandler(logging.Handler):
+    """Logging handler that formats and writes records on a background thread.
+
+    The logging thread only runs filters (e.g. CorrelationIdFilter, which
+    must see the request context) and enqueues the record. A writer thread
+    drains the bounded queue in batches, formats each record and writes the
+    batch to the stream with a single write/flush. When the queue is full,
+    records are dropped and counted rather than blocking the caller.
+    """
+
+    def __init__(
+        self,
+        stream: Optional[IO[str]] = None,
+        queue_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 0.5,
+    ) -> None:
+        """Initialize the handler and start the writer thread.
+
+        Args:
+            stream: Stream to write formatted records to (default: sys.stdout)
+            queue_size: Maximum number of records waiting to be written
+            batch_size: Maximum number of records written per batch
+            flush_interval: Seconds to wait for records before re-checking
+                for shutdown
+        """
+        super().__init__()
+        self.stream = stream if stream is not None else sys.stdout
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Union[logging.LogRecord, threading.Event]]" = (
+            queue.Queue(maxsize=max(1, queue_size))
+        )
+        self._stats_lock = threading.Lock()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+        self.written = 0
+        self.batches = 0
+        self._ensure_thread()
+
+    def _ensure_thread(self) -> None:
+        """Start the writer thread if it is not running.
+
+        Threads do not survive fork(), so this is also called on emit to
+        restart the writer in forked worker processes.
+        """
+        if self._closed or (self._thread is not None and self._thread.is_alive()):
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="async-log-writer", daemon=True
+        )
+        self._thread.start()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Prepare a record for cross-thread handoff.
+
+        Merges the message arguments into the message so the writer thread
+        does not format mutable objects that may have changed in the meantime.
+
+        Args:
+            record: The log record to prepare
+
+        Returns:
+            The prepared record
+        """
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Enqueue a record for the writer thread.
+
+        Args:
+            record: The log record to enqueue
+        """
+        try:
+            self._ensure_thread()
+            self._queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            with self._stats_lock:
+                self.dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def _next_batch(self) -> List[Union[logging.LogRecord, threading.Event]]:
+        """Block for the next record and drain up to batch_size items."""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write_batch(
+        self, batch: List[Union[logging.LogRecord, threading.Event]]
+    ) -> None:
+        """Format and write a batch, then signal any flush markers in it."""
+        lines: List[str] = []
+        markers: List[threading.Event] = []
+        for item in batch:
+            if isinstance(item, threading.Event):
+                markers.append(item)
+                continue
+            try:
+                lines.append(self.format(item))
+            except Exception:
+                self.handleError(item)
+
+        if lines:
+            try:
+                self.stream.write("\n".join(lines) + "\n")
+                self.stream.flush()
+            except Exception:
+                # Nothing sensible to do if the output stream is broken
+                pass
+            with self._stats_lock:
+                self.written += len(lines)
+                self.batches += 1
+
+        for marker in markers:
+            marker.set()
+
+    def _run(self) -> None:
+        """Writer thread main loop."""
+        while not self._closed or not self._queue.empty():
+            batch = self._next_batch()
+            if batch:
+                self._write_batch(batch)
+
+    def flush(self, timeout: float = 5.0) -> None:
+        """Wait until all records queued so far have been written.
+
+        Args:
+            timeout: Maximum seconds to wait for the writer thread
+        """
+        if self._thread is None or not self._thread.is_alive():
+            # No writer (closed or not restarted yet) - drain synchronously
+            while True:
+                try:
+                    batch = [self._queue.get_nowait()]
+                except queue.Empty:
+                    return
+                self._write_batch(batch)
+
+        marker = threading.Event()
+        try:
+            self._queue.put(marker, timeout=timeout)
+        except queue.Full:
+            return
+        marker.wait(timeout)
+
+    def close(self) -> None:
+        """Flush pending records and stop the writer thread."""
+        if not self._closed:
+            self.flush()
+            self._closed = True
+            if self._thread is not None and self._thread.is_alive():
+                # Wake the writer so it notices shutdown without waiting
+                # for the flush interval to elapse
+                try:
+                    self._queue.put_nowait(threading.Event())
+                except queue.Full:
+                    pass
+                self._thread.join(self.flush_interval * 2)
+        super().close()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get queue and throughput counters.
+
+        Returns:
+            Dictionary with queued, dropped, written and batches counts
+        """
+        with self._stats_lock:
+            return {
+                "queued": self._queue.qsize(),
+                "dropped": self.dropped,
+                "written": self.written,
+                "batches": self.batches,
+            }
+
+
 def configure_logging(app: Flask, json_format: bool = False) -> None:
     """Configure application logging.
 
@@ -141,11 +353,23 @@ def configure_logging(app: Flask, json_format: bool = False) -> None:
     logger = app.logger
 
     # Remove existing handlers
-    for handler in logger.handlers[:]:
-        logger.removeHandler(handler)
-
-    # Create handler
-    handler = logging.StreamHandler(sys.stdout)
+    for existing in logger.handlers[:]:
+        logger.removeHandler(existing)
+        if isinstance(existing, AsyncBatchingHandler):
+            existing.close()
+
+    # Create handler - formatting and writing happen off the request thread
+    # unless async logging is disabled
+    handler: logging.Handler
+    if app.config.get("LOG_ASYNC", True):
+        handler = AsyncBatchingHandler(
+            sys.stdout,
+            queue_size=int(app.config.get("LOG_QUEUE_SIZE", 10000)),
+            batch_size=int(app.config.get("LOG_BATCH_SIZE", 100)),
+            flush_interval=float(app.config.get("LOG_FLUSH_INTERVAL", 0.5)),
+        )
+    else:
+        handler = logging.StreamHandler(sys.stdout)
 
     # Set formatter based on environment
     if json_format:
@@ -244,6 +468,319 @@ def init_request_logging(app: Flask) -> None:
         return response
 
 
+def _normalize_statement(statement: str) -> str:
+    """Collapse whitespace in a SQL statement and truncate it for logging.
+
+    Args:
+        statement: Raw SQL statement text
+
+    Returns:
+        Single-line statement, truncated to MAX_LOGGED_STATEMENT_LENGTH
+    """
+    normalized = re.sub(r"\s+", " ", statement).strip()
+    if len(normalized) > MAX_LOGGED_STATEMENT_LENGTH:
+        normalized = normalized[:MAX_LOGGED_STATEMENT_LENGTH] + "..."
+    return normalized
+
+
+def get_parameter_shape(parameters: Any, executemany: bool = False) -> Any:
+    """Describe the shape of bound SQL parameters without their values.
+
+    Parameter values can contain credentials or personal data, so only the
+    parameter names (for dict-style parameters) and value types are logged.
+
+    Args:
+        parameters: Bound parameters as passed to the DBAPI cursor
+        executemany: True if the statement was executed with executemany()
+
+    Returns:
+        JSON-serializable description of the parameters
+    """
+    if executemany and isinstance(parameters, (list, tuple)):
+        if not parameters:
+            return {"rows": 0}
+        return {"rows": len(parameters), "row": get_parameter_shape(parameters[0])}
+    if isinstance(parameters, dict):
+        return {str(key): type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [type(value).__name__ for value in parameters]
+    if parameters is None:
+        return None
+    return type(parameters).__name__
+
+
+class RequestProfile:
+    """Timing breakdown collected for a single request.
+
+    Tracks time spent executing SQL, rendering templates, and serializing
+    JSON, plus the SQL statement count and the top-N slowest statements.
+    """
+
+    def __init__(self, top_n: int = 5) -> None:
+        """Initialize the profile.
+
+        Args:
+            top_n: Number of slowest SQL statements to retain
+        """
+        self.start_time = time.perf_counter()
+        self.top_n = top_n
+        self.db_time = 0.0
+        self.statement_count = 0
+        self.template_time = 0.0
+        self.serialization_time = 0.0
+        self._template_start: Optional[float] = None
+        # Min-heap of (duration, sequence, statement, parameter_shape)
+        self._slowest: List[Tuple[float, int, str, Any]] = []
+
+    def record_statement(
+        self, duration: float, statement: str, parameter_shape: Any
+    ) -> None:
+        """Record an executed SQL statement.
+
+        Args:
+            duration: Execution time in seconds
+            statement: SQL statement text
+            parameter_shape: Output of get_parameter_shape()
+        """
+        self.db_time += duration
+        self.statement_count += 1
+        if self.top_n <= 0:
+            return
+        entry = (duration, self.statement_count, statement, parameter_shape)
+        if len(self._slowest) < self.top_n:
+            heapq.heappush(self._slowest, entry)
+        elif duration > self._slowest[0][0]:
+            heapq.heapreplace(self._slowest, entry)
+
+    def slowest_statements(self) -> List[Dict[str, Any]]:
+        """Get the slowest statements recorded, slowest first.
+
+        Returns:
+            List of dictionaries with duration_ms, statement and parameters
+        """
+        return [
+            {
+                "duration_ms": round(duration * 1000, 2),
+                "statement": _normalize_statement(statement),
+                "parameters": parameter_shape,
+            }
+            for duration, _, statement, parameter_shape in sorted(
+                self._slowest, reverse=True
+            )
+        ]
+
+    def elapsed(self) -> float:
+        """Get the seconds elapsed since the request started."""
+        return time.perf_counter() - self.start_time
+
+
+def _get_request_profile() -> Optional[RequestProfile]:
+    """Get the profile for the current request, if one is active."""
+    if not has_request_context():
+        return None
+    return getattr(g, "request_profile", None)
+
+
+def _threshold_seconds(key: str, default_ms: float) -> Optional[float]:
+    """Read a millisecond threshold from app config.
+
+    Args:
+        key: Configuration key
+        default_ms: Default threshold in milliseconds
+
+    Returns:
+        Threshold in seconds, or None if the threshold is disabled (<= 0)
+    """
+    value = default_ms
+    if has_app_context():
+        value = current_app.config.get(key, default_ms)
+    try:
+        threshold_ms = float(value)
+    # fmt: off
+    except (TypeError, ValueError):
+        # fmt: on
+        threshold_ms = default_ms
+    if threshold_ms <= 0:
+        return None
+    return threshold_ms / 1000
+
+
+def _before_cursor_execute(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    """SQLAlchemy hook recording the statement start time."""
+    conn.info.setdefault("query_start_times", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Any,
+    cursor: Any,
+    statement: str,
+    parameters: Any,
+    context: Any,
+    executemany: bool,
+) -> None:
+    """SQLAlchemy hook recording statement duration and logging slow queries."""
+    start_times = conn.info.get("query_start_times")
+    if not start_times:
+        return
+    duration = time.perf_counter() - start_times.pop()
+
+    parameter_shape = get_parameter_shape(parameters, executemany)
+
+    profile = _get_request_profile()
+    if profile is not None:
+        profile.record_statement(duration, statement, parameter_shape)
+
+    threshold = _threshold_seconds("SLOW_QUERY_THRESHOLD_MS", 250)
+    if threshold is None or duration < threshold:
+        return
+
+    log = current_app.logger if has_app_context() else logger
+    extra: Dict[str, Any] = {
+        "event": "slow_query",
+        "duration_ms": round(duration * 1000, 2),
+        "statement": _normalize_statement(statement),
+        "parameters": parameter_shape,
+        "executemany": executemany,
+    }
+    if has_request_context():
+        extra["method"] = request.method
+        extra["path"] = request.path
+    log.warning(f"Slow query: {extra['duration_ms']}ms", extra=extra)
+
+
+def _handle_cursor_error(context: Any) -> None:
+    """SQLAlchemy hook discarding the start time of a failed statement.
+
+    after_cursor_execute does not run for a statement that raised, so its
+    start time would otherwise be taken for the connection's next statement.
+    """
+    conn = context.connection
+    if conn is None:
+        return
+    start_times = conn.info.get("query_start_times")
+    if start_times:
+        start_times.pop()
+
+
+def init_slow_query_logging(app: Flask) -> None:
+    """Attach SQL timing hooks to the application's database engine.
+
+    Args:
+        app: Flask application instance
+    """
+    from sqlalchemy import event
+
+    from .app import db
+
+    with app.app_context():
+        engine = db.engine
+        if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+            event.listen(engine, "handle_error", _handle_cursor_error)
+
+
+class ProfilingJSONProvider(DefaultJSONProvider):
+    """JSON provider that records serialization time on the request profile."""
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """Serialize to JSON, accounting the time to the current request."""
+        profile = _get_request_profile()
+        if profile is None:
+            return super().dumps(obj, **kwargs)
+
+        start = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            profile.serialization_time += time.perf_counter() - start
+
+
+def init_slow_request_logging(app: Flask) -> None:
+    """Initialize slow request detection.
+
+    Every request collects a RequestProfile. When a request exceeds
+    SLOW_REQUEST_THRESHOLD_MS, a structured "slow_request" record is logged
+    with the route, a duration breakdown (database, template rendering, JSON
+    serialization), the SQL statement count and the slowest statements.
+
+    Args:
+        app: Flask application instance
+    """
+    app.json = ProfilingJSONProvider(app)
+    init_slow_query_logging(app)
+
+    def _on_before_render(sender: Flask, **extra: Any) -> None:
+        profile = _get_request_profile()
+        if profile is not None:
+            profile._template_start = time.perf_counter()
+
+    def _on_rendered(sender: Flask, **extra: Any) -> None:
+        profile = _get_request_profile()
+        if profile is not None and profile._template_start is not None:
+            profile.template_time += time.perf_counter() - profile._template_start
+            profile._template_start = None
+
+    before_render_template.connect(_on_before_render, app, weak=False)
+    template_rendered.connect(_on_rendered, app, weak=False)
+
+    @app.before_request
+    def start_request_profile() -> None:
+        """Start collecting timing data for the request."""
+        g.request_profile = RequestProfile(
+            top_n=int(app.config.get("SLOW_REQUEST_TOP_QUERIES", 5))
+        )
+
+    @app.after_request
+    def log_slow_request(response: Response) -> Response:
+        """Log a structured record if the request exceeded the threshold."""
+        profile = _get_request_profile()
+        threshold = _threshold_seconds("SLOW_REQUEST_THRESHOLD_MS", 1000)
+        if profile is None or threshold is None:
+            return response
+
+        duration = profile.elapsed()
+        if duration < threshold:
+            return response
+
+        other_time = max(
+            0.0,
+            duration
+            - profile.db_time
+            - profile.template_time
+            - profile.serialization_time,
+        )
+        app.logger.warning(
+            f"Slow request: {request.method} {request.path} took "
+            f"{round(duration * 1000, 2)}ms",
+            extra={
+                "event": "slow_request",
+                "method": request.method,
+                "path": request.path,
+                "route": request.url_rule.rule if request.url_rule else None,
+                "endpoint": request.endpoint,
+                "status_code": response.status_code,
+                "duration_ms": round(duration * 1000, 2),
+                "breakdown_ms": {
+                    "db": round(profile.db_time * 1000, 2),
+                    "template": round(profile.template_time * 1000, 2),
+                    "serialization": round(profile.serialization_time * 1000, 2),
+                    "other": round(other_time * 1000, 2),
+                },
+                "sql_statement_count": profile.statement_count,
+                "slowest_statements": profile.slowest_statements(),
+            },
+        )
+        return response
+
+
 def init_logging(app: Flask) -> None:
     """Initialize all logging for the application.
 
@@ -254,3 +791,4 @@ def init_logging(app: Flask) -> None:
     use_json = app.config.get("LOG_JSON", not app.debug)
     configure_logging(app, json_format=use_json)
     init_request_logging(app)
+    init_slow_request_logging(app)
@@ -0,0 +1,294 @@
+"""
+Background media probing for the Kiosk Show Replacement application.
+
+Uploaded videos are probed with a single ffprobe run per file (see
+StorageManager.probe_video()) on a bounded worker pool instead of inside
+the upload request. The upload returns with a probe_status of "pending";
+when the probe finishes its results (codecs, duration) are saved on the
+MediaBlob and pushed to the uploading user's admin connections as a
+``media.probed`` SSE event.
+
+With MEDIA_PROBE_WORKERS set to 0, or while the job queue is full, videos
+are probed synchronously in the calling thread instead.
+
+When video transcoding is enabled, a video with an unsupported codec is
+marked "transcoding" rather than "rejected" and queued for conversion, and
+probed videos are queued for any configured renditions (see transcode).
+"""
+
+import logging
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Optional
+
+from flask import Flask, current_app
+
+from .file_catalog import forget_files
+from .models import MediaBlob, db
+from .sse import create_media_event, sse_manager
+from .storage import StorageManager, get_storage_manager
+
+logger = logging.getLogger(__name__)
+
+
+class MediaProbePool:
+    """Bounded thread pool for media processing jobs.
+
+    ffprobe runs as a subprocess and Pillow releases the GIL while resizing
+    and encoding, so threads are enough to process files in parallel
+    without holding request workers. At most ``max_workers`` jobs run at
+    once and at most ``max_queue`` more wait; submit() refuses further jobs
+    so callers can fall back to running them inline.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_queue: int = 50,
+        thread_name_prefix: str = "media-probe",
+    ) -> None:
+        """Initialize the pool; threads are started on first use.
+
+        Args:
+            max_workers: Maximum concurrent jobs (0 disables the pool)
+            max_queue: Maximum jobs waiting for a worker
+            thread_name_prefix: Name prefix for the worker threads
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.thread_name_prefix = thread_name_prefix
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def configure(self, max_workers: int, max_queue: int) -> None:
+        """Change the pool size, replacing any running executor.
+
+        Jobs already submitted to a replaced executor still complete.
+
+        Args:
+            max_workers: Maximum concurrent jobs (0 disables the pool)
+            max_queue: Maximum jobs waiting for a worker
+        """
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+            self.max_workers = max_workers
+            self.max_queue = max_queue
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    @property
+    def enabled(self) -> bool:
+        """Whether jobs are run by background workers."""
+        return self.max_workers > 0
+
+    @property
+    def pending(self) -> int:
+        """Number of jobs running or waiting."""
+        with self._lock:
+            return self._pending
+
+    def submit(self, func: Callable[..., Any], *args: Any) -> bool:
+        """Queue a job if the pool is enabled and has room.
+
+        Args:
+            func: Callable to run on a worker thread
+            *args: Arguments for the callable
+
+        Returns:
+            True if the job was queued, False if the caller should run it
+        """
+        if not self.enabled:
+            return False
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                return False
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self.thread_name_prefix,
+                )
+            self._pending += 1
+            executor = self._executor
+
+        future = executor.submit(func, *args)
+        future.add_done_callback(self._job_done)
+        return True
+
+    def _job_done(self, future: "Future[Any]") -> None:
+        """Release a job slot and log unexpected failures."""
+        with self._lock:
+            self._pending -= 1
+        exc = future.exception()
+        if exc is not None:
+            logger.error(f"{self.thread_name_prefix} job failed: {exc}")
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads.
+
+        Args:
+            wait: Wait for queued jobs to finish
+        """
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+# Global pool instance
+probe_pool = MediaProbePool()
+
+
+def run_blob_probe(
+    blob_id: int, original_filename: str, storage: Optional[StorageManager] = None
+) -> Optional[MediaBlob]:
+    """Probe a stored video and record the results on its blob.
+
+    A video with an unsupported codec is marked "rejected" and its file is
+    deleted (see discard_rejected_file()), unless transcoding is enabled,
+    in which case it is marked
+    "transcoding" and queued for conversion. A video ffprobe cannot read is
+    marked "failed" but kept, as uploads were allowed when ffprobe is
+    unavailable.
+
+    Args:
+        blob_id: ID of the media blob to probe
+        original_filename: Uploaded filename, for log and error messages
+        storage: Storage manager holding the file (defaults to the global one)
+
+    Returns:
+        The updated media blob, or None if it no longer exists
+    """
+    # Imported here as the transcode module builds on this module's pool
+    from .transcode import queue_transcodes, transcoding_enabled
+
+    storage = storage or get_storage_manager()
+    blob = db.session.get(MediaBlob, blob_id)
+    if blob is None:
+        return None
+
+    file_path = storage.base_path / blob.file_path
+    probe_info, format_error = storage.check_stored_video(
+        file_path, original_filename, checksum=blob.checksum
+    )
+
+    if probe_info is None:
+        blob.probe_status = "failed"
+        blob.probe_error = "Could not read video information"
+    else:
+        blob.video_codec = probe_info.get("video_codec")
+        blob.audio_codec = probe_info.get("audio_codec")
+        blob.container_format = probe_info.get("container_format")
+        if probe_info.get("duration") is not None:
+            blob.duration = probe_info["duration"]
+        if format_error and blob.video_codec and transcoding_enabled():
+            # Convert the video instead of rejecting its codec
+            blob.probe_status = "transcoding"
+            blob.probe_error = None
+        else:
+            blob.probe_status = "rejected" if format_error else "ready"
+            blob.probe_error = format_error or None
+
+    db.session.commit()
+    if blob.probe_status == "rejected":
+        discard_rejected_file(blob, storage)
+    logger.info(
+        f"Probed video '{original_filename}' (media blob {blob.checksum[:12]}): "
+        f"{blob.probe_status}"
+    )
+
+    event = create_media_event("probed", blob.id, blob.to_dict())
+    sse_manager.broadcast_event(
+        event, connection_type="admin", user_id=blob.created_by_id
+    )
+
+    if blob.probe_status in ("ready", "transcoding") and transcoding_enabled():
+        queue_transcodes(blob, storage, primary=blob.probe_status == "transcoding")
+    return blob
+
+
+def discard_rejected_file(blob: MediaBlob, storage: StorageManager) -> None:
+    """Delete the file of a rejected video unless slideshow items use it.
+
+    Call after committing the "rejected" status, which stops items from
+    being attached to the blob. Items attached while the video was being
+    probed or converted keep its file until they let go of it; the
+    unreferenced-blob purge deletes it then.
+
+    Args:
+        blob: Rejected media blob
+        storage: Storage manager holding the file
+    """
+    # The commit expired the blob, so this reads the current count
+    if blob.ref_count > 0:
+        logger.info(
+            f"Keeping rejected video {blob.file_path}, used by "
+            f"{blob.ref_count} slideshow items"
+        )
+        return
+
+    file_path = storage.base_path / blob.file_path
+    try:
+        file_path.unlink(missing_ok=True)
+    except OSError as e:
+        logger.error(f"Failed to delete rejected video {file_path}: {e}")
+        return
+    forget_files([blob.file_path], session=db.session)
+    db.session.commit()
+
+
+def _run_in_app_context(
+    app: Flask, blob_id: int, original_filename: str, storage: StorageManager
+) -> None:
+    """Run a blob probe on a worker thread."""
+    with app.app_context():
+        run_blob_probe(blob_id, original_filename, storage)
+
+
+def schedule_blob_probe(
+    blob: MediaBlob, original_filename: str, storage: Optional[StorageManager] = None
+) -> None:
+    """Probe an uploaded video, in the background when possible.
+
+    The blob is marked "pending" and committed before the job is queued.
+    If background probing is disabled for the current app, or the pool is
+    full, the probe runs before this returns.
+
+    Args:
+        blob: Media blob of the uploaded video
+        original_filename: Uploaded filename, for log and error messages
+        storage: Storage manager holding the file (defaults to the global one)
+    """
+    storage = storage or get_storage_manager()
+    blob.probe_status = "pending"
+    blob.probe_error = None
+    db.session.commit()
+
+    app = current_app._get_current_object()  # type: ignore[attr-defined]
+    # The pool is shared by every app in the process; each app's own setting
+    # decides whether it queues probes
+    background = int(app.config.get("MEDIA_PROBE_WORKERS", 2)) > 0
+    if background and probe_pool.submit(
+        _run_in_app_context, app, blob.id, original_filename, storage
+    ):
+        return
+
+    if background and probe_pool.enabled:
+        logger.warning(
+            f"Media probe queue is full; probing '{original_filename}' inline"
+        )
+    run_blob_probe(blob.id, original_filename, storage)
+
+
+def init_media_probe(app: Flask) -> None:
+    """Size the media probe worker pool from configuration.
+
+    Args:
+        app: Flask application instance
+    """
+    probe_pool.configure(
+        max_workers=int(app.config.get("MEDIA_PROBE_WORKERS", 2)),
+        max_queue=int(app.config.get("MEDIA_PROBE_QUEUE_SIZE", 50)),
+    )
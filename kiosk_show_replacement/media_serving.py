@@ -0,0 +1,261 @@
+"""
+Uploaded media serving for the Kiosk Show Replacement application.
+
+Files under ``/uploads/`` are served with caching headers chosen by path:
+
+- Content-addressed files (media blobs, image derivatives and video
+  transcodes, named after the SHA-256 checksum of their content) never
+  change at a given URL. They are served with a strong ETag taken from the
+  file name and ``Cache-Control: public, max-age=MEDIA_CACHE_MAX_AGE,
+  immutable``, so kiosks do not revalidate them.
+- Other uploads get UPLOAD_CACHE_MAX_AGE and are revalidated with
+  If-None-Match / If-Modified-Since once that expires.
+
+Byte range requests (browsers use them to buffer and seek in videos) are
+answered by seeking to the start of the range rather than reading through
+the file, and the body is handed to the WSGI server's file wrapper, which
+gunicorn sends with sendfile(2) without copying it through Python.
+
+With MEDIA_ACCEL_REDIRECT_PREFIX set, the application only checks the path
+and sets headers; an ``X-Accel-Redirect`` header names an nginx
+``internal`` location mapped to the upload folder, and nginx sends the
+file and handles ranges. Flask's USE_X_SENDFILE setting does the same with
+an ``X-Sendfile`` header for Apache or lighttpd.
+"""
+
+import mimetypes
+import os
+import re
+import zlib
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import IO, Iterator, Optional
+from urllib.parse import quote
+
+from flask import Response, abort, current_app, request
+from werkzeug.datastructures import ContentRange
+from werkzeug.http import parse_range_header
+from werkzeug.security import safe_join
+
+# Paths of files named after the SHA-256 checksum of their content
+CONTENT_ADDRESSED_PATH = re.compile(
+    r"^media/(?:images|videos|derivatives|transcodes)/[0-9a-f]{2}/"
+    r"(?P<name>[0-9a-f]{64}(?:_[0-9a-z]+)*)(?:\.[0-9A-Za-z]+)?$"
+)
+
+# Bytes read per chunk when a range is streamed through Python
+RANGE_BLOCK_SIZE = 64 * 1024
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """Caching headers for an uploaded file.
+
+    Attributes:
+        max_age: Seconds clients may use the file without revalidating
+        immutable: Whether the content at the URL can never change
+        etag: Strong ETag for content-addressed files; None to derive one
+            from the file's modification time and size
+    """
+
+    max_age: int
+    immutable: bool = False
+    etag: Optional[str] = None
+
+
+def get_cache_policy(path: str) -> CachePolicy:
+    """Get the caching policy for an upload.
+
+    Args:
+        path: Path of the file relative to the upload folder
+
+    Returns:
+        Cache policy for the file
+    """
+    match = CONTENT_ADDRESSED_PATH.match(path)
+    if match is not None:
+        return CachePolicy(
+            max_age=int(current_app.config.get("MEDIA_CACHE_MAX_AGE", 31536000)),
+            immutable=True,
+            etag=match.group("name"),
+        )
+    return CachePolicy(
+        max_age=int(current_app.config.get("UPLOAD_CACHE_MAX_AGE", 3600))
+    )
+
+
+def apply_cache_policy(response: Response, policy: CachePolicy) -> Response:
+    """Set the Cache-Control header of a response from a policy.
+
+    Args:
+        response: Response serving the file
+        policy: Cache policy of the file
+
+    Returns:
+        The response
+    """
+    if response.status_code in (200, 206, 304):
+        response.cache_control.public = True
+        response.cache_control.max_age = policy.max_age
+        if policy.immutable:
+            response.cache_control.immutable = True
+    return response
+
+
+def resolve_upload(upload_folder: str, path: str) -> str:
+    """Get the absolute path of an uploaded file.
+
+    Args:
+        upload_folder: Absolute path of the upload folder
+        path: Path of the file relative to the upload folder
+
+    Returns:
+        Absolute file path
+
+    Raises:
+        NotFound: If the path leaves the upload folder or is not a file
+    """
+    file_path = safe_join(upload_folder, path)
+    if file_path is None or not os.path.isfile(file_path):
+        abort(404)
+    return file_path
+
+
+def _file_etag(file_path: str, stat: os.stat_result, policy: CachePolicy) -> str:
+    """Get a file's ETag, matching the one send_file() sets for it."""
+    if policy.etag is not None:
+        return policy.etag
+    check = zlib.adler32(file_path.encode()) & 0xFFFFFFFF
+    return f"{stat.st_mtime}-{stat.st_size}-{check}"
+
+
+def _mimetype(file_path: str) -> str:
+    """Guess a file's content type from its name."""
+    return mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+
+
+def _not_modified(etag: str) -> bool:
+    """Whether the client's If-None-Match header already has the file."""
+    return request.if_none_match.contains(etag) or bool(request.if_none_match.star_tag)
+
+
+def serve_offloaded(
+    upload_folder: str, path: str, policy: CachePolicy
+) -> Optional[Response]:
+    """Hand an upload to the fronting web server, if configured.
+
+    Args:
+        upload_folder: Absolute path of the upload folder
+        path: Path of the file relative to the upload folder
+        policy: Cache policy of the file
+
+    Returns:
+        Response with an X-Accel-Redirect or X-Sendfile header and no body,
+        or None if neither is configured
+    """
+    accel_prefix = current_app.config.get("MEDIA_ACCEL_REDIRECT_PREFIX")
+    use_x_sendfile = current_app.config.get("USE_X_SENDFILE", False)
+    if not accel_prefix and not use_x_sendfile:
+        return None
+
+    file_path = resolve_upload(upload_folder, path)
+    stat = os.stat(file_path)
+    etag = _file_etag(file_path, stat, policy)
+    response = current_app.response_class(mimetype=_mimetype(file_path))
+    response.set_etag(etag)
+    response.last_modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+    if _not_modified(etag):
+        response.status_code = 304
+        return apply_cache_policy(response, policy)
+
+    if accel_prefix:
+        relative = os.path.relpath(file_path, upload_folder).replace(os.sep, "/")
+        response.headers["X-Accel-Redirect"] = (
+            f"{accel_prefix.rstrip('/')}/{quote(relative)}"
+        )
+    else:
+        response.headers["X-Sendfile"] = file_path
+    return apply_cache_policy(response, policy)
+
+
+def _read_range(file: IO[bytes], length: int) -> Iterator[bytes]:
+    """Yield ``length`` bytes from a file's current position."""
+    try:
+        while length > 0:
+            chunk = file.read(min(RANGE_BLOCK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+    finally:
+        file.close()
+
+
+def serve_range(
+    upload_folder: str, path: str, policy: CachePolicy
+) -> Optional[Response]:
+    """Serve a byte range request for an upload.
+
+    A single satisfiable range is answered with 206 Partial Content, read
+    from the start of the range. Other requests (no Range header, an
+    If-Range validator that no longer matches, or several ranges, which
+    are not supported) return None and are left to send_file(), which
+    sends the whole file or rejects the range.
+
+    Args:
+        upload_folder: Absolute path of the upload folder
+        path: Path of the file relative to the upload folder
+        policy: Cache policy of the file
+
+    Returns:
+        206, 304 or 416 response, or None to use send_file()
+    """
+    if request.method not in ("GET", "HEAD") or "Range" not in request.headers:
+        return None
+
+    file_path = resolve_upload(upload_folder, path)
+    stat = os.stat(file_path)
+    etag = _file_etag(file_path, stat, policy)
+    if _not_modified(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return apply_cache_policy(response, policy)
+
+    if_range = request.if_range
+    if if_range.etag is not None and if_range.etag != etag:
+        return None
+    if if_range.date is not None and int(stat.st_mtime) > if_range.date.timestamp():
+        return None
+
+    parsed = parse_range_header(request.headers.get("Range"))
+    if parsed is None or len(parsed.ranges) != 1:
+        return None
+
+    byte_range = parsed.range_for_length(stat.st_size)
+    if byte_range is None:
+        response = current_app.response_class(status=416)
+        response.content_range = ContentRange("bytes", None, None, stat.st_size)
+        return response
+
+    start, stop = byte_range
+    length = stop - start
+    file = open(file_path, "rb")
+    file.seek(start)
+    file_wrapper = request.environ.get("wsgi.file_wrapper")
+    if file_wrapper is not None:
+        # The server stops at Content-Length (PEP 3333); gunicorn sends the
+        # range with sendfile(2) from the file's current position
+        body = file_wrapper(file, RANGE_BLOCK_SIZE)
+    else:
+        body = _read_range(file, length)
+
+    response = current_app.response_class(
+        body, status=206, mimetype=_mimetype(file_path), direct_passthrough=True
+    )
+    response.call_on_close(file.close)
+    response.content_length = length
+    response.content_range = ContentRange("bytes", start, stop, stat.st_size)
+    response.accept_ranges = "bytes"
+    response.set_etag(etag)
+    response.last_modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+    return apply_cache_policy(response, policy)
@@ -0,0 +1,497 @@
+"""
+Content-addressed media store for the Kiosk Show Replacement application.
+
+Uploaded images and videos are stored once per unique SHA-256 checksum
+(see StorageManager.commit_blob()) and tracked by MediaBlob rows. Each
+blob's ``ref_count`` is the number of slideshow items referencing it,
+kept up to date when items are created or changed, so cleanup can delete
+unreferenced files without walking the upload directories.
+
+Newly uploaded blobs start with no references (the slideshow item is
+created by a separate request), so unreferenced blobs are only deleted
+once they have been unreferenced for MEDIA_ORPHAN_GRACE_HOURS. A
+scheduled job purges them every MEDIA_ORPHAN_PURGE_INTERVAL seconds.
+
+Uploaded videos are probed by the media probe worker pool (see
+media_probe); items cannot reference a video whose codec was rejected.
+Newly stored images get resized variants for smaller displays (see
+image_derivatives), which are deleted along with their blob, as are
+transcoded copies of videos (see transcode).
+"""
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from flask import Flask, current_app
+from sqlalchemy import delete, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
+from werkzeug.datastructures import FileStorage
+
+from .exceptions import ValidationError
+from .file_catalog import forget_files
+from .image_derivatives import delete_derivative_files, schedule_derivatives
+from .leases import claim_lease, release_lease
+from .media_probe import schedule_blob_probe
+from .models import MediaBlob, MediaDerivative, MediaTranscode, SlideshowItem, db
+from .storage import StorageManager, get_storage_manager
+from .transcode import delete_transcode_files
+
+logger = logging.getLogger(__name__)
+
+# Job lease held while the scheduled purge deletes unreferenced blobs
+PURGE_LEASE = "media_orphan_purge"
+PURGE_LEASE_SECONDS = 600
+
+
+def normalize_media_path(file_path: Optional[str]) -> Optional[str]:
+    """Normalize an item's content_file_path to a path relative to the uploads.
+
+    Args:
+        file_path: Stored content_file_path (may start with "/" or "uploads/")
+
+    Returns:
+        Relative path within the upload folder, or None if empty
+    """
+    if not file_path:
+        return None
+    path = file_path.strip().lstrip("/")
+    if path.startswith("uploads/"):
+        path = path[len("uploads/") :]
+    return path or None
+
+
+def store_upload(
+    file: FileStorage,
+    content_type: str,
+    user_id: int,
+    slideshow_id: int,
+    storage: Optional[StorageManager] = None,
+) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+    """Store an uploaded file in the content-addressed media store.
+
+    If a blob with the same checksum already exists, the upload is
+    discarded and the existing blob is returned. Newly stored videos are
+    queued for probing; the returned file info has a ``probe_status`` of
+    "pending" until the probe finishes (or the probe's result, if it ran
+    inline). Newly stored images are queued for resizing.
+
+    Args:
+        file: Uploaded file object
+        content_type: Type of content ('image' or 'video')
+        user_id: ID of the user uploading
+        slideshow_id: ID of the slideshow the upload is for
+        storage: Storage manager to use (defaults to the global instance)
+
+    Returns:
+        Tuple of (success, message, file_info_dict)
+    """
+    storage = storage or get_storage_manager()
+    filename = file.filename or "unnamed"
+
+    is_valid, error_message, upload = storage.stage_upload(file, content_type)
+    if not is_valid or upload is None:
+        return False, error_message, None
+
+    blob = MediaBlob.query.filter_by(checksum=upload.checksum).first()
+    if blob is not None:
+        _touch_unreferenced_blob(blob.id)
+    if blob is not None and (storage.base_path / blob.file_path).exists():
+        # Identical content is already stored; reuse it
+        upload.close()
+        file_info = _existing_blob_info(storage, blob, filename)
+        newly_stored = False
+        logger.info(
+            f"Deduplicated upload '{filename}' to media blob {blob.checksum[:12]}"
+        )
+    else:
+        success, message, file_info = storage.commit_blob(
+            upload, content_type, filename, user_id, slideshow_id
+        )
+        if not success or file_info is None:
+            return False, message, None
+        blob = _get_or_create_blob(storage, blob, file_info, user_id)
+        newly_stored = True
+
+    if blob.content_type == "video":
+        if newly_stored or blob.probe_status is None:
+            schedule_blob_probe(blob, filename, storage)
+        if blob.probe_status == "rejected":
+            return False, blob.probe_error or "Unsupported video format", None
+        file_info["probe_status"] = blob.probe_status
+        file_info["codec_info"] = blob.to_dict()["codec_info"]
+    elif newly_stored:
+        schedule_derivatives(blob, storage)
+
+    if blob.duration is not None and "duration" not in file_info:
+        file_info["duration"] = blob.duration
+        file_info["duration_seconds"] = int(round(blob.duration))
+
+    file_info["media_blob_id"] = blob.id
+    file_info["user_id"] = user_id
+    file_info["slideshow_id"] = slideshow_id
+    return True, f"File '{filename}' uploaded successfully", file_info
+
+
+def _existing_blob_info(
+    storage: StorageManager, blob: MediaBlob, original_filename: str
+) -> Dict[str, Any]:
+    """Build upload file info for an already-stored blob.
+
+    Args:
+        storage: Storage manager holding the blob
+        blob: Existing media blob
+        original_filename: Filename of the new (discarded) upload
+
+    Returns:
+        File info dictionary matching StorageManager.commit_blob()
+    """
+    file_path = storage.base_path / blob.file_path
+    return {
+        "filename": file_path.name,
+        "original_filename": original_filename,
+        "file_path": blob.file_path,
+        "absolute_path": str(file_path),
+        "content_type": blob.content_type,
+        "mime_type": blob.mime_type,
+        "file_size": blob.file_size,
+        "checksum": blob.checksum,
+        "upload_date": datetime.now(timezone.utc).isoformat(),
+        "deduplicated": True,
+    }
+
+
+def _get_or_create_blob(
+    storage: StorageManager,
+    blob: Optional[MediaBlob],
+    file_info: Dict[str, Any],
+    user_id: int,
+) -> MediaBlob:
+    """Record a stored file as a media blob.
+
+    Args:
+        storage: Storage manager holding the file
+        blob: Existing row for the checksum whose file was missing, if any
+        file_info: File info from StorageManager.commit_blob()
+        user_id: ID of the user uploading
+
+    Returns:
+        The media blob row for the stored file
+    """
+    if blob is not None:
+        # The row existed but its file was missing; point it at the new file
+        blob.file_path = file_info["file_path"]
+        blob.file_size = file_info["file_size"]
+        blob.mime_type = file_info["mime_type"]
+        blob.duration = file_info.get("duration", blob.duration)
+        db.session.commit()
+        return blob
+
+    blob = MediaBlob(
+        checksum=file_info["checksum"],
+        content_type=file_info["content_type"],
+        file_path=file_info["file_path"],
+        file_size=file_info["file_size"],
+        mime_type=file_info["mime_type"],
+        duration=file_info.get("duration"),
+        ref_count=0,
+        created_by_id=user_id,
+    )
+    db.session.add(blob)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # A concurrent upload of the same content recorded it first
+        db.session.rollback()
+        blob = MediaBlob.query.filter_by(checksum=file_info["checksum"]).one()
+    return blob
+
+
+def _touch_unreferenced_blob(blob_id: int) -> None:
+    """Restart the orphan grace period of a blob an upload is reusing.
+
+    The item referencing the upload is created by a later request, so an
+    unreferenced blob must not be purged in between. The change is
+    committed before the caller checks the blob's file, so a purge that
+    has not yet listed the blob leaves it alone, and a file deleted by one
+    that had is stored again.
+
+    Args:
+        blob_id: Media blob ID
+    """
+    db.session.execute(
+        update(MediaBlob)
+        .where(MediaBlob.id == blob_id, MediaBlob.ref_count <= 0)
+        .values(updated_at=datetime.now(timezone.utc))
+    )
+    db.session.commit()
+
+
+def _adjust_ref_count(blob_id: int, delta: int) -> None:
+    """Atomically add ``delta`` to a blob's reference count.
+
+    Args:
+        blob_id: Media blob ID
+        delta: Amount to add (negative to release references)
+    """
+    db.session.execute(
+        update(MediaBlob)
+        .where(MediaBlob.id == blob_id)
+        .values(
+            ref_count=MediaBlob.ref_count + delta,
+            updated_at=datetime.now(timezone.utc),
+        )
+    )
+
+
+def attach_item_media(item: SlideshowItem) -> None:
+    """Point a slideshow item at the blob for its content_file_path.
+
+    Call after setting or changing an item's content_file_path or
+    content_type; reference counts of the old and new blobs are adjusted.
+    The caller commits the session.
+
+    Args:
+        item: Slideshow item to update
+
+    Raises:
+        ValidationError: If the file is a video whose codec was rejected
+    """
+    blob_id = None
+    if item.content_type in ("image", "video"):
+        path = normalize_media_path(item.content_file_path)
+        if path:
+            blob = db.session.execute(
+                db.select(
+                    MediaBlob.id, MediaBlob.probe_status, MediaBlob.probe_error
+                ).where(MediaBlob.file_path == path)
+            ).first()
+            if blob is not None and blob.probe_status == "rejected":
+                raise ValidationError(
+                    blob.probe_error or "Unsupported video format",
+                    field="content_file_path",
+                )
+            blob_id = blob.id if blob is not None else None
+
+    if blob_id == item.media_blob_id:
+        return
+    if item.media_blob_id is not None:
+        _adjust_ref_count(item.media_blob_id, -1)
+    if blob_id is not None:
+        _adjust_ref_count(blob_id, 1)
+    item.media_blob_id = blob_id
+
+
+def release_slideshow_media(slideshow_id: int) -> List[int]:
+    """Drop the blob references held by all items of a slideshow.
+
+    Args:
+        slideshow_id: ID of the slideshow being purged
+
+    Returns:
+        IDs of the blobs whose references were released
+    """
+    items = SlideshowItem.query.filter(
+        SlideshowItem.slideshow_id == slideshow_id,
+        SlideshowItem.media_blob_id.isnot(None),
+    ).all()
+
+    released = []
+    for item in items:
+        assert item.media_blob_id is not None
+        released.append(item.media_blob_id)
+        _adjust_ref_count(item.media_blob_id, -1)
+        item.media_blob_id = None
+    db.session.commit()
+    return released
+
+
+def _orphan_cutoff(grace_hours: Optional[float]) -> datetime:
+    """Return the time before which unreferenced blobs may be deleted."""
+    if grace_hours is None:
+        grace_hours = current_app.config.get("MEDIA_ORPHAN_GRACE_HOURS", 24)
+    return datetime.now(timezone.utc) - timedelta(hours=grace_hours)
+
+
+def find_unreferenced_blobs(
+    grace_hours: Optional[float] = None,
+    blob_ids: Optional[Iterable[int]] = None,
+) -> List[MediaBlob]:
+    """Find blobs with no references.
+
+    Args:
+        grace_hours: Only include blobs unreferenced for at least this many
+            hours (defaults to MEDIA_ORPHAN_GRACE_HOURS)
+        blob_ids: Restrict the search to these blob IDs
+
+    Returns:
+        List of unreferenced media blobs
+    """
+    cutoff = _orphan_cutoff(grace_hours)
+    query = MediaBlob.query.filter(
+        MediaBlob.ref_count <= 0, MediaBlob.updated_at <= cutoff
+    )
+    if blob_ids is not None:
+        query = query.filter(MediaBlob.id.in_(list(blob_ids)))
+    return query.all()
+
+
+def purge_unreferenced_blobs(
+    dry_run: bool = False,
+    grace_hours: Optional[float] = None,
+    blob_ids: Optional[Iterable[int]] = None,
+    storage: Optional[StorageManager] = None,
+) -> Dict[str, Any]:
+    """Delete unreferenced blobs and their files.
+
+    Each blob is deleted in its own transaction by a conditional DELETE
+    that re-checks the reference count and grace period, so a blob that
+    an item or upload reused after it was listed keeps its file.
+
+    Args:
+        dry_run: If True, only report what would be deleted
+        grace_hours: Minimum hours a blob must have been unreferenced
+        blob_ids: Restrict the purge to these blob IDs
+        storage: Storage manager holding the files (defaults to the global one)
+
+    Returns:
+        Dictionary with the deleted blobs, their total size and any errors
+    """
+    storage = storage or get_storage_manager()
+    cutoff = _orphan_cutoff(grace_hours)
+    candidates = [
+        (blob.id, blob.to_dict())
+        for blob in find_unreferenced_blobs(grace_hours=grace_hours, blob_ids=blob_ids)
+    ]
+    deleted: List[Dict[str, Any]] = []
+    errors: List[Dict[str, Any]] = []
+
+    for blob_id, info in candidates:
+        if dry_run:
+            deleted.append(info)
+            continue
+        # Load the variants now; their rows are deleted before the blob's
+        blob = db.session.get(
+            MediaBlob,
+            blob_id,
+            options=[
+                selectinload(MediaBlob.derivatives),
+                selectinload(MediaBlob.transcodes),
+            ],
+            populate_existing=True,
+        )
+        if blob is None:
+            continue
+        db.session.execute(
+            delete(MediaDerivative).where(MediaDerivative.media_blob_id == blob_id)
+        )
+        db.session.execute(
+            delete(MediaTranscode).where(MediaTranscode.media_blob_id == blob_id)
+        )
+        result = db.session.execute(
+            delete(MediaBlob)
+            .where(
+                MediaBlob.id == blob_id,
+                MediaBlob.ref_count <= 0,
+                MediaBlob.updated_at <= cutoff,
+            )
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount != 1:
+            db.session.rollback()
+            logger.info(f"Media blob {blob_id} was reused, keeping its file")
+            continue
+
+        file_path = storage.base_path / info["file_path"]
+        try:
+            file_path.unlink(missing_ok=True)
+        except OSError as e:
+            db.session.rollback()
+            errors.append({"path": str(file_path), "error": str(e)})
+            logger.error(f"Failed to delete media blob file {file_path}: {e}")
+            continue
+        delete_derivative_files(blob, storage)
+        delete_transcode_files(blob, storage)
+        forget_files(
+            [info["file_path"]]
+            + [derivative.file_path for derivative in blob.derivatives]
+            + [transcode.file_path for transcode in blob.transcodes],
+            session=db.session,
+        )
+        # The rows are gone; keep the loaded objects readable after commit
+        db.session.expunge(blob)
+        db.session.commit()
+        deleted.append(info)
+        logger.info(f"Deleted unreferenced media blob {info['checksum'][:12]}")
+
+    return {
+        "dry_run": dry_run,
+        "deleted": deleted,
+        "deleted_size_bytes": sum(b["file_size"] for b in deleted),
+        "errors": errors,
+    }
+
+
+def purge_expired_blobs() -> int:
+    """Purge blobs unreferenced for longer than the grace period.
+
+    Run by the scheduler; only one process purges at a time.
+
+    Returns:
+        Number of blobs deleted (0 if another process is purging)
+    """
+    token = claim_lease(PURGE_LEASE, PURGE_LEASE_SECONDS)
+    if token is None:
+        logger.info("Media purge is running in another process")
+        return 0
+    try:
+        result = purge_unreferenced_blobs()
+    finally:
+        release_lease(PURGE_LEASE, token)
+    if result["deleted"]:
+        logger.info(f"Purged {len(result['deleted'])} unreferenced media blobs")
+    return len(result["deleted"])
+
+
+def recount_references() -> int:
+    """Recalculate every blob's reference count from slideshow items.
+
+    Reference counts are maintained incrementally; this repairs them if
+    items were changed outside the application.
+
+    Returns:
+        Number of blobs whose count was corrected
+    """
+    counts = dict(
+        db.session.query(SlideshowItem.media_blob_id, db.func.count(SlideshowItem.id))
+        .filter(SlideshowItem.media_blob_id.isnot(None))
+        .group_by(SlideshowItem.media_blob_id)
+        .all()
+    )
+
+    corrected = 0
+    for blob in MediaBlob.query.all():
+        actual = counts.get(blob.id, 0)
+        if blob.ref_count != actual:
+            blob.ref_count = actual
+            corrected += 1
+    db.session.commit()
+    return corrected
+
+
+def init_media_store(app: Flask) -> None:
+    """Schedule purging of unreferenced media.
+
+    Args:
+        app: Flask application instance
+    """
+    from .scheduler import get_scheduler
+
+    scheduler = get_scheduler(app)
+    if scheduler is not None:
+        scheduler.add_job(
+            "media_orphan_purge",
+            float(app.config.get("MEDIA_ORPHAN_PURGE_INTERVAL", 3600)),
+            purge_expired_blobs,
+        )
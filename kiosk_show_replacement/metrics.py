@@ -11,15 +11,23 @@ Metrics exposed:
 - database_errors_total: Count of database errors
 - storage_errors_total: Count of storage errors
 - display_heartbeat_age_seconds: Age of last display heartbeat
+- display_slide_load_seconds / content_item_load_seconds: Client-reported
+  slide load time histograms per display and per content item
+- display_slide_cache_total, display_dropped_frames_total,
+  display_missed_transitions_total, display_playback_errors_total,
+  display_js_heap_bytes: Client-reported playback metrics
+- log_records_dropped_total: Log records dropped by the async log queue
+- ical_events_pruned_total, ical_event_prune_runs_total,
+  ical_event_prune_duration_seconds: Retention pruning of past iCal events
 """
 
 import threading
 import time
 from collections import defaultdict
 from datetime import datetime, timezone
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from flask import Blueprint, Flask, Response, g, request
+from flask import Blueprint, Flask, Response, current_app, g, request
 
 metrics_bp = Blueprint("metrics", __name__)
 
@@ -35,9 +43,12 @@ class MetricsCollector:
         self._http_requests_total: Dict[Tuple[str, str, int], int] = defaultdict(int)
         self._database_errors_total: int = 0
         self._storage_errors_total: int = 0
+        self._ical_events_pruned_total: int = 0
+        self._ical_event_prune_runs_total: Dict[str, int] = defaultdict(int)
 
         # Gauges
         self._active_sse_connections: int = 0
+        self._ical_event_prune_duration: Optional[float] = None
 
         # Histograms (simplified - just track sum and count per bucket)
         self._http_request_duration_sum: Dict[str, float] = defaultdict(float)
@@ -46,6 +57,31 @@ class MetricsCollector:
             lambda: defaultdict(int)
         )
 
+        # Client playback metrics reported by display beacons
+        self._slide_load_sum: Dict[Tuple[str, str], float] = defaultdict(float)
+        self._slide_load_count: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._slide_load_buckets: Dict[Tuple[str, str], Dict[float, int]] = defaultdict(
+            lambda: defaultdict(int)
+        )
+        self._slide_cache_total: Dict[Tuple[str, str], int] = defaultdict(int)
+        self._dropped_frames_total: Dict[str, int] = defaultdict(int)
+        self._missed_transitions_total: Dict[str, int] = defaultdict(int)
+        self._playback_errors_total: Dict[str, int] = defaultdict(int)
+        self._js_heap_bytes: Dict[str, int] = {}
+
+        # Slide load histogram bucket boundaries (in seconds)
+        self._slide_load_bucket_bounds = [
+            0.05,
+            0.1,
+            0.25,
+            0.5,
+            1.0,
+            2.5,
+            5.0,
+            10.0,
+            30.0,
+        ]
+
         # Histogram bucket boundaries (in seconds)
         self._duration_buckets = [
             0.005,
@@ -90,6 +126,100 @@ class MetricsCollector:
                     break  # Only increment one bucket, cumulative is computed at output
             # Note: values larger than max bucket will only appear in +Inf
 
+    def observe_slide_load(
+        self,
+        display: str,
+        item_id: int,
+        duration: float,
+        cache_hit: Optional[bool] = None,
+    ) -> None:
+        """Record a client-reported slide load time.
+
+        The observation is added to both the per-display and the per-content
+        item histogram (label keys ("display", name) and ("item", id)).
+
+        Args:
+            display: Display name
+            item_id: Slideshow item ID
+            duration: Load time in seconds
+            cache_hit: Whether the content was already cached/preloaded
+        """
+        with self._lock:
+            for key in (("display", display), ("item", str(item_id))):
+                self._slide_load_sum[key] += duration
+                self._slide_load_count[key] += 1
+                for bucket in self._slide_load_bucket_bounds:
+                    if duration <= bucket:
+                        self._slide_load_buckets[key][bucket] += 1
+                        break
+            if cache_hit is not None:
+                result = "hit" if cache_hit else "miss"
+                self._slide_cache_total[(display, result)] += 1
+
+    def inc_playback_counters(
+        self,
+        display: str,
+        dropped_frames: int = 0,
+        missed_transitions: int = 0,
+        errors: int = 0,
+    ) -> None:
+        """Increment client-reported playback counters for a display.
+
+        Args:
+            display: Display name
+            dropped_frames: Number of dropped video frames
+            missed_transitions: Number of late/missed slide transitions
+            errors: Number of playback errors
+        """
+        with self._lock:
+            if dropped_frames:
+                self._dropped_frames_total[display] += dropped_frames
+            if missed_transitions:
+                self._missed_transitions_total[display] += missed_transitions
+            if errors:
+                self._playback_errors_total[display] += errors
+
+    def set_display_js_heap(self, display: str, heap_bytes: int) -> None:
+        """Set the most recently reported JS heap size for a display.
+
+        Args:
+            display: Display name
+            heap_bytes: Used JS heap size in bytes
+        """
+        with self._lock:
+            self._js_heap_bytes[display] = heap_bytes
+
+    def _slide_load_histogram_lines(
+        self, name: str, kind: str, label: str
+    ) -> List[str]:
+        """Render one of the slide load histograms. Caller must hold the lock.
+
+        Args:
+            name: Metric name
+            kind: Key kind ("display" or "item")
+            label: Prometheus label name for the key value
+
+        Returns:
+            Lines of Prometheus text for the histogram samples
+        """
+        lines: List[str] = []
+        keys = sorted(k for k in self._slide_load_count if k[0] == kind)
+        for key in keys:
+            safe_value = _escape_label_value(key[1])
+            cumulative = 0
+            for bucket in self._slide_load_bucket_bounds:
+                cumulative += self._slide_load_buckets[key].get(bucket, 0)
+                lines.append(
+                    f'{name}_bucket{{{label}="{safe_value}",le="{bucket}"}} {cumulative}'
+                )
+            count = self._slide_load_count[key]
+            lines.append(f'{name}_bucket{{{label}="{safe_value}",le="+Inf"}} {count}')
+            lines.append(
+                f'{name}_sum{{{label}="{safe_value}"}} {self._slide_load_sum[key]:.6f}'
+            )
+            lines.append(f'{name}_count{{{label}="{safe_value}"}} {count}')
+        return lines
+
     def inc_database_errors(self) -> None:
         """Increment database error counter."""
         with self._lock:
@@ -100,6 +230,21 @@ class MetricsCollector:
         with self._lock:
             self._storage_errors_total += 1
 
+    def observe_ical_event_prune(
+        self, deleted: int, duration: float, success: bool
+    ) -> None:
+        """Record a run of the iCal event retention pruning.
+
+        Args:
+            deleted: Number of events deleted
+            duration: Run time in seconds
+            success: Whether the run completed without a database error
+        """
+        with self._lock:
+            self._ical_events_pruned_total += deleted
+            self._ical_event_prune_runs_total["success" if success else "error"] += 1
+            self._ical_event_prune_duration = duration
+
     def set_sse_connections(self, count: int) -> None:
         """Set the number of active SSE connections.
 
@@ -180,6 +325,111 @@ class MetricsCollector:
             lines.append("# TYPE storage_errors_total counter")
             lines.append(f"storage_errors_total {self._storage_errors_total}")
 
+            # Client playback metrics
+            lines.append("")
+            lines.append(
+                "# HELP display_slide_load_seconds "
+                "Client-reported slide load time per display"
+            )
+            lines.append("# TYPE display_slide_load_seconds histogram")
+            lines.extend(
+                self._slide_load_histogram_lines(
+                    "display_slide_load_seconds", "display", "display_name"
+                )
+            )
+
+            lines.append("")
+            lines.append(
+                "# HELP content_item_load_seconds "
+                "Client-reported slide load time per content item"
+            )
+            lines.append("# TYPE content_item_load_seconds histogram")
+            lines.extend(
+                self._slide_load_histogram_lines(
+                    "content_item_load_seconds", "item", "item_id"
+                )
+            )
+
+            lines.append("")
+            lines.append(
+                "# HELP display_slide_cache_total "
+                "Slide loads served from preload cache (hit) or network (miss)"
+            )
+            lines.append("# TYPE display_slide_cache_total counter")
+            for (display, result), count in sorted(self._slide_cache_total.items()):
+                safe_name = _escape_label_value(display)
+                lines.append(
+                    f'display_slide_cache_total{{display_name="{safe_name}",'
+                    f'result="{result}"}} {count}'
+                )
+
+            for name, help_text, values in (
+                (
+                    "display_dropped_frames_total",
+                    "Dropped video frames reported by displays",
+                    self._dropped_frames_total,
+                ),
+                (
+                    "display_missed_transitions_total",
+                    "Slide transitions that fired late on displays",
+                    self._missed_transitions_total,
+                ),
+                (
+                    "display_playback_errors_total",
+                    "Content load/playback errors reported by displays",
+                    self._playback_errors_total,
+                ),
+            ):
+                lines.append("")
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} counter")
+                for display, count in sorted(values.items()):
+                    safe_name = _escape_label_value(display)
+                    lines.append(f'{name}{{display_name="{safe_name}"}} {count}')
+
+            lines.append("")
+            lines.append(
+                "# HELP display_js_heap_bytes "
+                "Most recent JS heap usage reported by displays"
+            )
+            lines.append("# TYPE display_js_heap_bytes gauge")
+            for display, heap_bytes in sorted(self._js_heap_bytes.items()):
+                safe_name = _escape_label_value(display)
+                lines.append(
+                    f'display_js_heap_bytes{{display_name="{safe_name}"}} {heap_bytes}'
+                )
+
+            lines.append("")
+            lines.append(
+                "# HELP ical_events_pruned_total "
+                "Past iCal events deleted by retention pruning"
+            )
+            lines.append("# TYPE ical_events_pruned_total counter")
+            lines.append(f"ical_events_pruned_total {self._ical_events_pruned_total}")
+
+            lines.append("")
+            lines.append(
+                "# HELP ical_event_prune_runs_total "
+                "iCal event retention pruning runs by result"
+            )
+            lines.append("# TYPE ical_event_prune_runs_total counter")
+            for result, count in sorted(self._ical_event_prune_runs_total.items()):
+                lines.append(
+                    f'ical_event_prune_runs_total{{result="{result}"}} {count}'
+                )
+
+            if self._ical_event_prune_duration is not None:
+                lines.append("")
+                lines.append(
+                    "# HELP ical_event_prune_duration_seconds "
+                    "Duration of the last iCal event retention pruning run"
+                )
+                lines.append("# TYPE ical_event_prune_duration_seconds gauge")
+                lines.append(
+                    "ical_event_prune_duration_seconds "
+                    f"{self._ical_event_prune_duration:.3f}"
+                )
+
         return "\n".join(lines) + "\n"
 
 
@@ -483,6 +733,51 @@ def get_sse_connection_metrics() -> None:
         pass
 
 
+def get_logging_metrics() -> str:
+    """Get async log handler queue metrics.
+
+    Returns:
+        Prometheus-formatted metrics for the async log queue, or an empty
+        string when async logging is not in use
+    """
+    try:
+        from .logging_config import AsyncBatchingHandler
+
+        handlers = [
+            h
+            for h in current_app.logger.handlers
+            if isinstance(h, AsyncBatchingHandler)
+        ]
+        if not handlers:
+            return ""
+
+        stats = [h.get_stats() for h in handlers]
+        lines: List[str] = []
+
+        lines.append(
+            "# HELP log_records_dropped_total "
+            "Log records dropped because the async log queue was full"
+        )
+        lines.append("# TYPE log_records_dropped_total counter")
+        lines.append(f"log_records_dropped_total {sum(s['dropped'] for s in stats)}")
+
+        lines.append("")
+        lines.append(
+            "# HELP log_records_written_total Log records written by the async logger"
+        )
+        lines.append("# TYPE log_records_written_total counter")
+        lines.append(f"log_records_written_total {sum(s['written'] for s in stats)}")
+
+        lines.append("")
+        lines.append("# HELP log_queue_depth Log records waiting to be written")
+        lines.append("# TYPE log_queue_depth gauge")
+        lines.append(f"log_queue_depth {sum(s['queued'] for s in stats)}")
+
+        return "\n".join(lines) + "\n"
+    except Exception:
+        return ""
+
+
 @metrics_bp.route("/metrics")
 def metrics_endpoint() -> Response:
     """Prometheus metrics endpoint.
@@ -504,6 +799,11 @@ def metrics_endpoint() -> Response:
     # Add summary metrics
     output += "\n" + get_summary_metrics()
 
+    # Add async logging queue metrics
+    logging_metrics = get_logging_metrics()
+    if logging_metrics:
+        output += "\n" + logging_metrics
+
     return Response(output, mimetype="text/plain; charset=utf-8")
 
 
@@ -516,3 +816,46 @@ def record_database_error() -> None:
 def record_storage_error() -> None:
     """Record a storage error occurrence."""
     metrics_collector.inc_storage_errors()
+
+
+def record_ical_event_prune(deleted: int, duration: float, success: bool) -> None:
+    """Record a run of the iCal event retention pruning.
+
+    Args:
+        deleted: Number of events deleted
+        duration: Run time in seconds
+        success: Whether the run completed without a database error
+    """
+    metrics_collector.observe_ical_event_prune(deleted, duration, success)
+
+
+def record_playback_sample(
+    display: str,
+    item_id: Optional[int] = None,
+    load_ms: Optional[float] = None,
+    cache_hit: Optional[bool] = None,
+    dropped_frames: int = 0,
+    missed_transition: bool = False,
+    error: bool = False,
+) -> None:
+    """Record one client playback beacon sample.
+
+    Args:
+        display: Display name
+        item_id: Slideshow item the sample refers to
+        load_ms: Slide load time in milliseconds
+        cache_hit: Whether the content was already cached/preloaded
+        dropped_frames: Number of dropped video frames
+        missed_transition: Whether the slide transition fired late
+        error: Whether loading/playing the content failed
+    """
+    if item_id is not None and load_ms is not None:
+        metrics_collector.observe_slide_load(
+            display, item_id, load_ms / 1000, cache_hit=cache_hit
+        )
+    metrics_collector.inc_playback_counters(
+        display,
+        dropped_frames=dropped_frames,
+        missed_transitions=1 if missed_transition else 0,
+        errors=1 if error else 0,
+    )
@@ -6,6 +6,10 @@ This module contains SQLAlchemy model definitions for:
 - Display: Connected kiosk device information
 - Slideshow: Collection of slideshow items with metadata
 - SlideshowItem: Individual content items within slideshows
+- MediaBlob: Content-addressed uploaded media with reference counts
+- StoredFile: Catalog of uploaded files on disk, for storage statistics
+- StorageScan: Results of background storage integrity scans
+- JobLease: Claims of background jobs that run in one process at a time
 
 All models include proper relationships, constraints, and audit fields
 for tracking creation and modification. Designed for easy migration
@@ -21,14 +25,28 @@ __all__ = [
     "DisplayConfigurationTemplate",
     "ICalFeed",
     "ICalEvent",
+    "ICalEventResource",
+    "ICalRefreshJob",
+    "DisplayTelemetry",
+    "MediaBlob",
+    "MediaDerivative",
+    "MediaTranscode",
+    "VideoProbeCache",
+    "StoredFile",
+    "StorageScan",
+    "StorageScanIssue",
+    "StorageScanDirectory",
+    "JobLease",
 ]
 
 from datetime import datetime, timezone
 from typing import TYPE_CHECKING, Any, List, Optional
 
 from sqlalchemy import (
+    BigInteger,
     Boolean,
     DateTime,
+    Float,
     ForeignKey,
     Index,
     Integer,
@@ -40,6 +58,7 @@ from sqlalchemy.orm import Mapped, backref, mapped_column, relationship, validat
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from ..app import db
+from ..skedda_layout import SLOT_MINUTES_CHOICES
 
 if TYPE_CHECKING:
     pass  # Forward references for type checking
@@ -563,8 +582,15 @@ class Slideshow(db.Model):
         """Alias for default_item_duration for backward compatibility."""
         return self.default_item_duration
 
-    def to_dict(self, include_items: bool = False) -> dict:
-        """Convert slideshow to dictionary for JSON serialization."""
+    def to_dict(
+        self, include_items: bool = False, display: Optional["Display"] = None
+    ) -> dict:
+        """Convert slideshow to dictionary for JSON serialization.
+
+        Args:
+            include_items: Include the active items as "slides"
+            display: Display the slides are shown on (see SlideshowItem.to_dict)
+        """
         data = {
             "id": self.id,
             "name": self.name,
@@ -581,7 +607,9 @@ class Slideshow(db.Model):
         }
 
         if include_items:
-            data["slides"] = [item.to_dict() for item in self.items if item.is_active]
+            data["slides"] = [
+                item.to_dict(display=display) for item in self.items if item.is_active
+            ]
 
         return data
 
@@ -641,6 +669,9 @@ class SlideshowItem(db.Model):
     content_file_path: Mapped[Optional[str]] = mapped_column(
         String(500)
     )  # Local file path for uploaded content
+    media_blob_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("media_blobs.id")
+    )  # Content-addressed blob backing content_file_path (if any)
 
     # Display settings
     display_duration: Mapped[Optional[int]] = mapped_column(
@@ -661,6 +692,11 @@ class SlideshowItem(db.Model):
     ical_refresh_minutes: Mapped[Optional[int]] = mapped_column(
         Integer
     )  # Refresh interval in minutes, default 15 in application logic
+    # Calendar grid hours and slot length (see skedda_layout.DayLayout);
+    # NULL uses the default 7 AM to 11 PM in 30-minute slots
+    ical_day_start_hour: Mapped[Optional[int]] = mapped_column(Integer)
+    ical_day_end_hour: Mapped[Optional[int]] = mapped_column(Integer)
+    ical_slot_minutes: Mapped[Optional[int]] = mapped_column(Integer)
 
     # Audit fields
     created_at: Mapped[datetime] = mapped_column(
@@ -689,6 +725,9 @@ class SlideshowItem(db.Model):
     ical_feed: Mapped[Optional["ICalFeed"]] = relationship(
         "ICalFeed", back_populates="slideshow_items"
     )
+    media_blob: Mapped[Optional["MediaBlob"]] = relationship(
+        "MediaBlob", back_populates="items"
+    )
 
     def __repr__(self) -> str:
         return f"<SlideshowItem {self.title or self.content_type}>"
@@ -730,8 +769,50 @@ class SlideshowItem(db.Model):
             return None
         return None
 
-    def to_dict(self) -> dict:
-        """Convert slideshow item to dictionary for JSON serialization."""
+    def get_display_url(self, display: Optional["Display"] = None) -> Optional[str]:
+        """Get the display URL, using the best resized image or video for a display.
+
+        Videos converted from an unsupported codec always use the converted
+        copy; lower-bitrate renditions and resized images are only chosen
+        for a display.
+
+        Args:
+            display: Display the item is shown on (None for the original)
+
+        Returns:
+            URL of a resized image or transcoded video if one suits the
+            display, else display_url
+        """
+        if (
+            display is not None
+            and self.content_type == "image"
+            and self.media_blob is not None
+        ):
+            derivative = self.media_blob.best_derivative(
+                display.resolution_width, display.resolution_height, display.rotation
+            )
+            if derivative is not None:
+                return f"/uploads/{derivative.file_path}"
+        elif self.content_type == "video" and self.media_blob is not None:
+            if display is not None:
+                transcode = self.media_blob.best_transcode(
+                    display.resolution_width,
+                    display.resolution_height,
+                    display.rotation,
+                )
+            else:
+                transcode = self.media_blob.best_transcode()
+            if transcode is not None:
+                return f"/uploads/{transcode.file_path}"
+        return self.display_url
+
+    def to_dict(self, display: Optional["Display"] = None) -> dict:
+        """Convert slideshow item to dictionary for JSON serialization.
+
+        Args:
+            display: Display the item is shown on; its resolution selects a
+                resized image or video rendition for display_url
+        """
         data = {
             "id": self.id,
             "slideshow_id": self.slideshow_id,
@@ -740,8 +821,9 @@ class SlideshowItem(db.Model):
             "content_url": self.content_url,
             "content_text": self.content_text,
             "content_file_path": self.content_file_path,
+            "media_blob_id": self.media_blob_id,
             "content_source": self.content_source,
-            "display_url": self.display_url,
+            "display_url": self.get_display_url(display),
             "display_duration": self.display_duration,
             "effective_duration": self.effective_duration,
             "order_index": self.order_index,
@@ -754,6 +836,9 @@ class SlideshowItem(db.Model):
         if self.content_type == "skedda":
             data["ical_feed_id"] = self.ical_feed_id
             data["ical_refresh_minutes"] = self.ical_refresh_minutes
+            data["ical_day_start_hour"] = self.ical_day_start_hour
+            data["ical_day_end_hour"] = self.ical_day_end_hour
+            data["ical_slot_minutes"] = self.ical_slot_minutes
             # Include the URL from the feed for display/editing purposes.
             # Only access ical_feed if already eager-loaded to avoid N+1 queries
             # when serializing lists of items. Check __dict__ to see if the
@@ -827,6 +912,25 @@ class SlideshowItem(db.Model):
             raise ValueError("iCal refresh interval must be between 1 and 1440 minutes")
         return refresh_minutes
 
+    @validates("ical_day_start_hour", "ical_day_end_hour", "ical_slot_minutes")
+    def validate_ical_day_layout(self, key: str, value: Optional[int]) -> Optional[int]:
+        """Validate a calendar grid setting.
+
+        Start hour must be 0-23, end hour 1-24 and the slot length one of
+        skedda_layout.SLOT_MINUTES_CHOICES. The settings are checked
+        together (end after start) by the API.
+        """
+        if value is None:
+            return value
+        if key == "ical_day_start_hour" and not 0 <= value <= 23:
+            raise ValueError("Calendar start hour must be between 0 and 23")
+        if key == "ical_day_end_hour" and not 1 <= value <= 24:
+            raise ValueError("Calendar end hour must be between 1 and 24")
+        if key == "ical_slot_minutes" and value not in SLOT_MINUTES_CHOICES:
+            choices = ", ".join(str(m) for m in SLOT_MINUTES_CHOICES)
+            raise ValueError(f"Calendar slot length must be one of {choices} minutes")
+        return value
+
 
 class AssignmentHistory(db.Model):
     """Model for tracking slideshow assignment history and audit trail."""
@@ -1066,6 +1170,19 @@ class ICalFeed(db.Model):
     url: Mapped[str] = mapped_column(String(500), unique=True, index=True)
     last_fetched: Mapped[Optional[datetime]] = mapped_column(DateTime)
     last_error: Mapped[Optional[str]] = mapped_column(Text)
+    # Set while a refresh is in progress, so that only one thread or process
+    # refreshes the feed at a time
+    refresh_started_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    # Validators from the last successful fetch, sent with the next request
+    # so an unchanged feed is answered with 304 Not Modified
+    etag: Mapped[Optional[str]] = mapped_column(String(255))
+    last_modified: Mapped[Optional[str]] = mapped_column(String(64))
+    # SHA-256 of the ICS content last stored, so an unchanged feed from a
+    # server without validators is not parsed and synced again
+    content_hash: Mapped[Optional[str]] = mapped_column(String(64))
+    # Incremented whenever the stored events change, so cached calendars
+    # and their ETags survive refreshes that change nothing
+    events_revision: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
 
     # Audit fields
     created_at: Mapped[datetime] = mapped_column(
@@ -1134,7 +1251,6 @@ class ICalEvent(db.Model):
     description: Mapped[Optional[str]] = mapped_column(Text)
     start_time: Mapped[datetime] = mapped_column(DateTime, index=True)
     end_time: Mapped[datetime] = mapped_column(DateTime)
-    resources: Mapped[Optional[str]] = mapped_column(Text)  # JSON array of space names
     attendee_name: Mapped[Optional[str]] = mapped_column(String(200))
     attendee_email: Mapped[Optional[str]] = mapped_column(String(200))
 
@@ -1150,6 +1266,12 @@ class ICalEvent(db.Model):
 
     # Relationships
     feed: Mapped["ICalFeed"] = relationship("ICalFeed", back_populates="events")
+    resource_entries: Mapped[List["ICalEventResource"]] = relationship(
+        "ICalEventResource",
+        back_populates="event",
+        cascade="all, delete-orphan",
+        order_by="ICalEventResource.name",
+    )
 
     # Constraints and indexes
     __table_args__ = (
@@ -1160,24 +1282,19 @@ class ICalEvent(db.Model):
     def __repr__(self) -> str:
         return f"<ICalEvent {self.summary[:30]}...>"
 
+    @property
+    def resources(self) -> List[str]:
+        """Names of the spaces/resources booked by the event, sorted."""
+        return [entry.name for entry in self.resource_entries]
+
+    @resources.setter
+    def resources(self, names: List[str]) -> None:
+        self.resource_entries = [
+            ICalEventResource(name=name) for name in sorted(set(names))
+        ]
+
     def to_dict(self) -> dict:
         """Convert event to dictionary for JSON serialization."""
-        import json
-        import logging
-
-        resources_list = []
-        if self.resources:
-            try:
-                resources_list = json.loads(self.resources)
-            except (json.JSONDecodeError, TypeError) as e:
-                logging.getLogger(__name__).warning(
-                    "Invalid resources JSON for ICalEvent %s (uid=%s): %s",
-                    self.id,
-                    self.uid,
-                    e,
-                )
-                resources_list = []
-
         return {
             "id": self.id,
             "feed_id": self.feed_id,
@@ -1186,7 +1303,7 @@ class ICalEvent(db.Model):
             "description": self.description,
             "start_time": self.start_time.isoformat() if self.start_time else None,
             "end_time": self.end_time.isoformat() if self.end_time else None,
-            "resources": resources_list,
+            "resources": self.resources,
             "attendee_name": self.attendee_name,
             "attendee_email": self.attendee_email,
             "created_at": self.created_at.isoformat() if self.created_at else None,
@@ -1212,3 +1329,723 @@ class ICalEvent(db.Model):
         if len(uid) > 500:
             raise ValueError("Event UID must be 500 characters or less")
         return uid
+
+
+class ICalEventResource(db.Model):
+    """Model representing a space/resource booked by an iCal event.
+
+    Stored one row per space so that the spaces of a feed can be listed
+    with a single indexed query, and an event's spaces read without
+    decoding JSON.
+    """
+
+    __tablename__ = "ical_event_resources"
+
+    event_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("ical_events.id"), primary_key=True
+    )
+    name: Mapped[str] = mapped_column(String(500), primary_key=True)
+
+    # Relationships
+    event: Mapped["ICalEvent"] = relationship(
+        "ICalEvent", back_populates="resource_entries"
+    )
+
+    def __repr__(self) -> str:
+        return f"<ICalEventResource {self.name[:30]}>"
+
+
+class ICalRefreshJob(db.Model):
+    """A background refresh of every iCal feed.
+
+    Started by ``POST /api/v1/ical-feeds/refresh``; feeds are fetched
+    concurrently and the job records progress as each one finishes.
+    ``status`` is "queued", "running", "completed" or "failed";
+    ``updated_at`` is refreshed as feeds finish, so a job whose process died
+    can be told apart from one still running.
+    """
+
+    __tablename__ = "ical_refresh_jobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    status: Mapped[str] = mapped_column(String(20), default="queued", index=True)
+    feed_count: Mapped[int] = mapped_column(Integer, default=0)
+    feeds_done: Mapped[int] = mapped_column(Integer, default=0)
+    feeds_refreshed: Mapped[int] = mapped_column(Integer, default=0)
+    feeds_skipped: Mapped[int] = mapped_column(Integer, default=0)
+    errors: Mapped[Optional[str]] = mapped_column(Text)  # JSON array
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    created_by_id: Mapped[Optional[int]] = mapped_column(Integer)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    def __repr__(self) -> str:
+        return f"<ICalRefreshJob {self.id} {self.status}>"
+
+    def to_dict(self) -> dict:
+        """Convert job to dictionary for JSON serialization."""
+        import json
+
+        return {
+            "id": self.id,
+            "status": self.status,
+            "feed_count": self.feed_count,
+            "feeds_done": self.feeds_done,
+            "feeds_refreshed": self.feeds_refreshed,
+            "feeds_skipped": self.feeds_skipped,
+            "progress": (
+                round(self.feeds_done / self.feed_count, 3)
+                if self.feed_count
+                else (1.0 if self.status == "completed" else 0.0)
+            ),
+            "errors": json.loads(self.errors) if self.errors else [],
+            "error": self.error,
+            "created_by_id": self.created_by_id,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "completed_at": (
+                self.completed_at.isoformat() if self.completed_at else None
+            ),
+        }
+
+
+class DisplayTelemetry(db.Model):
+    """Time-series telemetry sample (or downsampled rollup) for a display.
+
+    Raw samples have ``bucket_seconds == 0`` and ``sample_count == 1``.
+    The retention job folds old raw samples into rollup rows covering
+    ``bucket_seconds`` starting at ``recorded_at``, keeping count, sum,
+    min and max so averages can still be computed from rollups.
+
+    Kinds:
+        heartbeat: value is seconds since the previous heartbeat
+        render: value is client-side slide render time in milliseconds
+        error: client-side playback error (detail holds the message)
+    """
+
+    __tablename__ = "display_telemetry"
+
+    KINDS = ("heartbeat", "render", "error")
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    display_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("displays.id", ondelete="CASCADE")
+    )
+    kind: Mapped[str] = mapped_column(String(20))
+    recorded_at: Mapped[datetime] = mapped_column(DateTime)
+    bucket_seconds: Mapped[int] = mapped_column(Integer, default=0)
+    sample_count: Mapped[int] = mapped_column(Integer, default=1)
+    value_sum: Mapped[Optional[float]] = mapped_column(Float)
+    value_min: Mapped[Optional[float]] = mapped_column(Float)
+    value_max: Mapped[Optional[float]] = mapped_column(Float)
+    resolution_width: Mapped[Optional[int]] = mapped_column(Integer)
+    resolution_height: Mapped[Optional[int]] = mapped_column(Integer)
+    detail: Mapped[Optional[str]] = mapped_column(String(500))
+
+    # Relationships
+    # passive_deletes=True lets the database CASCADE delete telemetry rows
+    display: Mapped["Display"] = relationship(
+        "Display", backref=backref("telemetry", passive_deletes=True)
+    )
+
+    __table_args__ = (
+        Index(
+            "ix_display_telemetry_display_kind_time",
+            "display_id",
+            "kind",
+            "recorded_at",
+        ),
+        Index("ix_display_telemetry_bucket_time", "bucket_seconds", "recorded_at"),
+    )
+
+    def __repr__(self) -> str:
+        return f"<DisplayTelemetry {self.display_id}: {self.kind}>"
+
+    def to_dict(self) -> dict:
+        """Convert telemetry row to dictionary for JSON serialization."""
+        return {
+            "id": self.id,
+            "display_id": self.display_id,
+            "kind": self.kind,
+            "recorded_at": self.recorded_at.isoformat() if self.recorded_at else None,
+            "bucket_seconds": self.bucket_seconds,
+            "sample_count": self.sample_count,
+            "value_sum": self.value_sum,
+            "value_min": self.value_min,
+            "value_max": self.value_max,
+            "resolution_width": self.resolution_width,
+            "resolution_height": self.resolution_height,
+            "detail": self.detail,
+        }
+
+    @validates("kind")
+    def validate_kind(self, key: str, kind: str) -> str:
+        """Validate telemetry kind."""
+        if kind not in self.KINDS:
+            raise ValueError(f"Telemetry kind must be one of {', '.join(self.KINDS)}")
+        return kind
+
+
+class MediaBlob(db.Model):
+    """Uploaded media file stored once per unique content.
+
+    Files are stored under a path derived from their SHA-256 checksum, so
+    identical uploads share one file. ``ref_count`` is the number of
+    slideshow items (active or soft-deleted) referencing the blob; blobs
+    whose count has been zero for longer than the orphan grace period are
+    deleted by storage cleanup.
+
+    Videos are probed with ffprobe after upload by the media probe worker
+    pool; ``probe_status`` tracks that ("pending", "ready", "failed" when
+    ffprobe could not read the file, or "rejected" for unsupported codecs).
+    Images are not probed and have no probe status; instead, resized
+    variants for smaller displays are generated in the background (see
+    MediaDerivative).
+
+    When video transcoding is enabled, a video with an unsupported codec is
+    marked "transcoding" instead of "rejected" and converted by ffmpeg;
+    converted copies and lower-bitrate renditions are MediaTranscode rows.
+    """
+
+    __tablename__ = "media_blobs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    checksum: Mapped[str] = mapped_column(String(64), unique=True)  # SHA-256 hex
+    content_type: Mapped[str] = mapped_column(String(20))  # 'image' or 'video'
+    file_path: Mapped[str] = mapped_column(
+        String(500), unique=True
+    )  # Relative to the upload folder
+    file_size: Mapped[int] = mapped_column(BigInteger)
+    mime_type: Mapped[Optional[str]] = mapped_column(String(100))
+    duration: Mapped[Optional[float]] = mapped_column(Float)  # Videos only
+    ref_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    # Video probe results
+    probe_status: Mapped[Optional[str]] = mapped_column(String(20))
+    video_codec: Mapped[Optional[str]] = mapped_column(String(50))
+    audio_codec: Mapped[Optional[str]] = mapped_column(String(50))
+    container_format: Mapped[Optional[str]] = mapped_column(String(100))
+    probe_error: Mapped[Optional[str]] = mapped_column(Text)
+
+    # Audit fields
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+    created_by_id: Mapped[Optional[int]] = mapped_column(
+        Integer, ForeignKey("users.id")
+    )
+
+    # Relationships
+    items: Mapped[List["SlideshowItem"]] = relationship(
+        "SlideshowItem", back_populates="media_blob"
+    )
+    created_by: Mapped[Optional["User"]] = relationship("User")
+    derivatives: Mapped[List["MediaDerivative"]] = relationship(
+        "MediaDerivative",
+        back_populates="media_blob",
+        cascade="all, delete-orphan",
+        order_by="MediaDerivative.width",
+    )
+    transcodes: Mapped[List["MediaTranscode"]] = relationship(
+        "MediaTranscode",
+        back_populates="media_blob",
+        cascade="all, delete-orphan",
+        order_by="MediaTranscode.id",
+    )
+
+    __table_args__ = (Index("ix_media_blobs_ref_count", "ref_count", "updated_at"),)
+
+    def __repr__(self) -> str:
+        return f"<MediaBlob {self.checksum[:12]} refs={self.ref_count}>"
+
+    def best_derivative(
+        self,
+        display_width: Optional[int],
+        display_height: Optional[int],
+        rotation: int = 0,
+    ) -> Optional["MediaDerivative"]:
+        """Get the smallest derivative that fills a display without upscaling.
+
+        The image is shown scaled to fit the display, so a derivative is
+        large enough if it is at least as wide as the fitted image. For
+        displays rotated 90 or 270 degrees the content area is portrait.
+
+        Args:
+            display_width: Display width in pixels (None if unknown)
+            display_height: Display height in pixels (None if unknown)
+            rotation: Display rotation in degrees
+
+        Returns:
+            The best derivative, or None if the original should be used
+        """
+        if not display_width or not display_height:
+            return None
+        if rotation in (90, 270):
+            display_width, display_height = display_height, display_width
+
+        for derivative in sorted(self.derivatives, key=lambda d: d.width):
+            fitted_width = min(
+                display_width, display_height * derivative.width / derivative.height
+            )
+            # Allow for rounding of the derivative's dimensions
+            if derivative.width + 1 >= fitted_width:
+                return derivative
+        return None
+
+    def best_transcode(
+        self,
+        display_width: Optional[int] = None,
+        display_height: Optional[int] = None,
+        rotation: int = 0,
+    ) -> Optional["MediaTranscode"]:
+        """Get the completed transcode of this video to play on a display.
+
+        The smallest rendition at least as tall as the display's content
+        area is preferred; otherwise the converted copy of a video whose
+        own codec is unsupported is used.
+
+        Args:
+            display_width: Display width in pixels (None if unknown)
+            display_height: Display height in pixels (None if unknown)
+            rotation: Display rotation in degrees
+
+        Returns:
+            The transcode to play, or None if the original should be used
+        """
+        completed = [t for t in self.transcodes if t.status == "completed"]
+        if display_width and display_height:
+            if rotation in (90, 270):
+                display_width, display_height = display_height, display_width
+            renditions = sorted(
+                (t for t in completed if t.kind == "rendition"),
+                key=lambda t: (t.max_height, t.bitrate_kbps),
+            )
+            for rendition in renditions:
+                if rendition.max_height >= display_height:
+                    return rendition
+        for transcode in completed:
+            if transcode.kind == "primary":
+                return transcode
+        return None
+
+    def to_dict(self) -> dict:
+        """Convert media blob to dictionary for JSON serialization."""
+        return {
+            "id": self.id,
+            "checksum": self.checksum,
+            "content_type": self.content_type,
+            "file_path": self.file_path,
+            "file_size": self.file_size,
+            "mime_type": self.mime_type,
+            "duration": self.duration,
+            "ref_count": self.ref_count,
+            "probe_status": self.probe_status,
+            "codec_info": (
+                {
+                    "video_codec": self.video_codec,
+                    "audio_codec": self.audio_codec,
+                    "container_format": self.container_format,
+                }
+                if self.probe_status in ("ready", "rejected")
+                else None
+            ),
+            "probe_error": self.probe_error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+        }
+
+
+class MediaDerivative(db.Model):
+    """Resized, recompressed copy of an image blob for smaller displays.
+
+    Derivatives are generated in the background after upload at each
+    configured size that is smaller than the original; ``max_size`` is the
+    long-edge bound the image was fitted to, and ``width``/``height`` are
+    the resulting dimensions.
+    """
+
+    __tablename__ = "media_derivatives"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    media_blob_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("media_blobs.id"), index=True
+    )
+    format: Mapped[str] = mapped_column(String(10))  # 'webp' or 'avif'
+    max_size: Mapped[int] = mapped_column(Integer)
+    width: Mapped[int] = mapped_column(Integer)
+    height: Mapped[int] = mapped_column(Integer)
+    file_path: Mapped[str] = mapped_column(
+        String(500), unique=True
+    )  # Relative to the upload folder
+    file_size: Mapped[int] = mapped_column(BigInteger)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
+
+    media_blob: Mapped["MediaBlob"] = relationship(
+        "MediaBlob", back_populates="derivatives"
+    )
+
+    __table_args__ = (
+        UniqueConstraint(
+            "media_blob_id", "max_size", "format", name="uq_media_derivative_size"
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return f"<MediaDerivative {self.width}x{self.height} {self.format}>"
+
+    def to_dict(self) -> dict:
+        """Convert derivative to dictionary for JSON serialization."""
+        return {
+            "id": self.id,
+            "format": self.format,
+            "max_size": self.max_size,
+            "width": self.width,
+            "height": self.height,
+            "file_path": self.file_path,
+            "file_size": self.file_size,
+        }
+
+
+class MediaTranscode(db.Model):
+    """ffmpeg conversion of a video blob, queued and tracked as a job.
+
+    A "primary" transcode converts a video whose codec browsers cannot
+    play; "rendition" transcodes are lower-bitrate copies for displays with
+    smaller screens or weaker hardware. ``max_height`` bounds the output
+    height (videos are never upscaled) and ``status`` is one of "queued",
+    "running", "completed", "failed" or "cancelled".
+    """
+
+    __tablename__ = "media_transcodes"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    media_blob_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("media_blobs.id"), index=True
+    )
+    kind: Mapped[str] = mapped_column(String(20))  # 'primary' or 'rendition'
+    format: Mapped[str] = mapped_column(String(10))  # 'mp4' or 'webm'
+    max_height: Mapped[int] = mapped_column(Integer)
+    bitrate_kbps: Mapped[int] = mapped_column(Integer)
+    status: Mapped[str] = mapped_column(String(20), default="queued", index=True)
+    progress: Mapped[float] = mapped_column(Float, default=0.0)  # 0.0 - 1.0
+    file_path: Mapped[str] = mapped_column(
+        String(500), unique=True
+    )  # Relative to the upload folder
+    file_size: Mapped[Optional[int]] = mapped_column(BigInteger)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
+    started_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    media_blob: Mapped["MediaBlob"] = relationship(
+        "MediaBlob", back_populates="transcodes"
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f"<MediaTranscode {self.kind} {self.max_height}p "
+            f"{self.bitrate_kbps}k {self.format} {self.status}>"
+        )
+
+    def to_dict(self) -> dict:
+        """Convert transcode to dictionary for JSON serialization."""
+        return {
+            "id": self.id,
+            "media_blob_id": self.media_blob_id,
+            "kind": self.kind,
+            "format": self.format,
+            "max_height": self.max_height,
+            "bitrate_kbps": self.bitrate_kbps,
+            "status": self.status,
+            "progress": self.progress,
+            "file_path": self.file_path,
+            "file_size": self.file_size,
+            "error": self.error,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "completed_at": (
+                self.completed_at.isoformat() if self.completed_at else None
+            ),
+        }
+
+
+class VideoProbeCache(db.Model):
+    """Cached ffprobe result for a video file or URL.
+
+    ``source`` identifies the probed content: ``sha256:<checksum>`` for
+    local files, or ``url:<url>`` for remote videos, whose ``etag`` and
+    ``last_modified`` response headers are kept to check whether the video
+    has changed. ``cache_key`` is the SHA-256 of ``source``, so URLs of any
+    length can be looked up by a unique index. Only successful probes are
+    cached.
+    """
+
+    __tablename__ = "video_probe_cache"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    cache_key: Mapped[str] = mapped_column(String(64), unique=True)
+    source: Mapped[str] = mapped_column(Text)
+    etag: Mapped[Optional[str]] = mapped_column(String(255))
+    last_modified: Mapped[Optional[str]] = mapped_column(String(64))
+
+    # Probe results
+    video_codec: Mapped[Optional[str]] = mapped_column(String(50))
+    audio_codec: Mapped[Optional[str]] = mapped_column(String(50))
+    container_format: Mapped[Optional[str]] = mapped_column(String(100))
+    duration: Mapped[Optional[float]] = mapped_column(Float)
+
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
+    # When the result was last confirmed to match the source
+    checked_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc), index=True
+    )
+
+    def __repr__(self) -> str:
+        return f"<VideoProbeCache {self.source[:60]}>"
+
+    def to_probe_info(self) -> dict:
+        """Return the cached result in the format of StorageManager.probe_video()."""
+        return {
+            "video_codec": self.video_codec,
+            "audio_codec": self.audio_codec,
+            "container_format": self.container_format,
+            "duration": self.duration,
+        }
+
+
+class StoredFile(db.Model):
+    """Catalog entry for an uploaded image or video file on disk.
+
+    Rows are written when uploads are stored and removed when files are
+    deleted, and a periodic scan reconciles them with the upload folder
+    (see file_catalog), so storage statistics and integrity checks are
+    database queries rather than directory walks. Content-addressed files
+    are attributed to the user and slideshow they were first uploaded for;
+    files in the older per-slideshow directories to the IDs in their path.
+    Image derivatives and video transcodes are catalogued without an owner
+    or slideshow.
+    """
+
+    __tablename__ = "stored_files"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    path: Mapped[str] = mapped_column(
+        String(500), unique=True
+    )  # Relative to the upload folder
+    content_type: Mapped[str] = mapped_column(
+        String(20), index=True
+    )  # 'image' or 'video'
+    file_size: Mapped[int] = mapped_column(BigInteger)
+    checksum: Mapped[Optional[str]] = mapped_column(
+        String(64), index=True
+    )  # SHA-256 hex
+    # Not foreign keys: files can outlive the users and slideshows in their path
+    owner_id: Mapped[Optional[int]] = mapped_column(Integer, index=True)
+    slideshow_id: Mapped[Optional[int]] = mapped_column(Integer, index=True)
+    mtime: Mapped[datetime] = mapped_column(DateTime)
+    # When the storage scan last confirmed the content matches ``checksum``
+    verified_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+    cataloged_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+
+    def __repr__(self) -> str:
+        return f"<StoredFile {self.path}>"
+
+    def to_dict(self) -> dict:
+        """Convert catalog entry to dictionary for JSON serialization."""
+        return {
+            "id": self.id,
+            "path": self.path,
+            "content_type": self.content_type,
+            "file_size": self.file_size,
+            "checksum": self.checksum,
+            "owner_id": self.owner_id,
+            "slideshow_id": self.slideshow_id,
+            "mtime": self.mtime.isoformat() if self.mtime else None,
+            "verified_at": self.verified_at.isoformat() if self.verified_at else None,
+            "cataloged_at": (
+                self.cataloged_at.isoformat() if self.cataloged_at else None
+            ),
+        }
+
+
+class StorageScan(db.Model):
+    """A run of the background storage integrity scan.
+
+    The scan reconciles the file catalog with the directories that changed
+    since they were last scanned, records orphaned and missing files, and
+    optionally verifies file checksums (see storage_scan). ``status`` is
+    "running", "completed" or "failed"; ``updated_at`` is refreshed as the
+    scan makes progress, so a scan whose process died can be told apart
+    from one still running and resumed.
+    """
+
+    __tablename__ = "storage_scans"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    status: Mapped[str] = mapped_column(String(20), default="running", index=True)
+    verify_checksums: Mapped[bool] = mapped_column(Boolean, default=False)
+    directories_scanned: Mapped[int] = mapped_column(Integer, default=0)
+    directories_skipped: Mapped[int] = mapped_column(Integer, default=0)
+    files_scanned: Mapped[int] = mapped_column(Integer, default=0)
+    files_added: Mapped[int] = mapped_column(Integer, default=0)
+    files_updated: Mapped[int] = mapped_column(Integer, default=0)
+    files_removed: Mapped[int] = mapped_column(Integer, default=0)
+    checksums_verified: Mapped[int] = mapped_column(Integer, default=0)
+    bytes_verified: Mapped[int] = mapped_column(BigInteger, default=0)
+    issue_count: Mapped[int] = mapped_column(Integer, default=0)
+    error: Mapped[Optional[str]] = mapped_column(Text)
+    started_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        default=lambda: datetime.now(timezone.utc),
+        onupdate=lambda: datetime.now(timezone.utc),
+    )
+    completed_at: Mapped[Optional[datetime]] = mapped_column(DateTime)
+
+    issues: Mapped[List["StorageScanIssue"]] = relationship(
+        "StorageScanIssue",
+        back_populates="scan",
+        cascade="all, delete-orphan",
+        order_by="StorageScanIssue.id",
+    )
+
+    def __repr__(self) -> str:
+        return f"<StorageScan {self.id} {self.status}>"
+
+    def to_dict(self) -> dict:
+        """Convert scan to dictionary for JSON serialization."""
+        return {
+            "id": self.id,
+            "status": self.status,
+            "verify_checksums": self.verify_checksums,
+            "directories_scanned": self.directories_scanned,
+            "directories_skipped": self.directories_skipped,
+            "files_scanned": self.files_scanned,
+            "files_added": self.files_added,
+            "files_updated": self.files_updated,
+            "files_removed": self.files_removed,
+            "checksums_verified": self.checksums_verified,
+            "bytes_verified": self.bytes_verified,
+            "issue_count": self.issue_count,
+            "error": self.error,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "updated_at": self.updated_at.isoformat() if self.updated_at else None,
+            "completed_at": (
+                self.completed_at.isoformat() if self.completed_at else None
+            ),
+        }
+
+
+class StorageScanIssue(db.Model):
+    """A problem found by a storage integrity scan.
+
+    ``kind`` is "orphaned" (a file no slideshow item references),
+    "missing" (an item whose file does not exist), "checksum_mismatch" (a
+    file whose content no longer matches its recorded checksum) or
+    "unreadable" (a file that could not be read to verify it).
+    """
+
+    __tablename__ = "storage_scan_issues"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    scan_id: Mapped[int] = mapped_column(
+        Integer, ForeignKey("storage_scans.id"), index=True
+    )
+    kind: Mapped[str] = mapped_column(String(30))
+    path: Mapped[Optional[str]] = mapped_column(
+        String(500)
+    )  # Relative to the upload folder
+    file_size: Mapped[Optional[int]] = mapped_column(BigInteger)
+    slideshow_item_id: Mapped[Optional[int]] = mapped_column(Integer)
+    slideshow_id: Mapped[Optional[int]] = mapped_column(Integer)
+    media_blob_id: Mapped[Optional[int]] = mapped_column(Integer)
+    detail: Mapped[Optional[str]] = mapped_column(Text)
+
+    scan: Mapped["StorageScan"] = relationship("StorageScan", back_populates="issues")
+
+    def __repr__(self) -> str:
+        return f"<StorageScanIssue {self.kind} {self.path}>"
+
+    def to_dict(self) -> dict:
+        """Convert issue to dictionary for JSON serialization."""
+        return {
+            "id": self.id,
+            "scan_id": self.scan_id,
+            "kind": self.kind,
+            "path": self.path,
+            "file_size": self.file_size,
+            "slideshow_item_id": self.slideshow_item_id,
+            "slideshow_id": self.slideshow_id,
+            "media_blob_id": self.media_blob_id,
+            "detail": self.detail,
+        }
+
+
+class StorageScanDirectory(db.Model):
+    """Checkpoint of a directory visited by the storage integrity scan.
+
+    ``mtime_ns`` is the directory's modification time when it was last
+    listed; a directory whose modification time is unchanged has had no
+    files added, removed or renamed, so later scans skip listing it.
+    ``scan_id`` is the last scan that visited the directory, so an
+    interrupted scan resumes without revisiting directories.
+    """
+
+    __tablename__ = "storage_scan_directories"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    path: Mapped[str] = mapped_column(
+        String(500), unique=True
+    )  # Relative to the upload folder
+    mtime_ns: Mapped[int] = mapped_column(BigInteger)
+    file_count: Mapped[int] = mapped_column(Integer, default=0)
+    scan_id: Mapped[Optional[int]] = mapped_column(Integer, index=True)
+    listed_at: Mapped[datetime] = mapped_column(
+        DateTime, default=lambda: datetime.now(timezone.utc)
+    )
+
+    def __repr__(self) -> str:
+        return f"<StorageScanDirectory {self.path}>"
+
+
+class JobLease(db.Model):
+    """Claim of a background job by one application process.
+
+    Every process runs the scheduler, so jobs that must not run
+    concurrently take the lease named after them first (see leases).
+    ``holder`` identifies the claim and ``expires_at`` (naive UTC) is when
+    another process may take the job over unless the holder renews it.
+    """
+
+    __tablename__ = "job_leases"
+
+    name: Mapped[str] = mapped_column(String(100), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(64))
+    expires_at: Mapped[datetime] = mapped_column(DateTime)
+
+    def __repr__(self) -> str:
+        return f"<JobLease {self.name} {self.holder}>"
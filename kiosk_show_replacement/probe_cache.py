@@ -0,0 +1,346 @@
+"""
+Persistent ffprobe result cache for the Kiosk Show Replacement application.
+
+Probing a video with ffprobe takes from tens of milliseconds for a local
+file to many seconds for a remote URL. Successful probe results are kept
+in the video_probe_cache table so the same video is not probed again:
+
+- Local files are keyed by the SHA-256 checksum of their content, so a
+  result stays valid for as long as the entry is kept.
+- Remote videos are keyed by URL. A result is reused without any network
+  request for VIDEO_PROBE_CACHE_REVALIDATE_SECONDS after it was checked;
+  after that a HEAD request compares the URL's ETag/Last-Modified headers
+  with the ones recorded at probe time, and the video is only probed again
+  if they changed (or the server sends neither).
+
+Entries not checked for VIDEO_PROBE_CACHE_TTL_HOURS are ignored, and an
+hourly job, run by one process at a time, deletes them and trims the table
+to VIDEO_PROBE_CACHE_MAX_ENTRIES rows (setting it to 0 disables the cache).
+Cache reads and writes use their own database session, so they never
+commit or roll back the caller's session.
+"""
+
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+from flask import Flask, current_app, has_app_context
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .leases import claim_lease, release_lease
+from .models import VideoProbeCache, db
+
+logger = logging.getLogger(__name__)
+
+# Timeout for the HEAD request that revalidates a cached URL (seconds)
+REVALIDATE_TIMEOUT = 10
+
+# Job lease held while pruning the cache
+PRUNE_LEASE = "video_probe_cache_prune"
+PRUNE_LEASE_SECONDS = 300
+
+ProbeFunc = Callable[[], Optional[Dict[str, Any]]]
+
+
+def _utcnow() -> datetime:
+    """Return the current time as a naive UTC datetime, as stored in the DB."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Return a naive UTC datetime (aware values are converted)."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def cache_enabled() -> bool:
+    """Whether probe results are cached for the current app."""
+    return (
+        has_app_context()
+        and int(current_app.config.get("VIDEO_PROBE_CACHE_MAX_ENTRIES", 5000)) > 0
+    )
+
+
+def content_source(checksum: str) -> str:
+    """Return the cache source string for local content with a checksum."""
+    return f"sha256:{checksum.lower()}"
+
+
+def url_source(url: str) -> str:
+    """Return the cache source string for a remote URL."""
+    return f"url:{url}"
+
+
+def _cache_key(source: str) -> str:
+    """Return the indexed cache key for a source string."""
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def _load(source: str) -> Optional[VideoProbeCache]:
+    """Load the unexpired cache entry for a source.
+
+    Args:
+        source: Cache source string
+
+    Returns:
+        Detached cache entry, or None if there is no current entry
+    """
+    ttl_hours = float(current_app.config.get("VIDEO_PROBE_CACHE_TTL_HOURS", 720))
+    cutoff = _utcnow() - timedelta(hours=ttl_hours)
+    try:
+        with Session(db.engine) as session:
+            entry = session.execute(
+                select(VideoProbeCache).where(
+                    VideoProbeCache.cache_key == _cache_key(source)
+                )
+            ).scalar_one_or_none()
+    except SQLAlchemyError as e:
+        logger.warning(f"Failed to read video probe cache: {e}")
+        return None
+
+    if entry is None or _naive_utc(entry.checked_at) < cutoff:
+        return None
+    return entry
+
+
+def _save(
+    source: str,
+    probe_info: Dict[str, Any],
+    etag: Optional[str] = None,
+    last_modified: Optional[str] = None,
+) -> None:
+    """Store a probe result, replacing any existing entry for the source.
+
+    Args:
+        source: Cache source string
+        probe_info: Result of StorageManager.probe_video()
+        etag: ETag header of a remote video
+        last_modified: Last-Modified header of a remote video
+    """
+    now = _utcnow()
+    try:
+        with Session(db.engine) as session:
+            entry = session.execute(
+                select(VideoProbeCache).where(
+                    VideoProbeCache.cache_key == _cache_key(source)
+                )
+            ).scalar_one_or_none()
+            if entry is None:
+                entry = VideoProbeCache(
+                    cache_key=_cache_key(source), source=source, created_at=now
+                )
+                session.add(entry)
+            entry.etag = etag[:255] if etag else None
+            entry.last_modified = last_modified[:64] if last_modified else None
+            entry.video_codec = probe_info.get("video_codec")
+            entry.audio_codec = probe_info.get("audio_codec")
+            entry.container_format = probe_info.get("container_format")
+            entry.duration = probe_info.get("duration")
+            entry.checked_at = now
+            session.commit()
+    except IntegrityError:
+        # Another worker stored the same source at the same time
+        logger.debug(f"Video probe cache entry for {source} was stored concurrently")
+    except SQLAlchemyError as e:
+        logger.warning(f"Failed to write video probe cache: {e}")
+
+
+def _mark_checked(entry_id: int) -> None:
+    """Record that a cached result was confirmed to match its source."""
+    try:
+        with Session(db.engine) as session:
+            entry = session.get(VideoProbeCache, entry_id)
+            if entry is not None:
+                entry.checked_at = _utcnow()
+                session.commit()
+    except SQLAlchemyError as e:
+        logger.warning(f"Failed to update video probe cache: {e}")
+
+
+def fetch_url_validators(url: str) -> Tuple[Optional[str], Optional[str]]:
+    """Fetch the ETag and Last-Modified headers of a URL.
+
+    Args:
+        url: Remote video URL
+
+    Returns:
+        Tuple of (etag, last_modified); either is None if the server did not
+        send it or the request failed
+    """
+    try:
+        response = requests.head(
+            url,
+            timeout=REVALIDATE_TIMEOUT,
+            allow_redirects=True,
+            headers={"User-Agent": "KioskShowReplacement/1.0"},
+        )
+    except requests.exceptions.RequestException as e:
+        logger.debug(f"HEAD request for {url} failed: {e}")
+        return None, None
+
+    if response.status_code >= 400:
+        return None, None
+    return response.headers.get("ETag"), response.headers.get("Last-Modified")
+
+
+def get_content_probe(checksum: str, probe: ProbeFunc) -> Optional[Dict[str, Any]]:
+    """Return the probe result for local content, probing only on a miss.
+
+    Args:
+        checksum: SHA-256 checksum of the file content
+        probe: Callable running ffprobe on the file
+
+    Returns:
+        Probe result, or None if probing failed
+    """
+    if not cache_enabled():
+        return probe()
+
+    source = content_source(checksum)
+    entry = _load(source)
+    if entry is not None:
+        return entry.to_probe_info()
+
+    probe_info = probe()
+    if probe_info is not None:
+        _save(source, probe_info)
+    return probe_info
+
+
+def get_url_probe(url: str, probe: ProbeFunc) -> Optional[Dict[str, Any]]:
+    """Return the probe result for a remote video, probing only if it changed.
+
+    Args:
+        url: Remote video URL
+        probe: Callable running ffprobe on the URL
+
+    Returns:
+        Probe result, or None if probing failed
+    """
+    if not cache_enabled():
+        return probe()
+
+    source = url_source(url)
+    entry = _load(source)
+    if entry is not None:
+        revalidate_after = timedelta(
+            seconds=float(
+                current_app.config.get("VIDEO_PROBE_CACHE_REVALIDATE_SECONDS", 300)
+            )
+        )
+        if _utcnow() - _naive_utc(entry.checked_at) < revalidate_after:
+            return entry.to_probe_info()
+
+    etag, last_modified = fetch_url_validators(url)
+    if (
+        entry is not None
+        and (etag or last_modified)
+        and (etag, last_modified) == (entry.etag, entry.last_modified)
+    ):
+        _mark_checked(entry.id)
+        return entry.to_probe_info()
+
+    probe_info = probe()
+    if probe_info is not None:
+        _save(source, probe_info, etag, last_modified)
+    return probe_info
+
+
+def prune_probe_cache(
+    ttl_hours: Optional[float] = None, max_entries: Optional[int] = None
+) -> int:
+    """Delete expired entries and trim the cache to its maximum size.
+
+    Args:
+        ttl_hours: Hours since an entry was checked before it is deleted
+            (defaults to VIDEO_PROBE_CACHE_TTL_HOURS)
+        max_entries: Maximum entries to keep, least recently checked are
+            deleted first (defaults to VIDEO_PROBE_CACHE_MAX_ENTRIES)
+
+    Only one process prunes at a time, holding the "video_probe_cache_prune"
+    job lease (see leases).
+
+    Returns:
+        Number of entries deleted (0 if another process is pruning)
+    """
+    if ttl_hours is None:
+        ttl_hours = float(current_app.config.get("VIDEO_PROBE_CACHE_TTL_HOURS", 720))
+    if max_entries is None:
+        max_entries = int(current_app.config.get("VIDEO_PROBE_CACHE_MAX_ENTRIES", 5000))
+
+    token = claim_lease(PRUNE_LEASE, PRUNE_LEASE_SECONDS)
+    if token is None:
+        logger.info("Video probe cache pruning is running in another process")
+        return 0
+    try:
+        return _prune(ttl_hours, max_entries)
+    finally:
+        release_lease(PRUNE_LEASE, token)
+
+
+def _prune(ttl_hours: float, max_entries: int) -> int:
+    """Prune the cache while holding the pruning lease.
+
+    Args:
+        ttl_hours: Hours since an entry was checked before it is deleted
+        max_entries: Maximum entries to keep
+
+    Returns:
+        Number of entries deleted
+    """
+    cutoff = _utcnow() - timedelta(hours=ttl_hours)
+    try:
+        result = db.session.execute(
+            delete(VideoProbeCache).where(VideoProbeCache.checked_at < cutoff)
+        )
+        deleted = result.rowcount or 0
+
+        excess = (
+            db.session.execute(select(func.count(VideoProbeCache.id))).scalar_one()
+            - max_entries
+        )
+        if excess > 0:
+            oldest_ids = (
+                db.session.execute(
+                    select(VideoProbeCache.id)
+                    .order_by(VideoProbeCache.checked_at, VideoProbeCache.id)
+                    .limit(excess)
+                )
+                .scalars()
+                .all()
+            )
+            result = db.session.execute(
+                delete(VideoProbeCache).where(VideoProbeCache.id.in_(oldest_ids))
+            )
+            deleted += result.rowcount or 0
+        db.session.commit()
+    except SQLAlchemyError as e:
+        db.session.rollback()
+        logger.error(f"Failed to prune video probe cache: {e}")
+        return 0
+
+    if deleted:
+        logger.info(f"Pruned {deleted} video probe cache entries")
+    return deleted
+
+
+def init_probe_cache(app: Flask) -> None:
+    """Schedule the video probe cache pruning job.
+
+    Args:
+        app: Flask application instance
+    """
+    from .scheduler import get_scheduler
+
+    scheduler = get_scheduler(app)
+    if scheduler is not None:
+        scheduler.add_job(
+            "video_probe_cache_prune",
+            float(app.config.get("VIDEO_PROBE_CACHE_PRUNE_INTERVAL", 3600)),
+            prune_probe_cache,
+        )
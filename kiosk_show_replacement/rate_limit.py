@@ -0,0 +1,77 @@
+"""
+Request rate limiting for the Kiosk.show Replacement application.
+
+This module provides an in-memory token bucket rate limiter. Each key (for
+example a display) has a bucket holding up to ``burst`` tokens, refilled at
+``rate_per_minute`` tokens per minute; a request takes one token and is
+refused while the bucket is empty. Buckets are kept per process, so with
+several application processes a key may make up to that many times the
+configured rate.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, Hashable, Optional, Tuple
+
+
+class RateLimiter:
+    """Thread-safe token bucket rate limiter keyed by client."""
+
+    def __init__(self, rate_per_minute: float, burst: Optional[int] = None) -> None:
+        """Initialize a rate limiter with no buckets.
+
+        Args:
+            rate_per_minute: Requests allowed per minute and key (0 or less
+                allows every request)
+            burst: Requests a key may make at once (defaults to the
+                per-minute rate)
+        """
+        self.rate_per_minute = rate_per_minute
+        self.burst = burst if burst is not None else max(1, int(rate_per_minute))
+        self._buckets: Dict[Hashable, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, key: Hashable) -> float:
+        """Take a token from a key's bucket.
+
+        Args:
+            key: Client the request is counted against
+
+        Returns:
+            0 if the request is allowed, otherwise the seconds until the
+            bucket has a token again
+        """
+        if self.rate_per_minute <= 0:
+            return 0.0
+
+        rate = self.rate_per_minute / 60.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.get(key, (float(self.burst), now))
+            tokens = min(float(self.burst), tokens + (now - updated) * rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+        return (1 - tokens) / rate
+
+    def retry_after(self, key: Hashable) -> Optional[int]:
+        """Take a token, returning whole seconds to wait if refused.
+
+        Args:
+            key: Client the request is counted against
+
+        Returns:
+            None if the request is allowed, otherwise the seconds to send in
+            a Retry-After header
+        """
+        wait = self.acquire(key)
+        if wait <= 0:
+            return None
+        return max(1, math.ceil(wait))
+
+    def clear(self) -> None:
+        """Forget all buckets."""
+        with self._lock:
+            self._buckets.clear()
@@ -0,0 +1,560 @@
+"""
+Resumable chunked uploads for the Kiosk Show Replacement application.
+
+Large files (typically videos) can be uploaded in chunks using a small
+tus-like protocol instead of a single multipart POST:
+
+1. create_upload() declares the filename, content type and total size and
+   returns an upload ID.
+2. append_chunk() appends a chunk at an explicit offset. A client whose
+   connection dropped asks for the current offset (get_upload()) and
+   continues from there instead of restarting.
+3. complete_upload() verifies the assembled file and stores it in the
+   content-addressed media store exactly like a single-request upload.
+
+Chunks are appended directly to a file in the staging directory, so the
+assembled upload is moved into place by a rename rather than copied.
+Abandoned uploads are removed by a scheduled cleanup job, run by one
+process at a time, after RESUMABLE_UPLOAD_EXPIRY_HOURS.
+"""
+
+import base64
+import binascii
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import secrets
+import shutil
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Any, Dict, Optional, Tuple
+
+from flask import current_app
+from werkzeug.datastructures import FileStorage
+
+from .exceptions import ConflictError, NotFoundError, ValidationError
+from .leases import claim_lease, release_lease
+from .media_store import store_upload
+from .storage import StorageManager, get_storage_manager
+from .storage_resilience import UploadStream, check_disk_space
+
+if TYPE_CHECKING:
+    from flask import Flask
+
+logger = logging.getLogger(__name__)
+
+#: Staging subdirectory holding one directory per in-progress upload
+RESUMABLE_DIRECTORY = "resumable"
+
+#: Upload IDs are 128-bit random hex strings
+UPLOAD_ID_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+METADATA_FILENAME = "upload.json"
+DATA_FILENAME = "data"
+
+#: Hash algorithms accepted in per-chunk Upload-Checksum headers
+CHUNK_CHECKSUM_ALGORITHMS = {"sha1", "sha256", "md5"}
+
+#: Job lease held while removing abandoned uploads
+CLEANUP_LEASE = "resumable_upload_cleanup"
+CLEANUP_LEASE_SECONDS = 300
+
+
+def get_resumable_path(storage: Optional[StorageManager] = None) -> Path:
+    """Get the directory holding in-progress resumable uploads.
+
+    Args:
+        storage: Storage manager to use (defaults to the global instance)
+
+    Returns:
+        Path object for the resumable upload directory
+    """
+    storage = storage or get_storage_manager()
+    path = storage.get_staging_path() / RESUMABLE_DIRECTORY
+    storage.ensure_directory(path)
+    return path
+
+
+def _get_upload_dir(upload_id: str, storage: Optional[StorageManager] = None) -> Path:
+    """Get the directory for an upload, rejecting malformed IDs.
+
+    Args:
+        upload_id: Upload ID from the client
+        storage: Storage manager to use (defaults to the global instance)
+
+    Returns:
+        Path object for the upload's directory
+
+    Raises:
+        NotFoundError: If the ID is malformed or the upload does not exist
+    """
+    if not UPLOAD_ID_PATTERN.match(upload_id or ""):
+        raise NotFoundError(
+            "Upload not found", resource_type="upload", resource_id=upload_id
+        )
+    upload_dir = get_resumable_path(storage) / upload_id
+    if not (upload_dir / METADATA_FILENAME).exists():
+        raise NotFoundError(
+            "Upload not found", resource_type="upload", resource_id=upload_id
+        )
+    return upload_dir
+
+
+def _upload_status(
+    upload_id: str, metadata: Dict[str, Any], offset: int
+) -> Dict[str, Any]:
+    """Build the client-facing status of an upload.
+
+    Args:
+        upload_id: Upload ID
+        metadata: Stored upload metadata
+        offset: Number of bytes received so far
+
+    Returns:
+        Dictionary describing the upload
+    """
+    return {
+        "upload_id": upload_id,
+        "filename": metadata["filename"],
+        "content_type": metadata["content_type"],
+        "slideshow_id": metadata["slideshow_id"],
+        "size": metadata["size"],
+        "offset": offset,
+        "complete": offset == metadata["size"],
+        "chunk_size": current_app.config.get(
+            "RESUMABLE_UPLOAD_CHUNK_SIZE", 8 * 1024 * 1024
+        ),
+        "created_at": metadata["created_at"],
+    }
+
+
+def _load_upload(
+    upload_id: str, user_id: int, storage: Optional[StorageManager] = None
+) -> Tuple[Path, Dict[str, Any]]:
+    """Load an upload's directory and metadata, checking ownership.
+
+    Args:
+        upload_id: Upload ID
+        user_id: ID of the requesting user
+        storage: Storage manager to use (defaults to the global instance)
+
+    Returns:
+        Tuple of (upload_dir, metadata)
+
+    Raises:
+        NotFoundError: If the upload does not exist or belongs to another user
+    """
+    upload_dir = _get_upload_dir(upload_id, storage)
+    metadata = json.loads((upload_dir / METADATA_FILENAME).read_text())
+    if metadata["user_id"] != user_id:
+        # Other users' uploads are indistinguishable from missing ones
+        raise NotFoundError(
+            "Upload not found", resource_type="upload", resource_id=upload_id
+        )
+    return upload_dir, metadata
+
+
+def create_upload(
+    filename: str,
+    content_type: str,
+    size: int,
+    user_id: int,
+    slideshow_id: int,
+    checksum: Optional[str] = None,
+    storage: Optional[StorageManager] = None,
+) -> Dict[str, Any]:
+    """Start a resumable upload.
+
+    The declared file is validated against the same extension and size
+    limits as a single-request upload before any data is accepted.
+
+    Args:
+        filename: Original filename
+        content_type: Type of content ('image' or 'video')
+        size: Total size of the file in bytes
+        user_id: ID of the user uploading
+        slideshow_id: ID of the slideshow the upload is for
+        checksum: Optional SHA-256 hex digest of the whole file, verified
+            when the upload is completed
+        storage: Storage manager to use (defaults to the global instance)
+
+    Returns:
+        Status dictionary for the new upload (offset 0)
+
+    Raises:
+        ValidationError: If the declared file is not acceptable
+    """
+    storage = storage or get_storage_manager()
+
+    limits = storage.get_upload_limits(content_type)
+    if limits is None:
+        raise ValidationError(
+            f"Unsupported content type: {content_type}", field="content_type"
+        )
+    allowed_extensions, max_size = limits
+
+    if not filename or "." not in filename:
+        raise ValidationError("File must have an extension", field="filename")
+    extension = filename.rsplit(".", 1)[1].lower()
+    if extension not in allowed_extensions:
+        raise ValidationError(
+            f"File extension '{extension}' not allowed for {content_type}",
+            field="filename",
+        )
+
+    if size <= 0:
+        raise ValidationError("File size must be positive", field="size")
+    if size > max_size:
+        size_mb = max_size / (1024 * 1024)
+        raise ValidationError(
+            f"File size exceeds maximum allowed size of {size_mb:.1f}MB",
+            field="size",
+        )
+
+    if checksum is not None:
+        checksum = checksum.lower()
+        if not re.match(r"^[0-9a-f]{64}$", checksum):
+            raise ValidationError(
+                "checksum must be a SHA-256 hex digest", field="checksum"
+            )
+
+    resumable_path = get_resumable_path(storage)
+    check_disk_space(resumable_path, size)
+
+    upload_id = secrets.token_hex(16)
+    upload_dir = resumable_path / upload_id
+    upload_dir.mkdir()
+    (upload_dir / DATA_FILENAME).touch()
+
+    metadata = {
+        "user_id": user_id,
+        "slideshow_id": slideshow_id,
+        "content_type": content_type,
+        "filename": filename,
+        "size": size,
+        "checksum": checksum,
+        "created_at": datetime.now(timezone.utc).isoformat(),
+    }
+    (upload_dir / METADATA_FILENAME).write_text(json.dumps(metadata))
+
+    logger.info(f"Started resumable upload {upload_id} for '{filename}' ({size} bytes)")
+    return _upload_status(upload_id, metadata, 0)
+
+
+def get_upload(
+    upload_id: str, user_id: int, storage: Optional[StorageManager] = None
+) -> Dict[str, Any]:
+    """Get the status of a resumable upload.
+
+    Args:
+        upload_id: Upload ID
+        user_id: ID of the requesting user
+        storage: Storage manager to use (defaults to the global instance)
+
+    Returns:
+        Status dictionary including the current offset
+
+    Raises:
+        NotFoundError: If the upload does not exist
+    """
+    upload_dir, metadata = _load_upload(upload_id, user_id, storage)
+    offset = (upload_dir / DATA_FILENAME).stat().st_size
+    return _upload_status(upload_id, metadata, offset)
+
+
+def parse_chunk_checksum(header: Optional[str]) -> Optional[Tuple[str, bytes]]:
+    """Parse an ``Upload-Checksum`` header.
+
+    The header has the form ``<algorithm> <base64 digest>``, for example
+    ``sha256 n4bQgYhMfWWaL+qgxVrQFaO/TxsrC4Is0V1sFbDwCgg=``.
+
+    Args:
+        header: Header value, or None if not sent
+
+    Returns:
+        Tuple of (algorithm, digest bytes), or None if no header was sent
+
+    Raises:
+        ValidationError: If the header is malformed or the algorithm unsupported
+    """
+    if not header:
+        return None
+    try:
+        algorithm, encoded = header.strip().split(" ", 1)
+        digest = base64.b64decode(encoded.strip(), validate=True)
+    # fmt: off
+    except (ValueError, binascii.Error):
+        # fmt: on
+        raise ValidationError("Malformed Upload-Checksum header")
+    algorithm = algorithm.lower()
+    if algorithm not in CHUNK_CHECKSUM_ALGORITHMS:
+        raise ValidationError(f"Unsupported checksum algorithm: {algorithm}")
+    return algorithm, digest
+
+
+def append_chunk(
+    upload_id: str,
+    user_id: int,
+    offset: int,
+    stream: IO[bytes],
+    length: int,
+    chunk_checksum: Optional[Tuple[str, bytes]] = None,
+    storage: Optional[StorageManager] = None,
+) -> Dict[str, Any]:
+    """Append a chunk of data to a resumable upload.
+
+    The chunk is only accepted at the upload's current offset. Without a
+    chunk checksum, data received before a dropped connection is kept so
+    the client can resume after it; with a checksum, a chunk that does not
+    match is discarded entirely.
+
+    Args:
+        upload_id: Upload ID
+        user_id: ID of the requesting user
+        offset: Offset the client believes the chunk starts at
+        stream: Readable stream with the chunk data
+        length: Number of bytes in the chunk
+        chunk_checksum: Optional (algorithm, digest) from
+            parse_chunk_checksum()
+        storage: Storage manager to use (defaults to the global instance)
+
+    Returns:
+        Status dictionary with the new offset
+
+    Raises:
+        NotFoundError: If the upload does not exist
+        ConflictError: If the offset does not match, or another request is
+            writing to the upload
+        ValidationError: If the chunk is too large or fails its checksum
+    """
+    upload_dir, metadata = _load_upload(upload_id, user_id, storage)
+    chunk_size = 64 * 1024
+
+    with open(upload_dir / DATA_FILENAME, "ab") as data_file:
+        try:
+            fcntl.flock(data_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise ConflictError(
+                "Another chunk is being written to this upload",
+                details={"upload_id": upload_id},
+            )
+
+        current_offset = os.fstat(data_file.fileno()).st_size
+        if offset != current_offset:
+            raise ConflictError(
+                "Upload offset does not match",
+                conflicting_field="offset",
+                details={"offset": current_offset},
+            )
+        if length < 0 or current_offset + length > metadata["size"]:
+            raise ValidationError(
+                "Chunk extends past the declared upload size",
+                details={"offset": current_offset, "size": metadata["size"]},
+            )
+
+        digest = hashlib.new(chunk_checksum[0]) if chunk_checksum else None
+        received = 0
+        try:
+            while received < length:
+                data = stream.read(min(chunk_size, length - received))
+                if not data:
+                    break
+                data_file.write(data)
+                if digest is not None:
+                    digest.update(data)
+                received += len(data)
+        except Exception:
+            if digest is not None:
+                data_file.truncate(current_offset)
+            else:
+                data_file.flush()
+            raise
+
+        if (
+            chunk_checksum is not None
+            and digest is not None
+            and (received != length or digest.digest() != chunk_checksum[1])
+        ):
+            data_file.truncate(current_offset)
+            raise ValidationError(
+                "Chunk checksum mismatch",
+                details={"offset": current_offset},
+            )
+        data_file.flush()
+        new_offset = current_offset + received
+
+    return _upload_status(upload_id, metadata, new_offset)
+
+
+def complete_upload(
+    upload_id: str, user_id: int, storage: Optional[StorageManager] = None
+) -> Dict[str, Any]:
+    """Verify an assembled upload and store it in the media store.
+
+    The assembled file is hashed in a single read pass, checked against
+    the checksum declared at creation (if any), validated like any other
+    upload and renamed into its content-addressed location.
+
+    Args:
+        upload_id: Upload ID
+        user_id: ID of the requesting user
+        storage: Storage manager to use (defaults to the global instance)
+
+    Returns:
+        File info dictionary, as returned for single-request uploads
+
+    Raises:
+        NotFoundError: If the upload does not exist
+        ConflictError: If not all data has been received
+        ValidationError: If the file fails verification or validation
+    """
+    storage = storage or get_storage_manager()
+    upload_dir, metadata = _load_upload(upload_id, user_id, storage)
+    data_path = upload_dir / DATA_FILENAME
+
+    offset = data_path.stat().st_size
+    if offset != metadata["size"]:
+        raise ConflictError(
+            "Upload is incomplete",
+            conflicting_field="offset",
+            details={"offset": offset, "size": metadata["size"]},
+        )
+
+    limits = storage.get_upload_limits(metadata["content_type"])
+    max_size = limits[1] if limits else 0
+    upload = UploadStream(data_path, max_size=max_size, adopt=True)
+    try:
+        if metadata["checksum"] and upload.checksum != metadata["checksum"]:
+            raise ValidationError(
+                "Uploaded file checksum does not match",
+                field="checksum",
+                details={"expected": metadata["checksum"], "actual": upload.checksum},
+            )
+
+        file = FileStorage(stream=upload, filename=metadata["filename"])
+        success, message, file_info = store_upload(
+            file,
+            metadata["content_type"],
+            user_id,
+            metadata["slideshow_id"],
+            storage,
+        )
+        if not success or file_info is None:
+            raise ValidationError(message)
+    finally:
+        upload.close()
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+    logger.info(f"Completed resumable upload {upload_id} ('{metadata['filename']}')")
+    return file_info
+
+
+def abort_upload(
+    upload_id: str, user_id: int, storage: Optional[StorageManager] = None
+) -> None:
+    """Cancel a resumable upload and discard its data.
+
+    Args:
+        upload_id: Upload ID
+        user_id: ID of the requesting user
+        storage: Storage manager to use (defaults to the global instance)
+
+    Raises:
+        NotFoundError: If the upload does not exist
+    """
+    upload_dir, _ = _load_upload(upload_id, user_id, storage)
+    shutil.rmtree(upload_dir, ignore_errors=True)
+    logger.info(f"Aborted resumable upload {upload_id}")
+
+
+def cleanup_expired_uploads(
+    expiry_hours: Optional[float] = None,
+    storage: Optional[StorageManager] = None,
+) -> int:
+    """Remove resumable uploads that have not received data recently.
+
+    Temporary files left in the staging directory by interrupted
+    single-request uploads are removed after the same period.
+
+    Args:
+        expiry_hours: Hours of inactivity before an upload is removed
+            (defaults to RESUMABLE_UPLOAD_EXPIRY_HOURS)
+        storage: Storage manager to use (defaults to the global instance)
+
+    Only one process cleans up at a time, holding the
+    "resumable_upload_cleanup" job lease (see leases).
+
+    Returns:
+        Number of uploads and temporary files removed (0 if another process
+        is cleaning up)
+    """
+    storage = storage or get_storage_manager()
+    if expiry_hours is None:
+        expiry_hours = current_app.config.get("RESUMABLE_UPLOAD_EXPIRY_HOURS", 24)
+
+    token = claim_lease(CLEANUP_LEASE, CLEANUP_LEASE_SECONDS)
+    if token is None:
+        logger.info("Resumable upload cleanup is running in another process")
+        return 0
+    try:
+        return _remove_expired(time.time() - expiry_hours * 3600, storage)
+    finally:
+        release_lease(CLEANUP_LEASE, token)
+
+
+def _remove_expired(cutoff: float, storage: StorageManager) -> int:
+    """Remove uploads and temporary files while holding the cleanup lease.
+
+    Args:
+        cutoff: Files and uploads last modified before this time are removed
+        storage: Storage manager to use
+
+    Returns:
+        Number of uploads and temporary files removed
+    """
+    removed = 0
+
+    for upload_dir in get_resumable_path(storage).iterdir():
+        if not upload_dir.is_dir():
+            continue
+        data_path = upload_dir / DATA_FILENAME
+        marker = data_path if data_path.exists() else upload_dir
+        try:
+            if marker.stat().st_mtime >= cutoff:
+                continue
+        except FileNotFoundError:
+            continue
+        shutil.rmtree(upload_dir, ignore_errors=True)
+        removed += 1
+        logger.info(f"Removed expired resumable upload {upload_dir.name}")
+
+    for temp_file in storage.get_staging_path().glob(".tmp_*"):
+        try:
+            if temp_file.stat().st_mtime < cutoff:
+                temp_file.unlink()
+                removed += 1
+        except FileNotFoundError:
+            continue
+
+    return removed
+
+
+def init_resumable_uploads(app: "Flask") -> None:
+    """Schedule the cleanup job for abandoned resumable uploads.
+
+    Args:
+        app: Flask application instance
+    """
+    from .scheduler import get_scheduler
+
+    scheduler = get_scheduler(app)
+    if scheduler is not None:
+        scheduler.add_job(
+            "resumable_upload_cleanup",
+            float(app.config.get("RESUMABLE_UPLOAD_CLEANUP_INTERVAL", 3600)),
+            cleanup_expired_uploads,
+        )
@@ -0,0 +1,209 @@
+"""
+Background job scheduler for the Kiosk Show Replacement application.
+
+This module runs lightweight periodic maintenance jobs (health checks,
+cache refreshes, pruning) on a daemon thread inside each application
+process. Jobs run inside an application context so they can use the
+database session and configuration like request handlers do.
+
+The scheduler starts lazily on the first request rather than in
+create_app(), so CLI commands and forked worker processes do not start
+threads they will never use. It is disabled entirely when
+SCHEDULER_ENABLED is false (the default under the testing configuration).
+"""
+
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+
+from flask import Flask
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PeriodicJob:
+    """A job run by the background scheduler at a fixed interval.
+
+    Attributes:
+        name: Unique job name (used for logging and replacement)
+        interval: Seconds between runs
+        func: Callable invoked with no arguments inside an app context
+        next_run: Monotonic time of the next scheduled run
+        last_duration: Duration of the most recent run in seconds
+        last_error: Error message from the most recent failed run
+        runs: Number of completed runs
+    """
+
+    name: str
+    interval: float
+    func: Callable[[], None]
+    next_run: float = 0.0
+    last_duration: Optional[float] = None
+    last_error: Optional[str] = None
+    runs: int = 0
+
+
+class BackgroundScheduler:
+    """Runs registered periodic jobs on a single daemon thread."""
+
+    def __init__(self) -> None:
+        """Initialize an empty scheduler."""
+        self._jobs: Dict[str, PeriodicJob] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+        self._app: Optional[Flask] = None
+
+    def add_job(
+        self,
+        name: str,
+        interval: float,
+        func: Callable[[], None],
+        run_immediately: bool = True,
+    ) -> None:
+        """Register (or replace) a periodic job.
+
+        Args:
+            name: Unique job name
+            interval: Seconds between runs (jobs with interval <= 0 are ignored)
+            func: Callable invoked with no arguments inside an app context
+            run_immediately: Run the job as soon as the scheduler starts
+                instead of waiting one interval
+        """
+        if interval <= 0:
+            return
+        next_run = time.monotonic() + (0 if run_immediately else interval)
+        with self._lock:
+            self._jobs[name] = PeriodicJob(
+                name=name, interval=interval, func=func, next_run=next_run
+            )
+        self._wakeup.set()
+
+    def get_jobs(self) -> Dict[str, PeriodicJob]:
+        """Get a snapshot of registered jobs.
+
+        Returns:
+            Dictionary mapping job name to job
+        """
+        with self._lock:
+            return dict(self._jobs)
+
+    @property
+    def running(self) -> bool:
+        """Whether the scheduler thread is alive."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, app: Flask) -> None:
+        """Start the scheduler thread if it is not already running.
+
+        Threads do not survive fork(), so calling this in a forked worker
+        starts a new thread there.
+
+        Args:
+            app: Flask application used to create app contexts for jobs
+        """
+        if self.running:
+            return
+        with self._lock:
+            if self.running:
+                return
+            self._app = app
+            self._stopped = False
+            self._thread = threading.Thread(
+                target=self._run, name="background-scheduler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the scheduler thread.
+
+        Args:
+            timeout: Maximum seconds to wait for a running job to finish
+        """
+        self._stopped = True
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def run_job(self, job: PeriodicJob) -> None:
+        """Run a single job inside an app context, recording its outcome.
+
+        Args:
+            job: The job to run
+        """
+        start = time.monotonic()
+        try:
+            if self._app is not None:
+                with self._app.app_context():
+                    job.func()
+            else:
+                job.func()
+            job.last_error = None
+        except Exception as e:
+            job.last_error = str(e)
+            logger.exception(f"Scheduled job {job.name} failed: {e}")
+        finally:
+            job.runs += 1
+            job.last_duration = time.monotonic() - start
+            job.next_run = time.monotonic() + job.interval
+
+    def _run(self) -> None:
+        """Scheduler thread main loop."""
+        while not self._stopped:
+            self._wakeup.clear()
+            now = time.monotonic()
+            with self._lock:
+                due = [j for j in self._jobs.values() if j.next_run <= now]
+            for job in due:
+                if self._stopped:
+                    return
+                self.run_job(job)
+
+            with self._lock:
+                next_run = min((j.next_run for j in self._jobs.values()), default=None)
+            if next_run is None:
+                timeout = 60.0
+            else:
+                timeout = max(0.0, next_run - time.monotonic())
+            self._wakeup.wait(timeout)
+
+
+def get_scheduler(app: Flask) -> Optional[BackgroundScheduler]:
+    """Get the scheduler registered on an application.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        The application's scheduler, or None if it has not been initialized
+    """
+    return app.extensions.get("scheduler")
+
+
+def init_scheduler(app: Flask) -> BackgroundScheduler:
+    """Initialize the background scheduler for an application.
+
+    Jobs may be registered on the returned scheduler at any time; the
+    thread is started on the first request when SCHEDULER_ENABLED is true.
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        The application's scheduler
+    """
+    scheduler = BackgroundScheduler()
+    app.extensions["scheduler"] = scheduler
+
+    if app.config.get("SCHEDULER_ENABLED", True):
+
+        @app.before_request
+        def _start_scheduler() -> None:
+            if not scheduler.running:
+                scheduler.start(app)
+
+    return scheduler
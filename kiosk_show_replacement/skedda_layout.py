@@ -0,0 +1,274 @@
+"""
+Day layout engine for Skedda calendar slides.
+
+A Skedda slide shows one day as a grid of time slots, one column per space.
+Each slide's grid runs from its ``ical_day_start_hour`` to its
+``ical_day_end_hour`` in slots of ``ical_slot_minutes`` (see DayLayout).
+
+This module turns a day's events into grid positions in one pass:
+
+- Slot label tables are built once per layout and shared by every calendar
+  using it.
+- Event times are converted to the display timezone and placed by their
+  wall-clock minutes, so days with a DST change still line up with the
+  labels, and events running into the day from either side are clipped
+  to the grid.
+- Concurrent bookings of the same space are packed into side-by-side
+  lanes: each event gets the lowest free lane, and every event of a group
+  of overlapping events gets the group's lane count, so the display only
+  has to divide the column width.
+"""
+
+import heapq
+from dataclasses import dataclass
+from datetime import date, datetime, time, timezone, tzinfo
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Optional
+
+# Slot sizes (minutes) that divide an hour, so every hour starts a slot
+SLOT_MINUTES_CHOICES = (5, 10, 15, 20, 30, 60)
+
+
+def validate_day_layout(start_hour: int, end_hour: int, slot_minutes: int) -> None:
+    """Validate the settings of a day layout.
+
+    Args:
+        start_hour: Hour the grid starts at
+        end_hour: Hour the grid ends at
+        slot_minutes: Length of a slot in minutes
+
+    Raises:
+        ValueError: If a setting is out of range or the grid is empty
+    """
+    if not 0 <= start_hour <= 23:
+        raise ValueError("Calendar start hour must be between 0 and 23")
+    if not 1 <= end_hour <= 24:
+        raise ValueError("Calendar end hour must be between 1 and 24")
+    if end_hour <= start_hour:
+        raise ValueError("Calendar end hour must be after its start hour")
+    if slot_minutes not in SLOT_MINUTES_CHOICES:
+        choices = ", ".join(str(m) for m in SLOT_MINUTES_CHOICES)
+        raise ValueError(f"Calendar slot length must be one of {choices} minutes")
+
+
+@dataclass(frozen=True)
+class DayLayout:
+    """Time grid of a day on a Skedda calendar.
+
+    Attributes:
+        start_hour: Hour the grid starts at (0-23)
+        end_hour: Hour the grid ends at (1-24), after start_hour
+        slot_minutes: Length of a slot in minutes (see SLOT_MINUTES_CHOICES)
+    """
+
+    start_hour: int = 7
+    end_hour: int = 23
+    slot_minutes: int = 30
+
+    def __post_init__(self) -> None:
+        """Validate the grid bounds and slot size."""
+        validate_day_layout(self.start_hour, self.end_hour, self.slot_minutes)
+
+    @property
+    def slot_count(self) -> int:
+        """Number of slots in the grid."""
+        return (self.end_hour - self.start_hour) * 60 // self.slot_minutes
+
+    @classmethod
+    def for_item(cls, item: Any) -> "DayLayout":
+        """Get the layout of a Skedda slideshow item.
+
+        Args:
+            item: SlideshowItem; unset layout fields use the defaults
+
+        Returns:
+            DayLayout of the item
+        """
+        return cls.from_settings(
+            item.ical_day_start_hour, item.ical_day_end_hour, item.ical_slot_minutes
+        )
+
+    @classmethod
+    def from_settings(
+        cls,
+        start_hour: Optional[int],
+        end_hour: Optional[int],
+        slot_minutes: Optional[int],
+    ) -> "DayLayout":
+        """Get the layout for stored slideshow item settings.
+
+        Args:
+            start_hour: Grid start hour, or None for the default
+            end_hour: Grid end hour, or None for the default
+            slot_minutes: Slot length, or None for the default
+
+        Returns:
+            DayLayout with the given settings
+        """
+        return cls(
+            start_hour=cls.start_hour if start_hour is None else start_hour,
+            end_hour=cls.end_hour if end_hour is None else end_hour,
+            slot_minutes=cls.slot_minutes if slot_minutes is None else slot_minutes,
+        )
+
+
+DEFAULT_LAYOUT = DayLayout()
+
+
+@lru_cache(maxsize=64)
+def time_slot_table(layout: DayLayout) -> tuple[dict[str, str], ...]:
+    """Get the slot labels of a layout.
+
+    The table is built once per layout; it is shared and must not be
+    modified.
+
+    Args:
+        layout: Day layout
+
+    Returns:
+        One ``{"time": "07:00", "display": "7:00 AM"}`` entry per slot
+    """
+    first = layout.start_hour * 60
+    slots = []
+    for index in range(layout.slot_count):
+        minutes = first + index * layout.slot_minutes
+        slot_time = time(minutes // 60, minutes % 60)
+        slots.append(
+            {
+                "time": slot_time.strftime("%H:%M"),
+                "display": slot_time.strftime("%-I:%M %p"),
+            }
+        )
+    return tuple(slots)
+
+
+def _day_minutes(moment: datetime, day: date, local_tz: tzinfo) -> int:
+    """Get the local wall-clock minutes of a UTC time relative to a day.
+
+    Args:
+        moment: Naive UTC datetime
+        day: Local date minute 0 is the midnight starting
+        local_tz: Display timezone
+
+    Returns:
+        Minutes after the day's midnight (negative for earlier days)
+    """
+    local = moment.replace(tzinfo=timezone.utc).astimezone(local_tz)
+    return (local.date() - day).days * 1440 + local.hour * 60 + local.minute
+
+
+def assign_lanes(spans: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    """Pack overlapping time spans of one space into side-by-side lanes.
+
+    Spans are taken in start order; each gets the lowest lane free at its
+    start. A group of spans linked by overlaps shares a lane count, the
+    most lanes in use at once within the group.
+
+    Args:
+        spans: (start, end) pairs, end exclusive
+
+    Returns:
+        (lane, lane_count) for each span, in the order given
+    """
+    order = sorted(range(len(spans)), key=lambda i: spans[i])
+    result: list[tuple[int, int]] = [(0, 1)] * len(spans)
+    # (end, lane) of spans still running, and lanes free below the highest
+    running: list[tuple[int, int]] = []
+    free: list[int] = []
+    group: list[int] = []
+    group_lanes = 0
+
+    def close_group() -> None:
+        for i in group:
+            result[i] = (result[i][0], group_lanes)
+
+    for i in order:
+        start, end = spans[i]
+        while running and running[0][0] <= start:
+            heapq.heappush(free, heapq.heappop(running)[1])
+        if not running:
+            # Nothing overlaps this span: the previous group is complete
+            close_group()
+            group, group_lanes, free = [], 0, []
+        lane = heapq.heappop(free) if free else group_lanes
+        group_lanes = max(group_lanes, lane + 1)
+        heapq.heappush(running, (end, lane))
+        group.append(i)
+        result[i] = (lane, 0)
+    close_group()
+    return result
+
+
+def layout_day(
+    events: Iterable[Any],
+    spaces: list[str],
+    day: date,
+    layout: DayLayout,
+    local_tz: tzinfo,
+    describe: Callable[[Any], tuple[str, str]],
+) -> list[dict[str, Any]]:
+    """Place a day's events on the calendar grid.
+
+    Args:
+        events: ICalEvent rows overlapping the day
+        spaces: Spaces shown as columns; bookings of other spaces are left
+            out
+        day: Local date shown
+        layout: Day layout of the calendar
+        local_tz: Display timezone
+        describe: Function returning an event's (person name, description)
+
+    Returns:
+        One entry per event and space, in event order, with its grid slot
+        (``start_slot``, ``row_span``) and lane (``lane``, ``lane_count``)
+    """
+    first = layout.start_hour * 60
+    last = layout.end_hour * 60
+    size = layout.slot_minutes
+    shown = set(spaces)
+
+    formatted: list[dict[str, Any]] = []
+    by_space: dict[str, list[int]] = {}
+    for event in events:
+        start = _day_minutes(event.start_time, day, local_tz)
+        end = _day_minutes(event.end_time, day, local_tz)
+        # Clip to the grid; the start slot rounds down and the end slot up,
+        # so every slot the event touches is covered
+        start_slot = (min(max(start, first), last) - first) // size
+        end_slot = -(-(min(max(end, first), last) - first) // size)
+        start_slot = min(start_slot, layout.slot_count - 1)
+        row_span = max(1, end_slot - start_slot)
+
+        person_name, description = describe(event)
+        local_start = event.start_time.replace(tzinfo=timezone.utc).astimezone(local_tz)
+        local_end = event.end_time.replace(tzinfo=timezone.utc).astimezone(local_tz)
+        for space in event.resources:
+            if space not in shown:
+                continue
+            by_space.setdefault(space, []).append(len(formatted))
+            formatted.append(
+                {
+                    "id": event.id,
+                    "uid": event.uid,
+                    "space": space,
+                    "person_name": person_name,
+                    "description": description,
+                    "start_time": local_start.strftime("%H:%M"),
+                    "end_time": local_end.strftime("%H:%M"),
+                    "start_slot": start_slot,
+                    "row_span": row_span,
+                }
+            )
+
+    for indexes in by_space.values():
+        spans = [
+            (
+                formatted[i]["start_slot"],
+                formatted[i]["start_slot"] + formatted[i]["row_span"],
+            )
+            for i in indexes
+        ]
+        for i, (lane, lane_count) in zip(indexes, assign_lanes(spans)):
+            formatted[i]["lane"] = lane
+            formatted[i]["lane_count"] = lane_count
+    return formatted
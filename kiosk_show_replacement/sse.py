@@ -436,6 +436,44 @@ def create_slideshow_event(
     return SSEEvent(event_type=f"slideshow.{event_type}", data=event_data)
 
 
+def create_media_event(
+    event_type: str, media_blob_id: int, data: Dict[str, Any]
+) -> SSEEvent:
+    """Create media-related SSE event.
+
+    Args:
+        event_type: Type of media event
+        media_blob_id: Media blob ID
+        data: Event data
+
+    Returns:
+        SSE event for media updates
+    """
+    event_data = dict(data)
+    event_data["media_blob_id"] = media_blob_id
+
+    return SSEEvent(event_type=f"media.{event_type}", data=event_data)
+
+
+def create_skedda_event(
+    event_type: str, feed_id: int, data: Dict[str, Any]
+) -> SSEEvent:
+    """Create Skedda calendar SSE event.
+
+    Args:
+        event_type: Type of calendar event
+        feed_id: iCal feed ID
+        data: Event data
+
+    Returns:
+        SSE event for calendar updates
+    """
+    event_data = dict(data)
+    event_data["feed_id"] = feed_id
+
+    return SSEEvent(event_type=f"skedda.{event_type}", data=event_data)
+
+
 def create_system_event(event_type: str, data: Dict[str, Any]) -> SSEEvent:
     """Create system-related SSE event.
 
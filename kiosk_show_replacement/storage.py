@@ -5,6 +5,7 @@ This module handles file upload storage, directory management, and file operatio
 with proper security and organization.
 """
 
+import functools
 import hashlib
 import json
 import logging
@@ -12,18 +13,43 @@ import mimetypes
 import subprocess
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypeVar,
+    Union,
+)
 from urllib.parse import quote_plus
 
-from flask import current_app
+from flask import Request, current_app, request
 
 if TYPE_CHECKING:
     from flask import Flask
 from werkzeug.datastructures import FileStorage
 from werkzeug.utils import secure_filename
 
+from .file_catalog import forget_files, get_catalog_stats, record_file
+from .probe_cache import get_content_probe, get_url_probe
+from .storage_resilience import (
+    UploadStream,
+    check_disk_space,
+    copy_to_upload_stream,
+)
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
+# WSGI environ key set by @streaming_upload to select the upload content type
+UPLOAD_CONTENT_TYPE_ENVIRON_KEY = "kiosk.upload_content_type"
+
 
 class StorageManager:
     """
@@ -39,6 +65,13 @@ class StorageManager:
     # Longer timeout to account for network latency and buffering
     FFPROBE_URL_TIMEOUT = 60
 
+    # Directory (under the upload folder) holding in-progress uploads; it is
+    # on the same filesystem as the final location so uploads are moved
+    # into place with a rename rather than a copy
+    STAGING_DIRECTORY = ".incoming"
+    # Directory (under the upload folder) holding content-addressed media
+    MEDIA_DIRECTORY = "media"
+
     @staticmethod
     def _is_url(source: Union[Path, str]) -> bool:
         """
@@ -108,6 +141,79 @@ class StorageManager:
         self.ensure_directory(upload_path)
         return upload_path
 
+    def get_staging_path(self) -> Path:
+        """
+        Get the directory used for in-progress uploads.
+
+        Returns:
+            Path object for the staging directory
+        """
+        staging_path = self.base_path / self.STAGING_DIRECTORY
+        self.ensure_directory(staging_path)
+        return staging_path
+
+    def get_upload_limits(self, content_type: str) -> Optional[Tuple[Set[str], int]]:
+        """
+        Get the allowed extensions and maximum size for a content type.
+
+        Args:
+            content_type: Content type ('image' or 'video')
+
+        Returns:
+            Tuple of (allowed_extensions, max_size_bytes), or None if the
+            content type is not supported
+        """
+        if content_type == "image":
+            allowed_extensions = current_app.config.get(
+                "ALLOWED_IMAGE_EXTENSIONS", {"jpg", "jpeg", "png", "gif"}
+            )
+            max_size = current_app.config.get("MAX_IMAGE_SIZE", 50 * 1024 * 1024)
+        elif content_type == "video":
+            allowed_extensions = current_app.config.get(
+                "ALLOWED_VIDEO_EXTENSIONS", {"mp4", "webm", "avi"}
+            )
+            max_size = current_app.config.get("MAX_VIDEO_SIZE", 500 * 1024 * 1024)
+        else:
+            return None
+        return allowed_extensions, max_size
+
+    def open_upload_stream(
+        self, filename: str, content_type: str, expected_size: Optional[int] = None
+    ) -> UploadStream:
+        """
+        Open a single-pass upload stream in the staging directory.
+
+        The stream stores at most the size limit for the content type; files
+        with a disallowed extension get a zero-byte limit so nothing is
+        written to disk for them. Disk space is checked before the stream is
+        opened, for ``expected_size`` bytes (capped at the size limit) plus
+        STORAGE_MIN_FREE_BYTES.
+
+        Args:
+            filename: Original uploaded filename
+            content_type: Content type ('image' or 'video')
+            expected_size: Upper bound of the upload size, if known (such as
+                the request's Content-Length)
+
+        Returns:
+            UploadStream writing to a temporary file in the staging directory
+
+        Raises:
+            StorageError: If there is not enough free disk space
+        """
+        max_size = 0
+        limits = self.get_upload_limits(content_type)
+        extension = ""
+        if "." in filename:
+            extension = filename.rsplit(".", 1)[1].lower()
+        if limits is not None and extension in limits[0]:
+            max_size = limits[1]
+
+        staging_path = self.get_staging_path() / f"upload.{extension or 'bin'}"
+        if max_size > 0:
+            check_disk_space(staging_path.parent, min(expected_size or 0, max_size))
+        return UploadStream(staging_path, max_size=max_size)
+
     def validate_file(self, file: FileStorage, content_type: str) -> Tuple[bool, str]:
         """
         Validate an uploaded file for security and type constraints.
@@ -130,26 +236,22 @@ class StorageManager:
 
         extension = filename.rsplit(".", 1)[1]
 
-        if content_type == "image":
-            allowed_extensions = current_app.config.get(
-                "ALLOWED_IMAGE_EXTENSIONS", {"jpg", "jpeg", "png", "gif"}
-            )
-            max_size = current_app.config.get("MAX_IMAGE_SIZE", 50 * 1024 * 1024)
-        elif content_type == "video":
-            allowed_extensions = current_app.config.get(
-                "ALLOWED_VIDEO_EXTENSIONS", {"mp4", "webm", "avi"}
-            )
-            max_size = current_app.config.get("MAX_VIDEO_SIZE", 500 * 1024 * 1024)
-        else:
+        limits = self.get_upload_limits(content_type)
+        if limits is None:
             return False, f"Unsupported content type: {content_type}"
+        allowed_extensions, max_size = limits
 
         if extension not in allowed_extensions:
             return False, f"File extension '{extension}' not allowed for {content_type}"
 
-        # Check file size (seek to end to get size)
-        file.seek(0, 2)  # Seek to end
-        file_size = file.tell()
-        file.seek(0)  # Reset to beginning
+        # Check file size; streamed uploads already know their size, other
+        # streams are measured by seeking to the end
+        if isinstance(file.stream, UploadStream):
+            file_size = file.stream.size
+        else:
+            file.seek(0, 2)  # Seek to end
+            file_size = file.tell()
+            file.seek(0)  # Reset to beginning
 
         if file_size > max_size:
             size_mb = max_size / (1024 * 1024)
@@ -171,28 +273,58 @@ class StorageManager:
 
         return True, ""
 
-    def get_video_codec_info(
-        self, source: Union[Path, str]
-    ) -> Optional[Dict[str, Optional[str]]]:
+    def probe_video(
+        self, source: Union[Path, str], checksum: Optional[str] = None
+    ) -> Optional[Dict[str, Any]]:
         """
-        Extract video codec information using ffprobe.
+        Extract codec information and duration with a single ffprobe run.
 
-        Supports both local file paths and remote URLs (http/https).
-        ffprobe natively supports remote URLs.
+        Supports both local file paths and remote URLs (http/https). Results
+        are cached (see probe_cache): local files by content checksum and
+        URLs by URL, revalidated with their ETag/Last-Modified headers.
 
         Args:
             source: Path to a local video file, or a URL string (http/https)
+            checksum: SHA-256 checksum of a local file, if known. Files in
+                the content-addressed media store are named by their
+                checksum; other files without one are not cached.
 
         Returns:
-            Dictionary with 'video_codec', 'audio_codec', and 'container_format',
-            or None if extraction fails. Individual values may be None if not found.
+            Dictionary with 'video_codec', 'audio_codec', 'container_format'
+            and 'duration' (seconds), or None if probing fails. Individual
+            values may be None if not found.
+        """
+        if self._is_url(source):
+            return get_url_probe(str(source), lambda: self._run_ffprobe(source))
+
+        checksum = checksum or self._checksum_from_path(Path(source))
+        if checksum is None:
+            return self._run_ffprobe(source)
+        return get_content_probe(checksum, lambda: self._run_ffprobe(source))
+
+    @staticmethod
+    def _checksum_from_path(file_path: Path) -> Optional[str]:
+        """Return the checksum a content-addressed file is named by, if any."""
+        stem = file_path.stem.lower()
+        if len(stem) == 64 and all(c in "0123456789abcdef" for c in stem):
+            return stem
+        return None
+
+    def _run_ffprobe(self, source: Union[Path, str]) -> Optional[Dict[str, Any]]:
+        """
+        Run ffprobe once and parse codecs and duration from its output.
+
+        Args:
+            source: Path to a local video file, or a URL string (http/https)
+
+        Returns:
+            Probe result as described for probe_video(), or None on failure
         """
         is_url = self._is_url(source)
         timeout = self.FFPROBE_URL_TIMEOUT if is_url else self.FFPROBE_LOCAL_TIMEOUT
         source_str = str(source)
 
         try:
-            # Run ffprobe to get stream and format information
             result = subprocess.run(
                 [
                     "ffprobe",
@@ -210,60 +342,82 @@ class StorageManager:
             )
 
             if result.returncode != 0:
-                logger.warning(
-                    f"ffprobe failed to get codec info for {source_str}: {result.stderr}"
-                )
+                logger.warning(f"ffprobe failed to probe {source_str}: {result.stderr}")
                 return None
 
-            # Parse JSON output
             data = json.loads(result.stdout)
 
-            # Extract codec information from streams
             video_codec: Optional[str] = None
             audio_codec: Optional[str] = None
-
             for stream in data.get("streams", []):
                 codec_type = stream.get("codec_type")
                 codec_name = stream.get("codec_name")
-
                 if codec_type == "video" and video_codec is None:
                     video_codec = codec_name
                 elif codec_type == "audio" and audio_codec is None:
                     audio_codec = codec_name
 
-            # Extract container format
-            container_format = data.get("format", {}).get("format_name")
-
-            codec_info = {
+            format_info = data.get("format", {})
+            duration_str = format_info.get("duration")
+            probe_info = {
                 "video_codec": video_codec,
                 "audio_codec": audio_codec,
-                "container_format": container_format,
+                "container_format": format_info.get("format_name"),
+                "duration": float(duration_str) if duration_str else None,
             }
 
-            logger.debug(f"Video codec info for {source_str}: {codec_info}")
-            return codec_info
+            logger.debug(f"Video probe for {source_str}: {probe_info}")
+            return probe_info
 
         except FileNotFoundError:
             logger.error(
                 "ffprobe not found. Please install ffmpeg to enable "
-                "video codec detection."
+                "video codec and duration detection."
             )
             return None
         except subprocess.TimeoutExpired:
-            logger.error(f"ffprobe timed out getting codec info for {source_str}")
+            logger.error(f"ffprobe timed out probing {source_str}")
             return None
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse ffprobe codec output for {source_str}: {e}")
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.error(f"Failed to parse ffprobe output for {source_str}: {e}")
             return None
         except Exception as e:
-            logger.error(f"Error getting video codec info for {source_str}: {e}")
+            logger.error(f"Error probing video {source_str}: {e}")
+            return None
+
+    def get_video_codec_info(
+        self, source: Union[Path, str]
+    ) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Extract video codec information using ffprobe.
+
+        Supports both local file paths and remote URLs (http/https).
+        ffprobe natively supports remote URLs.
+
+        Args:
+            source: Path to a local video file, or a URL string (http/https)
+
+        Returns:
+            Dictionary with 'video_codec', 'audio_codec', and 'container_format',
+            or None if extraction fails. Individual values may be None if not found.
+        """
+        probe_info = self.probe_video(source)
+        if probe_info is None:
             return None
+        return {
+            "video_codec": probe_info.get("video_codec"),
+            "audio_codec": probe_info.get("audio_codec"),
+            "container_format": probe_info.get("container_format"),
+        }
 
     # Browser-compatible video codecs for HTML5 <video> element
     SUPPORTED_VIDEO_CODECS = {"h264", "vp8", "vp9", "theora", "av1"}
 
     def validate_video_format(
-        self, file_path: Path, original_filename: str
+        self,
+        file_path: Path,
+        original_filename: str,
+        codec_info: Optional[Dict[str, Any]] = None,
     ) -> Tuple[bool, str]:
         """
         Validate that a video file uses browser-compatible codecs.
@@ -274,11 +428,14 @@ class StorageManager:
         Args:
             file_path: Path to the video file to validate
             original_filename: Original filename for error messages
+            codec_info: Result of an earlier probe_video() of the file; the
+                file is probed if not given
 
         Returns:
             Tuple of (is_valid, error_message). If valid, error_message is empty.
         """
-        codec_info = self.get_video_codec_info(file_path)
+        if codec_info is None:
+            codec_info = self.get_video_codec_info(file_path)
 
         if codec_info is None:
             # If we can't get codec info, log warning but allow the upload
@@ -332,8 +489,8 @@ class StorageManager:
         """
         Validate a video URL for browser compatibility and extract metadata.
 
-        This function combines codec validation and duration detection for video URLs.
-        It uses ffprobe to probe the remote URL directly.
+        This function combines codec validation and duration detection for video URLs
+        using a single ffprobe run against the remote URL.
 
         Args:
             url: The video URL to validate (must be http:// or https://)
@@ -354,10 +511,10 @@ class StorageManager:
                 "Invalid URL format. URL must start with http:// or https://",
             )
 
-        # Get codec info (this also validates the URL is accessible)
-        codec_info = self.get_video_codec_info(url)
+        # Probe codecs and duration (this also validates the URL is accessible)
+        probe_info = self.probe_video(url)
 
-        if codec_info is None:
+        if probe_info is None:
             # Could be network error, invalid URL, or ffprobe unavailable
             logger.warning(
                 f"Could not retrieve video information from URL: {url}. "
@@ -373,8 +530,13 @@ class StorageManager:
                 ),
             )
 
-        video_codec = codec_info.get("video_codec")
-        container_format = codec_info.get("container_format")
+        codec_info: Dict[str, Optional[str]] = {
+            "video_codec": probe_info.get("video_codec"),
+            "audio_codec": probe_info.get("audio_codec"),
+            "container_format": probe_info.get("container_format"),
+        }
+        video_codec = codec_info["video_codec"]
+        container_format = codec_info["container_format"]
 
         # Check for video stream
         if video_codec is None:
@@ -413,8 +575,8 @@ class StorageManager:
                 ),
             )
 
-        # Get duration (optional - video is still valid if duration can't be detected)
-        duration = self.get_video_duration(url)
+        # Duration is optional - video is still valid if it can't be detected
+        duration = probe_info.get("duration")
 
         logger.info(
             f"Video URL validation passed: {url}, "
@@ -436,58 +598,13 @@ class StorageManager:
         Returns:
             Duration in seconds as a float, or None if extraction fails
         """
-        is_url = self._is_url(source)
-        timeout = self.FFPROBE_URL_TIMEOUT if is_url else self.FFPROBE_LOCAL_TIMEOUT
-        source_str = str(source)
-
-        try:
-            # Run ffprobe to get video duration
-            result = subprocess.run(
-                [
-                    "ffprobe",
-                    "-v",
-                    "quiet",
-                    "-print_format",
-                    "json",
-                    "-show_format",
-                    source_str,
-                ],
-                capture_output=True,
-                text=True,
-                timeout=timeout,
-            )
-
-            if result.returncode != 0:
-                logger.warning(f"ffprobe failed for {source_str}: {result.stderr}")
-                return None
-
-            # Parse JSON output
-            data = json.loads(result.stdout)
-            duration_str = data.get("format", {}).get("duration")
-
-            if duration_str:
-                duration = float(duration_str)
-                logger.debug(f"Video duration for {source_str}: {duration} seconds")
-                return duration
-
-            logger.warning(f"No duration found in ffprobe output for {source_str}")
-            return None
-
-        except FileNotFoundError:
-            logger.error(
-                "ffprobe not found. Please install ffmpeg to enable "
-                "automatic video duration detection."
-            )
-            return None
-        except subprocess.TimeoutExpired:
-            logger.error(f"ffprobe timed out for {source_str}")
-            return None
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse ffprobe output for {source_str}: {e}")
-            return None
-        except Exception as e:
-            logger.error(f"Error getting video duration for {source_str}: {e}")
+        probe_info = self.probe_video(source)
+        if probe_info is None:
             return None
+        duration = probe_info.get("duration")
+        if duration is None:
+            logger.warning(f"No duration found in ffprobe output for {source}")
+        return duration
 
     def generate_secure_filename(
         self, original_filename: str, user_id: int, slideshow_id: int
@@ -524,11 +641,124 @@ class StorageManager:
         else:
             return f"{secure_name}_{timestamp}_{file_hash}"
 
+    def stage_upload(
+        self, file: FileStorage, content_type: str
+    ) -> Tuple[bool, str, Optional[UploadStream]]:
+        """
+        Validate an uploaded file and get its hashed staging stream.
+
+        Files parsed with @streaming_upload were already hashed and written
+        to the staging directory while the request body was read. Other file
+        objects are copied once into a new staging upload stream.
+
+        Args:
+            file: Uploaded file object
+            content_type: Type of content ('image' or 'video')
+
+        Returns:
+            Tuple of (success, error_message, upload_stream). The caller must
+            commit() or close() the returned stream.
+        """
+        is_valid, error_message = self.validate_file(file, content_type)
+        if not is_valid:
+            return False, error_message, None
+
+        if isinstance(file.stream, UploadStream):
+            return True, "", file.stream
+
+        upload = self.open_upload_stream(file.filename or "unnamed", content_type)
+        try:
+            copy_to_upload_stream(file.stream, upload)
+        except Exception:
+            upload.close()
+            raise
+        return True, "", upload
+
+    def get_blob_path(self, checksum: str, content_type: str, extension: str) -> Path:
+        """
+        Get the content-addressed path for a media blob.
+
+        Directory structure: uploads/media/{content_type}/{checksum[:2]}/
+
+        Args:
+            checksum: SHA-256 hex digest of the file content
+            content_type: Type of content ('image' or 'video')
+            extension: File extension (without the dot)
+
+        Returns:
+            Path object for the blob file
+        """
+        content_dir = "images" if content_type == "image" else "videos"
+        blob_dir = self.base_path / self.MEDIA_DIRECTORY / content_dir / checksum[:2]
+        self.ensure_directory(blob_dir)
+        name = f"{checksum}.{extension}" if extension else checksum
+        return blob_dir / name
+
+    def commit_blob(
+        self,
+        upload: UploadStream,
+        content_type: str,
+        original_filename: str,
+        user_id: Optional[int] = None,
+        slideshow_id: Optional[int] = None,
+    ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
+        """
+        Move a staged upload to its content-addressed location.
+
+        If a file with the same content and extension is already stored, the
+        staged copy is discarded and the existing file is reused. Videos are
+        not probed here; media_store.store_upload() hands them to the media
+        probe worker pool.
+
+        Args:
+            upload: Staged upload stream from stage_upload()
+            content_type: Type of content ('image' or 'video')
+            original_filename: Original uploaded filename
+            user_id: ID of the user uploading, recorded in the file catalog
+            slideshow_id: ID of the slideshow the upload is for
+
+        Returns:
+            Tuple of (success, message, file_info_dict)
+        """
+        try:
+            extension = ""
+            if "." in original_filename:
+                extension = original_filename.rsplit(".", 1)[1].lower()
+            checksum = upload.checksum
+            file_size = upload.size
+            file_path = self.get_blob_path(checksum, content_type, extension)
+
+            deduplicated = file_path.exists()
+            if deduplicated:
+                upload.close()
+            else:
+                upload.commit(file_path)
+            record_file(self.base_path, file_path, checksum, user_id, slideshow_id)
+
+            file_info = self._build_file_info(
+                file_path, original_filename, content_type, file_size, checksum
+            )
+            file_info["deduplicated"] = deduplicated
+
+            logger.info(
+                f"Stored media blob {checksum[:12]} for '{original_filename}'"
+                + (" (deduplicated)" if deduplicated else "")
+            )
+            return True, f"File '{original_filename}' uploaded successfully", file_info
+
+        except Exception as e:
+            upload.close()
+            logger.error(f"Failed to store media blob for {original_filename}: {e}")
+            return False, f"Failed to save file: {str(e)}", None
+
     def save_file(
         self, file: FileStorage, content_type: str, user_id: int, slideshow_id: int
     ) -> Tuple[bool, str, Optional[Dict[str, Any]]]:
         """
-        Save an uploaded file to the organized storage structure.
+        Save an uploaded file to the per-user, per-slideshow storage structure.
+
+        Uploads through the API are stored content-addressed instead (see
+        stage_upload(), commit_blob() and media_store.store_upload()).
 
         Args:
             file: Uploaded file object
@@ -540,9 +770,9 @@ class StorageManager:
             Tuple of (success, message, file_info_dict)
         """
         try:
-            # Validate the file
-            is_valid, error_message = self.validate_file(file, content_type)
-            if not is_valid:
+            # Validate and stage the file
+            is_valid, error_message, upload = self.stage_upload(file, content_type)
+            if not is_valid or upload is None:
                 return False, error_message, None
 
             # Get upload path and create directories
@@ -554,59 +784,28 @@ class StorageManager:
             secure_name = self.generate_secure_filename(filename, user_id, slideshow_id)
             file_path = upload_path / secure_name
 
-            # Get file size
-            file.seek(0, 2)
-            file_size = file.tell()
-            file.seek(0)
+            # Move the staged data into place
+            file_size = upload.size
+            upload.commit(file_path)
 
-            # Save the file
-            file.save(str(file_path))
+            # Create file info
+            file_info = self._build_file_info(
+                file_path, filename, content_type, file_size, upload.checksum
+            )
+            file_info["user_id"] = user_id
+            file_info["slideshow_id"] = slideshow_id
 
-            # For videos, validate the codec is browser-compatible
+            # For videos, validate the codec and extract the duration
             if content_type == "video":
-                is_format_valid, format_error = self.validate_video_format(
-                    file_path, filename
+                format_error = self._process_stored_video(
+                    file_path, filename, file_info
                 )
-                if not is_format_valid:
-                    # Delete the saved file since validation failed
-                    try:
-                        file_path.unlink()
-                    except Exception as delete_err:
-                        logger.error(
-                            f"Failed to delete invalid video file {file_path}: "
-                            f"{delete_err}"
-                        )
+                if format_error:
                     return False, format_error, None
 
-            # Get MIME type
-            mime_type, _ = mimetypes.guess_type(str(file_path))
-
-            # Create file info
-            file_info = {
-                "filename": secure_name,
-                "original_filename": file.filename,
-                "file_path": str(file_path.relative_to(self.base_path)),
-                "absolute_path": str(file_path),
-                "content_type": content_type,
-                "mime_type": mime_type,
-                "file_size": file_size,
-                "user_id": user_id,
-                "slideshow_id": slideshow_id,
-                "upload_date": datetime.now(timezone.utc).isoformat(),
-            }
-
-            # For videos, extract duration using ffprobe
-            if content_type == "video":
-                duration = self.get_video_duration(file_path)
-                if duration is not None:
-                    # Round to nearest integer for display_duration
-                    file_info["duration"] = duration
-                    file_info["duration_seconds"] = int(round(duration))
-                    logger.info(
-                        f"Detected video duration: {duration:.2f}s "
-                        f"(rounded to {file_info['duration_seconds']}s)"
-                    )
-
+            record_file(
+                self.base_path, file_path, upload.checksum, user_id, slideshow_id
+            )
             logger.info(
                 f"Successfully saved file: {secure_name} for user {user_id}, "
                 f"slideshow {slideshow_id}"
@@ -617,6 +816,110 @@ class StorageManager:
             logger.error(f"Failed to save file {file.filename}: {e}")
             return False, f"Failed to save file: {str(e)}", None
 
+    def check_stored_video(
+        self, file_path: Path, original_filename: str, checksum: Optional[str] = None
+    ) -> Tuple[Optional[Dict[str, Any]], str]:
+        """
+        Probe a stored video once and validate its codec.
+
+        Args:
+            file_path: Path to the stored video
+            original_filename: Original filename for error messages
+            checksum: SHA-256 checksum of the video, if known
+
+        Returns:
+            Tuple of (probe_info, error_message). probe_info is None if
+            ffprobe could not read the file, which is allowed for backwards
+            compatibility; error_message is non-empty if the codec is not
+            browser-compatible.
+        """
+        probe_info = self.probe_video(file_path, checksum=checksum)
+        if probe_info is None:
+            logger.warning(
+                f"Could not determine video codec for '{original_filename}' "
+                f"at {file_path}. Allowing upload but video may not play in browser."
+            )
+            return None, ""
+
+        _, error_message = self.validate_video_format(
+            file_path, original_filename, codec_info=probe_info
+        )
+        return probe_info, error_message
+
+    def _process_stored_video(
+        self, file_path: Path, original_filename: str, file_info: Dict[str, Any]
+    ) -> Optional[str]:
+        """
+        Validate a stored video and add its duration to its file info.
+
+        The video is deleted if its codec is not browser-compatible.
+
+        Args:
+            file_path: Path to the stored video
+            original_filename: Original filename for error messages
+            file_info: File info dictionary to update
+
+        Returns:
+            Error message if the video was rejected, otherwise None
+        """
+        probe_info, format_error = self.check_stored_video(file_path, original_filename)
+        if format_error:
+            # Delete the saved file since validation failed
+            try:
+                file_path.unlink()
+            except Exception as delete_err:
+                logger.error(
+                    f"Failed to delete invalid video file {file_path}: {delete_err}"
+                )
+            return format_error
+
+        duration = probe_info.get("duration") if probe_info else None
+        if duration is not None:
+            # Round to nearest integer for display_duration
+            file_info["duration"] = duration
+            file_info["duration_seconds"] = int(round(duration))
+            logger.info(
+                f"Detected video duration: {duration:.2f}s "
+                f"(rounded to {file_info['duration_seconds']}s)"
+            )
+        return None
+
+    def _build_file_info(
+        self,
+        file_path: Path,
+        original_filename: str,
+        content_type: str,
+        file_size: int,
+        checksum: str,
+    ) -> Dict[str, Any]:
+        """
+        Build the file info dictionary returned for a stored upload.
+
+        Args:
+            file_path: Absolute path of the stored file
+            original_filename: Original uploaded filename
+            content_type: Type of content ('image' or 'video')
+            file_size: Size of the file in bytes
+            checksum: SHA-256 hex digest of the file content
+
+        Returns:
+            Dictionary describing the stored file
+        """
+        # Get MIME type
+        mime_type, _ = mimetypes.guess_type(str(file_path))
+
+        return {
+            "filename": file_path.name,
+            "original_filename": original_filename,
+            "file_path": file_path.relative_to(self.base_path).as_posix(),
+            "absolute_path": str(file_path),
+            "content_type": content_type,
+            "mime_type": mime_type,
+            "file_size": file_size,
+            "checksum": checksum,
+            "upload_date": datetime.now(timezone.utc).isoformat(),
+        }
+
     def delete_file(self, file_path: str) -> Tuple[bool, str]:
         """
         Delete a file from storage.
@@ -631,6 +934,7 @@ class StorageManager:
             full_path = self.base_path / file_path
             if full_path.exists():
                 full_path.unlink()
+                forget_files([Path(file_path).as_posix()])
                 logger.info(f"Deleted file: {file_path}")
                 return True, "File deleted successfully"
             else:
@@ -644,16 +948,40 @@ class StorageManager:
         """
         Clean up all files associated with a slideshow.
 
+        Content-addressed media is reference counted: the slideshow's items
+        release their blob references. Blobs left without references are
+        deleted by the scheduled purge once MEDIA_ORPHAN_GRACE_HOURS have
+        passed, since a concurrent upload may have just reused them. Files
+        stored in the older per-slideshow directories are removed from
+        those directories.
+
         Args:
             slideshow_id: ID of the slideshow to clean up
 
         Returns:
             Tuple of (files_deleted_count, error_messages)
         """
+        from .media_store import purge_unreferenced_blobs, release_slideshow_media
+
         deleted_count = 0
         errors = []
 
-        # Find all directories that might contain files for this slideshow
+        try:
+            released = release_slideshow_media(slideshow_id)
+            if released:
+                result = purge_unreferenced_blobs(blob_ids=released, storage=self)
+                deleted_count += len(result["deleted"])
+                errors.extend(
+                    f"Failed to delete {e['path']}: {e['error']}"
+                    for e in result["errors"]
+                )
+        except Exception as e:
+            error_msg = f"Failed to release media for slideshow {slideshow_id}: {e}"
+            errors.append(error_msg)
+            logger.error(error_msg)
+
+        # Files uploaded before content-addressed storage live in
+        # per-user, per-slideshow directories
         for content_type in ["images", "videos"]:
             content_path = self.base_path / content_type
             if not content_path.exists():
@@ -664,11 +992,15 @@ class StorageManager:
                 if user_dir.is_dir():
                     slideshow_dir = user_dir / str(slideshow_id)
                     if slideshow_dir.exists():
+                        deleted_paths = []
                         try:
                             # Delete all files in the slideshow directory
                             for file_path in slideshow_dir.iterdir():
                                 if file_path.is_file():
                                     file_path.unlink()
+                                    deleted_paths.append(
+                                        file_path.relative_to(self.base_path).as_posix()
+                                    )
                                     deleted_count += 1
 
                             # Remove the directory if empty
@@ -682,6 +1014,7 @@ class StorageManager:
                             error_msg = f"Failed to cleanup {slideshow_dir}: {e}"
                             errors.append(error_msg)
                             logger.error(error_msg)
+                        forget_files(deleted_paths)
 
         return deleted_count, errors
 
@@ -726,60 +1059,93 @@ class StorageManager:
         """
         Get comprehensive storage statistics.
 
+        Statistics come from the file catalog (see file_catalog) rather
+        than walking the upload folder, so files changed outside the
+        application are only counted once the catalog is reconciled.
+
         Returns:
             Dictionary with storage statistics
         """
-        total_size = 0
-        image_size = 0
-        video_size = 0
-        total_files = 0
-        image_files = 0
-        video_files = 0
-        users_with_files: set[str] = set()
-        slideshows_with_files: set[str] = set()
-
         try:
-            for content_type in ["images", "videos"]:
-                content_path = self.base_path / content_type
-                if not content_path.exists():
-                    continue
-
-                for user_dir in content_path.iterdir():
-                    if user_dir.is_dir():
-                        user_id = user_dir.name
-                        users_with_files.add(user_id)
-
-                        for slideshow_dir in user_dir.iterdir():
-                            if slideshow_dir.is_dir():
-                                slideshow_id = slideshow_dir.name
-                                slideshows_with_files.add(slideshow_id)
-
-                                for file_path in slideshow_dir.iterdir():
-                                    if file_path.is_file():
-                                        file_size = file_path.stat().st_size
-                                        total_size += file_size
-                                        total_files += 1
-
-                                        if content_type == "images":
-                                            image_size += file_size
-                                            image_files += 1
-                                        else:
-                                            video_size += file_size
-                                            video_files += 1
-
+            return get_catalog_stats()
         except Exception as e:
             logger.error(f"Failed to calculate storage stats: {e}")
+            return {
+                "total_size": 0,
+                "image_size": 0,
+                "video_size": 0,
+                "total_files": 0,
+                "image_files": 0,
+                "video_files": 0,
+                "users_with_files": 0,
+                "slideshows_with_files": 0,
+            }
 
-        return {
-            "total_size": total_size,
-            "image_size": image_size,
-            "video_size": video_size,
-            "total_files": total_files,
-            "image_files": image_files,
-            "video_files": video_files,
-            "users_with_files": len(users_with_files),
-            "slideshows_with_files": len(slideshows_with_files),
-        }
+
+class UploadRequest(Request):
+    """Request class that streams upload file parts straight to storage.
+
+    For views decorated with @streaming_upload, each file part of a
+    multipart body is written to an UploadStream as Werkzeug parses it,
+    instead of Werkzeug's default in-memory/temporary-file spool. The file
+    is hashed, size-limited and written to the staging directory in the
+    same pass, and StorageManager.save_file() then renames it into place.
+    """
+
+    def _get_file_stream(
+        self,
+        total_content_length: Optional[int],
+        content_type: Optional[str],
+        filename: Optional[str] = None,
+        content_length: Optional[int] = None,
+    ) -> IO[bytes]:
+        """Get the stream a multipart file part is written to.
+
+        Args:
+            total_content_length: Length of the whole request body
+            content_type: MIME type of the file part
+            filename: Uploaded filename, if provided
+            content_length: Length of the file part, if provided
+
+        Returns:
+            An UploadStream for streaming upload views, otherwise Werkzeug's
+            default stream
+        """
+        upload_type = self.environ.get(UPLOAD_CONTENT_TYPE_ENVIRON_KEY)
+        if upload_type is None or not filename:
+            return super()._get_file_stream(
+                total_content_length, content_type, filename, content_length
+            )
+        return get_storage_manager().open_upload_stream(  # type: ignore[return-value]
+            filename, upload_type, expected_size=total_content_length
+        )
+
+
+def streaming_upload(
+    content_type: str,
+) -> Callable[[Callable[..., T]], Callable[..., T]]:
+    """Decorator enabling single-pass streaming uploads for a view.
+
+    Files in the request body are parsed directly into UploadStream objects
+    limited to the size allowed for ``content_type``. The view must not
+    have had its form data parsed before this decorator runs.
+
+    Args:
+        content_type: Content type of the uploaded files ('image' or 'video')
+
+    Returns:
+        Decorator function
+    """
+
+    def decorator(func: Callable[..., T]) -> Callable[..., T]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> T:
+            request.environ[UPLOAD_CONTENT_TYPE_ENVIRON_KEY] = content_type
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
 
 
 # Global storage manager instance
@@ -810,10 +1176,16 @@ def init_storage(app: "Flask") -> None:
     upload_folder = app.config.get("UPLOAD_FOLDER", "instance/uploads")
     storage_manager = StorageManager(upload_folder)
 
+    # Stream multipart uploads straight to storage
+    app.request_class = UploadRequest
+
     # Ensure base directories exist
     base_path = Path(upload_folder)
     for content_type in ["images", "videos"]:
         content_path = base_path / content_type
         storage_manager.ensure_directory(content_path)
+        storage_manager.ensure_directory(
+            base_path / StorageManager.MEDIA_DIRECTORY / content_type
+        )
 
     logger.info(f"Storage system initialized with upload folder: {upload_folder}")
@@ -3,6 +3,7 @@ Storage resilience utilities for the Kiosk Show Replacement application.
 
 This module provides enhanced storage operations with:
 - Atomic file writes (write to temp, then rename)
+- Single-pass upload streams (hash, size limit and write in one pass)
 - Disk space checking before uploads
 - File integrity validation (checksum)
 - Exception-based error handling
@@ -169,8 +170,12 @@ class AtomicFileWriter:
         self.temp_path: Optional[Path] = None
         self.file: Optional[IO[Any]] = None
 
-    def __enter__(self) -> IO[Any]:
-        """Create temporary file and return file handle."""
+    def open(self) -> IO[Any]:
+        """Create the temporary file and return its file handle.
+
+        Returns:
+            Open handle for the temporary file
+        """
         # Create temp file in same directory to ensure same filesystem
         self.target_path.parent.mkdir(parents=True, exist_ok=True)
         fd, temp_path = tempfile.mkstemp(
@@ -185,26 +190,49 @@ class AtomicFileWriter:
         self.file = open(self.temp_path, self.mode)
         return self.file
 
-    def __exit__(
-        self,
-        exc_type: Optional[type[BaseException]],
-        exc_val: Optional[BaseException],
-        exc_tb: Optional[TracebackType],
-    ) -> None:
-        """Finalize write or cleanup on error."""
+    def adopt(self, temp_path: Path) -> IO[Any]:
+        """Use an existing file as the temporary file and return its handle.
+
+        The file is renamed into place by commit() or removed by abort()
+        exactly as if it had been created by open().
+
+        Args:
+            temp_path: Existing file on the same filesystem as the target
+
+        Returns:
+            Open handle for the adopted file
+        """
+        self.temp_path = temp_path
+        self.file = open(self.temp_path, self.mode)
+        return self.file
+
+    def abort(self) -> None:
+        """Close and remove the temporary file, leaving the target untouched."""
         if self.file:
             self.file.close()
 
-        if exc_type is not None:
-            # Error occurred - cleanup temp file
-            if self.temp_path and self.temp_path.exists():
-                try:
-                    self.temp_path.unlink()
-                except Exception as e:
-                    logger.warning(f"Failed to cleanup temp file {self.temp_path}: {e}")
-            return  # Re-raise the exception
+        if self.temp_path and self.temp_path.exists():
+            try:
+                self.temp_path.unlink()
+            except Exception as e:
+                logger.warning(f"Failed to cleanup temp file {self.temp_path}: {e}")
+
+    def commit(self, target_path: Optional[Path] = None) -> None:
+        """Close the temporary file and atomically rename it into place.
+
+        Args:
+            target_path: Override the destination given to the constructor.
+                Must be on the same filesystem as the original target's
+                directory so the rename stays atomic.
+
+        Raises:
+            StorageError: If the rename fails
+        """
+        if target_path is not None:
+            self.target_path = target_path
+        if self.file:
+            self.file.close()
 
-        # Success - atomically rename temp to target
         try:
             if self.temp_path:
                 self.temp_path.rename(self.target_path)
@@ -222,6 +250,201 @@ class AtomicFileWriter:
                 file_path=str(self.target_path),
             )
 
+    def __enter__(self) -> IO[Any]:
+        """Create temporary file and return file handle."""
+        return self.open()
+
+    def __exit__(
+        self,
+        exc_type: Optional[type[BaseException]],
+        exc_val: Optional[BaseException],
+        exc_tb: Optional[TracebackType],
+    ) -> None:
+        """Finalize write or cleanup on error."""
+        if exc_type is not None:
+            # Error occurred - cleanup temp file
+            self.abort()
+            return  # Re-raise the exception
+
+        # Success - atomically rename temp to target
+        self.commit()
+
+
+class UploadStream:
+    """Single-pass sink for uploaded file data.
+
+    Data written to the stream is hashed, counted and written to an
+    AtomicFileWriter temporary file as it arrives, so an upload is read
+    exactly once and never held in memory. Once more than ``max_size``
+    bytes have been written the stream stops storing data (and truncates
+    what it already wrote) but keeps counting, so the caller can report
+    the real size after the request body has been drained.
+
+    The stream is also readable and seekable so it can back a Werkzeug
+    FileStorage. Call commit() to move the data to its final location;
+    closing an uncommitted stream discards the temporary file.
+    """
+
+    def __init__(
+        self,
+        staging_path: Path,
+        max_size: Optional[int] = None,
+        algorithm: str = "sha256",
+        adopt: bool = False,
+    ):
+        """Open the temporary file for an upload.
+
+        Args:
+            staging_path: Placeholder path whose directory holds the
+                temporary file; it must be on the same filesystem as the
+                final destination
+            max_size: Maximum number of bytes to store (None for no limit)
+            algorithm: Hash algorithm for the checksum
+            adopt: If True, staging_path is an already-assembled file that
+                becomes the temporary file; it is hashed and counted in a
+                single read pass instead of being copied
+        """
+        self.max_size = max_size
+        self.algorithm = algorithm
+        self.size = 0
+        self.exceeded = False
+        self.committed = False
+        self._hash = hashlib.new(algorithm)
+        if adopt:
+            self._writer = AtomicFileWriter(staging_path, mode="rb+")
+            self._file = self._writer.adopt(staging_path)
+            self._hash_existing()
+        else:
+            self._writer = AtomicFileWriter(staging_path, mode="wb+")
+            self._file = self._writer.open()
+
+    def _hash_existing(self, chunk_size: int = 64 * 1024) -> None:
+        """Hash and count the contents of an adopted file.
+
+        Args:
+            chunk_size: Bytes per read
+        """
+        while True:
+            chunk = self._file.read(chunk_size)
+            if not chunk:
+                break
+            self._hash.update(chunk)
+            self.size += len(chunk)
+        if self.max_size is not None and self.size > self.max_size:
+            self.exceeded = True
+        self._file.seek(0)
+
+    @property
+    def checksum(self) -> str:
+        """Hexadecimal checksum of the data written so far."""
+        return self._hash.hexdigest()
+
+    @property
+    def closed(self) -> bool:
+        """Whether the underlying temporary file is closed."""
+        return self._file.closed
+
+    def write(self, data: bytes) -> int:
+        """Hash, count and store a chunk of upload data.
+
+        Args:
+            data: Chunk of file data
+
+        Returns:
+            Number of bytes consumed
+        """
+        self.size += len(data)
+        if self.exceeded:
+            return len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            # Release the disk space already used; keep counting only
+            self.exceeded = True
+            self._file.seek(0)
+            self._file.truncate()
+            return len(data)
+
+        self._hash.update(data)
+        self._file.write(data)
+        return len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        """Read stored data back from the temporary file."""
+        return self._file.read(size)
+
+    def readline(self, size: int = -1) -> bytes:
+        """Read a line of stored data back from the temporary file."""
+        return self._file.readline(size)
+
+    def seek(self, offset: int, whence: int = 0) -> int:
+        """Move the read position within the temporary file."""
+        return self._file.seek(offset, whence)
+
+    def tell(self) -> int:
+        """Get the current position within the temporary file."""
+        return self._file.tell()
+
+    def readable(self) -> bool:
+        """Upload streams are readable."""
+        return True
+
+    def writable(self) -> bool:
+        """Upload streams are writable."""
+        return True
+
+    def seekable(self) -> bool:
+        """Upload streams are seekable."""
+        return True
+
+    def flush(self) -> None:
+        """Flush buffered data to the temporary file."""
+        self._file.flush()
+
+    def commit(self, target_path: Path) -> None:
+        """Atomically move the stored data to its final location.
+
+        Args:
+            target_path: Final destination (same filesystem as the staging path)
+
+        Raises:
+            StorageError: If the upload exceeded max_size or the rename fails
+        """
+        if self.exceeded:
+            self.close()
+            raise StorageError(
+                message="Upload exceeds maximum allowed size",
+                operation="upload",
+                details={"size": self.size, "max_size": self.max_size},
+            )
+        self._writer.commit(target_path)
+        self.committed = True
+
+    def close(self) -> None:
+        """Close the stream, discarding the data unless it was committed."""
+        if not self.committed:
+            self._writer.abort()
+
+
+def copy_to_upload_stream(
+    source: IO[bytes], upload: UploadStream, chunk_size: int = 64 * 1024
+) -> UploadStream:
+    """Copy a readable stream into an UploadStream in fixed-size chunks.
+
+    Args:
+        source: Readable binary stream
+        upload: Destination upload stream
+        chunk_size: Bytes per read
+
+    Returns:
+        The destination upload stream
+    """
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        upload.write(chunk)
+    upload.flush()
+    return upload
+
 
 def save_file_atomic(
     file: FileStorage,
@@ -249,12 +472,9 @@ def save_file_atomic(
     # Check disk space
     check_disk_space(target_path.parent, file_size)
 
-    # Calculate checksum before save (if requested)
-    checksum = None
-    if calculate_hash:
-        checksum = calculate_stream_checksum(file)
-
-    # Write file atomically
+    # Write file atomically, hashing each chunk as it is copied so the
+    # source is only read once
+    hash_obj = hashlib.new("sha256") if calculate_hash else None
     try:
         with AtomicFileWriter(target_path) as f:
             # Copy in chunks
@@ -262,6 +482,8 @@ def save_file_atomic(
                 chunk = file.read(8192)
                 if not chunk:
                     break
+                if hash_obj is not None:
+                    hash_obj.update(chunk)
                 f.write(chunk)
     except StorageError:
         raise
@@ -273,9 +495,7 @@ def save_file_atomic(
             file_path=str(target_path),
         )
 
-    # Verify file was written correctly
-    if checksum and calculate_hash:
-        verify_checksum(target_path, checksum)
+    checksum = hash_obj.hexdigest() if hash_obj is not None else None
 
     return {
         "path": str(target_path),
@@ -0,0 +1,597 @@
+"""
+Background storage integrity scan for the Kiosk Show Replacement application.
+
+A scan runs on its own worker thread, queued every STORAGE_SCAN_INTERVAL
+seconds by the scheduler or on demand from the admin API, and:
+
+1. Visits the catalogued directories of the upload folder (see
+   file_catalog) level by level, statting them on STORAGE_SCAN_THREADS
+   threads. A directory whose modification time is unchanged since it was
+   last listed has had no files added, removed or renamed, so only its
+   known subdirectories are visited; changed directories are listed with
+   os.scandir and their catalog entries reconciled.
+2. Records orphaned files and slideshow items whose file is missing, which
+   StorageIntegrityChecker finds from the catalog.
+3. With STORAGE_SCAN_VERIFY_CHECKSUMS enabled, re-hashes files not
+   verified in the last STORAGE_SCAN_VERIFY_INTERVAL_HOURS, reading at most
+   STORAGE_SCAN_VERIFY_BYTES_PER_SECOND on average, and records files whose
+   content no longer matches their checksum. This also catches files
+   changed in place, which do not change their directory's modification
+   time.
+
+Only one scan runs at a time across all application processes: a scan
+first claims the "storage_scan" job lease (see leases) and renews it, with
+the scan's updated_at, at least every HEARTBEAT_SECONDS while it works,
+including while checksum verification is throttled. Progress is committed
+after each level of directories, every few verified files and at each
+heartbeat. Each directory's checkpoint row records the scan that last
+visited it, so a scan interrupted by a restart resumes, once its lease
+expires, where it stopped instead of starting over. Results are stored in
+the storage_scans and storage_scan_issues tables, which the admin API
+serves.
+"""
+
+import logging
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from flask import Flask, current_app
+from sqlalchemy import delete, or_, select
+
+from .exceptions import StorageError
+from .file_catalog import (
+    CATALOG_DIRECTORIES,
+    forget_directory,
+    list_directory,
+    reconcile_directory,
+)
+from .leases import claim_lease, release_lease, renew_lease
+from .media_probe import MediaProbePool
+from .models import (
+    StorageScan,
+    StorageScanDirectory,
+    StorageScanIssue,
+    StoredFile,
+    db,
+)
+from .storage_resilience import calculate_checksum
+
+logger = logging.getLogger(__name__)
+
+# A running scan not updated for this long is assumed to have been
+# interrupted and is resumed by the next scan (seconds)
+STALE_SCAN_SECONDS = 900
+
+# Longest time between progress commits and lease renewals of a running
+# scan (seconds); well below STALE_SCAN_SECONDS
+HEARTBEAT_SECONDS = 60
+
+# Job lease held by the running scan
+SCAN_LEASE = "storage_scan"
+
+# Issues of each kind stored per scan; the scan's issue_count has the total
+MAX_ISSUES_PER_KIND = 1000
+
+# Verified files between commits of checksum verification progress
+VERIFY_COMMIT_INTERVAL = 50
+
+# Completed and failed scans kept, with their issues
+SCANS_KEPT = 10
+
+# Scans run on one background thread; scan_pool.submit() refuses a second
+scan_pool = MediaProbePool(
+    max_workers=1, max_queue=0, thread_name_prefix="storage-scan"
+)
+
+
+@dataclass
+class DirectoryVisit:
+    """Result of visiting a directory during a scan.
+
+    Attributes:
+        path: Path of the directory relative to the upload folder
+        mtime_ns: Modification time of the directory, or None if it no
+            longer exists
+        files: Catalogued files in the directory, or None if it was not
+            listed because it is unchanged
+        subdirectories: Subdirectories of a listed directory
+    """
+
+    path: str
+    mtime_ns: Optional[int]
+    files: Optional[Dict[str, os.stat_result]] = None
+    subdirectories: List[str] = field(default_factory=list)
+
+
+def _utcnow() -> datetime:
+    """Return the current time as a naive UTC datetime, as stored in the DB."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _naive_utc(value: datetime) -> datetime:
+    """Return a naive UTC datetime (aware values are converted)."""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def visit_directory(
+    base_path: Path, directory: str, known_mtime_ns: Optional[int]
+) -> DirectoryVisit:
+    """Stat a directory and list it if it changed since it was last listed.
+
+    Runs on the scan's listing threads, so it only touches the filesystem.
+
+    Args:
+        base_path: Upload folder
+        directory: Path of the directory relative to the upload folder
+        known_mtime_ns: Modification time recorded when it was last listed
+
+    Returns:
+        The directory visit
+    """
+    try:
+        mtime_ns = os.stat(os.path.join(base_path, directory)).st_mtime_ns
+        if mtime_ns == known_mtime_ns:
+            return DirectoryVisit(directory, mtime_ns)
+        files, subdirectories = list_directory(base_path, directory)
+    except FileNotFoundError:
+        return DirectoryVisit(directory, None)
+    return DirectoryVisit(directory, mtime_ns, files, subdirectories)
+
+
+class ScanLeaseLost(Exception):
+    """Raised when another process has taken over the running scan."""
+
+
+def _parent(path: str) -> str:
+    """Return the parent of a directory path."""
+    return path.rsplit("/", 1)[0] if "/" in path else ""
+
+
+class StorageScanner:
+    """Runs one storage integrity scan, recording progress on its row."""
+
+    def __init__(
+        self,
+        scan: StorageScan,
+        base_path: Path,
+        threads: int = 4,
+        lease_token: Optional[str] = None,
+    ):
+        """Initialize the scanner.
+
+        Args:
+            scan: Scan row to record progress and results on
+            base_path: Upload folder
+            threads: Threads statting and listing directories
+            lease_token: Claim of the scan lease to renew at each checkpoint
+        """
+        self.scan = scan
+        self.base_path = base_path
+        self.threads = threads
+        self.lease_token = lease_token
+        self._last_checkpoint = time.monotonic()
+        self.directories: Dict[str, StorageScanDirectory] = {}
+        self.children: Dict[str, List[str]] = defaultdict(list)
+        self.issue_counts: Dict[str, int] = defaultdict(int)
+
+    def run(self) -> None:
+        """Scan directories, record findings and verify checksums."""
+        # A resumed scan records its findings again
+        db.session.execute(
+            delete(StorageScanIssue).where(StorageScanIssue.scan_id == self.scan.id)
+        )
+        self.scan_directories()
+        self.record_findings()
+        if self.scan.verify_checksums:
+            self.verify_checksums()
+        self.scan.issue_count = sum(self.issue_counts.values())
+
+    def checkpoint(self) -> None:
+        """Commit progress and renew the scan's lease.
+
+        Raises:
+            ScanLeaseLost: If another process has taken the scan over
+        """
+        self.scan.updated_at = _utcnow()
+        db.session.commit()
+        self._last_checkpoint = time.monotonic()
+        if self.lease_token is not None and not renew_lease(
+            SCAN_LEASE, self.lease_token, STALE_SCAN_SECONDS
+        ):
+            raise ScanLeaseLost(f"Storage scan {self.scan.id} was taken over")
+
+    def _checkpoint_due(self) -> bool:
+        """Whether the last checkpoint was HEARTBEAT_SECONDS ago."""
+        return time.monotonic() - self._last_checkpoint >= HEARTBEAT_SECONDS
+
+    def _throttle(self, seconds: float) -> None:
+        """Sleep, checkpointing at least every HEARTBEAT_SECONDS."""
+        while seconds > 0:
+            chunk = min(seconds, HEARTBEAT_SECONDS)
+            time.sleep(chunk)
+            seconds -= chunk
+            if self._checkpoint_due():
+                self.checkpoint()
+
+    def _add_issue(self, kind: str, **values: object) -> None:
+        """Record an issue, up to MAX_ISSUES_PER_KIND of each kind."""
+        self.issue_counts[kind] += 1
+        if self.issue_counts[kind] <= MAX_ISSUES_PER_KIND:
+            db.session.add(StorageScanIssue(scan_id=self.scan.id, kind=kind, **values))
+
+    def _forget_directory(self, directory: str) -> None:
+        """Drop the catalog entries and checkpoints below a deleted directory."""
+        self.scan.files_removed += forget_directory(directory)
+        db.session.execute(
+            delete(StorageScanDirectory).where(
+                or_(
+                    StorageScanDirectory.path == directory,
+                    StorageScanDirectory.path.startswith(
+                        f"{directory}/", autoescape=True
+                    ),
+                )
+            )
+        )
+        for path in [
+            p
+            for p in self.directories
+            if p == directory or p.startswith(f"{directory}/")
+        ]:
+            del self.directories[path]
+
+    def _record_visit(self, visit: DirectoryVisit) -> None:
+        """Save a visited directory's checkpoint."""
+        assert visit.mtime_ns is not None
+        row = self.directories.get(visit.path)
+        if row is None:
+            row = StorageScanDirectory(path=visit.path)
+            db.session.add(row)
+            self.directories[visit.path] = row
+        row.scan_id = self.scan.id
+        if visit.files is not None:
+            row.mtime_ns = visit.mtime_ns
+            row.file_count = len(visit.files)
+            row.listed_at = _utcnow()
+
+    def _visit_all(self, level: List[str]) -> List[DirectoryVisit]:
+        """Visit a level of directories, in parallel when configured."""
+        known = {
+            path: row.mtime_ns
+            for path, row in self.directories.items()
+            if path in level
+        }
+        if self.threads <= 1 or len(level) == 1:
+            return [visit_directory(self.base_path, d, known.get(d)) for d in level]
+        with ThreadPoolExecutor(
+            max_workers=self.threads, thread_name_prefix="storage-scan-list"
+        ) as executor:
+            return list(
+                executor.map(
+                    lambda d: visit_directory(self.base_path, d, known.get(d)), level
+                )
+            )
+
+    def scan_directories(self) -> None:
+        """Reconcile the catalog with the directories that changed."""
+        for row in StorageScanDirectory.query.all():
+            self.directories[row.path] = row
+            self.children[_parent(row.path)].append(row.path)
+
+        level = list(CATALOG_DIRECTORIES)
+        while level:
+            # Directories this scan already visited before it was interrupted
+            done = [
+                d
+                for d in level
+                if d in self.directories and self.directories[d].scan_id == self.scan.id
+            ]
+            next_level = [child for d in done for child in self.children[d]]
+
+            for visit in self._visit_all([d for d in level if d not in done]):
+                if visit.mtime_ns is None:
+                    self._forget_directory(visit.path)
+                    continue
+                if visit.files is None:
+                    self.scan.directories_skipped += 1
+                    next_level.extend(self.children[visit.path])
+                else:
+                    counts = reconcile_directory(
+                        self.base_path, visit.path, visit.files
+                    )
+                    self.scan.directories_scanned += 1
+                    self.scan.files_scanned += counts["scanned"]
+                    self.scan.files_added += counts["added"]
+                    self.scan.files_updated += counts["updated"]
+                    self.scan.files_removed += counts["removed"]
+                    for child in self.children[visit.path]:
+                        if child not in visit.subdirectories:
+                            self._forget_directory(child)
+                    next_level.extend(visit.subdirectories)
+                self._record_visit(visit)
+
+            self.checkpoint()
+            level = next_level
+
+    def record_findings(self) -> None:
+        """Record orphaned files and items whose file is missing."""
+        from .validation import StorageIntegrityChecker
+
+        checker = StorageIntegrityChecker(str(self.base_path))
+        for orphan in checker.find_orphaned_files():
+            self._add_issue(
+                "orphaned",
+                path=orphan["relative_path"],
+                file_size=orphan["size"],
+                media_blob_id=orphan.get("media_blob_id"),
+            )
+        for item in checker.find_missing_files():
+            self._add_issue(
+                "missing",
+                path=item["relative_path"],
+                slideshow_item_id=item["item_id"],
+                slideshow_id=item["slideshow_id"],
+            )
+        self.checkpoint()
+
+    def verify_checksums(self) -> None:
+        """Re-hash files due for verification at a throttled rate."""
+        config = current_app.config
+        rate = float(config.get("STORAGE_SCAN_VERIFY_BYTES_PER_SECOND", 10485760))
+        interval = float(config.get("STORAGE_SCAN_VERIFY_INTERVAL_HOURS", 168))
+        cutoff = _utcnow() - timedelta(hours=interval)
+
+        due = db.session.execute(
+            select(
+                StoredFile.id,
+                StoredFile.path,
+                StoredFile.checksum,
+                StoredFile.file_size,
+            )
+            .where(
+                StoredFile.checksum.isnot(None),
+                or_(StoredFile.verified_at.is_(None), StoredFile.verified_at < cutoff),
+            )
+            .order_by(
+                StoredFile.verified_at.isnot(None),
+                StoredFile.verified_at,
+                StoredFile.id,
+            )
+        ).all()
+
+        started = time.monotonic()
+        bytes_read = 0
+        for count, entry in enumerate(due, start=1):
+            file_path = self.base_path / entry.path
+            if not file_path.exists():
+                # Deleted since it was catalogued; the next scan drops it
+                continue
+            try:
+                checksum = calculate_checksum(file_path)
+            except StorageError as e:
+                self._add_issue(
+                    "unreadable",
+                    path=entry.path,
+                    file_size=entry.file_size,
+                    detail=str(e),
+                )
+                continue
+
+            bytes_read += entry.file_size
+            self.scan.checksums_verified += 1
+            self.scan.bytes_verified += entry.file_size
+            if checksum == entry.checksum:
+                db.session.execute(
+                    StoredFile.__table__.update()
+                    .where(StoredFile.id == entry.id)
+                    .values(verified_at=_utcnow())
+                )
+            else:
+                self._add_issue(
+                    "checksum_mismatch",
+                    path=entry.path,
+                    file_size=entry.file_size,
+                    detail=f"Expected {entry.checksum}, found {checksum}",
+                )
+
+            if count % VERIFY_COMMIT_INTERVAL == 0 or self._checkpoint_due():
+                self.checkpoint()
+            if rate > 0:
+                ahead = bytes_read / rate - (time.monotonic() - started)
+                if ahead > 0:
+                    self._throttle(ahead)
+        self.checkpoint()
+
+
+def get_running_scan() -> Optional[StorageScan]:
+    """Get the scan in progress, if any.
+
+    Returns:
+        The most recent running scan updated within STALE_SCAN_SECONDS,
+        or None
+    """
+    scan = (
+        StorageScan.query.filter_by(status="running")
+        .order_by(StorageScan.id.desc())
+        .first()
+    )
+    if scan is None:
+        return None
+    if _utcnow() - _naive_utc(scan.updated_at) > timedelta(seconds=STALE_SCAN_SECONDS):
+        return None
+    return scan
+
+
+def _prune_scans() -> None:
+    """Delete finished scans beyond the most recent SCANS_KEPT."""
+    old_ids = (
+        db.session.execute(
+            select(StorageScan.id)
+            .where(StorageScan.status != "running")
+            .order_by(StorageScan.id.desc())
+            .offset(SCANS_KEPT)
+        )
+        .scalars()
+        .all()
+    )
+    if old_ids:
+        db.session.execute(
+            delete(StorageScanIssue).where(StorageScanIssue.scan_id.in_(old_ids))
+        )
+        db.session.execute(delete(StorageScan).where(StorageScan.id.in_(old_ids)))
+
+
+def run_storage_scan(
+    base_path: Optional[Path] = None, verify_checksums: Optional[bool] = None
+) -> Optional[StorageScan]:
+    """Run a storage integrity scan, resuming an interrupted one.
+
+    Args:
+        base_path: Upload folder (defaults to UPLOAD_FOLDER)
+        verify_checksums: Verify file checksums (defaults to
+            STORAGE_SCAN_VERIFY_CHECKSUMS)
+
+    Returns:
+        The finished scan, or None if another scan is in progress or took
+        this one over
+    """
+    config = current_app.config
+    if base_path is None:
+        base_path = Path(config.get("UPLOAD_FOLDER", "instance/uploads"))
+    if verify_checksums is None:
+        verify_checksums = bool(config.get("STORAGE_SCAN_VERIFY_CHECKSUMS", False))
+
+    token = claim_lease(SCAN_LEASE, STALE_SCAN_SECONDS)
+    if token is None:
+        logger.info("Storage scan already in progress; not starting another")
+        return None
+    try:
+        scan = _run_claimed_scan(base_path, verify_checksums, token)
+    finally:
+        release_lease(SCAN_LEASE, token)
+    if scan is None:
+        return None
+
+    logger.info(
+        f"Storage scan {scan.id} {scan.status}: {scan.directories_scanned} "
+        f"directories listed, {scan.directories_skipped} unchanged, "
+        f"{scan.checksums_verified} checksums verified, {scan.issue_count} issues"
+    )
+    return scan
+
+
+def _run_claimed_scan(
+    base_path: Path, verify_checksums: bool, token: str
+) -> Optional[StorageScan]:
+    """Run a scan while holding the scan lease.
+
+    Args:
+        base_path: Upload folder
+        verify_checksums: Verify file checksums
+        token: Claim of the scan lease
+
+    Returns:
+        The finished scan, or None if another process took it over
+    """
+    if get_running_scan() is not None:
+        # Still updated by a process not holding the lease, such as one
+        # started before an upgrade
+        logger.info("Storage scan already in progress; not starting another")
+        return None
+
+    # Holding the lease, any running scan is one that was interrupted
+    scan = (
+        StorageScan.query.filter_by(status="running")
+        .order_by(StorageScan.id.desc())
+        .first()
+    )
+    if scan is not None:
+        logger.info(f"Resuming interrupted storage scan {scan.id}")
+        scan.updated_at = _utcnow()
+    else:
+        scan = StorageScan(status="running", verify_checksums=verify_checksums)
+        db.session.add(scan)
+    db.session.commit()
+
+    scanner = StorageScanner(
+        scan,
+        base_path,
+        threads=int(current_app.config.get("STORAGE_SCAN_THREADS", 4)),
+        lease_token=token,
+    )
+    try:
+        scanner.run()
+        scan.status = "completed"
+    except ScanLeaseLost as e:
+        # The process that took over records the outcome
+        db.session.rollback()
+        logger.warning(str(e))
+        return None
+    except Exception as e:
+        db.session.rollback()
+        logger.exception(f"Storage scan {scan.id} failed: {e}")
+        scan.status = "failed"
+        scan.error = str(e)
+    scan.completed_at = _utcnow()
+    _prune_scans()
+    db.session.commit()
+    return scan
+
+
+def _run_in_app_context(app: Flask, verify_checksums: Optional[bool]) -> None:
+    """Run a storage scan on the scan thread."""
+    with app.app_context():
+        run_storage_scan(verify_checksums=verify_checksums)
+
+
+def schedule_storage_scan(verify_checksums: Optional[bool] = None) -> bool:
+    """Start a storage integrity scan, in the background when possible.
+
+    With STORAGE_SCAN_WORKERS set to 0 the scan runs before this returns.
+
+    Args:
+        verify_checksums: Verify file checksums (defaults to
+            STORAGE_SCAN_VERIFY_CHECKSUMS)
+
+    Returns:
+        False if a scan is already in progress, otherwise True
+    """
+    if get_running_scan() is not None:
+        return False
+
+    app = current_app._get_current_object()  # type: ignore[attr-defined]
+    # The pool is shared by every app in the process; each app's own setting
+    # decides whether it scans in the background
+    if int(app.config.get("STORAGE_SCAN_WORKERS", 1)) > 0:
+        return scan_pool.submit(_run_in_app_context, app, verify_checksums)
+
+    return run_storage_scan(verify_checksums=verify_checksums) is not None
+
+
+def init_storage_scan(app: Flask) -> None:
+    """Size the scan pool and schedule periodic storage scans.
+
+    Args:
+        app: Flask application instance
+    """
+    from .scheduler import get_scheduler
+
+    scan_pool.configure(
+        max_workers=1 if int(app.config.get("STORAGE_SCAN_WORKERS", 1)) > 0 else 0,
+        max_queue=0,
+    )
+
+    scheduler = get_scheduler(app)
+    if scheduler is not None:
+        scheduler.add_job(
+            "storage_scan",
+            float(app.config.get("STORAGE_SCAN_INTERVAL", 3600)),
+            schedule_storage_scan,
+        )
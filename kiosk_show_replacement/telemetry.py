@@ -0,0 +1,462 @@
+"""
+Display telemetry store for the Kiosk Show Replacement application.
+
+This module records per-display time-series telemetry (heartbeat arrival
+intervals, reported resolution, client-side slide render timings and
+playback errors) in the display_telemetry table.
+
+Writes are batched: request handlers only append samples to an in-memory
+buffer, and a scheduled job bulk-inserts the buffer in a single statement
+and commit. A second scheduled job downsamples raw samples older than
+TELEMETRY_RAW_RETENTION_HOURS into rollup rows and deletes rollups older
+than TELEMETRY_ROLLUP_RETENTION_DAYS. Every application process schedules
+it, so a run first claims the "telemetry_downsample" job lease (see
+leases), and each batch deletes its raw rows before inserting their rollups,
+giving up if another process already deleted any of them, so no sample is
+counted twice.
+"""
+
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import Flask, current_app
+from sqlalchemy import delete, insert, select
+
+from .leases import claim_lease, release_lease, renew_lease
+from .models import Display, DisplayTelemetry, db
+
+logger = logging.getLogger(__name__)
+
+# Maximum length of the detail column
+MAX_DETAIL_LENGTH = 500
+
+# Job lease held while downsampling, renewed after each batch
+DOWNSAMPLE_LEASE = "telemetry_downsample"
+DOWNSAMPLE_LEASE_SECONDS = 300
+
+
+def _ensure_utc(value: datetime) -> datetime:
+    """Return a timezone-aware UTC datetime (naive values are assumed UTC)."""
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _bucket_start(value: datetime, bucket_seconds: int) -> datetime:
+    """Floor a datetime to the start of its bucket.
+
+    Args:
+        value: Datetime to floor
+        bucket_seconds: Bucket size in seconds
+
+    Returns:
+        Timezone-aware UTC datetime at the start of the bucket
+    """
+    timestamp = _ensure_utc(value).timestamp()
+    floored = timestamp - (timestamp % bucket_seconds)
+    return datetime.fromtimestamp(floored, timezone.utc)
+
+
+class TelemetryBuffer:
+    """Thread-safe, bounded in-memory buffer of pending telemetry samples."""
+
+    def __init__(self, max_size: int = 10000) -> None:
+        """Initialize the buffer.
+
+        Args:
+            max_size: Maximum number of pending samples; further samples are
+                dropped and counted until the buffer is flushed
+        """
+        self.max_size = max_size
+        self._samples: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def add(self, sample: Dict[str, Any]) -> bool:
+        """Add a sample to the buffer.
+
+        Args:
+            sample: Column values for a DisplayTelemetry row
+
+        Returns:
+            True if buffered, False if dropped because the buffer is full
+        """
+        with self._lock:
+            if len(self._samples) >= self.max_size:
+                self.dropped += 1
+                return False
+            self._samples.append(sample)
+            return True
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Remove and return all pending samples."""
+        with self._lock:
+            samples, self._samples = self._samples, []
+            return samples
+
+    def __len__(self) -> int:
+        """Number of pending samples."""
+        with self._lock:
+            return len(self._samples)
+
+
+# Global buffer instance
+telemetry_buffer = TelemetryBuffer()
+
+
+def record_telemetry(
+    display_id: int,
+    kind: str,
+    value: Optional[float] = None,
+    resolution_width: Optional[int] = None,
+    resolution_height: Optional[int] = None,
+    detail: Optional[str] = None,
+    recorded_at: Optional[datetime] = None,
+) -> bool:
+    """Buffer a raw telemetry sample for a display.
+
+    Args:
+        display_id: ID of the display the sample belongs to
+        kind: One of DisplayTelemetry.KINDS
+        value: Numeric value (interval seconds, render milliseconds, ...)
+        resolution_width: Reported display width in pixels
+        resolution_height: Reported display height in pixels
+        detail: Free-form detail such as an error message
+        recorded_at: Sample time (default: now)
+
+    Returns:
+        True if the sample was buffered
+
+    Raises:
+        ValueError: If kind is not a known telemetry kind
+    """
+    if kind not in DisplayTelemetry.KINDS:
+        raise ValueError(
+            f"Telemetry kind must be one of {', '.join(DisplayTelemetry.KINDS)}"
+        )
+
+    return telemetry_buffer.add(
+        {
+            "display_id": display_id,
+            "kind": kind,
+            "recorded_at": recorded_at or datetime.now(timezone.utc),
+            "bucket_seconds": 0,
+            "sample_count": 1,
+            "value_sum": value,
+            "value_min": value,
+            "value_max": value,
+            "resolution_width": resolution_width,
+            "resolution_height": resolution_height,
+            "detail": detail[:MAX_DETAIL_LENGTH] if detail else None,
+        }
+    )
+
+
+def record_heartbeat(display: Display, previous_seen_at: Optional[datetime]) -> bool:
+    """Buffer a heartbeat sample for a display.
+
+    The sample value is the number of seconds since the previous heartbeat,
+    which tracks heartbeat latency/jitter; it is None for the first heartbeat.
+
+    Args:
+        display: Display that sent the heartbeat (last_seen_at already updated)
+        previous_seen_at: The display's last_seen_at before this heartbeat
+
+    Returns:
+        True if the sample was buffered
+    """
+    now = _ensure_utc(display.last_seen_at or datetime.now(timezone.utc))
+    interval = None
+    if previous_seen_at is not None:
+        interval = round((now - _ensure_utc(previous_seen_at)).total_seconds(), 3)
+
+    return record_telemetry(
+        display.id,
+        "heartbeat",
+        value=interval,
+        resolution_width=display.resolution_width,
+        resolution_height=display.resolution_height,
+        recorded_at=now,
+    )
+
+
+def flush_telemetry() -> int:
+    """Write all buffered samples to the database in one batch.
+
+    Samples for displays that no longer exist are discarded.
+
+    Returns:
+        Number of rows written
+    """
+    samples = telemetry_buffer.drain()
+    if not samples:
+        return 0
+
+    try:
+        display_ids = {s["display_id"] for s in samples}
+        existing = set(
+            db.session.execute(
+                select(Display.id).where(Display.id.in_(display_ids))
+            ).scalars()
+        )
+        rows = [s for s in samples if s["display_id"] in existing]
+        if rows:
+            db.session.execute(insert(DisplayTelemetry), rows)
+        db.session.commit()
+        return len(rows)
+    except Exception as e:
+        db.session.rollback()
+        logger.error(f"Failed to write {len(samples)} telemetry samples: {e}")
+        return 0
+
+
+def _rollup_key(
+    row: DisplayTelemetry, bucket_seconds: int
+) -> Tuple[int, str, datetime]:
+    """Grouping key for folding a raw row into a rollup."""
+    return (row.display_id, row.kind, _bucket_start(row.recorded_at, bucket_seconds))
+
+
+def downsample_telemetry(now: Optional[datetime] = None) -> Dict[str, int]:
+    """Fold old raw samples into rollups and delete expired rollups.
+
+    Args:
+        now: Reference time (default: current time)
+
+    Returns:
+        Dictionary with counts of raw rows rolled up, rollups created and
+        rollups deleted (all 0 if another process is downsampling)
+    """
+    token = claim_lease(DOWNSAMPLE_LEASE, DOWNSAMPLE_LEASE_SECONDS)
+    if token is None:
+        logger.info("Telemetry downsampling is running in another process")
+        return {"rolled_up": 0, "rollups_created": 0, "deleted": 0}
+    try:
+        return _downsample(token, now)
+    finally:
+        release_lease(DOWNSAMPLE_LEASE, token)
+
+
+def _downsample(token: str, now: Optional[datetime]) -> Dict[str, int]:
+    """Run downsampling while holding the downsampling lease.
+
+    Args:
+        token: Claim of the downsampling lease
+        now: Reference time (default: current time)
+
+    Returns:
+        Dictionary with counts of raw rows rolled up, rollups created and
+        rollups deleted
+    """
+    config = current_app.config
+    now = _ensure_utc(now or datetime.now(timezone.utc))
+    rollup_seconds = int(config.get("TELEMETRY_ROLLUP_SECONDS", 3600))
+    batch_size = int(config.get("TELEMETRY_PRUNE_BATCH_SIZE", 1000))
+    raw_cutoff = _bucket_start(
+        now - timedelta(hours=float(config.get("TELEMETRY_RAW_RETENTION_HOURS", 48))),
+        rollup_seconds,
+    )
+    rollup_cutoff = now - timedelta(
+        days=float(config.get("TELEMETRY_ROLLUP_RETENTION_DAYS", 90))
+    )
+
+    result = {"rolled_up": 0, "rollups_created": 0, "deleted": 0}
+
+    # Fold raw samples older than the cutoff, one batch per commit
+    while True:
+        raw_rows = (
+            db.session.execute(
+                select(DisplayTelemetry)
+                .where(
+                    DisplayTelemetry.bucket_seconds == 0,
+                    DisplayTelemetry.recorded_at < raw_cutoff,
+                )
+                .order_by(DisplayTelemetry.id)
+                .limit(batch_size)
+            )
+            .scalars()
+            .all()
+        )
+        if not raw_rows:
+            break
+
+        rollups: "OrderedDict[Tuple[int, str, datetime], Dict[str, Any]]" = (
+            OrderedDict()
+        )
+        for row in raw_rows:
+            key = _rollup_key(row, rollup_seconds)
+            rollup = rollups.get(key)
+            if rollup is None:
+                rollup = rollups[key] = {
+                    "display_id": row.display_id,
+                    "kind": row.kind,
+                    "recorded_at": key[2],
+                    "bucket_seconds": rollup_seconds,
+                    "sample_count": 0,
+                    "value_sum": None,
+                    "value_min": None,
+                    "value_max": None,
+                    "resolution_width": None,
+                    "resolution_height": None,
+                    "detail": None,
+                }
+            rollup["sample_count"] += row.sample_count
+            if row.value_sum is not None:
+                rollup["value_sum"] = (rollup["value_sum"] or 0) + row.value_sum
+                rollup["value_min"] = min(
+                    v for v in (rollup["value_min"], row.value_min) if v is not None
+                )
+                rollup["value_max"] = max(
+                    v for v in (rollup["value_max"], row.value_max) if v is not None
+                )
+            if row.resolution_width is not None:
+                rollup["resolution_width"] = row.resolution_width
+                rollup["resolution_height"] = row.resolution_height
+
+        # Delete first: rows another process already folded are not counted
+        deleted = db.session.execute(
+            delete(DisplayTelemetry).where(
+                DisplayTelemetry.id.in_([row.id for row in raw_rows])
+            )
+        )
+        if deleted.rowcount != len(raw_rows):
+            db.session.rollback()
+            logger.warning("Telemetry rows were downsampled by another process")
+            break
+        db.session.execute(insert(DisplayTelemetry), list(rollups.values()))
+        db.session.commit()
+        result["rolled_up"] += len(raw_rows)
+        result["rollups_created"] += len(rollups)
+        if not renew_lease(DOWNSAMPLE_LEASE, token, DOWNSAMPLE_LEASE_SECONDS):
+            logger.warning("Telemetry downsampling was taken over by another process")
+            return result
+
+    # Delete expired rollups in batches
+    while True:
+        expired_ids = (
+            db.session.execute(
+                select(DisplayTelemetry.id)
+                .where(
+                    DisplayTelemetry.bucket_seconds > 0,
+                    DisplayTelemetry.recorded_at < rollup_cutoff,
+                )
+                .limit(batch_size)
+            )
+            .scalars()
+            .all()
+        )
+        if not expired_ids:
+            break
+        db.session.execute(
+            delete(DisplayTelemetry).where(DisplayTelemetry.id.in_(expired_ids))
+        )
+        db.session.commit()
+        result["deleted"] += len(expired_ids)
+
+    if any(result.values()):
+        logger.info(f"Telemetry downsampling complete: {result}")
+    return result
+
+
+def get_telemetry_series(
+    display: Display,
+    kind: str,
+    start: datetime,
+    end: datetime,
+    bucket_seconds: int,
+) -> List[Dict[str, Any]]:
+    """Aggregate a display's telemetry into fixed-size time buckets.
+
+    Raw samples and rollups are combined; rollups coarser than
+    bucket_seconds are attributed to the bucket containing their start.
+
+    Args:
+        display: Display to get telemetry for
+        kind: Telemetry kind
+        start: Start of the time range (inclusive)
+        end: End of the time range (exclusive)
+        bucket_seconds: Bucket size in seconds
+
+    Returns:
+        List of buckets ordered by time, each with start, count, avg, min,
+        max and (for heartbeats) an uptime ratio
+    """
+    rows = db.session.execute(
+        select(
+            DisplayTelemetry.recorded_at,
+            DisplayTelemetry.sample_count,
+            DisplayTelemetry.value_sum,
+            DisplayTelemetry.value_min,
+            DisplayTelemetry.value_max,
+        )
+        .where(
+            DisplayTelemetry.display_id == display.id,
+            DisplayTelemetry.kind == kind,
+            DisplayTelemetry.recorded_at >= start,
+            DisplayTelemetry.recorded_at < end,
+        )
+        .order_by(DisplayTelemetry.recorded_at)
+    ).all()
+
+    buckets: "OrderedDict[datetime, Dict[str, Any]]" = OrderedDict()
+    for recorded_at, count, value_sum, value_min, value_max in rows:
+        key = _bucket_start(recorded_at, bucket_seconds)
+        bucket = buckets.setdefault(
+            key,
+            {"count": 0, "valued": 0, "sum": 0.0, "min": None, "max": None},
+        )
+        bucket["count"] += count
+        if value_sum is not None:
+            bucket["valued"] += count
+            bucket["sum"] += value_sum
+            bucket["min"] = (
+                value_min if bucket["min"] is None else min(bucket["min"], value_min)
+            )
+            bucket["max"] = (
+                value_max if bucket["max"] is None else max(bucket["max"], value_max)
+            )
+
+    series = []
+    for bucket_start, bucket in buckets.items():
+        point: Dict[str, Any] = {
+            "start": bucket_start.isoformat(),
+            "count": bucket["count"],
+            "avg": (
+                round(bucket["sum"] / bucket["valued"], 3) if bucket["valued"] else None
+            ),
+            "min": bucket["min"],
+            "max": bucket["max"],
+        }
+        if kind == "heartbeat" and display.heartbeat_interval:
+            expected = bucket_seconds / display.heartbeat_interval
+            point["uptime"] = round(min(1.0, bucket["count"] / expected), 3)
+        series.append(point)
+    return series
+
+
+def init_telemetry(app: Flask) -> None:
+    """Initialize telemetry buffering and schedule flush/retention jobs.
+
+    Args:
+        app: Flask application instance
+    """
+    from .scheduler import get_scheduler
+
+    telemetry_buffer.max_size = int(app.config.get("TELEMETRY_BUFFER_SIZE", 10000))
+
+    scheduler = get_scheduler(app)
+    if scheduler is not None:
+        scheduler.add_job(
+            "telemetry_flush",
+            float(app.config.get("TELEMETRY_FLUSH_INTERVAL", 10)),
+            flush_telemetry,
+            run_immediately=False,
+        )
+        scheduler.add_job(
+            "telemetry_downsample",
+            float(app.config.get("TELEMETRY_DOWNSAMPLE_INTERVAL", 3600)),
+            downsample_telemetry,
+        )
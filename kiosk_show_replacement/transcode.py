@@ -0,0 +1,665 @@
+"""
+ffmpeg video transcoding for the Kiosk Show Replacement application.
+
+Transcoding is opt-in (VIDEO_TRANSCODE_ENABLED). When enabled, an uploaded
+video whose codec browsers cannot play is marked "transcoding" instead of
+"rejected" by the media probe, and a "primary" job converts it to
+H.264/MP4 or VP9/WebM (VIDEO_TRANSCODE_FORMAT) fitted to
+VIDEO_TRANSCODE_MAX_HEIGHT at VIDEO_TRANSCODE_BITRATE_KBPS. Every uploaded
+video also gets a "rendition" job for each "height:kbps" pair in
+VIDEO_TRANSCODE_RENDITIONS, giving weaker kiosks a lower-bitrate copy
+(see MediaBlob.best_transcode()).
+
+Jobs are MediaTranscode rows run by a bounded worker pool. A transcode can
+take VIDEO_TRANSCODE_TIMEOUT seconds, so jobs are never run in the request
+or probe that queued them: jobs the pool has no room for stay "queued" and
+are handed to it by a scheduler job as workers free up. A process with
+VIDEO_TRANSCODE_WORKERS set to 0 runs no transcodes and leaves them to
+processes that have workers. Workers claim a job by a conditional update of
+its status, so each job runs once even if several processes dispatch it.
+
+While ffmpeg runs, its progress is saved and pushed to admin connections as
+``media.transcode`` SSE events every PROGRESS_INTERVAL seconds, and the
+job's status is checked so a cancellation made by any application process
+stops it. When a primary job finishes, the blob becomes "ready" (or
+"rejected" if conversion failed or was cancelled) and a ``media.probed``
+event is sent, as for a probe.
+
+Queued jobs are picked up again after a restart. Jobs interrupted while
+"running" stay so; they can be cancelled and queued again through the API.
+"""
+
+import logging
+import subprocess
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+from flask import Flask, current_app
+from sqlalchemy import select, update
+
+from .exceptions import ConflictError, NotFoundError
+from .file_catalog import record_file
+from .media_probe import MediaProbePool, discard_rejected_file
+from .models import MediaBlob, MediaTranscode, db
+from .sse import create_media_event, sse_manager
+from .storage import StorageManager, get_storage_manager
+
+logger = logging.getLogger(__name__)
+
+# Directory (under the media directory) holding transcoded videos
+TRANSCODE_DIRECTORY = "transcodes"
+
+# ffmpeg muxer, video and audio options for each output format
+OUTPUT_FORMATS: Dict[str, Dict[str, List[str]]] = {
+    "mp4": {
+        "muxer": ["-f", "mp4", "-movflags", "+faststart"],
+        "video": ["-c:v", "libx264", "-preset", "veryfast", "-profile:v", "high"],
+        "audio": ["-c:a", "aac", "-b:a", "128k"],
+    },
+    "webm": {
+        "muxer": ["-f", "webm"],
+        "video": [
+            "-c:v",
+            "libvpx-vp9",
+            "-deadline",
+            "good",
+            "-cpu-used",
+            "4",
+            "-row-mt",
+            "1",
+        ],
+        "audio": ["-c:a", "libopus", "-b:a", "128k"],
+    },
+}
+
+# Job statuses that can still be cancelled
+ACTIVE_STATUSES = ("queued", "running")
+
+# Seconds between progress updates and cancellation checks of a running job
+PROGRESS_INTERVAL = 2.0
+
+# Global pool instance
+transcode_pool = MediaProbePool(
+    max_workers=1, max_queue=10, thread_name_prefix="video-transcode"
+)
+
+# ffmpeg processes running in this process by job ID, so a cancellation
+# made here stops them immediately
+_processes: Dict[int, "subprocess.Popen[str]"] = {}
+_processes_lock = threading.Lock()
+
+# Jobs handed to the worker pool in this process and not yet finished, so
+# dispatching does not submit them twice
+_dispatched: Set[int] = set()
+_dispatched_lock = threading.Lock()
+
+
+def _utcnow() -> datetime:
+    """Return the current time in UTC."""
+    return datetime.now(timezone.utc)
+
+
+def transcoding_enabled() -> bool:
+    """Whether video transcoding is enabled for the current app."""
+    return bool(current_app.config.get("VIDEO_TRANSCODE_ENABLED", False))
+
+
+def get_transcode_format() -> str:
+    """Get the configured output format, falling back to MP4 if unknown.
+
+    Returns:
+        Format name ('mp4' or 'webm')
+    """
+    fmt = str(current_app.config.get("VIDEO_TRANSCODE_FORMAT", "mp4")).lower()
+    if fmt not in OUTPUT_FORMATS:
+        logger.warning(f"Unknown video transcode format '{fmt}'; using mp4")
+        fmt = "mp4"
+    return fmt
+
+
+def get_renditions() -> List[Tuple[int, int]]:
+    """Get the configured renditions, largest first.
+
+    Returns:
+        List of (max_height, bitrate_kbps) tuples
+    """
+    renditions = set()
+    spec = str(current_app.config.get("VIDEO_TRANSCODE_RENDITIONS", ""))
+    for entry in spec.replace(" ", "").split(","):
+        if not entry:
+            continue
+        height, _, bitrate = entry.partition(":")
+        try:
+            renditions.add((int(height), int(bitrate)))
+        except ValueError:
+            logger.warning(f"Ignoring invalid video rendition '{entry}'")
+    return sorted(renditions, reverse=True)
+
+
+def get_transcode_path(
+    storage: StorageManager, checksum: str, max_height: int, bitrate_kbps: int, fmt: str
+) -> Path:
+    """Get the path for a transcode of a blob.
+
+    Args:
+        storage: Storage manager holding the blob
+        checksum: SHA-256 checksum of the original video
+        max_height: Maximum output height
+        bitrate_kbps: Output video bitrate
+        fmt: Output format
+
+    Returns:
+        Path object for the transcoded file
+    """
+    return (
+        storage.base_path
+        / storage.MEDIA_DIRECTORY
+        / TRANSCODE_DIRECTORY
+        / checksum[:2]
+        / f"{checksum}_{max_height}p_{bitrate_kbps}k.{fmt}"
+    )
+
+
+def _partial_path(target: Path) -> Path:
+    """Get the path ffmpeg writes to before the output is complete."""
+    return target.with_name(f".{target.name}.part")
+
+
+def build_ffmpeg_command(
+    source: Path, target: Path, fmt: str, max_height: int, bitrate_kbps: int
+) -> List[str]:
+    """Build the ffmpeg command line for a transcode.
+
+    The video is scaled down (never up) to at most ``max_height`` with an
+    even width and height, and encoded with a capped bitrate so playback
+    stays smooth on kiosk hardware. Progress is written to stdout.
+
+    Args:
+        source: Path to the original video
+        target: Path to write the output to
+        fmt: Output format ('mp4' or 'webm')
+        max_height: Maximum output height
+        bitrate_kbps: Output video bitrate
+
+    Returns:
+        Command line arguments
+    """
+    options = OUTPUT_FORMATS[fmt]
+    return [
+        "ffmpeg",
+        "-nostdin",
+        "-hide_banner",
+        "-loglevel",
+        "error",
+        "-y",
+        "-i",
+        str(source),
+        "-map",
+        "0:v:0",
+        "-map",
+        "0:a:0?",
+        "-vf",
+        f"scale=-2:'min({max_height},trunc(ih/2)*2)'",
+        "-pix_fmt",
+        "yuv420p",
+        *options["video"],
+        "-b:v",
+        f"{bitrate_kbps}k",
+        "-maxrate",
+        f"{bitrate_kbps}k",
+        "-bufsize",
+        f"{bitrate_kbps * 2}k",
+        *options["audio"],
+        *options["muxer"],
+        "-progress",
+        "pipe:1",
+        "-nostats",
+        str(target),
+    ]
+
+
+def _publish(job: MediaTranscode) -> None:
+    """Push a job's status and progress to admin connections."""
+    event = create_media_event("transcode", job.media_blob_id, job.to_dict())
+    sse_manager.broadcast_event(event, connection_type="admin")
+
+
+def _is_cancelled(job_id: int) -> bool:
+    """Check the database for a cancellation of a job."""
+    status = db.session.execute(
+        select(MediaTranscode.status).where(MediaTranscode.id == job_id)
+    ).scalar_one_or_none()
+    return status == "cancelled"
+
+
+def queue_transcodes(
+    blob: MediaBlob,
+    storage: Optional[StorageManager] = None,
+    primary: bool = False,
+    renditions: Optional[Sequence[Tuple[int, int]]] = None,
+) -> List[MediaTranscode]:
+    """Create and schedule transcode jobs for a video blob.
+
+    Jobs that already exist are only queued again if they failed or were
+    cancelled.
+
+    Args:
+        blob: Media blob of the video
+        storage: Storage manager holding the file (defaults to the global one)
+        primary: Include a conversion to a browser-playable codec
+        renditions: (max_height, bitrate_kbps) pairs to generate (defaults
+            to VIDEO_TRANSCODE_RENDITIONS)
+
+    Returns:
+        The jobs queued
+    """
+    storage = storage or get_storage_manager()
+    fmt = get_transcode_format()
+    specs: List[Tuple[str, int, int]] = []
+    if primary:
+        specs.append(
+            (
+                "primary",
+                int(current_app.config.get("VIDEO_TRANSCODE_MAX_HEIGHT", 1080)),
+                int(current_app.config.get("VIDEO_TRANSCODE_BITRATE_KBPS", 5000)),
+            )
+        )
+    if renditions is None:
+        renditions = get_renditions()
+    specs.extend(("rendition", height, bitrate) for height, bitrate in renditions)
+
+    existing = {transcode.file_path: transcode for transcode in blob.transcodes}
+    jobs: List[MediaTranscode] = []
+    for kind, max_height, bitrate_kbps in specs:
+        file_path = (
+            get_transcode_path(storage, blob.checksum, max_height, bitrate_kbps, fmt)
+            .relative_to(storage.base_path)
+            .as_posix()
+        )
+        job = existing.get(file_path)
+        if job is None:
+            job = MediaTranscode(
+                media_blob_id=blob.id,
+                format=fmt,
+                max_height=max_height,
+                bitrate_kbps=bitrate_kbps,
+                file_path=file_path,
+            )
+            blob.transcodes.append(job)
+            existing[file_path] = job
+        elif job.status in ("failed", "cancelled"):
+            job.started_at = None
+            job.completed_at = None
+            job.file_size = None
+        else:
+            continue
+        job.kind = kind
+        job.status = "queued"
+        job.progress = 0.0
+        job.error = None
+        jobs.append(job)
+
+    if not jobs:
+        return []
+    db.session.commit()
+
+    for job in jobs:
+        _publish(job)
+        _schedule(job.id, storage)
+    return jobs
+
+
+def _run_in_app_context(app: Flask, job_id: int, storage: StorageManager) -> None:
+    """Run a transcode on a worker thread."""
+    try:
+        with app.app_context():
+            run_transcode(job_id, storage)
+    finally:
+        with _dispatched_lock:
+            _dispatched.discard(job_id)
+
+
+def _workers_enabled(app: Flask) -> bool:
+    """Whether this application runs transcodes on its worker pool."""
+    return int(app.config.get("VIDEO_TRANSCODE_WORKERS", 1)) > 0
+
+
+def _schedule(job_id: int, storage: StorageManager) -> bool:
+    """Hand a queued job to the worker pool if it has room.
+
+    A job the pool cannot take stays queued for dispatch_queued_transcodes().
+
+    Args:
+        job_id: ID of the transcode job
+        storage: Storage manager holding the files
+
+    Returns:
+        True if the job is with the worker pool
+    """
+    app = current_app._get_current_object()  # type: ignore[attr-defined]
+    if not _workers_enabled(app):
+        return False
+    with _dispatched_lock:
+        if job_id in _dispatched:
+            return True
+        _dispatched.add(job_id)
+    if transcode_pool.submit(_run_in_app_context, app, job_id, storage):
+        return True
+
+    with _dispatched_lock:
+        _dispatched.discard(job_id)
+    logger.info(f"Video transcode queue is full; job {job_id} stays queued")
+    return False
+
+
+def dispatch_queued_transcodes() -> int:
+    """Hand queued jobs to the worker pool, oldest first, while it has room.
+
+    Returns:
+        Number of jobs handed to the pool
+    """
+    if not _workers_enabled(current_app):
+        return 0
+    storage = get_storage_manager()
+    job_ids = (
+        db.session.execute(
+            select(MediaTranscode.id)
+            .where(MediaTranscode.status == "queued")
+            .order_by(MediaTranscode.id)
+        )
+        .scalars()
+        .all()
+    )
+    dispatched = 0
+    for job_id in job_ids:
+        with _dispatched_lock:
+            if job_id in _dispatched:
+                continue
+        if not _schedule(job_id, storage):
+            break
+        dispatched += 1
+    return dispatched
+
+
+def _run_ffmpeg(
+    job: MediaTranscode, source: Path, partial: Path, duration: Optional[float]
+) -> Tuple[str, Optional[str]]:
+    """Run ffmpeg for a job, saving progress and watching for cancellation.
+
+    Args:
+        job: Running transcode job
+        source: Path to the original video
+        partial: Path to write the output to
+        duration: Duration of the original in seconds, for progress
+
+    Returns:
+        Tuple of (status, error): "completed", "failed" or "cancelled"
+    """
+    timeout = float(current_app.config.get("VIDEO_TRANSCODE_TIMEOUT", 7200))
+    command = build_ffmpeg_command(
+        source, partial, job.format, job.max_height, job.bitrate_kbps
+    )
+    partial.parent.mkdir(parents=True, exist_ok=True)
+
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            process = subprocess.Popen(
+                command, stdout=subprocess.PIPE, stderr=stderr, text=True
+            )
+        except OSError as e:
+            return "failed", f"Could not run ffmpeg: {e}"
+
+        timed_out = threading.Event()
+
+        def stop_on_timeout() -> None:
+            timed_out.set()
+            process.kill()
+
+        timer = threading.Timer(timeout, stop_on_timeout)
+        timer.daemon = True
+        with _processes_lock:
+            _processes[job.id] = process
+        timer.start()
+        try:
+            last_update = _utcnow()
+            assert process.stdout is not None
+            for line in process.stdout:
+                key, _, value = line.strip().partition("=")
+                # Older ffmpeg versions name the microsecond value out_time_ms
+                if key in ("out_time_us", "out_time_ms") and duration:
+                    try:
+                        position = int(value) / 1_000_000
+                    except ValueError:
+                        continue
+                    job.progress = round(min(max(position / duration, 0.0), 0.99), 3)
+
+                if (_utcnow() - last_update).total_seconds() >= PROGRESS_INTERVAL:
+                    last_update = _utcnow()
+                    db.session.commit()
+                    if _is_cancelled(job.id):
+                        process.kill()
+                        break
+                    _publish(job)
+            returncode = process.wait()
+        finally:
+            timer.cancel()
+            with _processes_lock:
+                _processes.pop(job.id, None)
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+
+        if _is_cancelled(job.id):
+            return "cancelled", None
+        if timed_out.is_set():
+            return "failed", f"Transcoding took longer than {int(timeout)} seconds"
+        if returncode != 0:
+            stderr.seek(0)
+            lines = stderr.read().decode("utf-8", errors="replace").strip()
+            detail = lines.splitlines()[-1] if lines else "no error output"
+            return "failed", f"ffmpeg exited with status {returncode}: {detail}"
+    return "completed", None
+
+
+def run_transcode(
+    job_id: int, storage: Optional[StorageManager] = None
+) -> Optional[MediaTranscode]:
+    """Run a queued transcode job.
+
+    The job is claimed by changing its status from "queued" to "running"
+    in one conditional update; jobs cancelled, already run or claimed by
+    another worker are skipped. Output is written to a temporary file and
+    only moved into place once ffmpeg succeeds.
+
+    Args:
+        job_id: ID of the transcode job
+        storage: Storage manager holding the files (defaults to the global one)
+
+    Returns:
+        The job, or None if it no longer exists
+    """
+    storage = storage or get_storage_manager()
+    claimed = db.session.execute(
+        update(MediaTranscode)
+        .where(MediaTranscode.id == job_id, MediaTranscode.status == "queued")
+        .values(status="running", started_at=_utcnow())
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    job = db.session.get(MediaTranscode, job_id)
+    if job is None or claimed.rowcount != 1:
+        return job
+
+    blob = job.media_blob
+    source = storage.base_path / blob.file_path
+    target = storage.base_path / job.file_path
+    partial = _partial_path(target)
+    _publish(job)
+
+    status, error = _run_ffmpeg(job, source, partial, blob.duration)
+
+    if status == "completed":
+        try:
+            partial.replace(target)
+            job.file_size = target.stat().st_size
+        except OSError as e:
+            status, error = "failed", f"Could not store transcoded video: {e}"
+    if status != "completed":
+        partial.unlink(missing_ok=True)
+
+    if status == "cancelled":
+        # The cancelling request recorded the status and time
+        db.session.refresh(job)
+    else:
+        job.status = status
+        job.error = error
+        job.progress = 1.0 if status == "completed" else job.progress
+        job.completed_at = _utcnow()
+        db.session.commit()
+    if job.status == "completed":
+        record_file(storage.base_path, target)
+
+    logger.info(
+        f"Transcode {job.kind} {job.max_height}p {job.bitrate_kbps}k "
+        f"{job.format} of media blob {blob.checksum[:12]}: {job.status}"
+        + (f" ({job.error})" if job.error else "")
+    )
+    _finish_blob(job, storage)
+    _publish(job)
+    return job
+
+
+def _finish_blob(job: MediaTranscode, storage: StorageManager) -> None:
+    """Update a blob's status once its primary transcode has ended.
+
+    A converted video becomes "ready". If conversion failed or was
+    cancelled the video is rejected as it would have been without
+    transcoding: its other jobs are cancelled and its file is deleted
+    unless slideshow items use it (see discard_rejected_file()).
+
+    Args:
+        job: Finished transcode job
+        storage: Storage manager holding the files
+    """
+    blob = job.media_blob
+    if job.kind != "primary" or blob.probe_status != "transcoding":
+        return
+    if job.status in ACTIVE_STATUSES:
+        return
+
+    if job.status == "completed":
+        blob.probe_status = "ready"
+        blob.probe_error = None
+    else:
+        reason = "it was cancelled" if job.status == "cancelled" else job.error
+        blob.probe_status = "rejected"
+        blob.probe_error = f"Video could not be converted for web browsers: {reason}"
+        for other in blob.transcodes:
+            if other.id != job.id and other.status in ACTIVE_STATUSES:
+                other.status = "cancelled"
+                other.error = "Cancelled"
+                other.completed_at = _utcnow()
+                _terminate(other.id)
+    db.session.commit()
+    if blob.probe_status == "rejected":
+        discard_rejected_file(blob, storage)
+
+    event = create_media_event("probed", blob.id, blob.to_dict())
+    sse_manager.broadcast_event(
+        event, connection_type="admin", user_id=blob.created_by_id
+    )
+
+
+def _terminate(job_id: int) -> None:
+    """Stop a job's ffmpeg process if it is running in this process."""
+    with _processes_lock:
+        process = _processes.get(job_id)
+    if process is not None and process.poll() is None:
+        process.terminate()
+
+
+def cancel_transcode(
+    job_id: int, storage: Optional[StorageManager] = None
+) -> MediaTranscode:
+    """Cancel a queued or running transcode job.
+
+    A running ffmpeg process in this process is stopped immediately; one in
+    another process stops at its next progress update.
+
+    Args:
+        job_id: ID of the transcode job
+        storage: Storage manager holding the files (defaults to the global one)
+
+    Returns:
+        The cancelled job
+
+    Raises:
+        NotFoundError: If the job does not exist
+        ConflictError: If the job has already finished
+    """
+    storage = storage or get_storage_manager()
+    job = db.session.get(MediaTranscode, job_id)
+    if job is None:
+        raise NotFoundError(
+            "Transcode not found", resource_type="transcode", resource_id=job_id
+        )
+    if job.status not in ACTIVE_STATUSES:
+        raise ConflictError(f"Transcode has already {job.status}")
+
+    job.status = "cancelled"
+    job.error = "Cancelled"
+    job.completed_at = _utcnow()
+    db.session.commit()
+    _terminate(job.id)
+
+    logger.info(f"Cancelled transcode job {job.id}")
+    _finish_blob(job, storage)
+    _publish(job)
+    return job
+
+
+def delete_transcode_files(
+    blob: MediaBlob, storage: Optional[StorageManager] = None
+) -> None:
+    """Stop a blob's running transcodes and delete their files.
+
+    The rows are deleted with the blob (the relationship cascades).
+
+    Args:
+        blob: Media blob being deleted
+        storage: Storage manager holding the files (defaults to the global one)
+    """
+    storage = storage or get_storage_manager()
+    for transcode in blob.transcodes:
+        _terminate(transcode.id)
+        target = storage.base_path / transcode.file_path
+        for file_path in (target, _partial_path(target)):
+            try:
+                file_path.unlink(missing_ok=True)
+            except OSError as e:
+                logger.error(f"Failed to delete transcoded video {file_path}: {e}")
+
+
+def init_transcoding(app: Flask) -> None:
+    """Size the video transcode worker pool and schedule job dispatching.
+
+    Args:
+        app: Flask application instance
+    """
+    from .scheduler import get_scheduler
+
+    transcode_pool.configure(
+        max_workers=int(app.config.get("VIDEO_TRANSCODE_WORKERS", 1)),
+        max_queue=int(app.config.get("VIDEO_TRANSCODE_QUEUE_SIZE", 10)),
+    )
+
+    scheduler = get_scheduler(app)
+    if scheduler is not None and _workers_enabled(app):
+        scheduler.add_job(
+            "video_transcode_dispatch",
+            float(app.config.get("VIDEO_TRANSCODE_DISPATCH_INTERVAL", 30)),
+            dispatch_queued_transcodes,
+        )
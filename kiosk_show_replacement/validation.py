@@ -12,8 +12,10 @@ import logging
 import re
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Set
+from urllib.parse import unquote_plus
 
 from flask import current_app
+from sqlalchemy import select
 
 from .exceptions import ValidationError
 
@@ -201,45 +203,90 @@ class StorageIntegrityChecker:
         )
         self.base_path = Path(self.upload_folder)
 
+    def _referenced_paths(self, active_only: bool = False) -> Dict[str, Any]:
+        """Get the upload paths referenced by image and video items.
+
+        Args:
+            active_only: Only include active items
+
+        Returns:
+            Dictionary mapping each path (relative to the upload folder) to
+            the row of the first item referencing it
+        """
+        from .media_store import normalize_media_path
+        from .models import SlideshowItem, db
+
+        query = select(
+            SlideshowItem.id,
+            SlideshowItem.slideshow_id,
+            SlideshowItem.content_file_path,
+            SlideshowItem.content_url,
+        ).where(SlideshowItem.content_type.in_(["image", "video"]))
+        if active_only:
+            query = query.where(SlideshowItem.is_active == True)  # noqa: E712
+
+        referenced: Dict[str, Any] = {}
+        for item in db.session.execute(query):
+            url = item.content_url or ""
+            url_path = unquote_plus(url) if url.startswith("/uploads/") else None
+            for reference in (item.content_file_path, url_path):
+                # Normalize path
+                path = normalize_media_path(reference)
+                if path:
+                    referenced.setdefault(path, item)
+        return referenced
+
     def find_orphaned_files(self) -> List[Dict[str, Any]]:
         """Find files in storage that aren't referenced by any slideshow item.
 
+        Content-addressed media is orphaned when its blob's reference count
+        has been zero for longer than MEDIA_ORPHAN_GRACE_HOURS. Files in the
+        older per-slideshow directories are looked up in the file catalog
+        (see file_catalog) and compared against the paths referenced by
+        slideshow items.
+
         Returns:
             List of dictionaries describing orphaned files
         """
-        from .models import SlideshowItem
+        from .media_store import find_unreferenced_blobs
+        from .models import StoredFile, db
 
         orphaned = []
 
-        # Get all file paths from database
-        items = SlideshowItem.query.filter(
-            SlideshowItem.content_type.in_(["image", "video"])
-        ).all()
+        for blob in find_unreferenced_blobs():
+            file_path = self.base_path / blob.file_path
+            orphaned.append(
+                {
+                    "path": str(file_path),
+                    "relative_path": blob.file_path,
+                    "size": blob.file_size,
+                    "content_type": (
+                        "images" if blob.content_type == "image" else "videos"
+                    ),
+                    "media_blob_id": blob.id,
+                }
+            )
 
-        db_files: Set[str] = set()
-        for item in items:
-            if item.content_url:
-                # Normalize path
-                db_files.add(item.content_url.replace("/uploads/", ""))
+        db_files = self._referenced_paths()
 
-        # Scan storage directories
-        for content_type in ["images", "videos"]:
-            content_path = self.base_path / content_type
-            if not content_path.exists():
-                continue
-
-            for file_path in content_path.rglob("*"):
-                if file_path.is_file():
-                    relative_path = str(file_path.relative_to(self.base_path))
-                    if relative_path not in db_files:
-                        orphaned.append(
-                            {
-                                "path": str(file_path),
-                                "relative_path": relative_path,
-                                "size": file_path.stat().st_size,
-                                "content_type": content_type,
-                            }
-                        )
+        # Catalogued files in the legacy storage directories
+        legacy_files = db.session.execute(
+            select(StoredFile.path, StoredFile.file_size, StoredFile.content_type)
+            .where(~StoredFile.path.startswith("media/"))
+            .order_by(StoredFile.path)
+        )
+        for relative_path, size, content_type in legacy_files:
+            if relative_path not in db_files:
+                orphaned.append(
+                    {
+                        "path": str(self.base_path / relative_path),
+                        "relative_path": relative_path,
+                        "size": size,
+                        "content_type": (
+                            "images" if content_type == "image" else "videos"
+                        ),
+                    }
+                )
 
         logger.info(f"Found {len(orphaned)} orphaned files")
         return orphaned
@@ -247,33 +294,35 @@ class StorageIntegrityChecker:
     def find_missing_files(self) -> List[Dict[str, Any]]:
         """Find slideshow items that reference non-existent files.
 
+        Files are looked up in the file catalog; referenced paths outside
+        the catalogued directories are checked on disk.
+
         Returns:
             List of dictionaries describing items with missing files
         """
-        from .models import SlideshowItem
+        from .file_catalog import classify_path, find_uncatalogued
+
+        referenced = self._referenced_paths(active_only=True)
+        catalogued = [path for path in referenced if classify_path(path)]
+        missing_paths = set(find_uncatalogued(catalogued))
+        missing_paths.update(
+            path
+            for path in referenced
+            if not classify_path(path) and not (self.base_path / path).exists()
+        )
 
         missing = []
-
-        items = SlideshowItem.query.filter(
-            SlideshowItem.content_type.in_(["image", "video"]),
-            SlideshowItem.is_active == True,  # noqa: E712
-        ).all()
-
-        for item in items:
-            if item.content_url:
-                # Convert URL to file path
-                relative_path = item.content_url.replace("/uploads/", "")
-                file_path = self.base_path / relative_path
-
-                if not file_path.exists():
-                    missing.append(
-                        {
-                            "item_id": item.id,
-                            "slideshow_id": item.slideshow_id,
-                            "content_url": item.content_url,
-                            "expected_path": str(file_path),
-                        }
-                    )
+        for path, item in referenced.items():
+            if path in missing_paths:
+                missing.append(
+                    {
+                        "item_id": item.id,
+                        "slideshow_id": item.slideshow_id,
+                        "content_url": item.content_url,
+                        "relative_path": path,
+                        "expected_path": str(self.base_path / path),
+                    }
+                )
 
         logger.info(f"Found {len(missing)} items with missing files")
         return missing
@@ -284,27 +333,19 @@ class StorageIntegrityChecker:
         Returns:
             Dictionary with consistency check results
         """
+        from .file_catalog import get_catalog_stats
+
         orphaned_files = self.find_orphaned_files()
         missing_files = self.find_missing_files()
 
-        # Calculate storage statistics
-        total_size = 0
-        total_files = 0
-
-        for content_type in ["images", "videos"]:
-            content_path = self.base_path / content_type
-            if content_path.exists():
-                for file_path in content_path.rglob("*"):
-                    if file_path.is_file():
-                        total_size += file_path.stat().st_size
-                        total_files += 1
-
+        # Storage statistics from the file catalog
+        stats = get_catalog_stats()
         orphaned_size = sum(f["size"] for f in orphaned_files)
 
         return {
             "is_consistent": len(orphaned_files) == 0 and len(missing_files) == 0,
-            "total_files": total_files,
-            "total_size_bytes": total_size,
+            "total_files": stats["total_files"],
+            "total_size_bytes": stats["total_size"],
             "orphaned_files": {
                 "count": len(orphaned_files),
                 "total_size_bytes": orphaned_size,
@@ -325,17 +366,36 @@ class StorageIntegrityChecker:
         Returns:
             Dictionary with cleanup results
         """
+        from .file_catalog import forget_files
+        from .media_store import purge_unreferenced_blobs
+        from .storage import StorageManager
+
         orphaned = self.find_orphaned_files()
         deleted = []
         errors = []
 
+        # Unreferenced media blobs are deleted by reference count
+        blob_ids = [f["media_blob_id"] for f in orphaned if "media_blob_id" in f]
+        if blob_ids:
+            result = purge_unreferenced_blobs(
+                dry_run=dry_run,
+                blob_ids=blob_ids,
+                storage=StorageManager(self.upload_folder),
+            )
+            deleted_ids = {b["id"] for b in result["deleted"]}
+            deleted.extend(f for f in orphaned if f.get("media_blob_id") in deleted_ids)
+            errors.extend(result["errors"])
+
         for file_info in orphaned:
+            if "media_blob_id" in file_info:
+                continue
             file_path = Path(file_info["path"])
             if dry_run:
                 deleted.append(file_info)
             else:
                 try:
                     file_path.unlink()
+                    forget_files([file_info["relative_path"]])
                     deleted.append(file_info)
                     logger.info(f"Deleted orphaned file: {file_path}")
                 except Exception as e:
@@ -0,0 +1,32 @@
+"""Add conditional fetch validators to ical_feeds
+
+Revision ID: a3b8c0d2e4f6
+Revises: f2a7b9c1d3e5
+Create Date: 2026-10-19 01:00:00.000000
+
+Stores the ETag, Last-Modified and content hash of each feed's last fetch so
+refreshes can skip feeds that have not changed.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3b8c0d2e4f6'
+down_revision = 'f2a7b9c1d3e5'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('ical_feeds', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('etag', sa.String(length=255), nullable=True))
+        batch_op.add_column(sa.Column('last_modified', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('ical_feeds', schema=None) as batch_op:
+        batch_op.drop_column('content_hash')
+        batch_op.drop_column('last_modified')
+        batch_op.drop_column('etag')
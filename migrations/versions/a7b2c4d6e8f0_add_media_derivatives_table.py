@@ -0,0 +1,46 @@
+"""Add media_derivatives table for resized images
+
+Revision ID: a7b2c4d6e8f0
+Revises: f6a1b3c5d7e9
+Create Date: 2026-10-18 18:00:00.000000
+
+Uploaded images now get resized, recompressed variants at standard kiosk
+sizes. Each variant is recorded against its media blob so displays can be
+sent the smallest one that fills their resolution.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7b2c4d6e8f0'
+down_revision = 'f6a1b3c5d7e9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('media_derivatives',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('media_blob_id', sa.Integer(), nullable=False),
+    sa.Column('format', sa.String(length=10), nullable=False),
+    sa.Column('max_size', sa.Integer(), nullable=False),
+    sa.Column('width', sa.Integer(), nullable=False),
+    sa.Column('height', sa.Integer(), nullable=False),
+    sa.Column('file_path', sa.String(length=500), nullable=False),
+    sa.Column('file_size', sa.BigInteger(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['media_blob_id'], ['media_blobs.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('file_path'),
+    sa.UniqueConstraint('media_blob_id', 'max_size', 'format', name='uq_media_derivative_size')
+    )
+    with op.batch_alter_table('media_derivatives', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_media_derivatives_media_blob_id'), ['media_blob_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('media_derivatives', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_media_derivatives_media_blob_id'))
+
+    op.drop_table('media_derivatives')
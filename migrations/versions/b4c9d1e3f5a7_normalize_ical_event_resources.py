@@ -0,0 +1,89 @@
+"""Move iCal event resources to the ical_event_resources table
+
+Revision ID: b4c9d1e3f5a7
+Revises: a3b8c0d2e4f6
+Create Date: 2026-10-19 02:00:00.000000
+
+The spaces/resources booked by each iCal event were stored as a JSON array
+in ical_events.resources. They now have one row each in
+ical_event_resources, so the spaces of a feed can be listed with a single
+query. Existing resources are copied over; unreadable JSON is dropped, as
+it was ignored before.
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4c9d1e3f5a7'
+down_revision = 'a3b8c0d2e4f6'
+branch_labels = None
+depends_on = None
+
+ical_events = sa.table(
+    'ical_events',
+    sa.column('id', sa.Integer()),
+    sa.column('resources', sa.Text()),
+)
+ical_event_resources = sa.table(
+    'ical_event_resources',
+    sa.column('event_id', sa.Integer()),
+    sa.column('name', sa.String(length=500)),
+)
+
+
+def upgrade():
+    # Read the JSON arrays before ical_events is rebuilt without them
+    connection = op.get_bind()
+    rows = []
+    for event_id, resources in connection.execute(
+        sa.select(ical_events.c.id, ical_events.c.resources).where(
+            ical_events.c.resources.isnot(None)
+        )
+    ):
+        try:
+            names = json.loads(resources)
+        except (TypeError, ValueError):
+            continue
+        if isinstance(names, list):
+            rows.extend(
+                {'event_id': event_id, 'name': name}
+                for name in sorted({str(name) for name in names})
+            )
+
+    with op.batch_alter_table('ical_events', schema=None) as batch_op:
+        batch_op.drop_column('resources')
+
+    op.create_table('ical_event_resources',
+    sa.Column('event_id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=500), nullable=False),
+    sa.ForeignKeyConstraint(['event_id'], ['ical_events.id'], ),
+    sa.PrimaryKeyConstraint('event_id', 'name')
+    )
+    if rows:
+        op.bulk_insert(ical_event_resources, rows)
+
+
+def downgrade():
+    # Read the rows before ical_events is rebuilt with a JSON column
+    connection = op.get_bind()
+    resources = {}
+    for event_id, name in connection.execute(
+        sa.select(ical_event_resources.c.event_id, ical_event_resources.c.name)
+        .order_by(ical_event_resources.c.event_id, ical_event_resources.c.name)
+    ):
+        resources.setdefault(event_id, []).append(name)
+
+    op.drop_table('ical_event_resources')
+
+    with op.batch_alter_table('ical_events', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('resources', sa.TEXT(), nullable=True))
+
+    for event_id, names in resources.items():
+        connection.execute(
+            ical_events.update()
+            .where(ical_events.c.id == event_id)
+            .values(resources=json.dumps(names))
+        )
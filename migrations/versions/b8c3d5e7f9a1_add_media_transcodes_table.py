@@ -0,0 +1,53 @@
+"""Add media_transcodes table for ffmpeg video conversion jobs
+
+Revision ID: b8c3d5e7f9a1
+Revises: a7b2c4d6e8f0
+Create Date: 2026-10-18 20:00:00.000000
+
+When transcoding is enabled, videos with codecs browsers cannot play are
+converted with ffmpeg instead of being rejected, and lower-bitrate
+renditions can be generated for weaker kiosks. Each conversion is a job
+row tracking its status, progress and output file.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b8c3d5e7f9a1'
+down_revision = 'a7b2c4d6e8f0'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('media_transcodes',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('media_blob_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('format', sa.String(length=10), nullable=False),
+    sa.Column('max_height', sa.Integer(), nullable=False),
+    sa.Column('bitrate_kbps', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('progress', sa.Float(), nullable=False),
+    sa.Column('file_path', sa.String(length=500), nullable=False),
+    sa.Column('file_size', sa.BigInteger(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['media_blob_id'], ['media_blobs.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('file_path')
+    )
+    with op.batch_alter_table('media_transcodes', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_media_transcodes_media_blob_id'), ['media_blob_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_media_transcodes_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('media_transcodes', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_media_transcodes_status'))
+        batch_op.drop_index(batch_op.f('ix_media_transcodes_media_blob_id'))
+
+    op.drop_table('media_transcodes')
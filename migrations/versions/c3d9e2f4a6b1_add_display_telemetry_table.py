@@ -0,0 +1,46 @@
+"""Add display_telemetry table for display time-series history
+
+Revision ID: c3d9e2f4a6b1
+Revises: 98e37a0eed25
+Create Date: 2026-10-18 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c3d9e2f4a6b1'
+down_revision = '98e37a0eed25'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('display_telemetry',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('display_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=20), nullable=False),
+    sa.Column('recorded_at', sa.DateTime(), nullable=False),
+    sa.Column('bucket_seconds', sa.Integer(), nullable=False),
+    sa.Column('sample_count', sa.Integer(), nullable=False),
+    sa.Column('value_sum', sa.Float(), nullable=True),
+    sa.Column('value_min', sa.Float(), nullable=True),
+    sa.Column('value_max', sa.Float(), nullable=True),
+    sa.Column('resolution_width', sa.Integer(), nullable=True),
+    sa.Column('resolution_height', sa.Integer(), nullable=True),
+    sa.Column('detail', sa.String(length=500), nullable=True),
+    sa.ForeignKeyConstraint(['display_id'], ['displays.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('display_telemetry', schema=None) as batch_op:
+        batch_op.create_index('ix_display_telemetry_display_kind_time', ['display_id', 'kind', 'recorded_at'], unique=False)
+        batch_op.create_index('ix_display_telemetry_bucket_time', ['bucket_seconds', 'recorded_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('display_telemetry', schema=None) as batch_op:
+        batch_op.drop_index('ix_display_telemetry_bucket_time')
+        batch_op.drop_index('ix_display_telemetry_display_kind_time')
+
+    op.drop_table('display_telemetry')
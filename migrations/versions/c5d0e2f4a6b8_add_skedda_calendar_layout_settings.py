@@ -0,0 +1,33 @@
+"""Add Skedda calendar layout settings to slideshow_items
+
+Revision ID: c5d0e2f4a6b8
+Revises: b4c9d1e3f5a7
+Create Date: 2026-10-19 03:00:00.000000
+
+Skedda slides can set the hours their day grid covers and the length of
+its time slots. NULL keeps the previous fixed grid of 7 AM to 11 PM in
+30-minute slots.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d0e2f4a6b8'
+down_revision = 'b4c9d1e3f5a7'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('slideshow_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('ical_day_start_hour', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('ical_day_end_hour', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('ical_slot_minutes', sa.Integer(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('slideshow_items', schema=None) as batch_op:
+        batch_op.drop_column('ical_slot_minutes')
+        batch_op.drop_column('ical_day_end_hour')
+        batch_op.drop_column('ical_day_start_hour')
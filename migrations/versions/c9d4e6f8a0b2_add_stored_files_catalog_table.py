@@ -0,0 +1,50 @@
+"""Add stored_files catalog of uploaded files
+
+Revision ID: c9d4e6f8a0b2
+Revises: b8c3d5e7f9a1
+Create Date: 2026-10-18 22:00:00.000000
+
+Storage statistics and integrity checks query this catalog instead of
+walking the upload folder. The table starts empty and is filled by the
+first reconciliation of the catalog with the upload folder.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c9d4e6f8a0b2'
+down_revision = 'b8c3d5e7f9a1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('stored_files',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('path', sa.String(length=500), nullable=False),
+    sa.Column('content_type', sa.String(length=20), nullable=False),
+    sa.Column('file_size', sa.BigInteger(), nullable=False),
+    sa.Column('checksum', sa.String(length=64), nullable=True),
+    sa.Column('owner_id', sa.Integer(), nullable=True),
+    sa.Column('slideshow_id', sa.Integer(), nullable=True),
+    sa.Column('mtime', sa.DateTime(), nullable=False),
+    sa.Column('cataloged_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('path')
+    )
+    with op.batch_alter_table('stored_files', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_stored_files_checksum'), ['checksum'], unique=False)
+        batch_op.create_index(batch_op.f('ix_stored_files_content_type'), ['content_type'], unique=False)
+        batch_op.create_index(batch_op.f('ix_stored_files_owner_id'), ['owner_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_stored_files_slideshow_id'), ['slideshow_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('stored_files', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_stored_files_slideshow_id'))
+        batch_op.drop_index(batch_op.f('ix_stored_files_owner_id'))
+        batch_op.drop_index(batch_op.f('ix_stored_files_content_type'))
+        batch_op.drop_index(batch_op.f('ix_stored_files_checksum'))
+
+    op.drop_table('stored_files')
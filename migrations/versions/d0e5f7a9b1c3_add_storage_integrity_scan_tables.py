@@ -0,0 +1,96 @@
+"""Add storage integrity scan tables
+
+Revision ID: d0e5f7a9b1c3
+Revises: c9d4e6f8a0b2
+Create Date: 2026-10-18 23:00:00.000000
+
+storage_scans and storage_scan_issues hold the results of background
+storage integrity scans; storage_scan_directories records each scanned
+directory's modification time so unchanged directories are not listed
+again. stored_files.verified_at records when a file's checksum was last
+verified.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd0e5f7a9b1c3'
+down_revision = 'c9d4e6f8a0b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('storage_scan_directories',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('path', sa.String(length=500), nullable=False),
+    sa.Column('mtime_ns', sa.BigInteger(), nullable=False),
+    sa.Column('file_count', sa.Integer(), nullable=False),
+    sa.Column('scan_id', sa.Integer(), nullable=True),
+    sa.Column('listed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('path')
+    )
+    with op.batch_alter_table('storage_scan_directories', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_storage_scan_directories_scan_id'), ['scan_id'], unique=False)
+
+    op.create_table('storage_scans',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('verify_checksums', sa.Boolean(), nullable=False),
+    sa.Column('directories_scanned', sa.Integer(), nullable=False),
+    sa.Column('directories_skipped', sa.Integer(), nullable=False),
+    sa.Column('files_scanned', sa.Integer(), nullable=False),
+    sa.Column('files_added', sa.Integer(), nullable=False),
+    sa.Column('files_updated', sa.Integer(), nullable=False),
+    sa.Column('files_removed', sa.Integer(), nullable=False),
+    sa.Column('checksums_verified', sa.Integer(), nullable=False),
+    sa.Column('bytes_verified', sa.BigInteger(), nullable=False),
+    sa.Column('issue_count', sa.Integer(), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('storage_scans', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_storage_scans_status'), ['status'], unique=False)
+
+    op.create_table('storage_scan_issues',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('scan_id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(length=30), nullable=False),
+    sa.Column('path', sa.String(length=500), nullable=True),
+    sa.Column('file_size', sa.BigInteger(), nullable=True),
+    sa.Column('slideshow_item_id', sa.Integer(), nullable=True),
+    sa.Column('slideshow_id', sa.Integer(), nullable=True),
+    sa.Column('media_blob_id', sa.Integer(), nullable=True),
+    sa.Column('detail', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['scan_id'], ['storage_scans.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('storage_scan_issues', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_storage_scan_issues_scan_id'), ['scan_id'], unique=False)
+
+    with op.batch_alter_table('stored_files', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('verified_at', sa.DateTime(), nullable=True))
+
+
+
+def downgrade():
+    with op.batch_alter_table('stored_files', schema=None) as batch_op:
+        batch_op.drop_column('verified_at')
+
+    with op.batch_alter_table('storage_scan_issues', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_storage_scan_issues_scan_id'))
+
+    op.drop_table('storage_scan_issues')
+    with op.batch_alter_table('storage_scans', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_storage_scans_status'))
+
+    op.drop_table('storage_scans')
+    with op.batch_alter_table('storage_scan_directories', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_storage_scan_directories_scan_id'))
+
+    op.drop_table('storage_scan_directories')
@@ -0,0 +1,60 @@
+"""Add media_blobs table for content-addressed uploads
+
+Revision ID: d4e8f1a2b3c5
+Revises: c3d9e2f4a6b1
+Create Date: 2026-10-18 11:00:00.000000
+
+Uploaded files are now stored once per unique SHA-256 checksum. The
+media_blobs table tracks each stored file and how many slideshow items
+reference it; slideshow_items.media_blob_id links items to their blob.
+Files uploaded before this migration keep their existing paths and have
+no blob.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd4e8f1a2b3c5'
+down_revision = 'c3d9e2f4a6b1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('media_blobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('checksum', sa.String(length=64), nullable=False),
+    sa.Column('content_type', sa.String(length=20), nullable=False),
+    sa.Column('file_path', sa.String(length=500), nullable=False),
+    sa.Column('file_size', sa.BigInteger(), nullable=False),
+    sa.Column('mime_type', sa.String(length=100), nullable=True),
+    sa.Column('duration', sa.Float(), nullable=True),
+    sa.Column('ref_count', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('created_by_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['created_by_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('checksum'),
+    sa.UniqueConstraint('file_path')
+    )
+    with op.batch_alter_table('media_blobs', schema=None) as batch_op:
+        batch_op.create_index('ix_media_blobs_ref_count', ['ref_count', 'updated_at'], unique=False)
+
+    with op.batch_alter_table('slideshow_items', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('media_blob_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_slideshow_items_media_blob_id', 'media_blobs', ['media_blob_id'], ['id']
+        )
+
+
+def downgrade():
+    with op.batch_alter_table('slideshow_items', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_slideshow_items_media_blob_id', type_='foreignkey')
+        batch_op.drop_column('media_blob_id')
+
+    with op.batch_alter_table('media_blobs', schema=None) as batch_op:
+        batch_op.drop_index('ix_media_blobs_ref_count')
+
+    op.drop_table('media_blobs')
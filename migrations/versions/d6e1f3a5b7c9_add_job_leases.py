@@ -0,0 +1,32 @@
+"""Add job_leases table
+
+Revision ID: d6e1f3a5b7c9
+Revises: c5d0e2f4a6b8
+Create Date: 2026-10-19 04:00:00.000000
+
+One row per background job that must run in a single application
+process at a time, claimed by a conditional update so processes cannot
+both hold it.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd6e1f3a5b7c9'
+down_revision = 'c5d0e2f4a6b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('job_leases',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('holder', sa.String(length=64), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('job_leases')
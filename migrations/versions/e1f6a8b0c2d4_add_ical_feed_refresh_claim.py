@@ -0,0 +1,29 @@
+"""Add ical_feeds.refresh_started_at refresh claim
+
+Revision ID: e1f6a8b0c2d4
+Revises: d0e5f7a9b1c3
+Create Date: 2026-10-18 23:30:00.000000
+
+Feeds are refreshed by a background job. refresh_started_at is set while a
+refresh is in progress so that only one thread or process refreshes a
+feed at a time.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e1f6a8b0c2d4'
+down_revision = 'd0e5f7a9b1c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('ical_feeds', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('refresh_started_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('ical_feeds', schema=None) as batch_op:
+        batch_op.drop_column('refresh_started_at')
@@ -0,0 +1,45 @@
+"""Add video probe results to media_blobs
+
+Revision ID: e5f9a2b3c4d6
+Revises: d4e8f1a2b3c5
+Create Date: 2026-10-18 14:00:00.000000
+
+Uploaded videos are now probed by a background worker pool. The probe
+status, codecs and any error are stored on the blob so the admin UI can
+fetch them once processing finishes.
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "e5f9a2b3c4d6"
+down_revision = "d4e8f1a2b3c5"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("media_blobs", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("probe_status", sa.String(length=20), nullable=True)
+        )
+        batch_op.add_column(
+            sa.Column("video_codec", sa.String(length=50), nullable=True)
+        )
+        batch_op.add_column(
+            sa.Column("audio_codec", sa.String(length=50), nullable=True)
+        )
+        batch_op.add_column(
+            sa.Column("container_format", sa.String(length=100), nullable=True)
+        )
+        batch_op.add_column(sa.Column("probe_error", sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table("media_blobs", schema=None) as batch_op:
+        batch_op.drop_column("probe_error")
+        batch_op.drop_column("container_format")
+        batch_op.drop_column("audio_codec")
+        batch_op.drop_column("video_codec")
+        batch_op.drop_column("probe_status")
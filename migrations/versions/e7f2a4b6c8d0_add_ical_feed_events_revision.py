@@ -0,0 +1,29 @@
+"""Add ical_feeds.events_revision
+
+Revision ID: e7f2a4b6c8d0
+Revises: d6e1f3a5b7c9
+Create Date: 2026-10-19 05:00:00.000000
+
+Counter incremented whenever a feed's stored events change, used as the
+revision of cached Skedda calendars and their ETags instead of the time
+of the last fetch.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7f2a4b6c8d0'
+down_revision = 'd6e1f3a5b7c9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('ical_feeds', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('events_revision', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('ical_feeds', schema=None) as batch_op:
+        batch_op.drop_column('events_revision')
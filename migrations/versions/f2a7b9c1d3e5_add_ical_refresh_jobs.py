@@ -0,0 +1,45 @@
+"""Add ical_refresh_jobs table
+
+Revision ID: f2a7b9c1d3e5
+Revises: e1f6a8b0c2d4
+Create Date: 2026-10-19 00:00:00.000000
+
+Refreshing all iCal feeds runs as a background job whose progress and
+results are recorded in this table and polled by the API.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a7b9c1d3e5'
+down_revision = 'e1f6a8b0c2d4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('ical_refresh_jobs',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('feed_count', sa.Integer(), nullable=False),
+    sa.Column('feeds_done', sa.Integer(), nullable=False),
+    sa.Column('feeds_refreshed', sa.Integer(), nullable=False),
+    sa.Column('feeds_skipped', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_by_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('completed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('ical_refresh_jobs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_ical_refresh_jobs_status'), ['status'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('ical_refresh_jobs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_ical_refresh_jobs_status'))
+
+    op.drop_table('ical_refresh_jobs')
@@ -0,0 +1,46 @@
+"""Add video_probe_cache table
+
+Revision ID: f6a1b3c5d7e9
+Revises: e5f9a2b3c4d6
+Create Date: 2026-10-18 16:00:00.000000
+
+ffprobe results are cached by content checksum for local files and by
+URL (with its ETag/Last-Modified validators) for remote videos, so the
+same video is not probed again.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6a1b3c5d7e9'
+down_revision = 'e5f9a2b3c4d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('video_probe_cache',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('source', sa.Text(), nullable=False),
+    sa.Column('etag', sa.String(length=255), nullable=True),
+    sa.Column('last_modified', sa.String(length=64), nullable=True),
+    sa.Column('video_codec', sa.String(length=50), nullable=True),
+    sa.Column('audio_codec', sa.String(length=50), nullable=True),
+    sa.Column('container_format', sa.String(length=100), nullable=True),
+    sa.Column('duration', sa.Float(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('checked_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cache_key')
+    )
+    with op.batch_alter_table('video_probe_cache', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_video_probe_cache_checked_at'), ['checked_at'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('video_probe_cache', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_video_probe_cache_checked_at'))
+
+    op.drop_table('video_probe_cache')
@@ -9,11 +9,15 @@ recreating the Flask app and database schema for each test. Instead,
 the clean_test_data fixture truncates tables between tests.
 """
 
+from io import BytesIO
+
 import pytest
 from sqlalchemy.pool import NullPool
 
+from kiosk_show_replacement import storage
 from kiosk_show_replacement.app import create_app, db
 from kiosk_show_replacement.models import SlideItem, Slideshow
+from kiosk_show_replacement.storage import StorageManager
 
 
 @pytest.fixture(scope="session")
@@ -303,6 +307,61 @@ def auth_headers(client, admin_user):
     return {}
 
 
+# Smallest valid PNG (1x1 pixel), for upload tests
+PNG_DATA = (
+    b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR\x00\x00\x00\x01\x00\x00\x00\x01"
+    b"\x08\x02\x00\x00\x00\x90wS\xde\x00\x00\x00\x0cIDATx\x9cc```\x00\x00"
+    b"\x00\x04\x00\x01\xdd\x8d\xb4\x1c\x00\x00\x00\x00IEND\xaeB`\x82"
+)
+
+# MP4 header boxes; upload tests patch probing, so no video frames are needed
+MP4_DATA = (
+    b"\x00\x00\x00\x20ftypmp42\x00\x00\x00\x20mp41mp42isom"
+    b"\x00\x00\x00\x08free\x00\x00\x00\x28mdat"
+)
+
+# Default file uploaded by post_upload() for each content type
+SAMPLE_UPLOADS = {"image": (PNG_DATA, "photo.png"), "video": (MP4_DATA, "clip.mp4")}
+
+
+def post_upload(client, slideshow_id, content_type="image", data=None, filename=None):
+    """Upload a file through the API and return the response.
+
+    The data and filename default to a sample file of the content type.
+    """
+    sample_data, sample_filename = SAMPLE_UPLOADS[content_type]
+    return client.post(
+        f"/api/v1/uploads/{content_type}",
+        data={
+            "file": (
+                BytesIO(sample_data if data is None else data),
+                filename or sample_filename,
+            ),
+            "slideshow_id": str(slideshow_id),
+        },
+        content_type="multipart/form-data",
+    )
+
+
+def upload_file(client, slideshow_id, content_type="image", data=None, filename=None):
+    """Upload a file through the API and return the stored file info."""
+    response = post_upload(client, slideshow_id, content_type, data, filename)
+    assert response.status_code == 201
+    return response.get_json()["data"]
+
+
+@pytest.fixture
+def isolated_storage(app, tmp_path, monkeypatch):
+    """Use an empty upload folder and storage manager for a test."""
+    upload_folder = tmp_path / "uploads"
+    monkeypatch.setitem(app.config, "UPLOAD_FOLDER", str(upload_folder))
+    with app.app_context():
+        monkeypatch.setattr(
+            storage, "storage_manager", StorageManager(str(upload_folder))
+        )
+    yield upload_folder
+
+
 class TestDataFactory:
     """Factory for creating test data."""
 
@@ -382,11 +441,23 @@ def clean_test_data(app):
         AssignmentHistory,
         Display,
         DisplayConfigurationTemplate,
+        DisplayTelemetry,
         ICalEvent,
+        ICalEventResource,
         ICalFeed,
+        ICalRefreshJob,
+        JobLease,
+        MediaBlob,
+        MediaDerivative,
+        MediaTranscode,
         Slideshow,
         SlideshowItem,
+        StorageScan,
+        StorageScanDirectory,
+        StorageScanIssue,
+        StoredFile,
         User,
+        VideoProbeCache,
     )
 
     def _clean_all_tables():
@@ -396,14 +467,26 @@ def clean_test_data(app):
         # Note: Display has current_slideshow_id FK, so delete Display before Slideshow
         # Note: ICalEvent has FK to ICalFeed, SlideshowItem has FK to ICalFeed
         db.session.query(AssignmentHistory).delete()
+        db.session.query(DisplayTelemetry).delete()
+        db.session.query(ICalEventResource).delete()
         db.session.query(ICalEvent).delete()
         db.session.query(SlideshowItem).delete()
+        db.session.query(MediaDerivative).delete()
+        db.session.query(MediaTranscode).delete()
+        db.session.query(MediaBlob).delete()
+        db.session.query(VideoProbeCache).delete()
+        db.session.query(StoredFile).delete()
+        db.session.query(StorageScanIssue).delete()
+        db.session.query(StorageScan).delete()
+        db.session.query(StorageScanDirectory).delete()
         db.session.query(ICalFeed).delete()
+        db.session.query(ICalRefreshJob).delete()
         db.session.query(
             Display
         ).delete()  # Has FK to Slideshow via current_slideshow_id
         db.session.query(Slideshow).delete()
         db.session.query(DisplayConfigurationTemplate).delete()
+        db.session.query(JobLease).delete()
         db.session.query(User).delete()
         db.session.commit()
 
@@ -411,6 +494,11 @@ def clean_test_data(app):
     with app.app_context():
         _clean_all_tables()
 
+    # Forget calendars cached and requests counted for reused row IDs; the
+    # rate limiter is created again from the test's configuration
+    app.extensions["skedda_calendar_cache"].clear()
+    app.extensions.pop("skedda_rate_limiter", None)
+
     yield  # Run the test
 
     # Clean after test and reset session state
@@ -2774,7 +2774,7 @@ class TestSkeddaCalendarDisplay:
                 description="Laser workshop",
                 start_time=today + timedelta(hours=10),
                 end_time=today + timedelta(hours=12),
-                resources='["Glowforge Laser Cutter"]',
+                resources=["Glowforge Laser Cutter"],
                 attendee_name="Alice",
                 attendee_email="alice@example.com",
             ),
@@ -2785,7 +2785,7 @@ class TestSkeddaCalendarDisplay:
                 description="Custom parts",
                 start_time=today + timedelta(hours=14),
                 end_time=today + timedelta(hours=16),
-                resources='["CNC Milling Machine"]',
+                resources=["CNC Milling Machine"],
                 attendee_name="Bob",
                 attendee_email="bob@example.com",
             ),
@@ -2796,7 +2796,7 @@ class TestSkeddaCalendarDisplay:
                 description="Open Build Night",
                 start_time=today + timedelta(hours=18),
                 end_time=today + timedelta(hours=21),
-                resources='["Glowforge Laser Cutter", "CNC Milling Machine"]',
+                resources=["Glowforge Laser Cutter", "CNC Milling Machine"],
                 attendee_name=None,  # No attendee for recurring/group events
                 attendee_email=None,
             ),
@@ -2809,7 +2809,7 @@ class TestSkeddaCalendarDisplay:
                 description="Prototype parts",
                 start_time=today + timedelta(days=3, hours=10),
                 end_time=today + timedelta(days=3, hours=12),
-                resources='["3D Printer"]',
+                resources=["3D Printer"],
                 attendee_name="Charlie",
                 attendee_email="charlie@example.com",
             ),
@@ -13,6 +13,7 @@ import json
 from datetime import datetime, timezone
 from unittest.mock import MagicMock, patch
 
+from kiosk_show_replacement.ical_service import ICSFetchResult
 from kiosk_show_replacement.models import (
     AssignmentHistory,
     Display,
@@ -1183,10 +1184,8 @@ DTEND:20260128T140000Z
 END:VEVENT
 END:VCALENDAR"""
 
-        with patch(
-            "kiosk_show_replacement.ical_service.fetch_ics_from_url"
-        ) as mock_fetch:
-            mock_fetch.return_value = ics_content
+        with patch("kiosk_show_replacement.ical_service.fetch_ics") as mock_fetch:
+            mock_fetch.return_value = ICSFetchResult(ics_content)
 
             item_data = {
                 "title": "Machine Schedule",
@@ -1253,9 +1252,7 @@ END:VCALENDAR"""
         self, client, authenticated_user, sample_slideshow
     ):
         """Test skedda item creation with unreachable URL fails."""
-        with patch(
-            "kiosk_show_replacement.ical_service.fetch_ics_from_url"
-        ) as mock_fetch:
+        with patch("kiosk_show_replacement.ical_service.fetch_ics") as mock_fetch:
             mock_fetch.return_value = None  # Simulate fetch failure
 
             item_data = {
@@ -1337,6 +1334,73 @@ END:VCALENDAR"""
             assert data["success"] is True
             assert data["data"]["ical_refresh_minutes"] == 60
 
+    def test_update_skedda_item_layout(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test updating the calendar grid of a skedda item."""
+        with app.app_context():
+            feed = ICalFeed(
+                url="https://example.com/calendar.ics",
+                last_fetched=datetime.now(timezone.utc),
+            )
+            db.session.add(feed)
+            db.session.commit()
+
+            item = SlideshowItem(
+                slideshow_id=sample_slideshow.id,
+                title="Machine Schedule",
+                content_type="skedda",
+                ical_feed_id=feed.id,
+                order_index=1,
+                created_by_id=authenticated_user.id,
+                updated_by_id=authenticated_user.id,
+            )
+            db.session.add(item)
+            db.session.commit()
+            item_id = item.id
+
+        response = client.put(
+            f"/api/v1/slideshow-items/{item_id}",
+            data=json.dumps({"ical_day_start_hour": 9, "ical_slot_minutes": 15}),
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        data = response.get_json()["data"]
+        assert data["ical_day_start_hour"] == 9
+        assert data["ical_day_end_hour"] is None
+        assert data["ical_slot_minutes"] == 15
+
+        # The end hour is checked against the stored start hour
+        response = client.put(
+            f"/api/v1/slideshow-items/{item_id}",
+            data=json.dumps({"ical_day_end_hour": 8}),
+            content_type="application/json",
+        )
+        assert response.status_code == 400
+        assert "after its start hour" in response.get_json()["errors"][0]
+
+    def test_create_skedda_item_invalid_layout(
+        self, client, authenticated_user, sample_slideshow
+    ):
+        """Test skedda item creation with an unsupported slot length fails."""
+        item_data = {
+            "title": "Machine Schedule",
+            "content_type": "skedda",
+            "ical_url": "https://example.com/calendar.ics",
+            "ical_slot_minutes": 7,
+        }
+
+        with patch("kiosk_show_replacement.ical_service.fetch_ics") as mock_fetch:
+            response = client.post(
+                f"/api/v1/slideshows/{sample_slideshow.id}/items",
+                data=json.dumps(item_data),
+                content_type="application/json",
+            )
+            mock_fetch.assert_not_called()
+
+        assert response.status_code == 400
+        assert "slot length" in response.get_json()["errors"][0]
+
     def test_get_skedda_data_success(
         self, app, client, authenticated_user, sample_slideshow
     ):
@@ -1356,7 +1420,7 @@ END:VCALENDAR"""
                 summary="John Doe: Project (Laser Cutter)",
                 start_time=datetime(2026, 1, 28, 17, 0, tzinfo=timezone.utc),
                 end_time=datetime(2026, 1, 28, 19, 0, tzinfo=timezone.utc),
-                resources=json.dumps(["Laser Cutter"]),
+                resources=["Laser Cutter"],
             )
             db.session.add(event)
 
@@ -1449,26 +1513,126 @@ END:VCALENDAR"""
             assert data["success"] is False
             assert "Invalid date format" in data["errors"][0]
 
+    def test_display_skedda_data_not_modified(self, app, client, sample_slideshow):
+        """Test a display revalidating unchanged calendar data gets a 304."""
+        with app.app_context():
+            feed = ICalFeed(
+                url="https://example.com/calendar.ics",
+                last_fetched=datetime.now(timezone.utc),
+            )
+            db.session.add(feed)
+            db.session.commit()
+
+            item = SlideshowItem(
+                slideshow_id=sample_slideshow.id,
+                title="Machine Schedule",
+                content_type="skedda",
+                ical_feed_id=feed.id,
+                ical_refresh_minutes=15,
+            )
+            display = Display(name="lobby", current_slideshow_id=sample_slideshow.id)
+            db.session.add_all([item, display])
+            db.session.commit()
+            url = f"/api/v1/display/lobby/skedda-data/{item.id}?date=2026-01-28"
+
+        response = client.get(url)
+        assert response.status_code == 200
+        assert response.headers["Cache-Control"] == "no-cache"
+        etag = response.headers["ETag"]
+
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.data == b""
+
+        response = client.get(
+            url.replace("2026-01-28", "2026-01-29"), headers={"If-None-Match": etag}
+        )
+        assert response.status_code == 200
+        assert response.headers["ETag"] != etag
+
+    def test_display_skedda_data_rate_limited(
+        self, app, client, sample_slideshow, monkeypatch
+    ):
+        """Test a display making too many calendar requests gets a 429."""
+        monkeypatch.setitem(app.config, "SKEDDA_DATA_RATE_LIMIT", 2)
+        with app.app_context():
+            feed = ICalFeed(
+                url="https://example.com/calendar.ics",
+                last_fetched=datetime.now(timezone.utc),
+            )
+            db.session.add(feed)
+            db.session.commit()
+
+            item = SlideshowItem(
+                slideshow_id=sample_slideshow.id,
+                title="Machine Schedule",
+                content_type="skedda",
+                ical_feed_id=feed.id,
+                ical_refresh_minutes=15,
+            )
+            lobby = Display(name="lobby", current_slideshow_id=sample_slideshow.id)
+            hallway = Display(name="hallway", current_slideshow_id=sample_slideshow.id)
+            db.session.add_all([item, lobby, hallway])
+            db.session.commit()
+            item_id = item.id
+
+        url = f"/api/v1/display/lobby/skedda-data/{item_id}"
+        assert client.get(url).status_code == 200
+        assert client.get(url).status_code == 200
+
+        response = client.get(url)
+        assert response.status_code == 429
+        assert int(response.headers["Retry-After"]) >= 1
+
+        response = client.get(f"/api/v1/display/hallway/skedda-data/{item_id}")
+        assert response.status_code == 200
+
+    def test_display_skedda_data_unknown_item(self, app, client, sample_slideshow):
+        """Test an unknown display or item is a 404."""
+        with app.app_context():
+            display = Display(name="lobby", current_slideshow_id=sample_slideshow.id)
+            db.session.add(display)
+            db.session.commit()
+
+        response = client.get("/api/v1/display/lobby/skedda-data/999999")
+        assert response.status_code == 404
+        assert response.get_json()["errors"][0] == "Slideshow item not found"
+
+        response = client.get("/api/v1/display/nobody/skedda-data/1")
+        assert response.status_code == 404
+        assert response.get_json()["errors"][0] == "Display not found"
+
     def test_refresh_all_feeds_success(self, app, client, authenticated_user):
-        """Test refreshing all iCal feeds."""
+        """Test refreshing all iCal feeds returns a job with its progress."""
         with app.app_context():
             feed1 = ICalFeed(url="https://example.com/cal1.ics")
             feed2 = ICalFeed(url="https://example.com/cal2.ics")
             db.session.add_all([feed1, feed2])
             db.session.commit()
 
-            with patch(
-                "kiosk_show_replacement.api.v1.refresh_all_feeds"
-            ) as mock_refresh:
-                mock_refresh.return_value = {"refreshed": 2, "errors": []}
+            with patch("kiosk_show_replacement.ical_service.fetch_ics") as mock_fetch:
+                mock_fetch.return_value = ICSFetchResult(
+                    "BEGIN:VCALENDAR\nEND:VCALENDAR"
+                )
 
                 response = client.post("/api/v1/ical-feeds/refresh")
 
-                assert response.status_code == 200
+                assert response.status_code == 202
                 data = response.get_json()
                 assert data["success"] is True
-                assert data["data"]["refreshed"] == 2
-                assert data["data"]["errors"] == []
+                job_id = data["data"]["id"]
+
+            # Refreshes run inline in testing, so the job has finished
+            response = client.get(f"/api/v1/ical-feeds/refresh/{job_id}")
+            assert response.status_code == 200
+            job = response.get_json()["data"]
+            assert job["status"] == "completed"
+            assert job["feed_count"] == 2
+            assert job["feeds_done"] == 2
+            assert job["progress"] == 1.0
+            assert job["feeds_refreshed"] == 2
+            assert job["errors"] == []
 
     def test_refresh_all_feeds_with_errors(self, app, client, authenticated_user):
         """Test refreshing feeds with some errors."""
@@ -1478,27 +1642,40 @@ END:VCALENDAR"""
             db.session.commit()
             feed_id = feed.id
 
-            with patch(
-                "kiosk_show_replacement.api.v1.refresh_all_feeds"
-            ) as mock_refresh:
-                mock_refresh.return_value = {
-                    "refreshed": 0,
-                    "errors": [
-                        {
-                            "feed_id": feed_id,
-                            "url": "https://example.com/cal.ics",
-                            "error": "Connection timeout",
-                        }
-                    ],
-                }
+            with patch("kiosk_show_replacement.ical_service.fetch_ics") as mock_fetch:
+                mock_fetch.return_value = None
 
                 response = client.post("/api/v1/ical-feeds/refresh")
 
-                assert response.status_code == 200
-                data = response.get_json()
-                assert data["success"] is True
-                assert data["data"]["refreshed"] == 0
-                assert len(data["data"]["errors"]) == 1
+                assert response.status_code == 202
+                job = response.get_json()["data"]
+                job = client.get(f"/api/v1/ical-feeds/refresh/{job['id']}")
+                job = job.get_json()["data"]
+                assert job["feeds_refreshed"] == 0
+                assert len(job["errors"]) == 1
+                assert job["errors"][0]["feed_id"] == feed_id
+
+    def test_refresh_all_feeds_in_progress(self, app, client, authenticated_user):
+        """Test a refresh already in progress is returned, not restarted."""
+        from kiosk_show_replacement.models import ICalRefreshJob
+
+        with app.app_context():
+            job = ICalRefreshJob(status="running", feed_count=3, feeds_done=1)
+            db.session.add(job)
+            db.session.commit()
+            job_id = job.id
+
+        response = client.post("/api/v1/ical-feeds/refresh")
+
+        assert response.status_code == 202
+        data = response.get_json()["data"]
+        assert data["id"] == job_id
+        assert data["progress"] == 0.333
+
+    def test_refresh_job_not_found(self, client, authenticated_user):
+        """Test polling an unknown refresh job returns 404."""
+        response = client.get("/api/v1/ical-feeds/refresh/999")
+        assert response.status_code == 404
 
 
 class TestDisplayAPI:
@@ -452,3 +452,133 @@ class TestHeartbeatSystem:
         display = Display.query.filter_by(name=display_name).first()
         assert display.resolution_width == 2560
         assert display.resolution_height == 1440
+
+
+class TestPlaybackBeacon:
+    """Test the batched client playback beacon endpoint."""
+
+    def test_beacon_records_playback_metrics(self, client, sample_slideshow_with_items):
+        """Test beacon samples are aggregated into Prometheus metrics."""
+        from kiosk_show_replacement.metrics import metrics_collector
+        from kiosk_show_replacement.telemetry import telemetry_buffer
+
+        _, items = sample_slideshow_with_items
+        display_name = "test-kiosk-beacon"
+        client.get(f"/display/{display_name}")
+        telemetry_buffer.drain()
+
+        response = client.post(
+            f"/display/{display_name}/beacon",
+            data=json.dumps(
+                {
+                    "samples": [
+                        {"item_id": items[0].id, "load_ms": 340, "cache": "miss"},
+                        {"item_id": items[1].id, "dropped_frames": 4},
+                        {"item_id": items[1].id, "missed_transition": True},
+                        {"item_id": items[0].id, "error": "Failed to load image"},
+                    ],
+                    "js_heap_bytes": 31457280,
+                }
+            ),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        assert response.get_json()["accepted"] == 4
+
+        output = metrics_collector.get_metrics_text()
+        label = f'display_name="{display_name}"'
+        assert f"display_slide_load_seconds_count{{{label}}} 1" in output
+        assert f'content_item_load_seconds_count{{item_id="{items[0].id}"}}' in output
+        assert f'display_slide_cache_total{{{label},result="miss"}} 1' in output
+        assert f"display_dropped_frames_total{{{label}}} 4" in output
+        assert f"display_missed_transitions_total{{{label}}} 1" in output
+        assert f"display_playback_errors_total{{{label}}} 1" in output
+        assert f"display_js_heap_bytes{{{label}}} 31457280" in output
+
+        kinds = [s["kind"] for s in telemetry_buffer.drain()]
+        assert kinds == ["render", "error"]
+
+    def test_beacon_ignores_non_finite_numbers(
+        self, client, sample_slideshow_with_items
+    ):
+        """Test NaN and Infinity values are dropped instead of recorded."""
+        from kiosk_show_replacement.metrics import metrics_collector
+        from kiosk_show_replacement.telemetry import telemetry_buffer
+
+        _, items = sample_slideshow_with_items
+        display_name = "test-kiosk-beacon-finite"
+        client.get(f"/display/{display_name}")
+        telemetry_buffer.drain()
+
+        # Python's JSON parser accepts these non-standard literals
+        response = client.post(
+            f"/display/{display_name}/beacon",
+            data=(
+                f'{{"samples": [{{"item_id": {items[0].id}, "load_ms": NaN}}, '
+                f'{{"item_id": {items[1].id}, "load_ms": Infinity, '
+                f'"dropped_frames": NaN}}], "js_heap_bytes": NaN}}'
+            ),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        assert response.get_json()["accepted"] == 2
+
+        output = metrics_collector.get_metrics_text()
+        label = f'display_name="{display_name}"'
+        assert f"display_slide_load_seconds_count{{{label}}}" not in output
+        assert f"display_js_heap_bytes{{{label}}}" not in output
+        assert "NaN" not in output
+        assert telemetry_buffer.drain() == []
+
+    def test_beacon_ignores_unknown_items(self, client):
+        """Test samples for unknown content items are not recorded."""
+        display_name = "test-kiosk-beacon-unknown"
+        client.get(f"/display/{display_name}")
+
+        response = client.post(
+            f"/display/{display_name}/beacon",
+            data=json.dumps({"samples": [{"item_id": 999999, "load_ms": 10}]}),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        assert response.get_json()["accepted"] == 0
+
+    def test_beacon_rejects_invalid_payload(self, client):
+        """Test a beacon without a samples list is rejected."""
+        display_name = "test-kiosk-beacon-invalid"
+        client.get(f"/display/{display_name}")
+
+        response = client.post(
+            f"/display/{display_name}/beacon",
+            data=json.dumps({"samples": "nope"}),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 400
+
+    def test_beacon_unknown_display(self, client):
+        """Test a beacon for an unregistered display returns 404."""
+        response = client.post(
+            "/display/never-registered/beacon",
+            data=json.dumps({"samples": []}),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 404
+
+    def test_slideshow_includes_beacon_script(
+        self, client, sample_slideshow_with_items
+    ):
+        """Test the slideshow page wires up playback beacons."""
+        slideshow, _ = sample_slideshow_with_items
+        slideshow.is_default = True
+        db.session.commit()
+
+        response = client.get("/display/test-kiosk-beacon-page")
+
+        html = response.get_data(as_text=True)
+        assert "/display/test-kiosk-beacon-page/beacon" in html
+        assert "sendPlaybackBeacon" in html
@@ -0,0 +1,214 @@
+"""
+Tests for the catalog of uploaded files.
+
+This module tests:
+- Recording files as they are stored and removing them as they are deleted
+- Reconciling the catalog with the upload folder
+- Storage statistics and integrity checks read from the catalog
+"""
+
+import hashlib
+import os
+from io import BytesIO
+from pathlib import Path
+
+import pytest
+from werkzeug.datastructures import FileStorage
+
+from kiosk_show_replacement.file_catalog import classify_path, reconcile_catalog
+from kiosk_show_replacement.media_store import purge_unreferenced_blobs
+from kiosk_show_replacement.models import SlideshowItem, StoredFile, db
+from kiosk_show_replacement.storage import StorageManager
+from kiosk_show_replacement.validation import StorageIntegrityChecker
+from tests.conftest import upload_file
+
+IMAGE_DATA = b"\x89PNG\r\n\x1a\n" + b"catalog test image"
+
+
+pytestmark = pytest.mark.usefixtures("isolated_storage")
+
+
+def _write_file(folder, path, data):
+    """Create a file below the upload folder."""
+    file_path = Path(folder) / path
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_bytes(data)
+    return file_path
+
+
+class TestClassifyPath:
+    """Tests for deciding which files are catalogued."""
+
+    def test_catalogued_directories(self):
+        """Test legacy paths carry their owner and slideshow IDs."""
+        assert classify_path("images/3/7/photo.png") == ("image", 3, 7)
+        assert classify_path("media/videos/ab/" + "ab" * 32 + ".mp4") == (
+            "video",
+            None,
+            None,
+        )
+        assert classify_path("media/derivatives/ab/x_640.webp") == (
+            "image",
+            None,
+            None,
+        )
+        assert classify_path("media/transcodes/ab/x_720p_2500k.mp4") == (
+            "video",
+            None,
+            None,
+        )
+
+    def test_other_files_are_not_catalogued(self):
+        """Test staged uploads and partial transcodes are skipped."""
+        assert classify_path("media/transcodes/ab/.x_720p_2500k.mp4.part") is None
+        assert classify_path(".incoming/upload.part") is None
+        assert classify_path("images/3/7/.hidden") is None
+
+
+class TestCatalogMaintenance:
+    """Tests for keeping the catalog up to date as files change."""
+
+    def test_upload_is_catalogued(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test an upload is recorded with its size, checksum and owner."""
+        data = upload_file(client, sample_slideshow.id, data=IMAGE_DATA)
+
+        with app.app_context():
+            entry = StoredFile.query.filter_by(path=data["file_path"]).one()
+            assert entry.content_type == "image"
+            assert entry.file_size == len(IMAGE_DATA)
+            assert entry.checksum == hashlib.sha256(IMAGE_DATA).hexdigest()
+            assert entry.owner_id == authenticated_user.id
+            assert entry.slideshow_id == sample_slideshow.id
+
+    def test_legacy_save_and_delete(self, app, isolated_storage):
+        """Test files saved to per-slideshow directories are added and removed."""
+        manager = StorageManager(str(isolated_storage))
+        upload = FileStorage(stream=BytesIO(IMAGE_DATA), filename="photo.png")
+
+        with app.app_context():
+            success, _, file_info = manager.save_file(upload, "image", 4, 9)
+            assert success
+            entry = StoredFile.query.filter_by(path=file_info["file_path"]).one()
+            assert (entry.owner_id, entry.slideshow_id) == (4, 9)
+
+            manager.delete_file(file_info["file_path"])
+            assert StoredFile.query.count() == 0
+
+    def test_purged_blob_is_removed(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test deleting an unreferenced blob removes its catalog entry."""
+        upload_file(client, sample_slideshow.id, data=IMAGE_DATA)
+
+        with app.app_context():
+            result = purge_unreferenced_blobs(grace_hours=0)
+            assert len(result["deleted"]) == 1
+            assert StoredFile.query.count() == 0
+
+
+class TestReconcileCatalog:
+    """Tests for reconciling the catalog with the upload folder."""
+
+    def test_reconcile_adds_updates_and_removes(self, app, isolated_storage):
+        """Test files changed outside the application are picked up."""
+        _write_file(isolated_storage, "videos/2/5/clip.mp4", b"video")
+        changed = _write_file(isolated_storage, "images/2/5/photo.jpg", b"old")
+        removed = _write_file(isolated_storage, "images/2/5/gone.jpg", b"gone")
+        _write_file(isolated_storage, "media/derivatives/ab/x_640.webp", b"small")
+
+        with app.app_context():
+            for path in (changed, removed):
+                db.session.add(
+                    StoredFile(
+                        path=path.relative_to(isolated_storage).as_posix(),
+                        content_type="image",
+                        file_size=3,
+                        mtime=db.func.current_timestamp(),
+                    )
+                )
+            db.session.commit()
+            changed.write_bytes(b"new content")
+            removed.unlink()
+
+            result = reconcile_catalog(isolated_storage)
+
+            assert result == {"scanned": 3, "added": 2, "updated": 1, "removed": 1}
+            entries = {e.path: e for e in StoredFile.query.all()}
+            assert set(entries) == {
+                "videos/2/5/clip.mp4",
+                "images/2/5/photo.jpg",
+                "media/derivatives/ab/x_640.webp",
+            }
+            assert entries["videos/2/5/clip.mp4"].checksum == (
+                hashlib.sha256(b"video").hexdigest()
+            )
+            assert entries["videos/2/5/clip.mp4"].owner_id == 2
+            assert entries["images/2/5/photo.jpg"].file_size == len(b"new content")
+
+    def test_reconcile_is_idempotent(self, app, isolated_storage):
+        """Test unchanged files are not updated again."""
+        file_path = _write_file(isolated_storage, "images/1/1/photo.jpg", b"data")
+        os.utime(file_path, (1_700_000_000, 1_700_000_000))
+
+        with app.app_context():
+            assert reconcile_catalog(isolated_storage)["added"] == 1
+            assert reconcile_catalog(isolated_storage) == {
+                "scanned": 1,
+                "added": 0,
+                "updated": 0,
+                "removed": 0,
+            }
+
+
+class TestCatalogQueries:
+    """Tests for statistics and integrity checks read from the catalog."""
+
+    def test_stats_come_from_catalog(
+        self, app, client, authenticated_user, sample_slideshow, isolated_storage
+    ):
+        """Test upload statistics count catalogued files only."""
+        upload_file(client, sample_slideshow.id, data=IMAGE_DATA)
+        # Not counted until the catalog is reconciled
+        _write_file(isolated_storage, "videos/1/1/clip.mp4", b"12345")
+
+        stats = client.get("/api/v1/uploads/stats").get_json()["data"]
+        assert stats["total_files"] == 1
+        assert stats["image_size"] == len(IMAGE_DATA)
+        assert stats["users_with_files"] == 1
+        assert stats["slideshows_with_files"] == 1
+
+        with app.app_context():
+            reconcile_catalog(isolated_storage)
+        stats = client.get("/api/v1/uploads/stats").get_json()["data"]
+        assert stats["video_files"] == 1
+        assert stats["total_size"] == len(IMAGE_DATA) + 5
+
+    def test_integrity_checks_use_catalog(
+        self, app, sample_slideshow, isolated_storage
+    ):
+        """Test orphaned and missing files are found from the catalog."""
+        _write_file(isolated_storage, "images/1/1/orphan.jpg", b"orphan")
+
+        with app.app_context():
+            reconcile_catalog(isolated_storage)
+            item = SlideshowItem(
+                slideshow_id=sample_slideshow.id,
+                title="Missing",
+                content_type="image",
+                content_file_path="images/1/1/missing.jpg",
+            )
+            db.session.add(item)
+            db.session.commit()
+
+            checker = StorageIntegrityChecker(str(isolated_storage))
+            orphaned = checker.find_orphaned_files()
+            assert [f["relative_path"] for f in orphaned] == ["images/1/1/orphan.jpg"]
+            missing = checker.find_missing_files()
+            assert [m["item_id"] for m in missing] == [item.id]
+
+            result = checker.check_storage_consistency()
+            assert result["total_files"] == 1
+            assert result["total_size_bytes"] == len(b"orphan")
+            assert not result["is_consistent"]
@@ -7,13 +7,15 @@ This module tests:
 - /health/storage - Storage health check
 - /health/ready - Readiness probe
 - /health/live - Liveness probe
+- Cached health check results and ?deep=1
 
 Note: Tests that require an "initialized" database (with at least one user)
 use the `sample_user` fixture from conftest.py. The health check considers
 a database "initialized" when it has at least one user.
 """
 
-from unittest.mock import patch
+import time
+from unittest.mock import MagicMock, patch
 
 
 class TestHealthEndpoint:
@@ -172,8 +174,6 @@ class TestLivenessProbe:
 
     def test_live_is_fast(self, app, client):
         """Test liveness probe responds quickly (no heavy checks)."""
-        import time
-
         start = time.perf_counter()
         response = client.get("/health/live")
         elapsed = time.perf_counter() - start
@@ -291,3 +291,111 @@ class TestHealthCheckHelpers:
             "storage": {"status": "healthy"},
         }
         assert _get_overall_status(checks) == "unhealthy"
+
+
+class TestHealthCheckCache:
+    """Tests for cached health check results."""
+
+    def test_cache_returns_fresh_result(self):
+        """Test a cached result is returned while within max age."""
+        from kiosk_show_replacement.health import HealthCheckCache
+
+        cache = HealthCheckCache()
+        cache.set("database", {"status": "healthy"})
+
+        result = cache.get("database", max_age=60)
+        assert result["status"] == "healthy"
+        assert result["cached"] is True
+        assert result["age_seconds"] >= 0
+
+    def test_cache_ignores_stale_result(self):
+        """Test stale or disabled cache entries are not returned."""
+        from kiosk_show_replacement.health import HealthCheckCache
+
+        cache = HealthCheckCache()
+        cache.set("database", {"status": "healthy"})
+
+        later = time.monotonic() + 120
+        with patch("kiosk_show_replacement.health.time.monotonic") as mock_time:
+            mock_time.return_value = later
+            assert cache.get("database", max_age=60) is None
+        assert cache.get("database", max_age=0) is None
+
+    def test_run_only_checks_when_stale(self):
+        """Test run() reuses the cached result instead of re-checking."""
+        from kiosk_show_replacement.health import HealthCheckCache
+
+        cache = HealthCheckCache()
+        check = MagicMock(return_value={"status": "healthy"})
+
+        first = cache.run("storage", check, max_age=60)
+        second = cache.run("storage", check, max_age=60)
+
+        assert check.call_count == 1
+        assert first["cached"] is False
+        assert second["cached"] is True
+
+    def test_run_force_bypasses_cache(self):
+        """Test force=True always runs the check."""
+        from kiosk_show_replacement.health import HealthCheckCache
+
+        cache = HealthCheckCache()
+        check = MagicMock(return_value={"status": "healthy"})
+
+        cache.run("storage", check, max_age=60)
+        cache.run("storage", check, max_age=60, force=True)
+
+        assert check.call_count == 2
+
+    def test_probe_serves_cached_verdict(self, app, client, monkeypatch):
+        """Test probes use the cached result when staleness is allowed."""
+        monkeypatch.setitem(app.config, "HEALTH_CHECK_MAX_STALENESS", 60)
+        app.extensions["health_cache"].clear()
+        try:
+            with patch("kiosk_show_replacement.health._check_database") as mock_check:
+                mock_check.return_value = {"status": "healthy", "initialized": True}
+                client.get("/health/ready")
+                response = client.get("/health/ready")
+
+                assert response.status_code == 200
+                assert mock_check.call_count == 1
+        finally:
+            app.extensions["health_cache"].clear()
+
+    def test_deep_probe_runs_checks(self, app, client, monkeypatch):
+        """Test ?deep=1 re-runs checks even when a cached result exists."""
+        monkeypatch.setitem(app.config, "HEALTH_CHECK_MAX_STALENESS", 60)
+        app.extensions["health_cache"].clear()
+        try:
+            with patch("kiosk_show_replacement.health._check_database") as mock_check:
+                mock_check.return_value = {"status": "healthy", "initialized": True}
+                client.get("/health/db")
+                response = client.get("/health/db?deep=1")
+
+                assert response.status_code == 200
+                assert response.json["cached"] is False
+                assert mock_check.call_count == 2
+        finally:
+            app.extensions["health_cache"].clear()
+
+    def test_refresh_health_checks_populates_cache(self, app, monkeypatch):
+        """Test the scheduled refresh stores results for all checks."""
+        from kiosk_show_replacement.health import refresh_health_checks
+
+        monkeypatch.setitem(app.config, "HEALTH_CHECK_MAX_STALENESS", 60)
+        cache = app.extensions["health_cache"]
+        cache.clear()
+        try:
+            with app.app_context():
+                refresh_health_checks()
+
+            assert cache.get("database", max_age=60) is not None
+            assert cache.get("storage", max_age=60) is not None
+        finally:
+            cache.clear()
+
+    def test_health_check_job_registered(self, app):
+        """Test the health check job is registered with the scheduler."""
+        from kiosk_show_replacement.scheduler import get_scheduler
+
+        assert "health_checks" in get_scheduler(app).get_jobs()
@@ -2,9 +2,11 @@
 
 import os
 from datetime import datetime, timezone
+from unittest.mock import patch
 
 import pytest
 
+from kiosk_show_replacement import ical_parser
 from kiosk_show_replacement.ical_parser import (
     extract_notes_from_description,
     extract_resources_from_event,
@@ -223,6 +225,132 @@ END:VCALENDAR"""
         assert len(resource_events) > 0
 
 
+def _calendar(*events, timezones=""):
+    """Build ICS content from VEVENT bodies."""
+    body = "".join(f"BEGIN:VEVENT\n{event}\nEND:VEVENT\n" for event in events)
+    return (
+        "BEGIN:VCALENDAR\nVERSION:2.0\nPRODID:-//Test//Test//EN\n"
+        f"{body}{timezones}END:VCALENDAR"
+    )
+
+
+NEW_YORK = """BEGIN:VTIMEZONE
+TZID:America/New_York
+BEGIN:STANDARD
+DTSTART:20070101T020000
+TZNAME:EST
+TZOFFSETFROM:-0400
+TZOFFSETTO:-0500
+END:STANDARD
+END:VTIMEZONE
+"""
+
+
+class TestParseIcsDataWindow:
+    """Tests for streaming parsing with a date window."""
+
+    WINDOW_START = datetime(2026, 1, 28, tzinfo=timezone.utc)
+    WINDOW_END = datetime(2026, 2, 4, tzinfo=timezone.utc)
+
+    def test_events_outside_window_are_skipped(self) -> None:
+        """Only events overlapping the window are returned."""
+        ics_content = _calendar(
+            "UID:past\nSUMMARY:Past\nDTSTART:20250101T120000Z\n"
+            "DTEND:20250101T130000Z",
+            "UID:overlap\nSUMMARY:Overlap\nDTSTART:20260127T220000Z\n"
+            "DTEND:20260128T010000Z",
+            "UID:inside\nSUMMARY:Inside\nDTSTART:20260201T120000Z\n"
+            "DTEND:20260201T130000Z",
+            "UID:ends-at-start\nSUMMARY:Ends\nDTSTART:20260127T230000Z\n"
+            "DTEND:20260128T000000Z",
+            "UID:future\nSUMMARY:Future\nDTSTART:20270101T120000Z\n"
+            "DTEND:20270101T130000Z",
+        )
+
+        events = parse_ics_data(
+            ics_content, window_start=self.WINDOW_START, window_end=self.WINDOW_END
+        )
+
+        assert [e["uid"] for e in events] == ["overlap", "inside"]
+
+    def test_skipped_events_are_not_built(self) -> None:
+        """Events clearly outside the window never become components."""
+        ics_content = _calendar(
+            *(
+                f"UID:old-{i}\nSUMMARY:Old\nDTSTART:2024010{i}T120000Z\n"
+                f"DTEND:2024010{i}T130000Z"
+                for i in range(1, 6)
+            ),
+            "UID:inside\nSUMMARY:Inside\nDTSTART:20260201T120000Z\n"
+            "DTEND:20260201T130000Z",
+        )
+
+        with patch(
+            "kiosk_show_replacement.ical_parser._parse_vevent",
+            wraps=ical_parser._parse_vevent,
+        ) as parse_vevent:
+            events = parse_ics_data(ics_content, window_start=self.WINDOW_START)
+
+        assert len(events) == 1
+        assert parse_vevent.call_count == 1
+
+    def test_time_zone_is_applied_before_window_check(self) -> None:
+        """An event dated the day before the window may still overlap it."""
+        # 22:00-23:00 in New York is 03:00-04:00 UTC the next day
+        ics_content = _calendar(
+            "UID:evening\nSUMMARY:Evening\n"
+            "DTSTART;TZID=America/New_York:20260127T220000\n"
+            "DTEND;TZID=America/New_York:20260127T230000",
+            timezones=NEW_YORK,
+        )
+
+        events = parse_ics_data(ics_content, window_start=self.WINDOW_START)
+
+        assert len(events) == 1
+        assert events[0]["start_time"] == datetime(
+            2026, 1, 28, 3, 0, tzinfo=timezone.utc
+        )
+
+    def test_folded_lines_are_unfolded(self) -> None:
+        """Content lines folded over several lines are joined."""
+        ics_content = _calendar(
+            "UID:folded\nSUMMARY:A very long\n  summary\nDESCRIPTION:Spaces: Roo\n"
+            " m A\nDTSTART:20260128T120000Z\nDTEND:20260128T130000Z"
+        )
+
+        events = parse_ics_data(ics_content)
+
+        assert events[0]["summary"] == "A very long summary"
+        assert events[0]["resources"] == ["Room A"]
+
+    def test_truncated_calendar_raises_error(self) -> None:
+        """A calendar without END:VCALENDAR is rejected."""
+        ics_content = _calendar(
+            "UID:x\nSUMMARY:X\nDTSTART:20260128T120000Z\nDTEND:20260128T130000Z"
+        ).replace("END:VCALENDAR", "")
+
+        with pytest.raises(ValueError, match="missing END:VCALENDAR"):
+            parse_ics_data(ics_content)
+
+    def test_skedda_file_matches_unwindowed_parse(self) -> None:
+        """Windowed parsing returns the unwindowed events in the window."""
+        ics_path = os.path.join(os.path.dirname(__file__), "..", "assets", "skedda.ics")
+        with open(ics_path, "r", encoding="utf-8") as f:
+            ics_content = f.read()
+
+        all_events = parse_ics_data(ics_content)
+        events = parse_ics_data(
+            ics_content, window_start=self.WINDOW_START, window_end=self.WINDOW_END
+        )
+
+        assert 0 < len(events) < len(all_events)
+        assert events == [
+            e
+            for e in all_events
+            if e["end_time"] > self.WINDOW_START and e["start_time"] < self.WINDOW_END
+        ]
+
+
 class TestParseSkeddaSummary:
     """Tests for parse_skedda_summary function."""
 
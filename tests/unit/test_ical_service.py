@@ -1,29 +1,81 @@
 """Unit tests for the iCal service module."""
 
-import json
+import hashlib
+from contextlib import contextmanager
 from datetime import date, datetime, timedelta, timezone
 from unittest.mock import MagicMock, patch
 
 import pytest
+from sqlalchemy import event as sa_event
 
+from kiosk_show_replacement import ical_service
 from kiosk_show_replacement.ical_service import (
+    PRUNE_LEASE,
+    ICSFetchResult,
+    SkeddaCalendarCache,
+    claim_feed_refresh,
+    fetch_ics,
     fetch_ics_from_url,
     get_all_feed_spaces,
+    get_due_feeds,
     get_events_for_date,
     get_or_create_feed,
+    get_skedda_calendar,
     get_skedda_calendar_data,
     needs_refresh,
+    prune_ical_events,
     refresh_all_feeds,
+    refresh_due_feeds,
     refresh_feed,
+    refresh_feed_single_flight,
+    schedule_feed_refresh,
     sync_feed_events,
 )
+from kiosk_show_replacement.leases import claim_lease, release_lease
 from kiosk_show_replacement.models import (
+    Display,
     ICalEvent,
+    ICalEventResource,
     ICalFeed,
     Slideshow,
     SlideshowItem,
     db,
 )
+from kiosk_show_replacement.skedda_layout import DEFAULT_LAYOUT, DayLayout
+
+
+def _parsed_events(count, first=0):
+    """Build parsed events as returned by parse_ics_data()."""
+    start = datetime(2026, 1, 28, 8, 0, tzinfo=timezone.utc)
+    return [
+        {
+            "uid": f"event-{i}",
+            "summary": f"Event {i}",
+            "description": None,
+            "start_time": start + timedelta(minutes=30 * i),
+            "end_time": start + timedelta(minutes=30 * i + 30),
+            "resources": ["Room A"],
+            "attendee_name": None,
+            "attendee_email": None,
+        }
+        for i in range(first, first + count)
+    ]
+
+
+@contextmanager
+def _event_statements():
+    """Record the SQL statements executed on the iCal event tables."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if "ical_event" in statement:
+            statements.append(statement.lstrip())
+
+    sa_event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        sa_event.remove(db.engine, "before_cursor_execute", record)
 
 
 class TestFetchIcsFromUrl:
@@ -78,6 +130,269 @@ class TestFetchIcsFromUrl:
             assert result is None
 
 
+class TestConditionalFetch:
+    """Tests for conditional ICS fetches and unchanged feeds."""
+
+    def test_fetch_sends_validators(self) -> None:
+        """Stored validators are sent and a 304 response has no content."""
+        with patch("kiosk_show_replacement.ical_service.requests.get") as mock_get:
+            mock_get.return_value = MagicMock(status_code=304, headers={})
+
+            result = fetch_ics(
+                "https://example.com/cal.ics",
+                etag='"abc"',
+                last_modified="Wed, 28 Jan 2026 12:00:00 GMT",
+            )
+
+        headers = mock_get.call_args.kwargs["headers"]
+        assert headers["If-None-Match"] == '"abc"'
+        assert headers["If-Modified-Since"] == "Wed, 28 Jan 2026 12:00:00 GMT"
+        assert result.not_modified
+        assert result.etag == '"abc"'
+        assert result.last_modified == "Wed, 28 Jan 2026 12:00:00 GMT"
+
+    def test_fetch_returns_new_validators(self) -> None:
+        """A full response returns its content and validators."""
+        with patch("kiosk_show_replacement.ical_service.requests.get") as mock_get:
+            mock_get.return_value = MagicMock(
+                status_code=200, text="BEGIN:VCALENDAR", headers={"ETag": '"v2"'}
+            )
+
+            result = fetch_ics("https://example.com/cal.ics")
+
+        assert "If-None-Match" not in mock_get.call_args.kwargs["headers"]
+        assert result == ICSFetchResult("BEGIN:VCALENDAR", etag='"v2"')
+        assert not result.not_modified
+
+    def test_refresh_stores_validators(self, app) -> None:
+        """A refresh stores the validators and hash, and sends them next time."""
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+
+            with patch("kiosk_show_replacement.ical_service.fetch_ics") as mock_fetch:
+                mock_fetch.return_value = ICSFetchResult(
+                    REFRESH_ICS, etag='"v1"', last_modified="yesterday"
+                )
+                assert refresh_feed(feed) is True
+                assert refresh_feed(feed) is True
+
+            assert feed.etag == '"v1"'
+            assert feed.last_modified == "yesterday"
+            assert len(feed.content_hash) == 64
+            assert mock_fetch.call_args.kwargs == {
+                "etag": '"v1"',
+                "last_modified": "yesterday",
+            }
+
+    def test_not_modified_skips_parse_and_sync(self, app) -> None:
+        """A 304 response only marks the feed as fetched."""
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            with patch(
+                "kiosk_show_replacement.ical_service.fetch_ics",
+                return_value=ICSFetchResult(REFRESH_ICS, etag='"v1"'),
+            ):
+                refresh_feed(feed)
+            fetched = feed.last_fetched
+            feed.last_error = "Failed to fetch ICS from URL"
+            db.session.commit()
+
+            with (
+                patch(
+                    "kiosk_show_replacement.ical_service.fetch_ics",
+                    return_value=ICSFetchResult(None, etag='"v1"'),
+                ),
+                patch("kiosk_show_replacement.ical_service.parse_ics_data") as parse,
+                patch(
+                    "kiosk_show_replacement.ical_service.broadcast_skedda_update"
+                ) as broadcast,
+            ):
+                assert refresh_feed(feed) is True
+
+            parse.assert_not_called()
+            broadcast.assert_not_called()
+            assert feed.last_fetched > fetched
+            assert feed.last_error is None
+            assert ICalEvent.query.filter_by(feed_id=feed.id).count() == 1
+
+    def test_unchanged_content_skips_sync(self, app) -> None:
+        """Content identical to the stored content is not parsed or synced."""
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+
+            with patch(
+                "kiosk_show_replacement.ical_service.fetch_ics",
+                return_value=ICSFetchResult(REFRESH_ICS),
+            ):
+                refresh_feed(feed)
+                with patch(
+                    "kiosk_show_replacement.ical_service.sync_feed_events"
+                ) as sync:
+                    assert refresh_feed(feed) is True
+
+            sync.assert_not_called()
+
+    def test_changed_content_is_synced(self, app) -> None:
+        """Changed content replaces the stored events and hash."""
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            with patch(
+                "kiosk_show_replacement.ical_service.fetch_ics",
+                return_value=ICSFetchResult(REFRESH_ICS),
+            ):
+                refresh_feed(feed)
+            content_hash = feed.content_hash
+
+            changed = REFRESH_ICS.replace("Refreshed Event", "Changed Event")
+            with patch(
+                "kiosk_show_replacement.ical_service.fetch_ics",
+                return_value=ICSFetchResult(changed),
+            ):
+                assert refresh_feed(feed) is True
+
+            assert feed.content_hash != content_hash
+            assert [event.summary for event in feed.events] == ["Changed Event"]
+
+    def test_parse_failure_keeps_validators(self, app) -> None:
+        """Validators of content that failed to parse are not stored."""
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+
+            with patch(
+                "kiosk_show_replacement.ical_service.fetch_ics",
+                return_value=ICSFetchResult("not ics", etag='"bad"'),
+            ):
+                assert refresh_feed(feed) is False
+
+            assert feed.etag is None
+            assert feed.content_hash is None
+
+
+def _dated_ics(*days):
+    """Build ICS content with a one hour event on each of the given dates."""
+    body = "".join(
+        f"BEGIN:VEVENT\nUID:event-{day:%Y%m%d}\nSUMMARY:Booking\n"
+        f"DTSTART:{day:%Y%m%d}T120000Z\nDTEND:{day:%Y%m%d}T130000Z\nEND:VEVENT\n"
+        for day in days
+    )
+    return f"BEGIN:VCALENDAR\nVERSION:2.0\n{body}END:VCALENDAR"
+
+
+class TestEventWindow:
+    """Tests for only storing events near today."""
+
+    @pytest.fixture(autouse=True)
+    def window(self, app, monkeypatch):
+        """Keep events from a week ago to 60 days ahead."""
+        monkeypatch.setitem(app.config, "ICAL_EVENT_WINDOW_PAST_DAYS", 7)
+        monkeypatch.setitem(app.config, "ICAL_EVENT_WINDOW_FUTURE_DAYS", 60)
+
+    def test_window_is_aligned_to_days(self, app) -> None:
+        """The window runs from midnight UTC, days before and after today."""
+        with app.app_context():
+            start, end = ical_service.get_event_window()
+
+        today = datetime.now(timezone.utc).replace(
+            hour=0, minute=0, second=0, microsecond=0
+        )
+        assert start == today - timedelta(days=7)
+        assert end == today + timedelta(days=61)
+
+    def test_open_window(self, app, monkeypatch) -> None:
+        """A window of 0 days keeps every event on that side."""
+        monkeypatch.setitem(app.config, "ICAL_EVENT_WINDOW_PAST_DAYS", 0)
+        with app.app_context():
+            start, end = ical_service.get_event_window()
+
+        assert start is None
+        assert end is not None
+
+    def test_refresh_stores_events_in_window(self, app) -> None:
+        """Events outside the window are not stored."""
+        today = date.today()
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            content = _dated_ics(
+                today - timedelta(days=30), today, today + timedelta(days=90)
+            )
+
+            with patch(
+                "kiosk_show_replacement.ical_service.fetch_ics",
+                return_value=ICSFetchResult(content),
+            ):
+                assert refresh_feed(feed) is True
+
+            assert [e.uid for e in feed.events] == [f"event-{today:%Y%m%d}"]
+
+    def test_past_events_outside_window_are_kept(self, app) -> None:
+        """Events before the window are left for the retention pruning."""
+        today = date.today()
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            past = datetime.combine(today - timedelta(days=10), datetime.min.time())
+            _add_event(feed, "past", past.replace(hour=13))
+            _add_event(feed, "cancelled", datetime.combine(today, datetime.min.time()))
+            db.session.commit()
+
+            with patch(
+                "kiosk_show_replacement.ical_service.fetch_ics",
+                return_value=ICSFetchResult(_dated_ics(today)),
+            ):
+                assert refresh_feed(feed) is True
+
+            # Only the event in the window is compared with the feed
+            assert sorted(e.uid for e in feed.events) == [
+                f"event-{today:%Y%m%d}",
+                "past",
+            ]
+            assert prune_ical_events(retention_days=7) == 1
+            assert [e.uid for e in feed.events] == [f"event-{today:%Y%m%d}"]
+
+    def test_first_refresh_of_day_resyncs(self, app) -> None:
+        """Unchanged content is synced again once the window has moved."""
+        today = date.today()
+        with app.app_context():
+            content = _dated_ics(today)
+            feed = ICalFeed(
+                url="https://example.com/cal.ics",
+                etag='"v1"',
+                content_hash=hashlib.sha256(content.encode("utf-8")).hexdigest(),
+                last_fetched=datetime.now(timezone.utc) - timedelta(days=1),
+            )
+            db.session.add(feed)
+            db.session.commit()
+
+            with (
+                patch(
+                    "kiosk_show_replacement.ical_service.fetch_ics",
+                    return_value=ICSFetchResult(content, etag='"v1"'),
+                ) as mock_fetch,
+                patch("kiosk_show_replacement.ical_service.sync_feed_events") as sync,
+            ):
+                assert refresh_feed(feed) is True
+                # Validators are only sent on the first refresh of the day
+                assert mock_fetch.call_args.kwargs["etag"] is None
+                sync.assert_called_once()
+
+                assert refresh_feed(feed) is True
+                assert mock_fetch.call_args.kwargs["etag"] == '"v1"'
+                sync.assert_called_once()
+
+
 class TestGetOrCreateFeed:
     """Tests for get_or_create_feed function."""
 
@@ -166,10 +481,8 @@ END:VCALENDAR"""
             db.session.commit()
             feed_id = feed.id
 
-            with patch(
-                "kiosk_show_replacement.ical_service.fetch_ics_from_url"
-            ) as mock_fetch:
-                mock_fetch.return_value = ics_content
+            with patch("kiosk_show_replacement.ical_service.fetch_ics") as mock_fetch:
+                mock_fetch.return_value = ICSFetchResult(ics_content)
 
                 result = refresh_feed(feed)
 
@@ -189,9 +502,7 @@ END:VCALENDAR"""
             db.session.add(feed)
             db.session.commit()
 
-            with patch(
-                "kiosk_show_replacement.ical_service.fetch_ics_from_url"
-            ) as mock_fetch:
+            with patch("kiosk_show_replacement.ical_service.fetch_ics") as mock_fetch:
                 mock_fetch.return_value = None
 
                 result = refresh_feed(feed)
@@ -206,10 +517,8 @@ END:VCALENDAR"""
             db.session.add(feed)
             db.session.commit()
 
-            with patch(
-                "kiosk_show_replacement.ical_service.fetch_ics_from_url"
-            ) as mock_fetch:
-                mock_fetch.return_value = "invalid ics content"
+            with patch("kiosk_show_replacement.ical_service.fetch_ics") as mock_fetch:
+                mock_fetch.return_value = ICSFetchResult("invalid ics content")
 
                 result = refresh_feed(feed)
 
@@ -330,6 +639,156 @@ class TestSyncFeedEvents:
             assert len(db_events) == 1
             assert db_events[0].uid == "event-1"
 
+    def test_unchanged_events_are_not_written(self, app) -> None:
+        """Syncing the same events again only reads the stored events."""
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            events = _parsed_events(3)
+            sync_feed_events(feed, events)
+            db.session.commit()
+
+            with _event_statements() as statements:
+                sync_feed_events(feed, events)
+
+            # The stored events and their resources
+            assert len(statements) == 2
+            assert all(s.startswith("SELECT") for s in statements)
+
+    def test_only_changes_are_written(self, app) -> None:
+        """New, changed and removed events are written in bulk."""
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            events = _parsed_events(4)
+            sync_feed_events(feed, events)
+            db.session.commit()
+            unchanged = ICalEvent.query.filter_by(uid="event-1").one()
+            unchanged_updated_at = unchanged.updated_at
+
+            events[0]["summary"] = "Moved"
+            del events[2:]
+            events.extend(_parsed_events(6)[4:])
+            with _event_statements() as statements:
+                sync_feed_events(feed, events)
+            db.session.commit()
+
+            # Two SELECTs of stored events and resources, DELETEs of the
+            # removed events' resources and of the events, one INSERT ... ON
+            # CONFLICT, a SELECT of the new event IDs and an INSERT of their
+            # resources
+            assert len(statements) == 7
+            stored = {e.uid: e for e in ICalEvent.query.filter_by(feed_id=feed.id)}
+            assert sorted(stored) == ["event-0", "event-1", "event-4", "event-5"]
+            assert stored["event-0"].summary == "Moved"
+            assert stored["event-1"].updated_at == unchanged_updated_at
+
+    def test_resource_changes_are_synced(self, app) -> None:
+        """An event's resources are replaced when they change."""
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            events = _parsed_events(2)
+            sync_feed_events(feed, events)
+            db.session.commit()
+
+            events[0]["resources"] = ["Room B", "Room C"]
+            events[1]["resources"] = []
+            sync_feed_events(feed, events)
+            db.session.commit()
+
+            stored = {e.uid: e for e in ICalEvent.query.filter_by(feed_id=feed.id)}
+            assert stored["event-0"].resources == ["Room B", "Room C"]
+            assert stored["event-0"].to_dict()["resources"] == ["Room B", "Room C"]
+            assert stored["event-1"].resources == []
+            assert ICalEventResource.query.count() == 2
+
+    def test_repeated_uid_keeps_last_event(self, app) -> None:
+        """A UID repeated in the feed stores its last event."""
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            events = _parsed_events(2)
+            events[1]["uid"] = "event-0"
+
+            sync_feed_events(feed, events)
+            db.session.commit()
+
+            assert [e.summary for e in ICalEvent.query.all()] == ["Event 1"]
+
+    def test_without_upsert_support(self, app, monkeypatch) -> None:
+        """Databases without an upsert get a bulk insert and update."""
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            sync_feed_events(feed, _parsed_events(1))
+            db.session.commit()
+            monkeypatch.setattr(db.session.get_bind().dialect, "name", "other")
+
+            events = _parsed_events(2)
+            events[0]["summary"] = "Moved"
+            sync_feed_events(feed, events)
+            db.session.commit()
+
+            stored = {e.uid: e.summary for e in ICalEvent.query.all()}
+            assert stored == {"event-0": "Moved", "event-1": "Event 1"}
+
+
+@pytest.mark.slow
+class TestSyncFeedEventsAtScale:
+    """Benchmark syncing a large feed."""
+
+    EVENT_COUNT = 10_000
+
+    def test_sync_large_feed(self, app) -> None:
+        """A 10,000 event feed syncs in a constant number of statements."""
+        import time
+
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            events = _parsed_events(self.EVENT_COUNT)
+
+            start = time.perf_counter()
+            with _event_statements() as statements:
+                sync_feed_events(feed, events)
+            db.session.commit()
+            initial = time.perf_counter() - start
+            assert len(statements) == 5
+            assert ICalEvent.query.count() == self.EVENT_COUNT
+
+            # Change 10%, remove 5% and add 5% of the events
+            for event in events[: self.EVENT_COUNT // 10]:
+                event["summary"] = "Changed"
+            events = (
+                events[self.EVENT_COUNT // 20 :]
+                + _parsed_events(self.EVENT_COUNT, first=self.EVENT_COUNT)[
+                    : self.EVENT_COUNT // 20
+                ]
+            )
+
+            start = time.perf_counter()
+            with _event_statements() as statements:
+                sync_feed_events(feed, events)
+            db.session.commit()
+            resync = time.perf_counter() - start
+
+            # As for any sync, whatever the number of changed events
+            assert len(statements) == 7
+            assert ICalEvent.query.count() == self.EVENT_COUNT
+            assert ICalEvent.query.filter_by(summary="Changed").count() == (
+                self.EVENT_COUNT // 20
+            )
+            # Generous bounds; one SELECT per event took several times longer
+            assert initial < 10
+            assert resync < 10
+
 
 class TestGetEventsForDate:
     """Tests for get_events_for_date function."""
@@ -492,7 +951,7 @@ class TestGetSkeddaCalendarData:
                 summary="John Doe: Project (Laser Cutter)",
                 start_time=datetime(2026, 1, 28, 17, 0, tzinfo=timezone.utc),
                 end_time=datetime(2026, 1, 28, 19, 0, tzinfo=timezone.utc),
-                resources=json.dumps(["Laser Cutter"]),
+                resources=["Laser Cutter"],
                 attendee_name="John Doe",
             )
             db.session.add(event)
@@ -554,7 +1013,7 @@ class TestGetAllFeedSpaces:
                 summary="Event 1",
                 start_time=datetime(2026, 1, 28, 12, 0, tzinfo=timezone.utc),
                 end_time=datetime(2026, 1, 28, 14, 0, tzinfo=timezone.utc),
-                resources=json.dumps(["Laser Cutter"]),
+                resources=["Laser Cutter"],
             )
             # Event on Jan 29 with "CNC Machine"
             event2 = ICalEvent(
@@ -563,7 +1022,7 @@ class TestGetAllFeedSpaces:
                 summary="Event 2",
                 start_time=datetime(2026, 1, 29, 10, 0, tzinfo=timezone.utc),
                 end_time=datetime(2026, 1, 29, 12, 0, tzinfo=timezone.utc),
-                resources=json.dumps(["CNC Machine"]),
+                resources=["CNC Machine"],
             )
             db.session.add_all([event1, event2])
             db.session.commit()
@@ -596,7 +1055,7 @@ class TestGetAllFeedSpaces:
                 summary="Event 1",
                 start_time=datetime(2026, 1, 28, 12, 0, tzinfo=timezone.utc),
                 end_time=datetime(2026, 1, 28, 14, 0, tzinfo=timezone.utc),
-                resources=json.dumps(["Laser Cutter", "CNC Machine"]),
+                resources=["Laser Cutter", "CNC Machine"],
             )
             event2 = ICalEvent(
                 feed_id=feed.id,
@@ -604,7 +1063,7 @@ class TestGetAllFeedSpaces:
                 summary="Event 2",
                 start_time=datetime(2026, 1, 29, 10, 0, tzinfo=timezone.utc),
                 end_time=datetime(2026, 1, 29, 12, 0, tzinfo=timezone.utc),
-                resources=json.dumps(["Laser Cutter"]),
+                resources=["Laser Cutter"],
             )
             db.session.add_all([event1, event2])
             db.session.commit()
@@ -613,8 +1072,8 @@ class TestGetAllFeedSpaces:
 
             assert spaces == ["CNC Machine", "Laser Cutter"]
 
-    def test_skips_events_with_invalid_json(self, app) -> None:
-        """Skips events with invalid JSON in resources."""
+    def test_ignores_events_without_resources(self, app) -> None:
+        """Events without resources add no spaces."""
         with app.app_context():
             feed = ICalFeed(url="https://example.com/cal.ics")
             db.session.add(feed)
@@ -626,7 +1085,6 @@ class TestGetAllFeedSpaces:
                 summary="Event 1",
                 start_time=datetime(2026, 1, 28, 12, 0, tzinfo=timezone.utc),
                 end_time=datetime(2026, 1, 28, 14, 0, tzinfo=timezone.utc),
-                resources="not valid json",
             )
             event2 = ICalEvent(
                 feed_id=feed.id,
@@ -634,7 +1092,7 @@ class TestGetAllFeedSpaces:
                 summary="Event 2",
                 start_time=datetime(2026, 1, 29, 10, 0, tzinfo=timezone.utc),
                 end_time=datetime(2026, 1, 29, 12, 0, tzinfo=timezone.utc),
-                resources=json.dumps(["Laser Cutter"]),
+                resources=["Laser Cutter"],
             )
             db.session.add_all([event1, event2])
             db.session.commit()
@@ -657,7 +1115,7 @@ class TestGetAllFeedSpaces:
                 summary="Event 1",
                 start_time=datetime(2026, 1, 28, 12, 0, tzinfo=timezone.utc),
                 end_time=datetime(2026, 1, 28, 14, 0, tzinfo=timezone.utc),
-                resources=json.dumps(["Laser Cutter"]),
+                resources=["Laser Cutter"],
             )
             event2 = ICalEvent(
                 feed_id=feed2.id,
@@ -665,7 +1123,7 @@ class TestGetAllFeedSpaces:
                 summary="Event 2",
                 start_time=datetime(2026, 1, 28, 10, 0, tzinfo=timezone.utc),
                 end_time=datetime(2026, 1, 28, 12, 0, tzinfo=timezone.utc),
-                resources=json.dumps(["3D Printer"]),
+                resources=["3D Printer"],
             )
             db.session.add_all([event1, event2])
             db.session.commit()
@@ -674,6 +1132,25 @@ class TestGetAllFeedSpaces:
 
             assert spaces == ["Laser Cutter"]
 
+    def test_spaces_are_one_query(self, app) -> None:
+        """The space list is read with a single query."""
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            sync_feed_events(feed, _parsed_events(50))
+            events = _parsed_events(1, first=50)
+            events[0]["resources"] = ["Room B", "Room A"]
+            sync_feed_events(feed, _parsed_events(50) + events)
+            db.session.commit()
+            feed_id = feed.id
+
+            with _event_statements() as statements:
+                spaces = get_all_feed_spaces(db.session.get(ICalFeed, feed_id))
+
+            assert spaces == ["Room A", "Room B"]
+            assert len(statements) == 1
+
 
 class TestGetSkeddaCalendarDataShowsAllSpaces:
     """Tests that get_skedda_calendar_data returns all spaces from the feed."""
@@ -695,7 +1172,7 @@ class TestGetSkeddaCalendarDataShowsAllSpaces:
                 summary="John Doe: Laser Project (Laser Cutter)",
                 start_time=datetime(2026, 1, 28, 12, 0, tzinfo=timezone.utc),
                 end_time=datetime(2026, 1, 28, 14, 0, tzinfo=timezone.utc),
-                resources=json.dumps(["Laser Cutter"]),
+                resources=["Laser Cutter"],
                 attendee_name="John Doe",
             )
             # Event on Jan 29 (different date) with "CNC Machine"
@@ -705,7 +1182,7 @@ class TestGetSkeddaCalendarDataShowsAllSpaces:
                 summary="Jane Smith: CNC Work (CNC Machine)",
                 start_time=datetime(2026, 1, 29, 10, 0, tzinfo=timezone.utc),
                 end_time=datetime(2026, 1, 29, 12, 0, tzinfo=timezone.utc),
-                resources=json.dumps(["CNC Machine"]),
+                resources=["CNC Machine"],
                 attendee_name="Jane Smith",
             )
             # Event on Jan 30 with "3D Printer"
@@ -715,7 +1192,7 @@ class TestGetSkeddaCalendarDataShowsAllSpaces:
                 summary="Bob: 3D Print (3D Printer)",
                 start_time=datetime(2026, 1, 30, 14, 0, tzinfo=timezone.utc),
                 end_time=datetime(2026, 1, 30, 16, 0, tzinfo=timezone.utc),
-                resources=json.dumps(["3D Printer"]),
+                resources=["3D Printer"],
                 attendee_name="Bob",
             )
             db.session.add_all([event1, event2, event3])
@@ -768,16 +1245,20 @@ class TestRefreshAllFeeds:
             db.session.add_all([feed1, feed2])
             db.session.commit()
 
-            with patch(
-                "kiosk_show_replacement.ical_service.refresh_feed"
-            ) as mock_refresh:
-                mock_refresh.return_value = True
+            with patch("kiosk_show_replacement.ical_service.fetch_ics") as mock_fetch:
+                mock_fetch.return_value = ICSFetchResult(REFRESH_ICS)
+                progress = []
 
-                result = refresh_all_feeds()
+                result = refresh_all_feeds(
+                    progress=lambda done, total: progress.append((done, total))
+                )
 
                 assert result["refreshed"] == 2
+                assert result["skipped"] == 0
                 assert result["errors"] == []
-                assert mock_refresh.call_count == 2
+                assert mock_fetch.call_count == 2
+                assert progress == [(1, 2), (2, 2)]
+                assert ICalEvent.query.count() == 2
 
     def test_handles_errors(self, app) -> None:
         """Handles errors during refresh."""
@@ -787,10 +1268,8 @@ class TestRefreshAllFeeds:
             db.session.commit()
             feed_id = feed.id
 
-            with patch(
-                "kiosk_show_replacement.ical_service.refresh_feed"
-            ) as mock_refresh:
-                mock_refresh.side_effect = Exception("Test error")
+            with patch("kiosk_show_replacement.ical_service.fetch_ics") as mock_fetch:
+                mock_fetch.side_effect = Exception("Test error")
 
                 result = refresh_all_feeds()
 
@@ -798,3 +1277,598 @@ class TestRefreshAllFeeds:
                 assert len(result["errors"]) == 1
                 assert result["errors"][0]["feed_id"] == feed_id
                 assert "Test error" in result["errors"][0]["error"]
+                # The claim is released so the feed can be retried
+                assert claim_feed_refresh(feed_id) is True
+
+    def test_failed_fetch_is_reported(self, app) -> None:
+        """A feed that cannot be fetched is listed with its error."""
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+
+            with patch(
+                "kiosk_show_replacement.ical_service.fetch_ics",
+                return_value=None,
+            ):
+                result = refresh_all_feeds()
+
+            assert result["refreshed"] == 0
+            assert "Failed to fetch" in result["errors"][0]["error"]
+
+    def test_feed_being_refreshed_is_skipped(self, app) -> None:
+        """Feeds claimed by another refresh are not fetched."""
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            claim_feed_refresh(feed.id)
+
+            with patch("kiosk_show_replacement.ical_service.fetch_ics") as mock_fetch:
+                result = refresh_all_feeds()
+
+            mock_fetch.assert_not_called()
+            assert result == {"refreshed": 0, "skipped": 1, "errors": []}
+
+    def test_fetches_concurrently_within_host_limit(self, app, monkeypatch) -> None:
+        """Feeds are fetched in parallel, but only one at a time per host."""
+        import threading
+        import time
+
+        monkeypatch.setitem(app.config, "ICAL_FETCH_CONCURRENCY", 4)
+        monkeypatch.setitem(app.config, "ICAL_FETCH_PER_HOST", 1)
+        lock = threading.Lock()
+        active: dict[str, int] = {}
+        peak: dict[str, int] = {}
+
+        def slow_fetch(url, **kwargs):
+            host = url.split("/")[2]
+            with lock:
+                active[host] = active.get(host, 0) + 1
+                peak[host] = max(peak.get(host, 0), active[host])
+                peak["total"] = max(peak.get("total", 0), sum(active.values()))
+            time.sleep(0.05)
+            with lock:
+                active[host] -= 1
+            return ICSFetchResult(REFRESH_ICS)
+
+        with app.app_context():
+            db.session.add_all(
+                ICalFeed(url=f"https://{host}/cal{i}.ics")
+                for host in ("a.example.com", "b.example.com")
+                for i in range(3)
+            )
+            db.session.commit()
+
+            with patch(
+                "kiosk_show_replacement.ical_service.fetch_ics",
+                side_effect=slow_fetch,
+            ):
+                result = refresh_all_feeds()
+
+        assert result["refreshed"] == 6
+        assert peak["a.example.com"] == 1
+        assert peak["b.example.com"] == 1
+        assert peak["total"] == 2
+
+    def test_deadline_abandons_slow_feeds(self, app, monkeypatch) -> None:
+        """Feeds not fetched by the deadline are reported and released."""
+        import threading
+
+        monkeypatch.setitem(app.config, "ICAL_REFRESH_ALL_DEADLINE", 0.2)
+        release = threading.Event()
+
+        def fetch(url, **kwargs):
+            if "slow" in url:
+                release.wait(5)
+            return ICSFetchResult(REFRESH_ICS)
+
+        with app.app_context():
+            fast = ICalFeed(url="https://example.com/fast.ics")
+            slow = ICalFeed(url="https://other.example.com/slow.ics")
+            db.session.add_all([fast, slow])
+            db.session.commit()
+
+            try:
+                with patch(
+                    "kiosk_show_replacement.ical_service.fetch_ics",
+                    side_effect=fetch,
+                ):
+                    result = refresh_all_feeds()
+            finally:
+                release.set()
+
+            assert result["refreshed"] == 1
+            assert result["errors"] == [
+                {
+                    "feed_id": slow.id,
+                    "url": slow.url,
+                    "error": "Refresh deadline exceeded",
+                }
+            ]
+            assert claim_feed_refresh(slow.id) is True
+
+
+REFRESH_ICS = """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//Test//Test//EN
+BEGIN:VEVENT
+UID:refreshed-event
+SUMMARY:Refreshed Event
+DTSTART:20260128T120000Z
+DTEND:20260128T140000Z
+END:VEVENT
+END:VCALENDAR"""
+
+
+def _skedda_feed(slideshow, last_fetched=None, refresh_minutes=15, url=None):
+    """Create a feed shown by an active Skedda item of a slideshow."""
+    feed = ICalFeed(
+        url=url or "https://example.com/refresh.ics", last_fetched=last_fetched
+    )
+    db.session.add(feed)
+    db.session.flush()
+    item = SlideshowItem(
+        slideshow_id=slideshow.id,
+        content_type="skedda",
+        title="Calendar",
+        ical_feed_id=feed.id,
+        ical_refresh_minutes=refresh_minutes,
+    )
+    db.session.add(item)
+    db.session.commit()
+    return feed, item
+
+
+class TestBackgroundRefresh:
+    """Tests for refreshing feeds in the background."""
+
+    def test_due_feeds(self, app, sample_slideshow) -> None:
+        """Feeds are due when their refresh interval is about to end."""
+        with app.app_context():
+            now = datetime.now(timezone.utc)
+            never, _ = _skedda_feed(sample_slideshow, url="https://example.com/1.ics")
+            expiring, _ = _skedda_feed(
+                sample_slideshow,
+                last_fetched=now - timedelta(minutes=14, seconds=30),
+                url="https://example.com/2.ics",
+            )
+            fresh, _ = _skedda_feed(
+                sample_slideshow,
+                last_fetched=now - timedelta(minutes=5),
+                url="https://example.com/3.ics",
+            )
+            unused = ICalFeed(url="https://example.com/4.ics")
+            db.session.add(unused)
+            db.session.commit()
+
+            assert set(get_due_feeds(ahead_seconds=60)) == {never.id, expiring.id}
+            assert get_due_feeds() == [never.id]
+
+    def test_claim_is_single_flight(self, app) -> None:
+        """A feed can only be claimed again once released or abandoned."""
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+
+            assert claim_feed_refresh(feed.id) is True
+            assert claim_feed_refresh(feed.id) is False
+
+            feed.refresh_started_at = datetime.now(timezone.utc) - timedelta(hours=1)
+            db.session.commit()
+            assert claim_feed_refresh(feed.id) is True
+
+    def test_claimed_feed_is_not_refreshed(self, app) -> None:
+        """A feed being refreshed elsewhere is skipped without fetching."""
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            claim_feed_refresh(feed.id)
+
+            with patch("kiosk_show_replacement.ical_service.fetch_ics") as mock_fetch:
+                assert refresh_feed_single_flight(feed.id) is None
+                mock_fetch.assert_not_called()
+
+    def test_refresh_releases_claim(self, app) -> None:
+        """A finished refresh releases the feed's claim."""
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+
+            with patch(
+                "kiosk_show_replacement.ical_service.fetch_ics",
+                return_value=None,
+            ):
+                assert refresh_feed_single_flight(feed.id) is False
+
+            assert db.session.get(ICalFeed, feed.id).refresh_started_at is None
+            assert claim_feed_refresh(feed.id) is True
+
+    def test_refresh_due_feeds_inline(self, app, sample_slideshow) -> None:
+        """Due feeds are refreshed on the calling thread without workers."""
+        with app.app_context():
+            feed, _ = _skedda_feed(sample_slideshow)
+
+            with patch(
+                "kiosk_show_replacement.ical_service.fetch_ics",
+                return_value=ICSFetchResult(REFRESH_ICS),
+            ):
+                assert refresh_due_feeds() == 1
+
+            events = ICalEvent.query.filter_by(feed_id=feed.id).all()
+            assert [e.uid for e in events] == ["refreshed-event"]
+            assert get_due_feeds() == []
+
+    def test_schedule_queues_each_feed_once(self, app, monkeypatch) -> None:
+        """A feed already queued in this process is not queued again."""
+        monkeypatch.setitem(app.config, "ICAL_REFRESH_WORKERS", 2)
+        monkeypatch.setattr(ical_service, "_queued_feeds", set())
+        submitted = []
+        monkeypatch.setattr(
+            ical_service.refresh_pool,
+            "submit",
+            lambda func, *args: submitted.append(args[1]) or True,
+        )
+
+        with app.app_context():
+            assert schedule_feed_refresh(7) is True
+            assert schedule_feed_refresh(7) is True
+
+        assert submitted == [7]
+
+    def test_calendar_read_does_not_fetch(self, app, sample_slideshow) -> None:
+        """Reading a stale calendar serves stored events without fetching."""
+        with app.app_context():
+            feed, item = _skedda_feed(
+                sample_slideshow,
+                last_fetched=datetime.now(timezone.utc) - timedelta(hours=2),
+            )
+
+            with patch("kiosk_show_replacement.ical_service.fetch_ics") as mock_fetch:
+                data = get_skedda_calendar_data(item, target_date=date(2026, 1, 28))
+
+            mock_fetch.assert_not_called()
+            assert data["events"] == []
+
+    def test_refresh_pushes_update_to_displays(self, app, sample_slideshow) -> None:
+        """A refresh sends skedda.updated to displays showing the feed."""
+        from kiosk_show_replacement.sse import sse_manager
+
+        with app.app_context():
+            feed, item = _skedda_feed(sample_slideshow)
+            display = Display(name="lobby", current_slideshow_id=sample_slideshow.id)
+            other = Display(name="hallway")
+            db.session.add_all([display, other])
+            db.session.commit()
+
+            showing = sse_manager.create_connection(None, "display")
+            showing.display_id = display.id
+            idle = sse_manager.create_connection(None, "display")
+            idle.display_id = other.id
+            try:
+                with patch(
+                    "kiosk_show_replacement.ical_service.fetch_ics",
+                    return_value=ICSFetchResult(REFRESH_ICS),
+                ):
+                    assert refresh_feed(feed) is True
+
+                assert idle.event_queue.empty()
+                event = showing.event_queue.get_nowait()
+                assert event.event_type == "skedda.updated"
+                assert event.data["feed_id"] == feed.id
+                assert event.data["slideshow_item_ids"] == [item.id]
+            finally:
+                sse_manager.remove_connection(showing.connection_id)
+                sse_manager.remove_connection(idle.connection_id)
+
+
+def _calendar_key(feed_id):
+    """Build a calendar cache key for 2026-01-28 with the default layout."""
+    return (feed_id, date(2026, 1, 28), DEFAULT_LAYOUT)
+
+
+class TestSkeddaCalendarCache:
+    """Tests for caching formatted Skedda calendars."""
+
+    def test_calendar_is_formatted_once(
+        self, app, sample_slideshow, monkeypatch
+    ) -> None:
+        """Repeated reads of an unchanged feed share one formatted calendar."""
+        formatted = MagicMock(wraps=ical_service.format_skedda_calendar)
+        monkeypatch.setattr(ical_service, "format_skedda_calendar", formatted)
+
+        with app.app_context():
+            _, item = _skedda_feed(
+                sample_slideshow, last_fetched=datetime.now(timezone.utc)
+            )
+
+            first, etag = get_skedda_calendar(item, target_date=date(2026, 1, 28))
+            second, second_etag = get_skedda_calendar(
+                item, target_date=date(2026, 1, 28)
+            )
+            get_skedda_calendar(item, target_date=date(2026, 1, 29))
+
+        assert second["events"] is first["events"]
+        assert second_etag == etag
+        assert formatted.call_count == 2
+
+    def test_refresh_replaces_cached_calendar(
+        self, app, sample_slideshow, monkeypatch
+    ) -> None:
+        """A refresh caches today's calendar and outdates the others."""
+        formatted = MagicMock(wraps=ical_service.format_skedda_calendar)
+        monkeypatch.setattr(ical_service, "format_skedda_calendar", formatted)
+
+        with app.app_context():
+            feed, item = _skedda_feed(
+                sample_slideshow,
+                last_fetched=datetime.now(timezone.utc) - timedelta(minutes=5),
+            )
+            before, etag = get_skedda_calendar(item, target_date=date(2026, 1, 28))
+            assert before["events"] == []
+
+            with patch(
+                "kiosk_show_replacement.ical_service.fetch_ics",
+                return_value=ICSFetchResult(REFRESH_ICS),
+            ):
+                assert refresh_feed(feed) is True
+            assert formatted.call_count == 2
+
+            get_skedda_calendar(item)
+            assert formatted.call_count == 2
+
+            after, after_etag = get_skedda_calendar(item, target_date=date(2026, 1, 28))
+            assert after["last_updated"] != before["last_updated"]
+            assert after_etag != etag
+            assert formatted.call_count == 3
+
+    def test_unchanged_refresh_keeps_cached_calendar(
+        self, app, sample_slideshow, monkeypatch
+    ) -> None:
+        """A refresh that changes no event keeps the calendar and its ETag."""
+        formatted = MagicMock(wraps=ical_service.format_skedda_calendar)
+        monkeypatch.setattr(ical_service, "format_skedda_calendar", formatted)
+
+        with app.app_context():
+            feed, item = _skedda_feed(
+                sample_slideshow,
+                last_fetched=datetime.now(timezone.utc) - timedelta(minutes=5),
+            )
+            with patch(
+                "kiosk_show_replacement.ical_service.fetch_ics",
+                return_value=ICSFetchResult(REFRESH_ICS, etag='"v1"'),
+            ):
+                assert refresh_feed(feed) is True
+            before, etag = get_skedda_calendar(item, target_date=date(2026, 1, 28))
+            calls = formatted.call_count
+
+            for result in (
+                ICSFetchResult(None, etag='"v1"'),
+                ICSFetchResult(REFRESH_ICS, etag='"v2"'),
+            ):
+                feed.last_fetched = datetime.now(timezone.utc) - timedelta(minutes=5)
+                db.session.commit()
+                with patch(
+                    "kiosk_show_replacement.ical_service.fetch_ics",
+                    return_value=result,
+                ):
+                    assert refresh_feed(feed) is True
+
+                after, after_etag = get_skedda_calendar(
+                    item, target_date=date(2026, 1, 28)
+                )
+                assert after_etag == etag
+                assert after["last_updated"] != before["last_updated"]
+                before = after
+
+            assert formatted.call_count == calls
+
+    def test_pruning_outdates_cached_calendar(self, app, sample_slideshow) -> None:
+        """Deleting a feed's past events changes its calendar's ETag."""
+        with app.app_context():
+            feed, item = _skedda_feed(
+                sample_slideshow, last_fetched=datetime.now(timezone.utc)
+            )
+            _add_event(feed, "old", datetime(2026, 1, 28, 15, 0))
+            db.session.commit()
+            before, etag = get_skedda_calendar(item, target_date=date(2026, 1, 28))
+            assert len(before["events"]) == 1
+
+            assert prune_ical_events(retention_days=1) == 1
+
+            after, after_etag = get_skedda_calendar(item, target_date=date(2026, 1, 28))
+            assert after["events"] == []
+            assert after_etag != etag
+
+    def test_least_recently_used_is_evicted(self) -> None:
+        """The cache keeps at most max_entries calendars."""
+        cache = SkeddaCalendarCache(max_entries=2)
+        cache.set(_calendar_key(1), "r1", {"feed": 1})
+        cache.set(_calendar_key(2), "r1", {"feed": 2})
+        assert cache.get(_calendar_key(1), "r1") is not None
+        cache.set(_calendar_key(3), "r1", {"feed": 3})
+
+        assert cache.get(_calendar_key(2), "r1") is None
+        assert cache.get(_calendar_key(1), "r1") is not None
+        assert cache.get(_calendar_key(1), "r2") is None
+
+    def test_disabled_cache_formats_every_read(self) -> None:
+        """A cache of size 0 stores nothing but still gives an ETag."""
+        cache = SkeddaCalendarCache(max_entries=0)
+        build = MagicMock(return_value={})
+
+        _, etag = cache.get_or_build(_calendar_key(1), "r1", build)
+        _, second_etag = cache.get_or_build(_calendar_key(1), "r1", build)
+
+        assert build.call_count == 2
+        assert etag == second_etag
+
+    def test_calendar_per_layout(self, app, sample_slideshow) -> None:
+        """Items showing one feed with different grids get their own calendar."""
+        with app.app_context():
+            feed, item = _skedda_feed(
+                sample_slideshow, last_fetched=datetime.now(timezone.utc)
+            )
+            hourly = SlideshowItem(
+                slideshow_id=sample_slideshow.id,
+                content_type="skedda",
+                title="Hourly",
+                ical_feed_id=feed.id,
+                ical_day_start_hour=8,
+                ical_day_end_hour=18,
+                ical_slot_minutes=60,
+            )
+            db.session.add(hourly)
+            db.session.commit()
+
+            default, etag = get_skedda_calendar(item, target_date=date(2026, 1, 28))
+            data, hourly_etag = get_skedda_calendar(
+                hourly, target_date=date(2026, 1, 28)
+            )
+
+        assert len(default["time_slots"]) == DEFAULT_LAYOUT.slot_count
+        assert data["slot_minutes"] == 60
+        assert [s["time"] for s in data["time_slots"]][:2] == ["08:00", "09:00"]
+        assert len(data["time_slots"]) == DayLayout(8, 18, 60).slot_count
+        assert hourly_etag != etag
+
+
+def _add_event(feed, uid, end, resources=("Room A",)):
+    """Store a one-hour event of a feed ending at a naive UTC time."""
+    event = ICalEvent(
+        feed_id=feed.id,
+        uid=uid,
+        summary=uid,
+        start_time=end - timedelta(hours=1),
+        end_time=end,
+    )
+    event.resources = list(resources)
+    db.session.add(event)
+    return event
+
+
+class TestPruneIcalEvents:
+    """Tests for deleting past events after the retention period."""
+
+    def test_deletes_old_events_in_batches(self, app, monkeypatch) -> None:
+        """Events ended before the cutoff go, with their resources."""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        recorded = MagicMock()
+        monkeypatch.setattr(ical_service, "record_ical_event_prune", recorded)
+
+        with app.app_context():
+            feeds = [ICalFeed(url=f"https://example.com/{i}.ics") for i in range(2)]
+            db.session.add_all(feeds)
+            db.session.commit()
+            for feed in feeds:
+                for i in range(3):
+                    _add_event(feed, f"old-{i}", now - timedelta(days=40 + i))
+                _add_event(feed, "recent", now - timedelta(days=5))
+                _add_event(feed, "upcoming", now + timedelta(days=1))
+            db.session.commit()
+
+            with _event_statements() as statements:
+                deleted = prune_ical_events(retention_days=30, batch_size=2)
+
+            assert deleted == 6
+            assert sorted(e.uid for e in ICalEvent.query.all()) == [
+                "recent",
+                "recent",
+                "upcoming",
+                "upcoming",
+            ]
+            assert ICalEventResource.query.count() == 4
+            # Two batches per feed, each deleting resources then events
+            deletes = [s for s in statements if s.startswith("DELETE FROM ical_events")]
+            assert len(deletes) == 4
+
+        recorded.assert_called_once()
+        assert recorded.call_args.args[0] == 6
+        assert recorded.call_args.args[2] is True
+
+    def test_uses_configured_retention(self, app, monkeypatch) -> None:
+        """The retention period defaults to ICAL_EVENT_RETENTION_DAYS."""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        monkeypatch.setitem(app.config, "ICAL_EVENT_RETENTION_DAYS", 3)
+
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            _add_event(feed, "old", now - timedelta(days=4))
+            _add_event(feed, "recent", now - timedelta(days=2))
+            db.session.commit()
+
+            assert prune_ical_events() == 1
+            assert [e.uid for e in ICalEvent.query.all()] == ["recent"]
+
+    def test_skips_when_another_process_is_pruning(self, app) -> None:
+        """Only the process holding the pruning lease deletes events."""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            _add_event(feed, "old", now - timedelta(days=4))
+            db.session.commit()
+            token = claim_lease(PRUNE_LEASE, 60)
+
+            assert prune_ical_events(retention_days=1) == 0
+            assert ICalEvent.query.count() == 1
+
+            release_lease(PRUNE_LEASE, token)
+            assert prune_ical_events(retention_days=1) == 1
+
+    def test_zero_retention_keeps_events(self, app, monkeypatch) -> None:
+        """A retention of 0 days turns pruning off."""
+        monkeypatch.setitem(app.config, "ICAL_EVENT_RETENTION_DAYS", 0)
+
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            _add_event(feed, "ancient", datetime(2000, 1, 1, 12, 0))
+            db.session.commit()
+
+            assert prune_ical_events() == 0
+            assert ICalEvent.query.count() == 1
+
+    def test_clears_calendar_cache(self, app, sample_slideshow) -> None:
+        """Cached calendars are dropped once events are deleted."""
+        day = (datetime.now(timezone.utc) - timedelta(days=3)).date()
+        with app.app_context():
+            feed, item = _skedda_feed(
+                sample_slideshow, last_fetched=datetime.now(timezone.utc)
+            )
+            _add_event(feed, "old", datetime(day.year, day.month, day.day, 13, 0))
+            db.session.commit()
+            data, _ = get_skedda_calendar(item, target_date=day)
+            assert len(data["events"]) == 1
+
+            assert prune_ical_events(retention_days=1) == 1
+
+            data, _ = get_skedda_calendar(item, target_date=day)
+            assert data["events"] == []
+
+    def test_cli_command(self, app, runner) -> None:
+        """The prune-ical-events command prunes with the given options."""
+        now = datetime.now(timezone.utc).replace(tzinfo=None)
+        with app.app_context():
+            feed = ICalFeed(url="https://example.com/cal.ics")
+            db.session.add(feed)
+            db.session.commit()
+            _add_event(feed, "old", now - timedelta(days=10))
+            _add_event(feed, "recent", now - timedelta(days=1))
+            db.session.commit()
+
+        result = runner.invoke(
+            args=["cli", "prune-ical-events", "--days", "7", "--batch-size", "1"]
+        )
+
+        assert result.exit_code == 0, result.output
+        assert "Pruned 1 iCal events." in result.output
+        with app.app_context():
+            assert [e.uid for e in ICalEvent.query.all()] == ["recent"]
@@ -0,0 +1,310 @@
+"""
+Tests for resized image derivatives.
+
+This module tests:
+- Generating resized variants of uploaded images
+- Choosing the best variant for a display's resolution and rotation
+- Serving variants to displays and deleting them with their blob
+"""
+
+import sys
+from io import BytesIO
+from pathlib import Path
+from types import ModuleType
+from unittest.mock import MagicMock
+
+import pytest
+from PIL import Image
+from sqlalchemy import event as sa_event
+
+from kiosk_show_replacement.image_derivatives import generate_derivatives
+from kiosk_show_replacement.media_store import purge_unreferenced_blobs
+from kiosk_show_replacement.models import (
+    Display,
+    MediaBlob,
+    MediaDerivative,
+    SlideshowItem,
+    StoredFile,
+    db,
+)
+from tests.conftest import upload_file
+
+
+@pytest.fixture(autouse=True)
+def derivative_sizes(app, isolated_storage, monkeypatch):
+    """Use small derivative sizes for each test."""
+    monkeypatch.setitem(app.config, "IMAGE_DERIVATIVE_SIZES", "320,640")
+
+
+def _image_bytes(width, height, fmt="PNG", exif=None):
+    """Create an image with a gradient so it does not compress to nothing."""
+    image = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    output = BytesIO()
+    if exif is not None:
+        image.save(output, format=fmt, exif=exif)
+    else:
+        image.save(output, format=fmt)
+    return output.getvalue()
+
+
+def _derivative(width, height):
+    """Build an unsaved derivative with the given dimensions."""
+    return MediaDerivative(
+        format="webp",
+        max_size=max(width, height),
+        width=width,
+        height=height,
+        file_path=f"media/derivatives/{width}x{height}.webp",
+        file_size=1,
+    )
+
+
+class TestGenerateDerivatives:
+    """Tests for generating derivatives on upload."""
+
+    def test_upload_generates_smaller_variants(
+        self, app, client, authenticated_user, sample_slideshow, isolated_storage
+    ):
+        """Test each configured size below the original gets a WebP variant."""
+        data = upload_file(client, sample_slideshow.id, data=_image_bytes(1000, 500))
+
+        with app.app_context():
+            blob = db.session.get(MediaBlob, data["media_blob_id"])
+            sizes = [(d.max_size, d.width, d.height) for d in blob.derivatives]
+            assert sizes == [(320, 320, 160), (640, 640, 320)]
+            for derivative in blob.derivatives:
+                path = Path(isolated_storage) / derivative.file_path
+                assert derivative.file_path.startswith("media/derivatives/")
+                with Image.open(path) as variant:
+                    assert variant.format == "WEBP"
+                    assert variant.size == (derivative.width, derivative.height)
+                assert derivative.file_size < blob.file_size
+
+        response = client.get(f"/api/v1/media/{data['media_blob_id']}")
+        derivatives = response.get_json()["data"]["derivatives"]
+        assert [d["max_size"] for d in derivatives] == [320, 640]
+
+    def test_small_image_has_no_derivatives(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test images no larger than the smallest size are not resized."""
+        data = upload_file(client, sample_slideshow.id, data=_image_bytes(300, 200))
+
+        with app.app_context():
+            assert MediaDerivative.query.count() == 0
+            assert generate_derivatives(data["media_blob_id"]) == []
+
+    def test_exif_orientation_is_applied(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test derivatives are rotated upright like the browser shows the original."""
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Rotate 90 degrees clockwise to display
+        data = upload_file(
+            client,
+            sample_slideshow.id,
+            data=_image_bytes(1000, 500, fmt="JPEG", exif=exif),
+            filename="photo.jpg",
+        )
+
+        with app.app_context():
+            blob = db.session.get(MediaBlob, data["media_blob_id"])
+            largest = blob.derivatives[-1]
+            assert (largest.width, largest.height) == (320, 640)
+
+    def test_generation_is_idempotent(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test existing derivatives are not generated again."""
+        data = upload_file(client, sample_slideshow.id, data=_image_bytes(1000, 500))
+
+        with app.app_context():
+            assert generate_derivatives(data["media_blob_id"]) == []
+            assert MediaDerivative.query.count() == 2
+
+    def test_resizing_runs_on_eventlet_threads(
+        self, app, client, authenticated_user, sample_slideshow, monkeypatch
+    ):
+        """Test resizing is handed to eventlet's thread pool when it is patched."""
+        monkeypatch.setitem(app.config, "IMAGE_DERIVATIVE_SIZES", "")
+        data = upload_file(client, sample_slideshow.id, data=_image_bytes(1000, 500))
+        monkeypatch.setitem(app.config, "IMAGE_DERIVATIVE_SIZES", "320,640")
+
+        eventlet = ModuleType("eventlet")
+        eventlet.patcher = MagicMock()
+        eventlet.patcher.is_monkey_patched.return_value = True
+        eventlet.tpool = MagicMock()
+        eventlet.tpool.execute.side_effect = lambda func, *args: func(*args)
+        monkeypatch.setitem(sys.modules, "eventlet", eventlet)
+
+        with app.app_context():
+            created = generate_derivatives(data["media_blob_id"])
+            assert [d.max_size for d in created] == [320, 640]
+
+        eventlet.patcher.is_monkey_patched.assert_called_once_with("thread")
+        eventlet.tpool.execute.assert_called_once()
+
+
+class TestBestDerivative:
+    """Tests for choosing a derivative for a display."""
+
+    @pytest.fixture
+    def blob(self):
+        """A landscape image blob with three derivatives."""
+        blob = MediaBlob(checksum="0" * 64, content_type="image")
+        blob.derivatives = [
+            _derivative(1280, 853),
+            _derivative(1920, 1280),
+            _derivative(2560, 1707),
+        ]
+        return blob
+
+    def test_smallest_variant_filling_display(self, blob):
+        """Test the smallest variant at least as large as the fitted image."""
+        assert blob.best_derivative(1280, 720).width == 1280
+        assert blob.best_derivative(1920, 1080).width == 1920
+        # A 3:2 image on a 1366x768 screen is fitted to 1152x768
+        assert blob.best_derivative(1366, 768).width == 1280
+        assert blob.best_derivative(1440, 1080).width == 1920
+
+    def test_rotated_display_uses_portrait_area(self, blob):
+        """Test a display rotated 90 degrees shows the image in a portrait area."""
+        # A 1920x1080 screen rotated to portrait fits the image 1080 wide
+        assert blob.best_derivative(1920, 1080, rotation=90).width == 1280
+        assert blob.best_derivative(1920, 1080, rotation=180).width == 1920
+
+    def test_original_when_no_variant_is_large_enough(self, blob):
+        """Test large or unknown displays use the original."""
+        assert blob.best_derivative(3840, 2160) is None
+        assert blob.best_derivative(None, None) is None
+
+
+class TestDisplaySlides:
+    """Tests for serving derivatives to displays."""
+
+    def _add_image_slide(self, client, slideshow_id, data):
+        """Create an image slide for an upload."""
+        response = client.post(
+            f"/api/v1/slideshows/{slideshow_id}/items",
+            json={
+                "title": "Photo",
+                "content_type": "image",
+                "content_file_path": data["file_path"],
+            },
+        )
+        assert response.status_code == 201
+        return response.get_json()["data"]
+
+    def test_display_gets_variant_for_its_resolution(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test display_url points at a variant only for displays it suits."""
+        data = upload_file(client, sample_slideshow.id, data=_image_bytes(1000, 500))
+        item = self._add_image_slide(client, sample_slideshow.id, data)
+        assert item["display_url"].endswith(".png")
+
+        with app.app_context():
+            small = Display(
+                name="small-kiosk",
+                resolution_width=600,
+                resolution_height=400,
+                current_slideshow_id=sample_slideshow.id,
+            )
+            unknown = Display(
+                name="new-kiosk", current_slideshow_id=sample_slideshow.id
+            )
+            db.session.add_all([small, unknown])
+            db.session.commit()
+
+        slides = client.get("/display/small-kiosk/slideshow/current").get_json()[
+            "slides"
+        ]
+        slide = next(s for s in slides if s["id"] == item["id"])
+        assert slide["display_url"].endswith("_640.webp")
+        assert slide["content_file_path"] == data["file_path"]
+
+        slides = client.get("/display/new-kiosk/slideshow/current").get_json()["slides"]
+        slide = next(s for s in slides if s["id"] == item["id"])
+        assert slide["display_url"] == item["display_url"]
+
+    def test_display_status_loads_media_in_bulk(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test the status endpoint does not query each slide's media."""
+        for width in (1000, 1001, 1002):
+            data = upload_file(
+                client, sample_slideshow.id, data=_image_bytes(width, 500)
+            )
+            self._add_image_slide(client, sample_slideshow.id, data)
+
+        with app.app_context():
+            db.session.add(
+                Display(
+                    name="status-kiosk",
+                    resolution_width=600,
+                    resolution_height=400,
+                    current_slideshow_id=sample_slideshow.id,
+                )
+            )
+            db.session.commit()
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if "FROM media_" in statement:
+                statements.append(statement)
+
+        with app.app_context():
+            sa_event.listen(db.engine, "before_cursor_execute", record)
+            try:
+                response = client.get("/display/status-kiosk/status")
+            finally:
+                sa_event.remove(db.engine, "before_cursor_execute", record)
+
+        slides = response.get_json()["slideshow"]["slides"]
+        images = [s for s in slides if s["content_file_path"]]
+        assert len(images) == 3
+        assert all(s["display_url"].endswith("_640.webp") for s in images)
+        assert len(statements) == 3
+
+    def test_derivatives_are_catalogued(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test derivatives count in storage statistics until purged."""
+        image = _image_bytes(1000, 500)
+        data = upload_file(client, sample_slideshow.id, data=image)
+
+        with app.app_context():
+            blob = db.session.get(MediaBlob, data["media_blob_id"])
+            derivatives = {d.file_path: d.file_size for d in blob.derivatives}
+        assert len(derivatives) == 2
+
+        stats = client.get("/api/v1/uploads/stats").get_json()["data"]
+        assert stats["image_files"] == 3
+        assert stats["image_size"] == len(image) + sum(derivatives.values())
+
+        with app.app_context():
+            catalogued = {f.path: f for f in StoredFile.query.all()}
+            assert set(derivatives) < set(catalogued)
+            assert all(catalogued[p].owner_id is None for p in derivatives)
+
+            purge_unreferenced_blobs(grace_hours=0)
+            assert StoredFile.query.count() == 0
+
+    def test_purge_deletes_derivative_files(
+        self, app, client, authenticated_user, sample_slideshow, isolated_storage
+    ):
+        """Test derivatives are deleted along with an unreferenced blob."""
+        data = upload_file(client, sample_slideshow.id, data=_image_bytes(1000, 500))
+
+        with app.app_context():
+            blob = db.session.get(MediaBlob, data["media_blob_id"])
+            paths = [Path(isolated_storage) / d.file_path for d in blob.derivatives]
+            assert all(path.exists() for path in paths)
+
+            result = purge_unreferenced_blobs(grace_hours=0)
+
+            assert len(result["deleted"]) == 1
+            assert not any(path.exists() for path in paths)
+            assert MediaDerivative.query.count() == 0
+            assert SlideshowItem.query.filter_by(media_blob_id=blob.id).count() == 0
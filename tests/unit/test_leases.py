@@ -0,0 +1,73 @@
+"""
+Tests for cross-process job leases.
+
+This module tests:
+- Claiming a lease once until it expires or is released
+- Renewing a claim and losing it to a takeover
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import update
+
+from kiosk_show_replacement.leases import claim_lease, release_lease, renew_lease
+from kiosk_show_replacement.models import JobLease, db
+
+
+def _expire(name):
+    """Make a lease's current claim expire."""
+    db.session.execute(
+        update(JobLease)
+        .where(JobLease.name == name)
+        .values(
+            expires_at=datetime.now(timezone.utc).replace(tzinfo=None)
+            - timedelta(seconds=1)
+        )
+    )
+    db.session.commit()
+
+
+class TestClaimLease:
+    """Tests for claiming leases."""
+
+    def test_lease_is_claimed_once(self, app):
+        """Test a valid claim excludes other claims of the same lease."""
+        with app.app_context():
+            token = claim_lease("job", 60)
+
+            assert token is not None
+            assert claim_lease("job", 60) is None
+            assert claim_lease("other-job", 60) is not None
+            assert db.session.get(JobLease, "job").holder == token
+
+    def test_expired_lease_is_taken_over(self, app):
+        """Test a claim not renewed in time is taken over."""
+        with app.app_context():
+            first = claim_lease("job", 60)
+            _expire("job")
+
+            second = claim_lease("job", 60)
+
+            assert second not in (None, first)
+            assert renew_lease("job", first, 60) is False
+            assert renew_lease("job", second, 60) is True
+
+    def test_released_lease_can_be_claimed(self, app):
+        """Test releasing a claim lets the job run again at once."""
+        with app.app_context():
+            token = claim_lease("job", 60)
+            release_lease("job", token)
+
+            assert claim_lease("job", 60) is not None
+
+    def test_release_of_lost_claim_is_ignored(self, app):
+        """Test releasing a claim taken over leaves the new holder's claim."""
+        with app.app_context():
+            first = claim_lease("job", 60)
+            _expire("job")
+            second = claim_lease("job", 60)
+
+            release_lease("job", first)
+
+            assert claim_lease("job", 60) is None
+            assert renew_lease("job", second, 60) is True
@@ -5,20 +5,27 @@ This module tests:
 - JSON formatter
 - Standard formatter
 - Correlation ID filter
+- Asynchronous batched log handler
 - Request/response logging
+- Slow request and slow query logging
 """
 
+import io
 import json
 import logging
+import threading
 from unittest.mock import patch
 
 from flask import g
 
 from kiosk_show_replacement.logging_config import (
+    AsyncBatchingHandler,
     CorrelationIdFilter,
     JsonFormatter,
+    RequestProfile,
     StandardFormatter,
     configure_logging,
+    get_parameter_shape,
 )
 
 
@@ -248,6 +255,154 @@ class TestConfigureLogging:
             filter_types = [type(f) for f in handler.filters]
             assert CorrelationIdFilter in filter_types
 
+    def test_uses_async_handler_by_default(self, app):
+        """Test the app logger writes through the async batching handler."""
+        with app.app_context():
+            configure_logging(app, json_format=True)
+
+            assert isinstance(app.logger.handlers[0], AsyncBatchingHandler)
+
+    def test_sync_handler_when_async_disabled(self, app, monkeypatch):
+        """Test LOG_ASYNC=False falls back to a synchronous stream handler."""
+        monkeypatch.setitem(app.config, "LOG_ASYNC", False)
+        with app.app_context():
+            configure_logging(app, json_format=True)
+            handler = app.logger.handlers[0]
+            assert not isinstance(handler, AsyncBatchingHandler)
+            assert isinstance(handler, logging.StreamHandler)
+
+        monkeypatch.setitem(app.config, "LOG_ASYNC", True)
+        with app.app_context():
+            configure_logging(app, json_format=True)
+
+    def test_reconfigure_closes_previous_async_handler(self, app):
+        """Test reconfiguring logging stops the previous writer thread."""
+        with app.app_context():
+            configure_logging(app, json_format=True)
+            old_handler = app.logger.handlers[0]
+            configure_logging(app, json_format=True)
+
+            assert old_handler._closed is True
+            assert app.logger.handlers[0] is not old_handler
+
+
+def _make_record(msg, *args):
+    """Build a log record for handler tests."""
+    return logging.LogRecord(
+        name="test",
+        level=logging.INFO,
+        pathname="test.py",
+        lineno=1,
+        msg=msg,
+        args=args,
+        exc_info=None,
+    )
+
+
+class TestAsyncBatchingHandler:
+    """Tests for the AsyncBatchingHandler class."""
+
+    def test_writes_formatted_records(self):
+        """Test queued records are formatted and written on flush."""
+        stream = io.StringIO()
+        handler = AsyncBatchingHandler(stream, flush_interval=0.05)
+        handler.setFormatter(JsonFormatter())
+        try:
+            handler.handle(_make_record("hello %s", "world"))
+            handler.handle(_make_record("second"))
+            handler.flush()
+
+            lines = stream.getvalue().splitlines()
+            assert [json.loads(line)["message"] for line in lines] == [
+                "hello world",
+                "second",
+            ]
+            assert handler.get_stats()["written"] == 2
+        finally:
+            handler.close()
+
+    def test_formats_off_calling_thread(self):
+        """Test formatting happens on the writer thread, not the caller."""
+        stream = io.StringIO()
+        handler = AsyncBatchingHandler(stream, flush_interval=0.05)
+        format_threads = []
+
+        class RecordingFormatter(logging.Formatter):
+            def format(self, record):
+                format_threads.append(threading.current_thread())
+                return super().format(record)
+
+        handler.setFormatter(RecordingFormatter())
+        try:
+            handler.handle(_make_record("message"))
+            handler.flush()
+
+            assert format_threads
+            assert threading.current_thread() not in format_threads
+        finally:
+            handler.close()
+
+    def test_message_args_merged_at_emit(self):
+        """Test message arguments are captured when the record is logged."""
+        handler = AsyncBatchingHandler(io.StringIO(), flush_interval=0.05)
+        try:
+            record = _make_record("value=%s", [1])
+            prepared = handler.prepare(record)
+
+            assert prepared.msg == "value=[1]"
+            assert prepared.args is None
+        finally:
+            handler.close()
+
+    def test_batches_multiple_records(self):
+        """Test records queued together are written as a single batch."""
+        stream = io.StringIO()
+        handler = AsyncBatchingHandler(stream, batch_size=50, flush_interval=0.05)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        try:
+            # Hold the stats lock so the writer cannot finish a batch while
+            # we queue records
+            with handler._stats_lock:
+                for i in range(10):
+                    handler.handle(_make_record(f"record {i}"))
+            handler.flush()
+
+            stats = handler.get_stats()
+            assert stats["written"] == 10
+            assert stats["batches"] < 10
+        finally:
+            handler.close()
+
+    def test_drops_records_when_queue_full(self):
+        """Test records are dropped and counted when the queue is full."""
+        handler = AsyncBatchingHandler(io.StringIO(), queue_size=2)
+        try:
+            # Stop the writer thread so nothing drains the queue
+            handler._closed = True
+            handler._queue.put_nowait(threading.Event())
+            handler._thread.join(2)
+            handler._closed = False
+
+            with patch.object(handler, "_ensure_thread"):
+                for i in range(5):
+                    handler.handle(_make_record(f"record {i}"))
+
+            assert handler.get_stats()["dropped"] == 3
+            assert handler.get_stats()["queued"] == 2
+        finally:
+            handler.close()
+
+    def test_close_drains_queue(self):
+        """Test closing the handler writes any pending records."""
+        stream = io.StringIO()
+        handler = AsyncBatchingHandler(stream, flush_interval=0.05)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        handler.handle(_make_record("pending"))
+        handler.close()
+
+        assert "pending" in stream.getvalue()
+        assert not handler._thread.is_alive()
+
 
 class TestRequestLogging:
     """Tests for request/response logging."""
@@ -271,3 +426,145 @@ class TestRequestLogging:
             # Check that logging was called with duration info
             # The actual logging happens, we just verify the endpoint works
             assert True  # If we got here, no exceptions occurred
+
+
+class TestGetParameterShape:
+    """Tests for the get_parameter_shape helper."""
+
+    def test_dict_parameters_report_names_and_types(self):
+        """Test dict parameters are described without their values."""
+        shape = get_parameter_shape({"username": "secret", "id": 5})
+        assert shape == {"username": "str", "id": "int"}
+
+    def test_positional_parameters_report_types(self):
+        """Test positional parameters are described by type."""
+        assert get_parameter_shape(("a", 1, None)) == ["str", "int", "NoneType"]
+
+    def test_executemany_reports_row_count(self):
+        """Test executemany parameters report row count and first row shape."""
+        shape = get_parameter_shape([{"a": 1}, {"a": 2}], executemany=True)
+        assert shape == {"rows": 2, "row": {"a": "int"}}
+
+
+class TestRequestProfile:
+    """Tests for the RequestProfile class."""
+
+    def test_records_statement_totals(self):
+        """Test statement count and database time accumulate."""
+        profile = RequestProfile()
+        profile.record_statement(0.01, "SELECT 1", [])
+        profile.record_statement(0.02, "SELECT 2", [])
+
+        assert profile.statement_count == 2
+        assert abs(profile.db_time - 0.03) < 1e-9
+
+    def test_keeps_only_top_n_slowest(self):
+        """Test only the N slowest statements are retained, slowest first."""
+        profile = RequestProfile(top_n=2)
+        profile.record_statement(0.01, "SELECT fast", [])
+        profile.record_statement(0.05, "SELECT slowest", [])
+        profile.record_statement(0.03, "SELECT slow", [])
+
+        slowest = profile.slowest_statements()
+        assert [s["statement"] for s in slowest] == ["SELECT slowest", "SELECT slow"]
+        assert slowest[0]["duration_ms"] == 50.0
+
+    def test_zero_top_n_keeps_no_statements(self):
+        """Test a top N of 0 still counts statements but keeps none."""
+        profile = RequestProfile(top_n=0)
+        profile.record_statement(0.01, "SELECT 1", [])
+        profile.record_statement(0.02, "SELECT 2", [])
+
+        assert profile.statement_count == 2
+        assert profile.slowest_statements() == []
+
+    def test_normalizes_statement_whitespace(self):
+        """Test multi-line statements are collapsed to a single line."""
+        profile = RequestProfile()
+        profile.record_statement(0.01, "SELECT *\n  FROM users\n", [])
+        assert profile.slowest_statements()[0]["statement"] == "SELECT * FROM users"
+
+
+class TestSlowRequestLogging:
+    """Tests for slow request and slow query logging."""
+
+    def _slow_records(self, mock_warning, event):
+        """Return mocked warning calls whose extra event matches."""
+        return [
+            call
+            for call in mock_warning.call_args_list
+            if call.kwargs.get("extra", {}).get("event") == event
+        ]
+
+    def test_logs_slow_request_with_breakdown(self, app, client, monkeypatch):
+        """Test requests over the threshold log a structured record."""
+        monkeypatch.setitem(app.config, "SLOW_REQUEST_THRESHOLD_MS", 0.0001)
+
+        with patch.object(app.logger, "warning") as mock_warning:
+            response = client.get("/health/db")
+            assert response.status_code in (200, 503)
+
+        records = self._slow_records(mock_warning, "slow_request")
+        assert len(records) == 1
+        extra = records[0].kwargs["extra"]
+        assert extra["path"] == "/health/db"
+        assert extra["route"] == "/health/db"
+        assert extra["sql_statement_count"] >= 1
+        assert set(extra["breakdown_ms"]) == {
+            "db",
+            "template",
+            "serialization",
+            "other",
+        }
+        assert extra["slowest_statements"]
+        json.dumps(extra)  # Record must be JSON-serializable
+
+    def test_fast_request_not_logged(self, app, client, monkeypatch):
+        """Test requests under the threshold are not logged as slow."""
+        monkeypatch.setitem(app.config, "SLOW_REQUEST_THRESHOLD_MS", 60000)
+
+        with patch.object(app.logger, "warning") as mock_warning:
+            client.get("/health/live")
+
+        assert self._slow_records(mock_warning, "slow_request") == []
+
+    def test_zero_threshold_disables_logging(self, app, client, monkeypatch):
+        """Test a zero threshold disables slow request logging."""
+        monkeypatch.setitem(app.config, "SLOW_REQUEST_THRESHOLD_MS", 0)
+
+        with patch.object(app.logger, "warning") as mock_warning:
+            client.get("/health/live")
+
+        assert self._slow_records(mock_warning, "slow_request") == []
+
+    def test_logs_slow_query(self, app, client, monkeypatch):
+        """Test SQL statements over the threshold log a slow query record."""
+        monkeypatch.setitem(app.config, "SLOW_QUERY_THRESHOLD_MS", 0.0001)
+
+        with patch.object(app.logger, "warning") as mock_warning:
+            client.get("/health/db")
+
+        records = self._slow_records(mock_warning, "slow_query")
+        assert records
+        extra = records[0].kwargs["extra"]
+        assert extra["path"] == "/health/db"
+        assert "SELECT" in extra["statement"].upper()
+
+
+class TestFailedStatementTiming:
+    """Tests for timing statements that raise."""
+
+    def test_failed_statement_start_time_discarded(self, app):
+        """Test a failed statement leaves no start time behind."""
+        from sqlalchemy import text
+        from sqlalchemy.exc import OperationalError
+
+        from kiosk_show_replacement.app import db
+
+        with app.app_context():
+            with db.engine.connect() as conn:
+                try:
+                    conn.execute(text("SELECT * FROM no_such_table"))
+                except OperationalError:
+                    pass
+                assert conn.info.get("query_start_times") == []
@@ -0,0 +1,224 @@
+"""
+Tests for background media probing.
+
+This module tests:
+- The bounded media probe worker pool
+- Probing uploaded videos inline and in the background
+- Probe results recorded on media blobs and pushed over SSE
+- Rejection of videos with unsupported codecs
+"""
+
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from kiosk_show_replacement.media_probe import (
+    MediaProbePool,
+    probe_pool,
+    run_blob_probe,
+)
+from kiosk_show_replacement.models import MediaBlob, db
+from kiosk_show_replacement.sse import sse_manager
+from kiosk_show_replacement.storage import StorageManager
+from tests.conftest import post_upload
+
+H264_PROBE = {
+    "video_codec": "h264",
+    "audio_codec": "aac",
+    "container_format": "mov,mp4,m4a,3gp,3g2,mj2",
+    "duration": 12.4,
+}
+
+
+pytestmark = pytest.mark.usefixtures("isolated_storage")
+
+
+@pytest.fixture
+def background_probes(app, monkeypatch):
+    """Run probes on a background worker for the duration of a test."""
+    monkeypatch.setitem(app.config, "MEDIA_PROBE_WORKERS", 1)
+    probe_pool.configure(max_workers=1, max_queue=5)
+    yield probe_pool
+    probe_pool.shutdown(wait=True)
+    probe_pool.configure(max_workers=0, max_queue=5)
+
+
+def _wait_for_pool(pool, timeout=5.0):
+    """Wait until the pool has no running or queued jobs."""
+    deadline = time.monotonic() + timeout
+    while pool.pending and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert pool.pending == 0
+
+
+class TestMediaProbePool:
+    """Tests for the MediaProbePool class."""
+
+    def test_disabled_pool_refuses_jobs(self):
+        """Test a pool with no workers asks callers to run jobs inline."""
+        pool = MediaProbePool(max_workers=0)
+        assert pool.submit(lambda: None) is False
+
+    def test_queue_is_bounded(self):
+        """Test jobs beyond the workers plus queue size are refused."""
+        pool = MediaProbePool(max_workers=1, max_queue=1)
+        release = threading.Event()
+        try:
+            assert pool.submit(release.wait) is True
+            assert pool.submit(release.wait) is True
+            assert pool.submit(release.wait) is False
+            assert pool.pending == 2
+        finally:
+            release.set()
+            pool.shutdown(wait=True)
+        assert pool.pending == 0
+
+
+class TestUploadProbing:
+    """Tests for probing uploaded videos."""
+
+    @patch.object(StorageManager, "probe_video", return_value=H264_PROBE)
+    def test_inline_probe_returns_results(
+        self, mock_probe, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test a disabled pool probes once during the upload."""
+        response = post_upload(client, sample_slideshow.id, "video")
+
+        assert response.status_code == 201
+        data = response.get_json()["data"]
+        assert data["probe_status"] == "ready"
+        assert data["codec_info"]["video_codec"] == "h264"
+        assert data["duration_seconds"] == 12
+        assert mock_probe.call_count == 1
+
+    @patch.object(StorageManager, "probe_video", return_value=H264_PROBE)
+    def test_background_probe_pushes_sse_event(
+        self,
+        mock_probe,
+        app,
+        client,
+        authenticated_user,
+        sample_slideshow,
+        background_probes,
+    ):
+        """Test the upload returns pending and results arrive over SSE."""
+        connection = sse_manager.create_connection(
+            user_id=authenticated_user.id, connection_type="admin"
+        )
+        try:
+            response = post_upload(client, sample_slideshow.id, "video")
+            assert response.status_code == 201
+            data = response.get_json()["data"]
+            assert data["probe_status"] == "pending"
+
+            _wait_for_pool(background_probes)
+
+            event = connection.event_queue.get(timeout=1)
+            assert event.event_type == "media.probed"
+            assert event.data["media_blob_id"] == data["media_blob_id"]
+            assert event.data["probe_status"] == "ready"
+            assert event.data["duration"] == 12.4
+        finally:
+            sse_manager.remove_connection(connection.connection_id)
+
+        response = client.get(f"/api/v1/media/{data['media_blob_id']}")
+        assert response.status_code == 200
+        assert response.get_json()["data"]["codec_info"]["video_codec"] == "h264"
+
+    @patch.object(StorageManager, "probe_video", return_value=H264_PROBE)
+    def test_duplicate_upload_is_not_reprobed(
+        self, mock_probe, client, authenticated_user, sample_slideshow
+    ):
+        """Test re-uploading a probed video reuses its stored results."""
+        post_upload(client, sample_slideshow.id, "video")
+        response = post_upload(client, sample_slideshow.id, "video")
+
+        data = response.get_json()["data"]
+        assert data["deduplicated"] is True
+        assert data["probe_status"] == "ready"
+        assert data["duration_seconds"] == 12
+        assert mock_probe.call_count == 1
+
+    @patch.object(
+        StorageManager,
+        "probe_video",
+        return_value={
+            "video_codec": "mpeg1video",
+            "audio_codec": "mp2",
+            "container_format": "mpeg",
+            "duration": 5.0,
+        },
+    )
+    def test_unsupported_codec_is_rejected(
+        self,
+        mock_probe,
+        app,
+        client,
+        authenticated_user,
+        sample_slideshow,
+        background_probes,
+        isolated_storage,
+    ):
+        """Test a rejected video is deleted and cannot be used by items."""
+        response = post_upload(client, sample_slideshow.id, "video")
+        data = response.get_json()["data"]
+        _wait_for_pool(background_probes)
+
+        with app.app_context():
+            blob = db.session.get(MediaBlob, data["media_blob_id"])
+            assert blob.probe_status == "rejected"
+            assert "mpeg1video" in blob.probe_error
+        assert not (Path(isolated_storage) / data["file_path"]).exists()
+
+        response = client.post(
+            f"/api/v1/slideshows/{sample_slideshow.id}/items",
+            json={
+                "title": "Rejected",
+                "content_type": "video",
+                "content_file_path": data["file_path"],
+            },
+        )
+        assert response.status_code == 400
+        assert "mpeg1video" in response.get_json()["error"]
+
+    def test_rejected_video_used_by_an_item_keeps_its_file(
+        self, app, client, authenticated_user, sample_slideshow, isolated_storage
+    ):
+        """Test an item attached while probing keeps the video it points at."""
+        with patch.object(StorageManager, "probe_video", return_value=H264_PROBE):
+            data = post_upload(client, sample_slideshow.id, "video").get_json()["data"]
+        with app.app_context():
+            # Attach an item as if it was saved while the probe was pending
+            blob = db.session.get(MediaBlob, data["media_blob_id"])
+            blob.probe_status = "pending"
+            db.session.commit()
+        response = client.post(
+            f"/api/v1/slideshows/{sample_slideshow.id}/items",
+            json={
+                "title": "Pending",
+                "content_type": "video",
+                "content_file_path": data["file_path"],
+            },
+        )
+        assert response.status_code == 201
+
+        with (
+            patch.object(
+                StorageManager,
+                "probe_video",
+                return_value={**H264_PROBE, "video_codec": "mpeg1video"},
+            ),
+            app.app_context(),
+        ):
+            blob = run_blob_probe(data["media_blob_id"], "clip.mp4")
+            assert blob.probe_status == "rejected"
+            assert blob.ref_count == 1
+        assert (Path(isolated_storage) / data["file_path"]).exists()
+
+    def test_media_endpoint_not_found(self, client, authenticated_user):
+        """Test requesting an unknown media blob returns 404."""
+        response = client.get("/api/v1/media/999999")
+        assert response.status_code == 404
@@ -0,0 +1,158 @@
+"""
+Tests for serving uploaded media.
+
+This module tests:
+- Caching headers for content-addressed and other uploads
+- Conditional requests and byte ranges
+- Offloading files to a fronting web server
+"""
+
+import pytest
+
+CHECKSUM = "ab" * 32
+MEDIA_PATH = f"media/videos/ab/{CHECKSUM}.mp4"
+LEGACY_PATH = "videos/1/2/clip.mp4"
+CONTENT = bytes(range(256)) * 4
+
+
+@pytest.fixture(autouse=True)
+def upload_folder(app, tmp_path, monkeypatch):
+    """Use an upload folder holding a content-addressed and a legacy file."""
+    folder = tmp_path / "uploads"
+    for path in (MEDIA_PATH, LEGACY_PATH):
+        file_path = folder / path
+        file_path.parent.mkdir(parents=True)
+        file_path.write_bytes(CONTENT)
+    monkeypatch.setitem(app.config, "UPLOAD_FOLDER", str(folder))
+    monkeypatch.setitem(app.config, "MEDIA_ACCEL_REDIRECT_PREFIX", "")
+    monkeypatch.setitem(app.config, "USE_X_SENDFILE", False)
+    return folder
+
+
+class TestCacheHeaders:
+    """Tests for caching headers on whole-file responses."""
+
+    def test_content_addressed_file_is_immutable(self, client):
+        """Test media blobs get a long max-age, immutable and a strong ETag."""
+        response = client.get(f"/uploads/{MEDIA_PATH}")
+
+        assert response.status_code == 200
+        assert response.data == CONTENT
+        assert response.cache_control.public
+        assert response.cache_control.max_age == 31536000
+        assert response.cache_control.immutable
+        assert response.get_etag() == (CHECKSUM, False)
+        assert response.accept_ranges == "bytes"
+
+    def test_legacy_upload_is_revalidated(self, client):
+        """Test other uploads get the shorter max-age and are not immutable."""
+        response = client.get(f"/uploads/{LEGACY_PATH}")
+
+        assert response.status_code == 200
+        assert response.cache_control.max_age == 3600
+        assert not response.cache_control.immutable
+        assert response.get_etag()[0] is not None
+
+    def test_if_none_match_returns_not_modified(self, client):
+        """Test a matching If-None-Match gets 304 with no body."""
+        response = client.get(
+            f"/uploads/{MEDIA_PATH}", headers={"If-None-Match": f'"{CHECKSUM}"'}
+        )
+
+        assert response.status_code == 304
+        assert response.data == b""
+        assert response.cache_control.immutable
+
+
+class TestRanges:
+    """Tests for byte range requests."""
+
+    @pytest.mark.parametrize(
+        "header,start,stop",
+        [
+            ("bytes=10-19", 10, 20),
+            ("bytes=1000-", 1000, 1024),
+            ("bytes=-24", 1000, 1024),
+        ],
+    )
+    def test_single_range(self, client, header, start, stop):
+        """Test a single range returns 206 with only the requested bytes."""
+        response = client.get(f"/uploads/{MEDIA_PATH}", headers={"Range": header})
+
+        assert response.status_code == 206
+        assert response.data == CONTENT[start:stop]
+        assert response.headers["Content-Range"] == (
+            f"bytes {start}-{stop - 1}/{len(CONTENT)}"
+        )
+        assert response.content_length == stop - start
+        assert response.cache_control.immutable
+
+    def test_legacy_upload_range(self, client):
+        """Test ranges of uploads that are not content-addressed."""
+        response = client.get(f"/uploads/{LEGACY_PATH}", headers={"Range": "bytes=0-3"})
+
+        assert response.status_code == 206
+        assert response.data == CONTENT[:4]
+
+    def test_unsatisfiable_range(self, client):
+        """Test a range past the end of the file returns 416."""
+        response = client.get(
+            f"/uploads/{MEDIA_PATH}", headers={"Range": "bytes=5000-6000"}
+        )
+
+        assert response.status_code == 416
+        assert response.headers["Content-Range"] == f"bytes */{len(CONTENT)}"
+
+    def test_if_range_mismatch_sends_whole_file(self, client):
+        """Test a stale If-Range validator gets the whole file."""
+        response = client.get(
+            f"/uploads/{MEDIA_PATH}",
+            headers={"Range": "bytes=10-19", "If-Range": '"stale"'},
+        )
+
+        assert response.status_code == 200
+        assert response.data == CONTENT
+
+    def test_if_range_match_sends_range(self, client):
+        """Test a current If-Range validator gets the range."""
+        response = client.get(
+            f"/uploads/{MEDIA_PATH}",
+            headers={"Range": "bytes=10-19", "If-Range": f'"{CHECKSUM}"'},
+        )
+
+        assert response.status_code == 206
+        assert response.data == CONTENT[10:20]
+
+
+class TestOffload:
+    """Tests for handing files to a fronting web server."""
+
+    def test_accel_redirect(self, app, client, monkeypatch):
+        """Test X-Accel-Redirect names the internal location and has no body."""
+        monkeypatch.setitem(app.config, "MEDIA_ACCEL_REDIRECT_PREFIX", "/protected/")
+
+        response = client.get(
+            f"/uploads/{MEDIA_PATH}", headers={"Range": "bytes=10-19"}
+        )
+
+        assert response.status_code == 200
+        assert response.headers["X-Accel-Redirect"] == f"/protected/{MEDIA_PATH}"
+        assert response.data == b""
+        assert response.mimetype == "video/mp4"
+        assert response.cache_control.immutable
+
+    def test_x_sendfile(self, app, client, upload_folder, monkeypatch):
+        """Test X-Sendfile names the absolute file path."""
+        monkeypatch.setitem(app.config, "USE_X_SENDFILE", True)
+
+        response = client.get(f"/uploads/{LEGACY_PATH}")
+
+        assert response.headers["X-Sendfile"] == str(upload_folder / LEGACY_PATH)
+        assert response.data == b""
+
+    def test_missing_file_not_offloaded(self, app, client, monkeypatch):
+        """Test missing files and paths outside the upload folder are 404."""
+        monkeypatch.setitem(app.config, "MEDIA_ACCEL_REDIRECT_PREFIX", "/protected")
+
+        assert client.get("/uploads/media/videos/ab/missing.mp4").status_code == 404
+        assert client.get("/uploads/..%2F..%2Fetc%2Fpasswd").status_code == 404
@@ -0,0 +1,299 @@
+"""
+Tests for the content-addressed media store.
+
+This module tests:
+- Deduplication of identical uploads
+- Reference counting as slideshow items are created and changed
+- Refcount-driven cleanup of unreferenced media
+"""
+
+import hashlib
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+
+from kiosk_show_replacement import media_store
+from kiosk_show_replacement.leases import claim_lease, release_lease
+from kiosk_show_replacement.media_store import (
+    PURGE_LEASE,
+    attach_item_media,
+    purge_expired_blobs,
+    purge_unreferenced_blobs,
+    recount_references,
+)
+from kiosk_show_replacement.models import MediaBlob, Slideshow, SlideshowItem, db
+from kiosk_show_replacement.storage import get_storage_manager
+from kiosk_show_replacement.validation import StorageIntegrityChecker
+from tests.conftest import PNG_DATA, upload_file
+
+pytestmark = pytest.mark.usefixtures("isolated_storage")
+
+
+def _create_item(client, slideshow_id, file_path):
+    """Create an image item for an uploaded file and return its ID."""
+    response = client.post(
+        f"/api/v1/slideshows/{slideshow_id}/items",
+        json={
+            "title": "Uploaded",
+            "content_type": "image",
+            "content_file_path": file_path,
+        },
+    )
+    assert response.status_code == 201
+    return response.get_json()["data"]["id"]
+
+
+def _age_blob(blob_id, hours=48):
+    """Make a blob look like it has been unreferenced for a while."""
+    blob = db.session.get(MediaBlob, blob_id)
+    blob.updated_at = datetime.now(timezone.utc) - timedelta(hours=hours)
+    db.session.commit()
+
+
+@pytest.fixture
+def second_slideshow(app, authenticated_user):
+    """Create a second slideshow for deduplication tests."""
+    with app.app_context():
+        slideshow = Slideshow(
+            name="Second Slideshow",
+            owner_id=authenticated_user.id,
+            created_by_id=authenticated_user.id,
+        )
+        db.session.add(slideshow)
+        db.session.commit()
+        yield slideshow
+
+
+class TestDeduplication:
+    """Tests for storing identical uploads once."""
+
+    def test_identical_uploads_share_one_blob(
+        self, app, client, authenticated_user, sample_slideshow, second_slideshow
+    ):
+        """Test the same file uploaded twice is stored once."""
+        first = upload_file(client, sample_slideshow.id)
+        second = upload_file(client, second_slideshow.id, filename="copy.png")
+
+        checksum = hashlib.sha256(PNG_DATA).hexdigest()
+        assert first["checksum"] == checksum
+        assert first["deduplicated"] is False
+        assert second["deduplicated"] is True
+        assert second["file_path"] == first["file_path"]
+        assert second["media_blob_id"] == first["media_blob_id"]
+        assert second["original_filename"] == "copy.png"
+        assert first["file_path"].startswith(f"media/images/{checksum[:2]}/")
+
+        with app.app_context():
+            assert MediaBlob.query.count() == 1
+            blob_dir = Path(app.config["UPLOAD_FOLDER"]) / first["file_path"]
+            assert len(list(blob_dir.parent.iterdir())) == 1
+
+    def test_missing_blob_file_is_restored(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test a blob whose file was lost is re-stored by the next upload."""
+        first = upload_file(client, sample_slideshow.id)
+        (Path(app.config["UPLOAD_FOLDER"]) / first["file_path"]).unlink()
+
+        second = upload_file(client, sample_slideshow.id)
+
+        assert second["deduplicated"] is False
+        assert second["media_blob_id"] == first["media_blob_id"]
+        assert (Path(app.config["UPLOAD_FOLDER"]) / second["file_path"]).exists()
+
+    def test_reused_unreferenced_blob_restarts_grace_period(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test re-uploading an aged orphan keeps it from being purged."""
+        first = upload_file(client, sample_slideshow.id)
+        with app.app_context():
+            _age_blob(first["media_blob_id"])
+
+        second = upload_file(client, sample_slideshow.id)
+
+        assert second["deduplicated"] is True
+        with app.app_context():
+            assert purge_unreferenced_blobs()["deleted"] == []
+        assert (Path(app.config["UPLOAD_FOLDER"]) / second["file_path"]).exists()
+
+
+class TestReferenceCounting:
+    """Tests for blob reference counts."""
+
+    def test_items_reference_blobs(
+        self, app, client, authenticated_user, sample_slideshow, second_slideshow
+    ):
+        """Test creating items increments the blob reference count."""
+        info = upload_file(client, sample_slideshow.id)
+        _create_item(client, sample_slideshow.id, info["file_path"])
+        _create_item(client, second_slideshow.id, info["file_path"])
+
+        with app.app_context():
+            blob = db.session.get(MediaBlob, info["media_blob_id"])
+            assert blob.ref_count == 2
+            assert {item.slideshow_id for item in blob.items} == {
+                sample_slideshow.id,
+                second_slideshow.id,
+            }
+
+    def test_changing_item_content_releases_reference(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test switching an item away from a file releases its reference."""
+        info = upload_file(client, sample_slideshow.id)
+        item_id = _create_item(client, sample_slideshow.id, info["file_path"])
+
+        response = client.put(
+            f"/api/v1/slideshow-items/{item_id}",
+            json={"content_type": "text", "content_text": "Hello"},
+        )
+
+        assert response.status_code == 200
+        with app.app_context():
+            assert db.session.get(MediaBlob, info["media_blob_id"]).ref_count == 0
+            assert db.session.get(SlideshowItem, item_id).media_blob_id is None
+
+    def test_attach_accepts_uploads_prefixed_paths(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test /uploads/-prefixed file paths resolve to the blob."""
+        info = upload_file(client, sample_slideshow.id)
+
+        with app.app_context():
+            item = SlideshowItem(
+                slideshow_id=sample_slideshow.id,
+                content_type="image",
+                content_file_path=f"/uploads/{info['file_path']}",
+            )
+            db.session.add(item)
+            attach_item_media(item)
+            db.session.commit()
+
+            assert item.media_blob_id == info["media_blob_id"]
+
+    def test_recount_references(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test reference counts can be rebuilt from slideshow items."""
+        info = upload_file(client, sample_slideshow.id)
+        _create_item(client, sample_slideshow.id, info["file_path"])
+
+        with app.app_context():
+            blob = db.session.get(MediaBlob, info["media_blob_id"])
+            blob.ref_count = 7
+            db.session.commit()
+
+            assert recount_references() == 1
+            assert db.session.get(MediaBlob, info["media_blob_id"]).ref_count == 1
+
+
+class TestCleanup:
+    """Tests for refcount-driven cleanup."""
+
+    def test_purge_respects_grace_period(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test fresh unreferenced uploads are kept until the grace period ends."""
+        info = upload_file(client, sample_slideshow.id)
+        blob_path = Path(app.config["UPLOAD_FOLDER"]) / info["file_path"]
+
+        with app.app_context():
+            assert purge_unreferenced_blobs()["deleted"] == []
+            assert blob_path.exists()
+
+            _age_blob(info["media_blob_id"])
+            result = purge_unreferenced_blobs()
+
+            assert [b["id"] for b in result["deleted"]] == [info["media_blob_id"]]
+            assert not blob_path.exists()
+            assert MediaBlob.query.count() == 0
+
+    def test_cleanup_slideshow_keeps_shared_media(
+        self, app, client, authenticated_user, sample_slideshow, second_slideshow
+    ):
+        """Test slideshow cleanup deletes media only when nothing else uses it."""
+        shared = upload_file(client, sample_slideshow.id)
+        own = upload_file(client, sample_slideshow.id, data=PNG_DATA + b"x")
+        _create_item(client, sample_slideshow.id, shared["file_path"])
+        _create_item(client, sample_slideshow.id, own["file_path"])
+        _create_item(client, second_slideshow.id, shared["file_path"])
+        upload_folder = Path(app.config["UPLOAD_FOLDER"])
+
+        with app.app_context():
+            deleted, errors = get_storage_manager().cleanup_slideshow_files(
+                sample_slideshow.id
+            )
+
+            assert errors == []
+            assert deleted == 0
+            assert db.session.get(MediaBlob, own["media_blob_id"]).ref_count == 0
+            assert db.session.get(MediaBlob, shared["media_blob_id"]).ref_count == 1
+
+            _age_blob(own["media_blob_id"])
+            assert purge_expired_blobs() == 1
+
+            assert not (upload_folder / own["file_path"]).exists()
+            assert (upload_folder / shared["file_path"]).exists()
+
+    def test_purge_keeps_blob_reused_after_listing(
+        self, app, client, authenticated_user, sample_slideshow, monkeypatch
+    ):
+        """Test a blob referenced after the purge listed it keeps its file."""
+        info = upload_file(client, sample_slideshow.id)
+        blob_path = Path(app.config["UPLOAD_FOLDER"]) / info["file_path"]
+
+        with app.app_context():
+            _age_blob(info["media_blob_id"])
+            listed = media_store.find_unreferenced_blobs()
+
+            def find_then_reference(**kwargs):
+                _create_item(client, sample_slideshow.id, info["file_path"])
+                return listed
+
+            monkeypatch.setattr(
+                media_store, "find_unreferenced_blobs", find_then_reference
+            )
+            result = purge_unreferenced_blobs()
+
+            assert result["deleted"] == []
+            assert blob_path.exists()
+            assert db.session.get(MediaBlob, info["media_blob_id"]).ref_count == 1
+
+    def test_scheduled_purge_skips_when_lease_held(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test only one process purges unreferenced media at a time."""
+        info = upload_file(client, sample_slideshow.id)
+
+        with app.app_context():
+            _age_blob(info["media_blob_id"])
+            token = claim_lease(PURGE_LEASE, 60)
+
+            assert purge_expired_blobs() == 0
+            assert db.session.get(MediaBlob, info["media_blob_id"]) is not None
+
+            release_lease(PURGE_LEASE, token)
+            assert purge_expired_blobs() == 1
+
+    def test_integrity_checker_uses_reference_counts(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test unreferenced blobs are reported and cleaned up as orphans."""
+        referenced = upload_file(client, sample_slideshow.id)
+        unreferenced = upload_file(client, sample_slideshow.id, data=PNG_DATA + b"y")
+        _create_item(client, sample_slideshow.id, referenced["file_path"])
+
+        with app.app_context():
+            _age_blob(unreferenced["media_blob_id"])
+            checker = StorageIntegrityChecker()
+
+            orphan_ids = [f.get("media_blob_id") for f in checker.find_orphaned_files()]
+            assert unreferenced["media_blob_id"] in orphan_ids
+            assert referenced["media_blob_id"] not in orphan_ids
+
+            result = checker.cleanup_orphaned_files(dry_run=False)
+
+            assert result["error_count"] == 0
+            assert db.session.get(MediaBlob, unreferenced["media_blob_id"]) is None
+            assert db.session.get(MediaBlob, referenced["media_blob_id"]) is not None
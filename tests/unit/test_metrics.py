@@ -5,6 +5,7 @@ This module tests:
 - /metrics endpoint
 - MetricsCollector class
 - Metric recording functions
+- Client playback metrics
 """
 
 from kiosk_show_replacement.metrics import (
@@ -61,6 +62,14 @@ class TestMetricsEndpoint:
         assert "database_errors_total" in data
         assert "storage_errors_total" in data
 
+    def test_metrics_contains_log_queue_metrics(self, app, client):
+        """Test metrics output contains async log queue counters."""
+        response = client.get("/metrics")
+        data = response.data.decode("utf-8")
+
+        assert "# TYPE log_records_dropped_total counter" in data
+        assert "log_queue_depth" in data
+
     def test_metrics_records_request(self, app, client):
         """Test that making a request records metrics."""
         # Make a request to trigger metrics
@@ -152,6 +161,20 @@ class TestMetricsCollector:
         output = collector.get_metrics_text()
         assert "active_sse_connections 3" in output
 
+    def test_ical_event_prune(self):
+        """Test recording iCal event pruning runs."""
+        collector = MetricsCollector()
+        assert "ical_event_prune_duration_seconds" not in collector.get_metrics_text()
+
+        collector.observe_ical_event_prune(120, 0.5, True)
+        collector.observe_ical_event_prune(30, 1.25, False)
+
+        output = collector.get_metrics_text()
+        assert "ical_events_pruned_total 150" in output
+        assert 'ical_event_prune_runs_total{result="success"} 1' in output
+        assert 'ical_event_prune_runs_total{result="error"} 1' in output
+        assert "ical_event_prune_duration_seconds 1.250" in output
+
     def test_thread_safety(self):
         """Test that collector is thread-safe."""
         import threading
@@ -180,6 +203,53 @@ class TestMetricsCollector:
         )
 
 
+class TestPlaybackMetrics:
+    """Tests for client playback metrics in the MetricsCollector."""
+
+    def test_observe_slide_load_histograms(self):
+        """Test slide loads populate per-display and per-item histograms."""
+        collector = MetricsCollector()
+        collector.observe_slide_load("lobby", 7, 0.3, cache_hit=False)
+        collector.observe_slide_load("lobby", 7, 2.0, cache_hit=True)
+
+        output = collector.get_metrics_text()
+        assert "# TYPE display_slide_load_seconds histogram" in output
+        assert (
+            'display_slide_load_seconds_bucket{display_name="lobby",le="0.5"} 1'
+            in output
+        )
+        assert (
+            'display_slide_load_seconds_bucket{display_name="lobby",le="+Inf"} 2'
+            in output
+        )
+        assert 'content_item_load_seconds_count{item_id="7"} 2' in output
+        assert 'display_slide_cache_total{display_name="lobby",result="hit"} 1' in (
+            output
+        )
+
+    def test_playback_counters_and_heap(self):
+        """Test playback counters accumulate and heap gauge is replaced."""
+        collector = MetricsCollector()
+        collector.inc_playback_counters("lobby", dropped_frames=3, errors=1)
+        collector.inc_playback_counters("lobby", dropped_frames=2, missed_transitions=1)
+        collector.set_display_js_heap("lobby", 100)
+        collector.set_display_js_heap("lobby", 200)
+
+        output = collector.get_metrics_text()
+        assert 'display_dropped_frames_total{display_name="lobby"} 5' in output
+        assert 'display_missed_transitions_total{display_name="lobby"} 1' in output
+        assert 'display_playback_errors_total{display_name="lobby"} 1' in output
+        assert 'display_js_heap_bytes{display_name="lobby"} 200' in output
+
+    def test_display_label_is_escaped(self):
+        """Test display names are escaped in label values."""
+        collector = MetricsCollector()
+        collector.observe_slide_load('say "hi"', 1, 0.1)
+
+        output = collector.get_metrics_text()
+        assert 'display_name="say \\"hi\\""' in output
+
+
 class TestMetricRecordingFunctions:
     """Tests for convenience metric recording functions."""
 
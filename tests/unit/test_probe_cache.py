@@ -0,0 +1,270 @@
+"""
+Tests for the persistent video probe cache.
+
+This module tests:
+- Caching local file probes by content checksum
+- Caching URL probes and revalidating them with ETag/Last-Modified
+- Expiry and size-bound pruning of cache entries
+"""
+
+import hashlib
+import json
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from kiosk_show_replacement.leases import claim_lease, release_lease
+from kiosk_show_replacement.models import VideoProbeCache, db
+from kiosk_show_replacement.probe_cache import (
+    PRUNE_LEASE,
+    content_source,
+    prune_probe_cache,
+    url_source,
+)
+from kiosk_show_replacement.storage import StorageManager
+
+FFPROBE_OUTPUT = json.dumps(
+    {
+        "streams": [
+            {"codec_type": "video", "codec_name": "h264"},
+            {"codec_type": "audio", "codec_name": "aac"},
+        ],
+        "format": {"format_name": "mov,mp4,m4a,3gp,3g2,mj2", "duration": "42.5"},
+    }
+)
+
+VIDEO_URL = "https://example.com/video.mp4"
+
+
+@pytest.fixture(autouse=True)
+def probe_cache_enabled(app, monkeypatch):
+    """Enable the probe cache, which is disabled in the testing config."""
+    monkeypatch.setitem(app.config, "VIDEO_PROBE_CACHE_MAX_ENTRIES", 100)
+    monkeypatch.setitem(app.config, "VIDEO_PROBE_CACHE_REVALIDATE_SECONDS", 300)
+    with app.app_context():
+        yield
+
+
+@pytest.fixture
+def storage_manager(tmp_path):
+    """Create a StorageManager instance with a temporary directory."""
+    return StorageManager(str(tmp_path))
+
+
+@pytest.fixture
+def mock_ffprobe():
+    """Mock ffprobe returning an H.264 video."""
+    with patch("kiosk_show_replacement.storage.subprocess.run") as mock_run:
+        mock_run.return_value = MagicMock(returncode=0, stdout=FFPROBE_OUTPUT)
+        yield mock_run
+
+
+def _head_response(etag=None, last_modified=None, status_code=200):
+    """Build a mock HEAD response with the given validators."""
+    headers = {}
+    if etag:
+        headers["ETag"] = etag
+    if last_modified:
+        headers["Last-Modified"] = last_modified
+    return MagicMock(status_code=status_code, headers=headers)
+
+
+def _age_entries(seconds):
+    """Move the checked_at time of every cache entry into the past."""
+    checked_at = datetime.now(timezone.utc) - timedelta(seconds=seconds)
+    for entry in VideoProbeCache.query.all():
+        entry.checked_at = checked_at
+    db.session.commit()
+
+
+class TestContentProbeCache:
+    """Tests for caching probes of local files."""
+
+    def test_content_addressed_file_is_probed_once(
+        self, storage_manager, mock_ffprobe, tmp_path
+    ):
+        """Test a file named by its checksum is only probed once."""
+        data = b"fake video data"
+        video_path = tmp_path / f"{hashlib.sha256(data).hexdigest()}.mp4"
+        video_path.write_bytes(data)
+
+        first = storage_manager.probe_video(video_path)
+        second = storage_manager.probe_video(video_path)
+
+        assert first == second
+        assert second["video_codec"] == "h264"
+        assert second["duration"] == 42.5
+        assert mock_ffprobe.call_count == 1
+
+    def test_same_content_at_another_path_hits_cache(
+        self, storage_manager, mock_ffprobe, tmp_path
+    ):
+        """Test a known checksum reuses the result for a different file."""
+        checksum = "a" * 64
+        (tmp_path / "one.mp4").write_bytes(b"x")
+        (tmp_path / "two.mp4").write_bytes(b"x")
+
+        storage_manager.probe_video(tmp_path / "one.mp4", checksum=checksum)
+        codec_info = storage_manager.get_video_codec_info(tmp_path / f"{checksum}.mp4")
+
+        assert codec_info["video_codec"] == "h264"
+        assert mock_ffprobe.call_count == 1
+
+    def test_file_without_checksum_is_not_cached(
+        self, storage_manager, mock_ffprobe, tmp_path
+    ):
+        """Test files not named by a checksum are probed every time."""
+        video_path = tmp_path / "legacy.mp4"
+        video_path.write_bytes(b"x")
+
+        storage_manager.get_video_duration(video_path)
+        storage_manager.get_video_duration(video_path)
+
+        assert mock_ffprobe.call_count == 2
+        assert VideoProbeCache.query.count() == 0
+
+    def test_failed_probe_is_not_cached(self, storage_manager, tmp_path):
+        """Test a failed probe is retried rather than cached."""
+        video_path = tmp_path / f"{'b' * 64}.mp4"
+        video_path.write_bytes(b"x")
+
+        with patch("kiosk_show_replacement.storage.subprocess.run") as mock_run:
+            mock_run.return_value = MagicMock(returncode=1, stderr="bad")
+            assert storage_manager.probe_video(video_path) is None
+            assert storage_manager.probe_video(video_path) is None
+
+        assert mock_run.call_count == 2
+
+    def test_disabled_cache_probes_every_time(
+        self, app, storage_manager, mock_ffprobe, tmp_path, monkeypatch
+    ):
+        """Test setting the maximum entries to 0 disables the cache."""
+        monkeypatch.setitem(app.config, "VIDEO_PROBE_CACHE_MAX_ENTRIES", 0)
+        video_path = tmp_path / f"{'c' * 64}.mp4"
+        video_path.write_bytes(b"x")
+
+        storage_manager.probe_video(video_path)
+        storage_manager.probe_video(video_path)
+
+        assert mock_ffprobe.call_count == 2
+
+
+@patch("kiosk_show_replacement.probe_cache.requests.head")
+class TestURLProbeCache:
+    """Tests for caching probes of remote videos."""
+
+    def test_repeated_validation_within_window(
+        self, mock_head, storage_manager, mock_ffprobe
+    ):
+        """Test repeated URL validation reuses the result without requests."""
+        mock_head.return_value = _head_response(etag='"v1"')
+
+        first = storage_manager.validate_video_url(VIDEO_URL)
+        second = storage_manager.validate_video_url(VIDEO_URL)
+
+        assert first == second
+        assert second[0] is True
+        assert second[1] == 42.5
+        assert mock_ffprobe.call_count == 1
+        assert mock_head.call_count == 1
+
+    def test_unchanged_etag_is_not_reprobed(
+        self, mock_head, storage_manager, mock_ffprobe
+    ):
+        """Test an expired revalidation window checks validators, not ffprobe."""
+        mock_head.return_value = _head_response(
+            etag='"v1"', last_modified="Sat, 17 Oct 2026 10:00:00 GMT"
+        )
+        storage_manager.probe_video(VIDEO_URL)
+        _age_entries(600)
+
+        probe_info = storage_manager.probe_video(VIDEO_URL)
+
+        assert probe_info["video_codec"] == "h264"
+        assert mock_ffprobe.call_count == 1
+        assert mock_head.call_count == 2
+        entry = VideoProbeCache.query.one()
+        assert entry.source == url_source(VIDEO_URL)
+        checked_at = entry.checked_at.replace(tzinfo=timezone.utc)
+        assert datetime.now(timezone.utc) - checked_at < timedelta(seconds=60)
+
+    def test_changed_etag_is_reprobed(self, mock_head, storage_manager, mock_ffprobe):
+        """Test a changed ETag replaces the cached result."""
+        mock_head.return_value = _head_response(etag='"v1"')
+        storage_manager.probe_video(VIDEO_URL)
+        _age_entries(600)
+
+        mock_head.return_value = _head_response(etag='"v2"')
+        storage_manager.probe_video(VIDEO_URL)
+
+        assert mock_ffprobe.call_count == 2
+        entry = VideoProbeCache.query.one()
+        assert entry.etag == '"v2"'
+
+    def test_url_without_validators_is_reprobed(
+        self, mock_head, storage_manager, mock_ffprobe
+    ):
+        """Test a URL without ETag or Last-Modified is probed once the window ends."""
+        mock_head.return_value = _head_response()
+        storage_manager.probe_video(VIDEO_URL)
+        _age_entries(600)
+
+        storage_manager.probe_video(VIDEO_URL)
+
+        assert mock_ffprobe.call_count == 2
+
+
+class TestPruneProbeCache:
+    """Tests for pruning the probe cache."""
+
+    def _add_entry(self, source, age_hours):
+        """Add a cache entry last checked the given number of hours ago."""
+        checked_at = datetime.now(timezone.utc) - timedelta(hours=age_hours)
+        entry = VideoProbeCache(
+            cache_key=hashlib.sha256(source.encode()).hexdigest(),
+            source=source,
+            video_codec="h264",
+            checked_at=checked_at,
+        )
+        db.session.add(entry)
+        db.session.commit()
+
+    def test_prune_removes_expired_and_excess_entries(self):
+        """Test expired entries and the least recently checked are deleted."""
+        self._add_entry(content_source("1" * 64), age_hours=48)
+        self._add_entry(content_source("2" * 64), age_hours=3)
+        self._add_entry(content_source("3" * 64), age_hours=2)
+        self._add_entry(content_source("4" * 64), age_hours=1)
+
+        deleted = prune_probe_cache(ttl_hours=24, max_entries=2)
+
+        assert deleted == 2
+        remaining = {entry.source for entry in VideoProbeCache.query.all()}
+        assert remaining == {content_source("3" * 64), content_source("4" * 64)}
+
+    def test_prune_skips_when_another_process_is_pruning(self):
+        """Test only the process holding the pruning lease deletes entries."""
+        self._add_entry(content_source("1" * 64), age_hours=48)
+        token = claim_lease(PRUNE_LEASE, 60)
+
+        assert prune_probe_cache(ttl_hours=24) == 0
+        assert VideoProbeCache.query.count() == 1
+
+        release_lease(PRUNE_LEASE, token)
+        assert prune_probe_cache(ttl_hours=24) == 1
+
+    def test_expired_entry_is_not_used(
+        self, app, storage_manager, mock_ffprobe, tmp_path, monkeypatch
+    ):
+        """Test an entry older than the TTL is probed again."""
+        monkeypatch.setitem(app.config, "VIDEO_PROBE_CACHE_TTL_HOURS", 1)
+        video_path = Path(tmp_path) / f"{'d' * 64}.mp4"
+        video_path.write_bytes(b"x")
+        storage_manager.probe_video(video_path)
+        _age_entries(7200)
+
+        storage_manager.probe_video(video_path)
+
+        assert mock_ffprobe.call_count == 2
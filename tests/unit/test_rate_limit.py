@@ -0,0 +1,49 @@
+"""
+Tests for the token bucket rate limiter.
+
+This module tests:
+- Allowing bursts up to the bucket size
+- Refilling buckets over time
+- Keeping a bucket per key
+"""
+
+from kiosk_show_replacement import rate_limit
+from kiosk_show_replacement.rate_limit import RateLimiter
+
+
+class TestRateLimiter:
+    """Tests for RateLimiter."""
+
+    def test_burst_then_refused(self, monkeypatch):
+        """Test requests beyond the burst are refused until a token refills."""
+        monkeypatch.setattr(rate_limit.time, "monotonic", lambda: 100.0)
+        limiter = RateLimiter(rate_per_minute=60, burst=2)
+
+        assert limiter.retry_after("a") is None
+        assert limiter.retry_after("a") is None
+        assert limiter.retry_after("a") == 1
+
+    def test_bucket_refills(self, monkeypatch):
+        """Test a bucket regains tokens at the configured rate."""
+        now = [100.0]
+        monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+        limiter = RateLimiter(rate_per_minute=6, burst=1)
+
+        assert limiter.acquire("a") == 0
+        assert limiter.acquire("a") == 10
+        now[0] += 10
+        assert limiter.acquire("a") == 0
+
+    def test_keys_are_independent(self):
+        """Test one key exhausting its bucket does not limit another."""
+        limiter = RateLimiter(rate_per_minute=1)
+
+        assert limiter.retry_after(1) is None
+        assert limiter.retry_after(1) is not None
+        assert limiter.retry_after(2) is None
+
+    def test_zero_rate_is_unlimited(self):
+        """Test a rate of 0 allows every request."""
+        limiter = RateLimiter(rate_per_minute=0)
+
+        assert all(limiter.retry_after("a") is None for _ in range(100))
@@ -0,0 +1,275 @@
+"""
+Tests for resumable chunked uploads.
+
+This module tests:
+- Creating uploads and validating the declared file
+- Appending chunks at explicit offsets and resuming after a mismatch
+- Per-chunk and whole-file checksum verification
+- Completing uploads into the content-addressed media store
+- Cleanup of abandoned uploads
+"""
+
+import base64
+import hashlib
+import os
+import time
+from pathlib import Path
+
+import pytest
+
+from kiosk_show_replacement.exceptions import NotFoundError
+from kiosk_show_replacement.leases import claim_lease, release_lease
+from kiosk_show_replacement.models import MediaBlob, db
+from kiosk_show_replacement.resumable_upload import (
+    CLEANUP_LEASE,
+    cleanup_expired_uploads,
+    get_resumable_path,
+    get_upload,
+)
+from tests.conftest import PNG_DATA
+
+pytestmark = pytest.mark.usefixtures("isolated_storage")
+
+
+def _create(client, slideshow_id, data=PNG_DATA, **overrides):
+    """Create a resumable upload and return the response."""
+    payload = {
+        "filename": "photo.png",
+        "content_type": "image",
+        "slideshow_id": slideshow_id,
+        "size": len(data),
+    }
+    payload.update(overrides)
+    return client.post("/api/v1/uploads/resumable", json=payload)
+
+
+def _patch(client, upload_id, offset, chunk, headers=None):
+    """Send a chunk of data at the given offset."""
+    return client.patch(
+        f"/api/v1/uploads/resumable/{upload_id}",
+        data=chunk,
+        headers={"Upload-Offset": str(offset), **(headers or {})},
+        content_type="application/offset+octet-stream",
+    )
+
+
+class TestCreateUpload:
+    """Tests for starting resumable uploads."""
+
+    def test_create_returns_upload_id(
+        self, client, authenticated_user, sample_slideshow
+    ):
+        """Test creating an upload returns its ID and a zero offset."""
+        response = _create(client, sample_slideshow.id)
+
+        assert response.status_code == 201
+        data = response.get_json()["data"]
+        assert len(data["upload_id"]) == 32
+        assert data["offset"] == 0
+        assert data["size"] == len(PNG_DATA)
+        assert data["chunk_size"] > 0
+        assert response.headers["Upload-Offset"] == "0"
+
+    def test_create_validates_declared_file(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test disallowed extensions and oversized files are rejected."""
+        response = _create(client, sample_slideshow.id, filename="evil.exe")
+        assert response.status_code == 400
+
+        response = _create(
+            client, sample_slideshow.id, size=app.config["MAX_IMAGE_SIZE"] + 1
+        )
+        assert response.status_code == 400
+
+        response = _create(client, sample_slideshow.id + 1000)
+        assert response.status_code == 404
+
+    def test_create_requires_authentication(self, client, sample_slideshow):
+        """Test creating an upload requires authentication."""
+        response = _create(client, sample_slideshow.id)
+        assert response.status_code == 401
+
+
+class TestAppendChunks:
+    """Tests for appending chunks and resuming."""
+
+    def test_resume_after_offset_mismatch(
+        self, client, authenticated_user, sample_slideshow
+    ):
+        """Test a client can find the current offset and resume from it."""
+        upload_id = _create(client, sample_slideshow.id).get_json()["data"]["upload_id"]
+
+        response = _patch(client, upload_id, 0, PNG_DATA[:20])
+        assert response.status_code == 200
+        assert response.get_json()["data"]["offset"] == 20
+
+        # A retried chunk at a stale offset is refused with the real offset
+        response = _patch(client, upload_id, 0, PNG_DATA[:20])
+        assert response.status_code == 409
+        assert response.get_json()["error_info"]["details"]["offset"] == 20
+
+        response = client.get(f"/api/v1/uploads/resumable/{upload_id}")
+        assert response.headers["Upload-Offset"] == "20"
+
+        response = _patch(client, upload_id, 20, PNG_DATA[20:])
+        assert response.get_json()["data"]["complete"] is True
+
+    def test_chunk_past_declared_size_is_rejected(
+        self, client, authenticated_user, sample_slideshow
+    ):
+        """Test a chunk cannot extend past the declared size."""
+        upload_id = _create(client, sample_slideshow.id).get_json()["data"]["upload_id"]
+
+        response = _patch(client, upload_id, 0, PNG_DATA + b"extra")
+
+        assert response.status_code == 400
+
+    def test_chunk_checksum_mismatch_discards_chunk(
+        self, client, authenticated_user, sample_slideshow
+    ):
+        """Test a chunk failing its Upload-Checksum is not kept."""
+        upload_id = _create(client, sample_slideshow.id).get_json()["data"]["upload_id"]
+        good = base64.b64encode(hashlib.sha256(PNG_DATA[:10]).digest()).decode()
+        bad = base64.b64encode(hashlib.sha256(b"other").digest()).decode()
+
+        response = _patch(
+            client,
+            upload_id,
+            0,
+            PNG_DATA[:10],
+            headers={"Upload-Checksum": f"sha256 {bad}"},
+        )
+        assert response.status_code == 400
+        response = client.get(f"/api/v1/uploads/resumable/{upload_id}")
+        assert response.headers["Upload-Offset"] == "0"
+
+        response = _patch(
+            client,
+            upload_id,
+            0,
+            PNG_DATA[:10],
+            headers={"Upload-Checksum": f"sha256 {good}"},
+        )
+        assert response.get_json()["data"]["offset"] == 10
+
+    def test_other_users_cannot_access_upload(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test uploads are only visible to the user who created them."""
+        upload_id = _create(client, sample_slideshow.id).get_json()["data"]["upload_id"]
+
+        with app.app_context():
+            with pytest.raises(NotFoundError):
+                get_upload(upload_id, authenticated_user.id + 1000)
+            assert get_upload(upload_id, authenticated_user.id)["offset"] == 0
+
+    def test_malformed_upload_id(self, client, authenticated_user):
+        """Test malformed upload IDs are not found."""
+        response = client.get("/api/v1/uploads/resumable/..%2F..%2Fetc")
+        assert response.status_code == 404
+
+
+class TestCompleteUpload:
+    """Tests for completing resumable uploads."""
+
+    def _upload_all(self, client, slideshow_id, **overrides):
+        """Create an upload and send its data in two chunks."""
+        upload_id = _create(client, slideshow_id, **overrides).get_json()["data"][
+            "upload_id"
+        ]
+        _patch(client, upload_id, 0, PNG_DATA[:30])
+        _patch(client, upload_id, 30, PNG_DATA[30:])
+        return upload_id
+
+    def test_complete_stores_media_blob(
+        self, app, client, authenticated_user, sample_slideshow, isolated_storage
+    ):
+        """Test completing an upload stores it like a single-request upload."""
+        checksum = hashlib.sha256(PNG_DATA).hexdigest()
+        upload_id = self._upload_all(client, sample_slideshow.id, checksum=checksum)
+
+        response = client.post(f"/api/v1/uploads/resumable/{upload_id}/complete")
+
+        assert response.status_code == 201
+        data = response.get_json()["data"]
+        assert data["checksum"] == checksum
+        assert data["original_filename"] == "photo.png"
+        assert data["url"].startswith("/uploads/")
+        assert (Path(isolated_storage) / data["file_path"]).read_bytes() == PNG_DATA
+        with app.app_context():
+            assert db.session.get(MediaBlob, data["media_blob_id"]) is not None
+            assert list(get_resumable_path().iterdir()) == []
+
+    def test_complete_incomplete_upload(
+        self, client, authenticated_user, sample_slideshow
+    ):
+        """Test an upload cannot be completed before all data arrives."""
+        upload_id = _create(client, sample_slideshow.id).get_json()["data"]["upload_id"]
+        _patch(client, upload_id, 0, PNG_DATA[:10])
+
+        response = client.post(f"/api/v1/uploads/resumable/{upload_id}/complete")
+
+        assert response.status_code == 409
+
+    def test_complete_checksum_mismatch(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test a whole-file checksum mismatch rejects and discards the upload."""
+        upload_id = self._upload_all(client, sample_slideshow.id, checksum="0" * 64)
+
+        response = client.post(f"/api/v1/uploads/resumable/{upload_id}/complete")
+
+        assert response.status_code == 400
+        with app.app_context():
+            assert MediaBlob.query.count() == 0
+        response = client.get(f"/api/v1/uploads/resumable/{upload_id}")
+        assert response.status_code == 404
+
+    def test_delete_upload(self, client, authenticated_user, sample_slideshow):
+        """Test a cancelled upload is removed."""
+        upload_id = _create(client, sample_slideshow.id).get_json()["data"]["upload_id"]
+
+        response = client.delete(f"/api/v1/uploads/resumable/{upload_id}")
+
+        assert response.status_code == 200
+        response = client.get(f"/api/v1/uploads/resumable/{upload_id}")
+        assert response.status_code == 404
+
+
+class TestCleanup:
+    """Tests for removing abandoned uploads."""
+
+    def test_cleanup_removes_only_expired_uploads(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test uploads without recent data are removed."""
+        stale_id = _create(client, sample_slideshow.id).get_json()["data"]["upload_id"]
+        fresh_id = _create(client, sample_slideshow.id).get_json()["data"]["upload_id"]
+
+        with app.app_context():
+            resumable_path = get_resumable_path()
+            old = time.time() - 48 * 3600
+            os.utime(resumable_path / stale_id / "data", (old, old))
+
+            assert cleanup_expired_uploads(expiry_hours=24) == 1
+            remaining = [p.name for p in resumable_path.iterdir()]
+            assert remaining == [fresh_id]
+
+    def test_cleanup_skips_when_another_process_is_cleaning_up(
+        self, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test only the process holding the cleanup lease removes uploads."""
+        upload_id = _create(client, sample_slideshow.id).get_json()["data"]["upload_id"]
+
+        with app.app_context():
+            data_path = get_resumable_path() / upload_id / "data"
+            old = time.time() - 48 * 3600
+            os.utime(data_path, (old, old))
+            token = claim_lease(CLEANUP_LEASE, 60)
+
+            assert cleanup_expired_uploads(expiry_hours=24) == 0
+            assert data_path.exists()
+
+            release_lease(CLEANUP_LEASE, token)
+            assert cleanup_expired_uploads(expiry_hours=24) == 1
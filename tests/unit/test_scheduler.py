@@ -0,0 +1,106 @@
+"""
+Tests for the background job scheduler.
+
+This module tests:
+- Job registration
+- Running jobs inside an application context
+- Error handling for failing jobs
+- Scheduler thread start/stop
+"""
+
+import threading
+
+from flask import current_app
+
+from kiosk_show_replacement.scheduler import (
+    BackgroundScheduler,
+    get_scheduler,
+    init_scheduler,
+)
+
+
+class TestBackgroundScheduler:
+    """Tests for the BackgroundScheduler class."""
+
+    def test_add_job_registers_job(self):
+        """Test jobs are registered by name."""
+        scheduler = BackgroundScheduler()
+        scheduler.add_job("example", 10, lambda: None)
+
+        jobs = scheduler.get_jobs()
+        assert "example" in jobs
+        assert jobs["example"].interval == 10
+
+    def test_add_job_ignores_non_positive_interval(self):
+        """Test jobs with an interval of 0 or less are not registered."""
+        scheduler = BackgroundScheduler()
+        scheduler.add_job("disabled", 0, lambda: None)
+
+        assert scheduler.get_jobs() == {}
+
+    def test_run_job_uses_app_context(self, app):
+        """Test jobs run inside the application context."""
+        seen = []
+        scheduler = BackgroundScheduler()
+        scheduler._app = app
+        scheduler.add_job("ctx", 10, lambda: seen.append(current_app.name))
+
+        scheduler.run_job(scheduler.get_jobs()["ctx"])
+
+        assert seen == [app.name]
+
+    def test_run_job_records_errors(self):
+        """Test a failing job records its error and is rescheduled."""
+
+        def failing_job():
+            raise RuntimeError("boom")
+
+        scheduler = BackgroundScheduler()
+        scheduler.add_job("failing", 10, failing_job)
+        job = scheduler.get_jobs()["failing"]
+
+        scheduler.run_job(job)
+
+        assert job.last_error == "boom"
+        assert job.runs == 1
+        assert job.next_run > 0
+
+    def test_start_runs_due_jobs(self, app):
+        """Test the scheduler thread runs jobs that are due."""
+        ran = threading.Event()
+        scheduler = BackgroundScheduler()
+        scheduler.add_job("immediate", 60, ran.set)
+
+        scheduler.start(app)
+        try:
+            assert ran.wait(5)
+            assert scheduler.running
+        finally:
+            scheduler.stop()
+
+        assert not scheduler.running
+
+
+class TestInitScheduler:
+    """Tests for scheduler initialization on the app."""
+
+    def test_scheduler_registered_on_app(self, app):
+        """Test the app has a scheduler extension."""
+        assert isinstance(get_scheduler(app), BackgroundScheduler)
+
+    def test_scheduler_not_started_when_disabled(self, app, client):
+        """Test the scheduler does not start under the testing config."""
+        client.get("/health/live")
+
+        assert app.config["SCHEDULER_ENABLED"] is False
+        assert not get_scheduler(app).running
+
+    def test_init_scheduler_returns_scheduler(self):
+        """Test init_scheduler stores the scheduler in app extensions."""
+        from flask import Flask
+
+        test_app = Flask(__name__)
+        test_app.config["SCHEDULER_ENABLED"] = False
+        scheduler = init_scheduler(test_app)
+
+        assert test_app.extensions["scheduler"] is scheduler
@@ -0,0 +1,177 @@
+"""
+Tests for the Skedda calendar day layout engine.
+
+This module tests:
+- Validating day layouts and building their slot label tables
+- Placing events on the grid, clipped to its hours
+- Packing concurrent bookings of a space into lanes
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import pytest
+
+from kiosk_show_replacement.skedda_layout import (
+    DEFAULT_LAYOUT,
+    DayLayout,
+    assign_lanes,
+    layout_day,
+    time_slot_table,
+)
+
+DAY = date(2026, 1, 28)
+EST = timezone(timedelta(hours=-5))
+
+
+def _event(event_id, start, end, resources=("Laser Cutter",)):
+    """Build an event row from naive UTC start and end times."""
+    return SimpleNamespace(
+        id=event_id,
+        uid=f"event-{event_id}",
+        summary=f"Event {event_id}",
+        start_time=start,
+        end_time=end,
+        resources=list(resources),
+    )
+
+
+def _describe(event):
+    """Describe events by their summary only."""
+    return "", event.summary
+
+
+class TestDayLayout:
+    """Tests for DayLayout and its slot labels."""
+
+    def test_default_layout(self):
+        """Test the default grid is 7 AM to 11 PM in 30-minute slots."""
+        slots = time_slot_table(DEFAULT_LAYOUT)
+
+        assert DEFAULT_LAYOUT.slot_count == 32
+        assert slots[0] == {"time": "07:00", "display": "7:00 AM"}
+        assert slots[-1] == {"time": "22:30", "display": "10:30 PM"}
+
+    def test_slot_table_is_shared(self):
+        """Test a layout's slot table is built once."""
+        layout = DayLayout(start_hour=8, end_hour=10, slot_minutes=15)
+
+        slots = time_slot_table(layout)
+
+        assert [s["time"] for s in slots] == [
+            "08:00",
+            "08:15",
+            "08:30",
+            "08:45",
+            "09:00",
+            "09:15",
+            "09:30",
+            "09:45",
+        ]
+        assert time_slot_table(DayLayout(8, 10, 15)) is slots
+
+    def test_unset_settings_use_defaults(self):
+        """Test unset item settings fall back to the default grid."""
+        assert DayLayout.from_settings(None, None, None) == DEFAULT_LAYOUT
+        assert DayLayout.from_settings(6, None, 15) == DayLayout(6, 23, 15)
+
+    @pytest.mark.parametrize(
+        "settings,message",
+        [
+            ((24, 24, 30), "start hour"),
+            ((7, 25, 30), "end hour"),
+            ((12, 12, 30), "after its start hour"),
+            ((7, 23, 25), "slot length"),
+        ],
+    )
+    def test_invalid_layouts(self, settings, message):
+        """Test invalid grids are rejected."""
+        with pytest.raises(ValueError, match=message):
+            DayLayout(*settings)
+
+
+class TestAssignLanes:
+    """Tests for packing overlapping spans into lanes."""
+
+    def test_separate_spans_share_a_lane(self):
+        """Test spans that do not overlap each get a lane of their own."""
+        assert assign_lanes([(0, 2), (2, 4), (5, 6)]) == [(0, 1), (0, 1), (0, 1)]
+
+    def test_overlapping_group(self):
+        """Test a group of overlapping spans shares its lane count."""
+        spans = [(0, 4), (1, 2), (2, 3), (3, 6), (8, 9)]
+
+        assert assign_lanes(spans) == [(0, 2), (1, 2), (1, 2), (1, 2), (0, 1)]
+
+    def test_lowest_free_lane_is_reused(self):
+        """Test a span takes the lowest lane freed before it starts."""
+        spans = [(0, 2), (0, 6), (0, 6), (3, 4)]
+
+        assert assign_lanes(spans) == [(0, 3), (1, 3), (2, 3), (0, 3)]
+
+
+class TestLayoutDay:
+    """Tests for placing a day's events on the grid."""
+
+    def test_events_are_placed_in_local_time(self):
+        """Test events get slots from their local wall-clock times."""
+        # 17:00-19:15 UTC is 12:00-14:15 EST
+        event = _event(1, datetime(2026, 1, 28, 17, 0), datetime(2026, 1, 28, 19, 15))
+
+        (entry,) = layout_day(
+            [event], ["Laser Cutter"], DAY, DEFAULT_LAYOUT, EST, _describe
+        )
+
+        assert (entry["start_time"], entry["end_time"]) == ("12:00", "14:15")
+        # 12:00 is slot 10; 14:15 ends within slot 14
+        assert (entry["start_slot"], entry["row_span"]) == (10, 5)
+        assert (entry["lane"], entry["lane_count"]) == (0, 1)
+
+    def test_events_are_clipped_to_the_grid(self):
+        """Test events running past the grid's hours are clipped to it."""
+        layout = DayLayout(start_hour=8, end_hour=18, slot_minutes=60)
+        overnight = _event(1, datetime(2026, 1, 28, 2, 0), datetime(2026, 1, 29, 3, 0))
+        late = _event(2, datetime(2026, 1, 29, 1, 0), datetime(2026, 1, 29, 2, 0))
+
+        entries = layout_day(
+            [overnight, late], ["Laser Cutter"], DAY, layout, EST, _describe
+        )
+
+        assert [(e["start_slot"], e["row_span"]) for e in entries] == [
+            (0, 10),
+            (9, 1),
+        ]
+
+    def test_concurrent_bookings_get_lanes(self):
+        """Test overlapping bookings of one space are packed into lanes."""
+        first = _event(1, datetime(2026, 1, 28, 17, 0), datetime(2026, 1, 28, 18, 0))
+        second = _event(
+            2,
+            datetime(2026, 1, 28, 17, 30),
+            datetime(2026, 1, 28, 18, 30),
+            resources=("Laser Cutter", "CNC Mill"),
+        )
+
+        entries = layout_day(
+            [first, second],
+            ["CNC Mill", "Laser Cutter"],
+            DAY,
+            DEFAULT_LAYOUT,
+            EST,
+            _describe,
+        )
+
+        lanes = {(e["id"], e["space"]): (e["lane"], e["lane_count"]) for e in entries}
+        assert lanes == {
+            (1, "Laser Cutter"): (0, 2),
+            (2, "Laser Cutter"): (1, 2),
+            (2, "CNC Mill"): (0, 1),
+        }
+
+    def test_unlisted_spaces_are_left_out(self):
+        """Test bookings of spaces without a column are not placed."""
+        event = _event(1, datetime(2026, 1, 28, 17, 0), datetime(2026, 1, 28, 18, 0))
+
+        assert (
+            layout_day([event], ["CNC Mill"], DAY, DEFAULT_LAYOUT, EST, _describe) == []
+        )
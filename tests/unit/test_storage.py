@@ -4,6 +4,8 @@ Test file upload and storage functionality.
 Tests for file upload API endpoints, storage management, and file serving.
 """
 
+import hashlib
+import json
 import shutil
 import tempfile
 from io import BytesIO
@@ -158,6 +160,33 @@ class TestStorageManager:
             assert file_info["user_id"] == 1
             assert file_info["slideshow_id"] == 2
 
+    def test_save_file_returns_checksum(
+        self, storage_manager, sample_image_file, temp_storage_dir, app
+    ):
+        """Test saved files report a SHA-256 checksum and leave no staging files."""
+        with app.app_context():
+            expected = hashlib.sha256(sample_image_file.stream.getvalue()).hexdigest()
+
+            success, _, file_info = storage_manager.save_file(
+                sample_image_file, "image", 1, 2
+            )
+
+            assert success is True
+            assert file_info["checksum"] == expected
+            staging = Path(temp_storage_dir) / StorageManager.STAGING_DIRECTORY
+            assert list(staging.iterdir()) == []
+
+    def test_open_upload_stream_limits(self, storage_manager, app):
+        """Test upload streams get the size limit for their content type."""
+        with app.app_context():
+            image = storage_manager.open_upload_stream("photo.PNG", "image")
+            disallowed = storage_manager.open_upload_stream("notes.txt", "image")
+
+            assert image.max_size == app.config["MAX_IMAGE_SIZE"]
+            assert disallowed.max_size == 0
+            image.close()
+            disallowed.close()
+
     def test_save_file_validation_failure(self, storage_manager, app):
         """Test file saving with validation failure."""
         with app.app_context():
@@ -922,18 +951,15 @@ class TestVideoURLSupport:
 
     # Tests for validate_video_url()
 
-    @patch.object(StorageManager, "get_video_codec_info")
-    @patch.object(StorageManager, "get_video_duration")
-    def test_validate_video_url_success(
-        self, mock_duration, mock_codec, storage_manager
-    ):
+    @patch.object(StorageManager, "probe_video")
+    def test_validate_video_url_success(self, mock_probe, storage_manager):
         """Test successful video URL validation."""
-        mock_codec.return_value = {
+        mock_probe.return_value = {
             "video_codec": "h264",
             "audio_codec": "aac",
             "container_format": "mov,mp4,m4a,3gp,3g2,mj2",
+            "duration": 120.5,
         }
-        mock_duration.return_value = 120.5
 
         url = "https://example.com/video.mp4"
         is_valid, duration, codec_info, error = storage_manager.validate_video_url(url)
@@ -943,18 +969,15 @@ class TestVideoURLSupport:
         assert codec_info["video_codec"] == "h264"
         assert error == ""
 
-    @patch.object(StorageManager, "get_video_codec_info")
-    @patch.object(StorageManager, "get_video_duration")
-    def test_validate_video_url_vp9_success(
-        self, mock_duration, mock_codec, storage_manager
-    ):
+    @patch.object(StorageManager, "probe_video")
+    def test_validate_video_url_vp9_success(self, mock_probe, storage_manager):
         """Test validation passes for VP9 codec URL."""
-        mock_codec.return_value = {
+        mock_probe.return_value = {
             "video_codec": "vp9",
             "audio_codec": "opus",
             "container_format": "webm",
+            "duration": 60.0,
         }
-        mock_duration.return_value = 60.0
 
         url = "https://example.com/video.webm"
         is_valid, duration, codec_info, error = storage_manager.validate_video_url(url)
@@ -963,18 +986,17 @@ class TestVideoURLSupport:
         assert duration == 60.0
         assert error == ""
 
-    @patch.object(StorageManager, "get_video_codec_info")
-    @patch.object(StorageManager, "get_video_duration")
+    @patch.object(StorageManager, "probe_video")
     def test_validate_video_url_no_duration_still_valid(
-        self, mock_duration, mock_codec, storage_manager
+        self, mock_probe, storage_manager
     ):
         """Test URL validation succeeds even if duration can't be detected."""
-        mock_codec.return_value = {
+        mock_probe.return_value = {
             "video_codec": "h264",
             "audio_codec": None,
             "container_format": "mp4",
+            "duration": None,  # Duration not available
         }
-        mock_duration.return_value = None  # Duration not available
 
         url = "https://example.com/video.mp4"
         is_valid, duration, codec_info, error = storage_manager.validate_video_url(url)
@@ -1004,10 +1026,10 @@ class TestVideoURLSupport:
         assert is_valid is False
         assert "Invalid URL format" in error
 
-    @patch.object(StorageManager, "get_video_codec_info")
-    def test_validate_video_url_inaccessible(self, mock_codec, storage_manager):
+    @patch.object(StorageManager, "probe_video")
+    def test_validate_video_url_inaccessible(self, mock_probe, storage_manager):
         """Test validation fails when URL is inaccessible."""
-        mock_codec.return_value = None  # ffprobe failed to access URL
+        mock_probe.return_value = None  # ffprobe failed to access URL
 
         url = "https://example.com/nonexistent.mp4"
         is_valid, duration, codec_info, error = storage_manager.validate_video_url(url)
@@ -1017,10 +1039,10 @@ class TestVideoURLSupport:
         assert codec_info is None
         assert "Could not retrieve video information" in error
 
-    @patch.object(StorageManager, "get_video_codec_info")
-    def test_validate_video_url_no_video_stream(self, mock_codec, storage_manager):
+    @patch.object(StorageManager, "probe_video")
+    def test_validate_video_url_no_video_stream(self, mock_probe, storage_manager):
         """Test validation fails when URL has no video stream."""
-        mock_codec.return_value = {
+        mock_probe.return_value = {
             "video_codec": None,  # No video stream
             "audio_codec": "aac",
             "container_format": "mp4",
@@ -1033,10 +1055,10 @@ class TestVideoURLSupport:
         assert codec_info is not None  # Codec info is returned even on failure
         assert "No video stream found" in error
 
-    @patch.object(StorageManager, "get_video_codec_info")
-    def test_validate_video_url_unsupported_codec(self, mock_codec, storage_manager):
+    @patch.object(StorageManager, "probe_video")
+    def test_validate_video_url_unsupported_codec(self, mock_probe, storage_manager):
         """Test validation fails for unsupported video codec."""
-        mock_codec.return_value = {
+        mock_probe.return_value = {
             "video_codec": "mpeg2video",  # Not browser-compatible
             "audio_codec": "mp2",
             "container_format": "mpeg",
@@ -1050,10 +1072,10 @@ class TestVideoURLSupport:
         assert "mpeg2video" in error
         assert "not supported by web browsers" in error
 
-    @patch.object(StorageManager, "get_video_codec_info")
-    def test_validate_video_url_wmv_rejected(self, mock_codec, storage_manager):
+    @patch.object(StorageManager, "probe_video")
+    def test_validate_video_url_wmv_rejected(self, mock_probe, storage_manager):
         """Test validation fails for WMV codec."""
-        mock_codec.return_value = {
+        mock_probe.return_value = {
             "video_codec": "wmv3",
             "audio_codec": "wma",
             "container_format": "asf",
@@ -1065,6 +1087,27 @@ class TestVideoURLSupport:
         assert is_valid is False
         assert "wmv3" in error
 
+    @patch("kiosk_show_replacement.storage.subprocess.run")
+    def test_validate_video_url_probes_once(self, mock_run, storage_manager):
+        """Test codecs and duration come from a single ffprobe run."""
+        mock_run.return_value = MagicMock(
+            returncode=0,
+            stdout=json.dumps(
+                {
+                    "streams": [{"codec_type": "video", "codec_name": "h264"}],
+                    "format": {"format_name": "mp4", "duration": "42.5"},
+                }
+            ),
+        )
+
+        url = "https://example.com/video.mp4"
+        is_valid, duration, codec_info, error = storage_manager.validate_video_url(url)
+
+        assert is_valid is True
+        assert duration == 42.5
+        assert codec_info["video_codec"] == "h264"
+        assert mock_run.call_count == 1
+
 
 class TestFileUploadAPI:
     """Test file upload API endpoints."""
@@ -1204,6 +1247,84 @@ class TestFileUploadAPI:
         assert json_data["data"]["content_type"] == "video"
         assert json_data["data"]["original_filename"] == "test.mp4"
 
+    def test_upload_image_is_streamed(
+        self,
+        client,
+        authenticated_user,
+        sample_slideshow,
+        sample_image_data,
+        isolated_storage,
+    ):
+        """Test uploads are parsed straight into a staging upload stream."""
+        data = {
+            "file": (BytesIO(sample_image_data), "test.png"),
+            "slideshow_id": str(sample_slideshow.id),
+        }
+
+        with patch.object(
+            StorageManager,
+            "open_upload_stream",
+            autospec=True,
+            side_effect=StorageManager.open_upload_stream,
+        ) as mock_open:
+            response = client.post(
+                "/api/v1/uploads/image", data=data, content_type="multipart/form-data"
+            )
+
+        assert response.status_code == 201
+        mock_open.assert_called_once()
+        checksum = response.get_json()["data"]["checksum"]
+        assert checksum == hashlib.sha256(sample_image_data).hexdigest()
+
+    def test_upload_refused_without_disk_space(
+        self,
+        app,
+        client,
+        authenticated_user,
+        sample_slideshow,
+        sample_image_data,
+        isolated_storage,
+        monkeypatch,
+    ):
+        """Test streamed uploads check free disk space before writing."""
+        monkeypatch.setitem(app.config, "STORAGE_MIN_FREE_BYTES", 10**18)
+        data = {
+            "file": (BytesIO(sample_image_data), "test.png"),
+            "slideshow_id": str(sample_slideshow.id),
+        }
+
+        response = client.post(
+            "/api/v1/uploads/image", data=data, content_type="multipart/form-data"
+        )
+
+        assert response.status_code == 500
+        assert response.get_json()["error"] == "Insufficient disk space"
+        staging = isolated_storage / StorageManager.STAGING_DIRECTORY
+        assert list(staging.iterdir()) == []
+
+    def test_upload_image_too_large(
+        self, app, client, authenticated_user, sample_slideshow, isolated_storage
+    ):
+        """Test oversized uploads are rejected without leaving staged data."""
+        data = {
+            "file": (BytesIO(b"x" * 2048), "big.png"),
+            "slideshow_id": str(sample_slideshow.id),
+        }
+
+        original = app.config["MAX_IMAGE_SIZE"]
+        app.config["MAX_IMAGE_SIZE"] = 1024
+        try:
+            response = client.post(
+                "/api/v1/uploads/image", data=data, content_type="multipart/form-data"
+            )
+        finally:
+            app.config["MAX_IMAGE_SIZE"] = original
+
+        assert response.status_code == 400
+        assert "exceeds maximum allowed size" in response.get_json()["error"]
+        staging = Path(app.config["UPLOAD_FOLDER"]) / StorageManager.STAGING_DIRECTORY
+        assert list(staging.iterdir()) == []
+
     def test_upload_video_invalid_extension(
         self, client, authenticated_user, sample_slideshow
     ):
@@ -3,11 +3,13 @@ Tests for storage resilience utilities.
 
 This module tests:
 - Atomic file writes
+- Single-pass upload streams
 - Disk space checking
 - Checksum calculation and verification
 - Safe file operations
 """
 
+import hashlib
 import tempfile
 from io import BytesIO
 from pathlib import Path
@@ -18,10 +20,12 @@ from werkzeug.datastructures import FileStorage
 from kiosk_show_replacement.exceptions import StorageError
 from kiosk_show_replacement.storage_resilience import (
     AtomicFileWriter,
+    UploadStream,
     calculate_checksum,
     calculate_stream_checksum,
     check_disk_space,
     cleanup_directory,
+    copy_to_upload_stream,
     delete_file_safe,
     save_file_atomic,
     verify_checksum,
@@ -208,6 +212,72 @@ class TestAtomicFileWriter:
                 assert target_path.read_text() == "original content"
 
 
+class TestUploadStream:
+    """Tests for single-pass upload streams."""
+
+    def test_hashes_and_commits_in_one_pass(self, app):
+        """Test written data is hashed and moved into place on commit."""
+        with app.app_context():
+            with tempfile.TemporaryDirectory() as tmpdir:
+                staging = Path(tmpdir) / "staging" / "upload.bin"
+                target = Path(tmpdir) / "final.bin"
+                content = b"chunk-one" + b"chunk-two"
+
+                upload = UploadStream(staging)
+                upload.write(b"chunk-one")
+                upload.write(b"chunk-two")
+                upload.commit(target)
+
+                assert target.read_bytes() == content
+                assert upload.size == len(content)
+                assert upload.checksum == hashlib.sha256(content).hexdigest()
+                assert list(staging.parent.iterdir()) == []
+
+    def test_stops_storing_after_max_size(self, app):
+        """Test oversized uploads are counted but not stored."""
+        with app.app_context():
+            with tempfile.TemporaryDirectory() as tmpdir:
+                staging = Path(tmpdir) / "upload.bin"
+
+                upload = UploadStream(staging, max_size=10)
+                upload.write(b"12345678")
+                upload.write(b"12345678")
+                upload.flush()
+
+                assert upload.exceeded is True
+                assert upload.size == 16
+                upload.seek(0)
+                assert upload.read() == b""
+
+                with pytest.raises(StorageError):
+                    upload.commit(Path(tmpdir) / "final.bin")
+                assert list(Path(tmpdir).iterdir()) == []
+
+    def test_close_discards_uncommitted_data(self, app):
+        """Test closing without committing removes the temp file."""
+        with app.app_context():
+            with tempfile.TemporaryDirectory() as tmpdir:
+                upload = UploadStream(Path(tmpdir) / "upload.bin")
+                upload.write(b"data")
+                upload.close()
+
+                assert list(Path(tmpdir).iterdir()) == []
+
+    def test_copy_to_upload_stream(self, app):
+        """Test a readable stream is copied into an upload stream."""
+        with app.app_context():
+            with tempfile.TemporaryDirectory() as tmpdir:
+                content = b"x" * 200000
+                upload = UploadStream(Path(tmpdir) / "upload.bin")
+
+                copy_to_upload_stream(BytesIO(content), upload, chunk_size=4096)
+                upload.seek(0)
+
+                assert upload.read() == content
+                assert upload.checksum == hashlib.sha256(content).hexdigest()
+                upload.close()
+
+
 class TestSaveFileAtomic:
     """Tests for atomic file saving."""
 
@@ -228,6 +298,7 @@ class TestSaveFileAtomic:
                 assert target_path.exists()
                 assert target_path.read_bytes() == content
                 assert "checksum" in result
+                assert result["checksum"] == hashlib.sha256(content).hexdigest()
                 assert result["size"] == len(content)
 
     def test_skips_checksum_when_disabled(self, app):
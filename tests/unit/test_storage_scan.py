@@ -0,0 +1,321 @@
+"""
+Tests for the background storage integrity scan.
+
+This module tests:
+- Reconciling the file catalog with changed directories only
+- Resuming an interrupted scan from its checkpoints
+- Running one scan at a time across processes with a lease
+- Recording orphaned, missing and corrupted files
+- The admin storage integrity API
+"""
+
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from sqlalchemy import update
+
+from kiosk_show_replacement import storage_scan
+from kiosk_show_replacement.leases import claim_lease
+from kiosk_show_replacement.models import (
+    JobLease,
+    SlideshowItem,
+    StorageScan,
+    StorageScanDirectory,
+    StoredFile,
+    db,
+)
+from kiosk_show_replacement.storage_scan import run_storage_scan
+
+OLD_MTIME = 1_700_000_000
+
+
+@pytest.fixture(autouse=True)
+def upload_folder(app, tmp_path, monkeypatch):
+    """Use an empty upload folder and unthrottled checksum verification."""
+    folder = tmp_path / "uploads"
+    folder.mkdir()
+    monkeypatch.setitem(app.config, "UPLOAD_FOLDER", str(folder))
+    monkeypatch.setitem(app.config, "STORAGE_SCAN_VERIFY_BYTES_PER_SECOND", 0)
+    return folder
+
+
+def _write_file(folder, path, data):
+    """Create a file below the upload folder, aging it and its directories."""
+    file_path = Path(folder) / path
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    file_path.write_bytes(data)
+    os.utime(file_path, (OLD_MTIME, OLD_MTIME))
+    for parent in file_path.relative_to(folder).parents:
+        if parent != Path("."):
+            os.utime(Path(folder) / parent, (OLD_MTIME, OLD_MTIME))
+    return file_path
+
+
+class TestDirectoryScan:
+    """Tests for reconciling the catalog with the upload folder."""
+
+    def test_scan_catalogs_files(self, app, upload_folder):
+        """Test a first scan lists every directory and catalogs its files."""
+        _write_file(upload_folder, "images/1/2/photo.jpg", b"photo")
+        _write_file(upload_folder, "videos/1/2/clip.mp4", b"clip")
+
+        with app.app_context():
+            scan = run_storage_scan()
+
+            assert scan.status == "completed"
+            assert scan.files_added == 2
+            # images, images/1, images/1/2 and the same for videos
+            assert scan.directories_scanned == 6
+            assert scan.directories_skipped == 0
+            assert {e.path for e in StoredFile.query.all()} == {
+                "images/1/2/photo.jpg",
+                "videos/1/2/clip.mp4",
+            }
+
+    def test_unchanged_directories_are_not_listed(self, app, upload_folder):
+        """Test only directories whose modification time changed are listed."""
+        _write_file(upload_folder, "images/1/2/photo.jpg", b"photo")
+        _write_file(upload_folder, "videos/1/2/clip.mp4", b"clip")
+
+        with app.app_context():
+            run_storage_scan()
+            (upload_folder / "images/1/2/new.jpg").write_bytes(b"new")
+            (upload_folder / "videos/1/2/clip.mp4").unlink()
+
+            scan = run_storage_scan()
+
+            assert scan.directories_scanned == 2
+            assert scan.directories_skipped == 4
+            assert (scan.files_added, scan.files_removed) == (1, 1)
+            assert {e.path for e in StoredFile.query.all()} == {
+                "images/1/2/photo.jpg",
+                "images/1/2/new.jpg",
+            }
+
+    def test_removed_directory_is_forgotten(self, app, upload_folder):
+        """Test a deleted directory drops its files and checkpoints."""
+        _write_file(upload_folder, "images/1/2/photo.jpg", b"photo")
+        _write_file(upload_folder, "images/3/4/other.jpg", b"other")
+
+        with app.app_context():
+            run_storage_scan()
+            (upload_folder / "images/3/4/other.jpg").unlink()
+            (upload_folder / "images/3/4").rmdir()
+            (upload_folder / "images/3").rmdir()
+
+            scan = run_storage_scan()
+
+            assert scan.files_removed == 1
+            assert [e.path for e in StoredFile.query.all()] == ["images/1/2/photo.jpg"]
+            paths = {row.path for row in StorageScanDirectory.query.all()}
+            assert paths == {"images", "images/1", "images/1/2"}
+
+    def test_interrupted_scan_resumes(self, app, upload_folder):
+        """Test a stale running scan resumes, skipping directories it visited."""
+        _write_file(upload_folder, "images/1/2/photo.jpg", b"photo")
+        _write_file(upload_folder, "videos/1/2/clip.mp4", b"clip")
+
+        with app.app_context():
+            interrupted = StorageScan(
+                status="running",
+                updated_at=datetime.now(timezone.utc) - timedelta(hours=1),
+            )
+            db.session.add(interrupted)
+            db.session.flush()
+            db.session.add(
+                StorageScanDirectory(path="videos", mtime_ns=0, scan_id=interrupted.id)
+            )
+            db.session.commit()
+
+            scan = run_storage_scan()
+
+            assert scan.id == interrupted.id
+            assert scan.status == "completed"
+            # videos was visited before the interruption and has no known
+            # subdirectories, so only images is listed
+            assert [e.path for e in StoredFile.query.all()] == ["images/1/2/photo.jpg"]
+
+    def test_running_scan_is_not_duplicated(self, app, upload_folder):
+        """Test no scan starts while another is in progress."""
+        with app.app_context():
+            db.session.add(StorageScan(status="running"))
+            db.session.commit()
+
+            assert run_storage_scan() is None
+            assert StorageScan.query.count() == 1
+
+
+class FakeClock:
+    """Stand-in for the time module whose sleep() advances the clock."""
+
+    def __init__(self, on_sleep=None):
+        self.now = 1000.0
+        self.sleeps = []
+        self.on_sleep = on_sleep
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+        if self.on_sleep is not None:
+            self.on_sleep()
+
+
+class TestScanLease:
+    """Tests for running one scan at a time across processes."""
+
+    def test_scan_held_by_another_process_is_not_started(self, app, upload_folder):
+        """Test no scan starts while another process holds the lease."""
+        with app.app_context():
+            assert claim_lease(storage_scan.SCAN_LEASE, 60) is not None
+
+            assert run_storage_scan() is None
+            assert StorageScan.query.count() == 0
+
+    def test_lease_is_released_after_scan(self, app, upload_folder):
+        """Test a finished scan lets the next one start at once."""
+        with app.app_context():
+            assert run_storage_scan().status == "completed"
+            assert run_storage_scan().status == "completed"
+
+    def test_throttled_verification_heartbeats(self, app, upload_folder, monkeypatch):
+        """Test long throttling sleeps are split by checkpoints."""
+        monkeypatch.setitem(app.config, "STORAGE_SCAN_VERIFY_BYTES_PER_SECOND", 10)
+        monkeypatch.setattr(storage_scan, "time", FakeClock())
+        _write_file(upload_folder, "videos/1/1/clip.mp4", b"x" * 1500)
+
+        with app.app_context():
+            scan = run_storage_scan(verify_checksums=True)
+
+            assert scan.status == "completed"
+        # 150 seconds of throttling, at most HEARTBEAT_SECONDS at a time
+        assert storage_scan.time.sleeps == [60, 60, 30]
+
+    def test_scan_taken_over_stops(self, app, upload_folder, monkeypatch):
+        """Test a scan whose lease was taken over stops without finishing."""
+        monkeypatch.setitem(app.config, "STORAGE_SCAN_VERIFY_BYTES_PER_SECOND", 10)
+
+        def take_over():
+            db.session.execute(
+                update(JobLease)
+                .where(JobLease.name == storage_scan.SCAN_LEASE)
+                .values(holder="other-process")
+            )
+
+        monkeypatch.setattr(storage_scan, "time", FakeClock(on_sleep=take_over))
+        _write_file(upload_folder, "videos/1/1/clip.mp4", b"x" * 1500)
+
+        with app.app_context():
+            assert run_storage_scan(verify_checksums=True) is None
+
+            scan = StorageScan.query.one()
+            assert scan.status == "running"
+            assert db.session.get(JobLease, storage_scan.SCAN_LEASE).holder == (
+                "other-process"
+            )
+
+
+class TestFindings:
+    """Tests for the issues recorded by a scan."""
+
+    def test_orphaned_and_missing_files(self, app, upload_folder, sample_slideshow):
+        """Test orphaned files and items with missing files are recorded."""
+        _write_file(upload_folder, "images/1/1/orphan.jpg", b"orphan")
+
+        with app.app_context():
+            item = SlideshowItem(
+                slideshow_id=sample_slideshow.id,
+                title="Missing",
+                content_type="image",
+                content_file_path="images/1/1/missing.jpg",
+            )
+            db.session.add(item)
+            db.session.commit()
+
+            scan = run_storage_scan()
+
+            issues = {issue.kind: issue for issue in scan.issues}
+            assert scan.issue_count == 2
+            assert issues["orphaned"].path == "images/1/1/orphan.jpg"
+            assert issues["orphaned"].file_size == len(b"orphan")
+            assert issues["missing"].path == "images/1/1/missing.jpg"
+            assert issues["missing"].slideshow_item_id == item.id
+
+    def test_checksum_mismatch(self, app, upload_folder, monkeypatch):
+        """Test a file changed in place fails checksum verification."""
+        monkeypatch.setitem(app.config, "STORAGE_SCAN_VERIFY_INTERVAL_HOURS", 0)
+        file_path = _write_file(upload_folder, "images/1/1/photo.jpg", b"original")
+
+        with app.app_context():
+            scan = run_storage_scan(verify_checksums=True)
+            assert scan.checksums_verified == 1
+            # Not referenced by an item, so also orphaned
+            assert [i.kind for i in scan.issues] == ["orphaned"]
+            assert StoredFile.query.one().verified_at is not None
+
+            # Same size and modification time, different content
+            file_path.write_bytes(b"modified")
+            os.utime(file_path, (OLD_MTIME, OLD_MTIME))
+
+            scan = run_storage_scan(verify_checksums=True)
+
+            assert scan.directories_scanned == 0
+            assert [(i.kind, i.path) for i in scan.issues] == [
+                ("orphaned", "images/1/1/photo.jpg"),
+                ("checksum_mismatch", "images/1/1/photo.jpg"),
+            ]
+
+    def test_verification_is_throttled(self, app, upload_folder, monkeypatch):
+        """Test verification sleeps to stay under the configured read rate."""
+        monkeypatch.setitem(app.config, "STORAGE_SCAN_VERIFY_BYTES_PER_SECOND", 10)
+        sleeps = []
+        monkeypatch.setattr(storage_scan.time, "sleep", sleeps.append)
+        _write_file(upload_folder, "images/1/1/photo.jpg", b"x" * 20)
+
+        with app.app_context():
+            scan = run_storage_scan(verify_checksums=True)
+
+        assert scan.bytes_verified == 20
+        assert len(sleeps) == 1
+        assert 1.5 < sleeps[0] <= 2
+
+
+class TestStorageIntegrityApi:
+    """Tests for the admin storage integrity endpoints."""
+
+    def test_start_scan_and_get_results(self, client, auth_headers, upload_folder):
+        """Test an admin can run a scan and read its results."""
+        _write_file(upload_folder, "images/1/1/orphan.jpg", b"orphan")
+
+        response = client.post("/api/v1/admin/storage/integrity/scan")
+        assert response.status_code == 202
+
+        response = client.get("/api/v1/admin/storage/integrity")
+        assert response.status_code == 200
+        data = response.get_json()["data"]
+        assert data["latest_scan"]["status"] == "completed"
+        assert data["latest_scan"]["issue_count"] == 1
+        assert data["running_scan"] is None
+        assert [i["kind"] for i in data["issues"]] == ["orphaned"]
+
+    def test_scan_in_progress_conflicts(self, app, client, auth_headers):
+        """Test starting a scan while one is running returns 409."""
+        with app.app_context():
+            db.session.add(StorageScan(status="running"))
+            db.session.commit()
+
+        response = client.post("/api/v1/admin/storage/integrity/scan")
+        assert response.status_code == 409
+
+        data = client.get("/api/v1/admin/storage/integrity").get_json()["data"]
+        assert data["running_scan"]["status"] == "running"
+        assert data["latest_scan"] is None
+
+    def test_requires_admin(self, client, authenticated_user):
+        """Test non-admin users cannot read or start scans."""
+        assert client.get("/api/v1/admin/storage/integrity").status_code == 403
+        assert client.post("/api/v1/admin/storage/integrity/scan").status_code == 403
@@ -0,0 +1,386 @@
+"""
+Tests for the display telemetry store.
+
+This module tests:
+- Buffering and batched flushing of telemetry samples
+- Heartbeat telemetry recorded by the heartbeat endpoints
+- Client telemetry submission endpoint
+- Downsampling and retention of old samples
+- Aggregated telemetry series API
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import delete
+
+from kiosk_show_replacement import telemetry
+from kiosk_show_replacement.leases import claim_lease
+from kiosk_show_replacement.models import Display, DisplayTelemetry, db
+from kiosk_show_replacement.telemetry import (
+    DOWNSAMPLE_LEASE,
+    TelemetryBuffer,
+    downsample_telemetry,
+    flush_telemetry,
+    get_telemetry_series,
+    record_telemetry,
+    telemetry_buffer,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_telemetry_buffer():
+    """Ensure the global telemetry buffer is empty around each test."""
+    telemetry_buffer.drain()
+    yield
+    telemetry_buffer.drain()
+
+
+@pytest.fixture
+def display(app):
+    """Create a display for telemetry tests."""
+    with app.app_context():
+        display = Display(name="telemetry-display", heartbeat_interval=60)
+        db.session.add(display)
+        db.session.commit()
+        yield display
+
+
+class TestTelemetryBuffer:
+    """Tests for the TelemetryBuffer class."""
+
+    def test_add_and_drain(self):
+        """Test samples are returned once by drain()."""
+        buffer = TelemetryBuffer()
+        buffer.add({"display_id": 1})
+        buffer.add({"display_id": 2})
+
+        assert len(buffer) == 2
+        assert [s["display_id"] for s in buffer.drain()] == [1, 2]
+        assert len(buffer) == 0
+
+    def test_drops_when_full(self):
+        """Test samples beyond max_size are dropped and counted."""
+        buffer = TelemetryBuffer(max_size=2)
+        results = [buffer.add({"n": i}) for i in range(3)]
+
+        assert results == [True, True, False]
+        assert buffer.dropped == 1
+
+
+class TestRecordAndFlush:
+    """Tests for recording and flushing telemetry."""
+
+    def test_record_rejects_unknown_kind(self):
+        """Test an unknown telemetry kind raises ValueError."""
+        with pytest.raises(ValueError):
+            record_telemetry(1, "bogus")
+
+    def test_flush_writes_buffered_samples(self, app, display):
+        """Test buffered samples are written in one flush."""
+        with app.app_context():
+            record_telemetry(display.id, "render", value=12.5)
+            record_telemetry(display.id, "error", detail="boom")
+
+            assert DisplayTelemetry.query.count() == 0
+            assert flush_telemetry() == 2
+
+            rows = DisplayTelemetry.query.order_by(DisplayTelemetry.id).all()
+            assert [r.kind for r in rows] == ["render", "error"]
+            assert rows[0].value_sum == 12.5
+            assert rows[1].detail == "boom"
+            assert all(r.bucket_seconds == 0 for r in rows)
+
+    def test_flush_discards_samples_for_missing_displays(self, app, display):
+        """Test samples for deleted displays do not break the batch."""
+        with app.app_context():
+            record_telemetry(display.id, "render", value=1.0)
+            record_telemetry(display.id + 1000, "render", value=2.0)
+
+            assert flush_telemetry() == 1
+            assert DisplayTelemetry.query.count() == 1
+
+    def test_flush_empty_buffer(self, app):
+        """Test flushing an empty buffer is a no-op."""
+        with app.app_context():
+            assert flush_telemetry() == 0
+
+
+class TestHeartbeatTelemetry:
+    """Tests for heartbeat telemetry recorded by the heartbeat endpoint."""
+
+    def test_heartbeat_records_interval_and_resolution(self, app, client, display):
+        """Test heartbeats buffer samples with interval and resolution."""
+        with app.app_context():
+            display.last_seen_at = datetime.now(timezone.utc) - timedelta(seconds=30)
+            db.session.commit()
+
+        response = client.post(
+            "/display/telemetry-display/heartbeat",
+            json={"resolution": {"width": 1920, "height": 1080}},
+        )
+        assert response.status_code == 200
+
+        samples = telemetry_buffer.drain()
+        assert len(samples) == 1
+        assert samples[0]["kind"] == "heartbeat"
+        assert samples[0]["resolution_width"] == 1920
+        assert 29 <= samples[0]["value_sum"] <= 35
+
+    def test_heartbeat_does_not_write_telemetry_immediately(self, app, client, display):
+        """Test the heartbeat request itself does not insert telemetry rows."""
+        client.post("/display/telemetry-display/heartbeat", json={})
+
+        with app.app_context():
+            assert DisplayTelemetry.query.count() == 0
+
+
+class TestTelemetrySubmission:
+    """Tests for the client telemetry submission endpoint."""
+
+    def test_submit_render_and_error_events(self, app, client, display):
+        """Test render timings and errors are accepted and buffered."""
+        response = client.post(
+            "/display/telemetry-display/telemetry",
+            json={
+                "events": [
+                    {"kind": "render", "value": 42.5},
+                    {"kind": "error", "detail": "Failed to load video"},
+                    {"kind": "heartbeat"},
+                    {"kind": "render", "value": "not-a-number"},
+                ]
+            },
+        )
+
+        assert response.status_code == 200
+        assert response.get_json()["accepted"] == 2
+        kinds = [s["kind"] for s in telemetry_buffer.drain()]
+        assert kinds == ["render", "error"]
+
+    def test_submit_drops_non_finite_values(self, app, client, display):
+        """Test NaN, Infinity and out-of-range render values are dropped."""
+        # Python's JSON parser accepts these non-standard literals
+        response = client.post(
+            "/display/telemetry-display/telemetry",
+            data=(
+                '{"events": [{"kind": "render", "value": NaN}, '
+                '{"kind": "render", "value": Infinity}, '
+                '{"kind": "render", "value": -5}, '
+                '{"kind": "render", "value": 12}]}'
+            ),
+            content_type="application/json",
+        )
+
+        assert response.status_code == 200
+        assert response.get_json()["accepted"] == 1
+        assert [s["value_sum"] for s in telemetry_buffer.drain()] == [12.0]
+
+    def test_submit_requires_events_list(self, client, display):
+        """Test a payload without an events list is rejected."""
+        response = client.post("/display/telemetry-display/telemetry", json={})
+        assert response.status_code == 400
+
+    def test_submit_unknown_display(self, client):
+        """Test telemetry for an unknown display returns 404."""
+        response = client.post(
+            "/display/no-such-display/telemetry", json={"events": []}
+        )
+        assert response.status_code == 404
+
+
+class TestDownsampling:
+    """Tests for telemetry downsampling and retention."""
+
+    def test_old_raw_samples_are_rolled_up(self, app, display):
+        """Test raw samples past retention are folded into hourly rollups."""
+        now = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+        old_hour = datetime(2026, 3, 5, 8, 0, tzinfo=timezone.utc)
+        with app.app_context():
+            for minute, value in ((1, 10.0), (20, 30.0), (40, 20.0)):
+                record_telemetry(
+                    display.id,
+                    "render",
+                    value=value,
+                    recorded_at=old_hour + timedelta(minutes=minute),
+                )
+            record_telemetry(display.id, "render", value=5.0, recorded_at=now)
+            flush_telemetry()
+
+            result = downsample_telemetry(now=now)
+
+            assert result["rolled_up"] == 3
+            assert result["rollups_created"] == 1
+            rollup = DisplayTelemetry.query.filter(
+                DisplayTelemetry.bucket_seconds > 0
+            ).one()
+            assert rollup.sample_count == 3
+            assert rollup.value_sum == 60.0
+            assert rollup.value_min == 10.0
+            assert rollup.value_max == 30.0
+            # The recent raw sample is kept as-is
+            assert DisplayTelemetry.query.filter_by(bucket_seconds=0).count() == 1
+
+    def test_expired_rollups_are_deleted(self, app, display):
+        """Test rollups older than the rollup retention are deleted."""
+        now = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+        with app.app_context():
+            db.session.add(
+                DisplayTelemetry(
+                    display_id=display.id,
+                    kind="heartbeat",
+                    recorded_at=now - timedelta(days=200),
+                    bucket_seconds=3600,
+                    sample_count=60,
+                )
+            )
+            db.session.commit()
+
+            result = downsample_telemetry(now=now)
+
+            assert result["deleted"] == 1
+            assert DisplayTelemetry.query.count() == 0
+
+    def _old_samples(self, display, now):
+        """Record and flush raw samples past the raw retention."""
+        for minute in (1, 20):
+            record_telemetry(
+                display.id,
+                "render",
+                value=10.0,
+                recorded_at=now - timedelta(days=5, minutes=minute),
+            )
+        flush_telemetry()
+
+    def test_downsampling_in_another_process_is_not_repeated(self, app, display):
+        """Test a run is skipped while another process holds the lease."""
+        now = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+        with app.app_context():
+            self._old_samples(display, now)
+            assert claim_lease(DOWNSAMPLE_LEASE, 60) is not None
+
+            result = downsample_telemetry(now=now)
+
+            assert result == {"rolled_up": 0, "rollups_created": 0, "deleted": 0}
+            assert DisplayTelemetry.query.filter_by(bucket_seconds=0).count() == 2
+
+    def test_rows_folded_elsewhere_are_not_counted_twice(
+        self, app, display, monkeypatch
+    ):
+        """Test no rollup is inserted for a batch another process deleted."""
+        now = datetime(2026, 3, 10, 12, 0, tzinfo=timezone.utc)
+        rollup_key = telemetry._rollup_key
+
+        def rollup_key_after_concurrent_delete(row, bucket_seconds):
+            # Another process folds the first sample of the batch meanwhile
+            db.session.execute(
+                delete(DisplayTelemetry).where(DisplayTelemetry.id == row.id)
+            )
+            return rollup_key(row, bucket_seconds)
+
+        with app.app_context():
+            self._old_samples(display, now)
+            monkeypatch.setattr(
+                telemetry, "_rollup_key", rollup_key_after_concurrent_delete
+            )
+
+            result = downsample_telemetry(now=now)
+
+            assert result["rolled_up"] == 0
+            assert (
+                DisplayTelemetry.query.filter(
+                    DisplayTelemetry.bucket_seconds > 0
+                ).count()
+                == 0
+            )
+
+
+class TestTelemetrySeries:
+    """Tests for aggregated telemetry series."""
+
+    def test_series_aggregates_raw_and_rollup_rows(self, app, display):
+        """Test buckets combine raw samples and rollups."""
+        start = datetime(2026, 3, 10, 10, 0, tzinfo=timezone.utc)
+        with app.app_context():
+            record_telemetry(display.id, "render", value=10.0, recorded_at=start)
+            record_telemetry(
+                display.id,
+                "render",
+                value=30.0,
+                recorded_at=start + timedelta(minutes=2),
+            )
+            flush_telemetry()
+            db.session.add(
+                DisplayTelemetry(
+                    display_id=display.id,
+                    kind="render",
+                    recorded_at=start + timedelta(hours=1),
+                    bucket_seconds=3600,
+                    sample_count=4,
+                    value_sum=80.0,
+                    value_min=5.0,
+                    value_max=50.0,
+                )
+            )
+            db.session.commit()
+
+            series = get_telemetry_series(
+                display, "render", start, start + timedelta(hours=2), 3600
+            )
+
+        assert len(series) == 2
+        assert series[0]["count"] == 2
+        assert series[0]["avg"] == 20.0
+        assert series[1]["count"] == 4
+        assert series[1]["avg"] == 20.0
+        assert series[1]["max"] == 50.0
+
+    def test_heartbeat_series_includes_uptime(self, app, display):
+        """Test heartbeat buckets report an uptime ratio."""
+        start = datetime(2026, 3, 10, 10, 0, tzinfo=timezone.utc)
+        with app.app_context():
+            for minute in range(5):
+                record_telemetry(
+                    display.id,
+                    "heartbeat",
+                    value=60.0,
+                    recorded_at=start + timedelta(minutes=minute),
+                )
+            flush_telemetry()
+
+            series = get_telemetry_series(
+                display, "heartbeat", start, start + timedelta(minutes=10), 600
+            )
+
+        # 5 heartbeats out of 10 expected at a 60 second interval
+        assert series[0]["uptime"] == 0.5
+
+    def test_telemetry_api(self, app, client, authenticated_user, display):
+        """Test the telemetry API returns an aggregated series."""
+        with app.app_context():
+            record_telemetry(display.id, "heartbeat", value=60.0)
+            flush_telemetry()
+
+        response = client.get(
+            f"/api/v1/displays/{display.id}/telemetry?kind=heartbeat&hours=1"
+        )
+
+        assert response.status_code == 200
+        data = response.get_json()["data"]
+        assert data["kind"] == "heartbeat"
+        assert data["bucket_seconds"] == 300
+        assert sum(point["count"] for point in data["series"]) == 1
+
+    def test_telemetry_api_validates_parameters(
+        self, client, authenticated_user, display
+    ):
+        """Test invalid kind and bucket parameters are rejected."""
+        response = client.get(f"/api/v1/displays/{display.id}/telemetry?kind=bogus")
+        assert response.status_code == 400
+
+        response = client.get(f"/api/v1/displays/{display.id}/telemetry?bucket=5")
+        assert response.status_code == 400
+
+    def test_telemetry_api_requires_authentication(self, client, display):
+        """Test the telemetry API requires authentication."""
+        response = client.get(f"/api/v1/displays/{display.id}/telemetry")
+        assert response.status_code == 401
@@ -0,0 +1,635 @@
+"""
+Tests for ffmpeg video transcoding.
+
+This module tests:
+- Building ffmpeg command lines for each output format
+- Converting videos with unsupported codecs instead of rejecting them
+- Lower-bitrate renditions chosen by display resolution
+- Progress reporting over SSE and cancellation of transcode jobs
+"""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event as sa_event
+from sqlalchemy import select, update
+
+from kiosk_show_replacement import transcode
+from kiosk_show_replacement.models import (
+    Display,
+    MediaBlob,
+    MediaTranscode,
+    StoredFile,
+    db,
+)
+from kiosk_show_replacement.sse import sse_manager
+from kiosk_show_replacement.storage import StorageManager
+from kiosk_show_replacement.transcode import build_ffmpeg_command, run_transcode
+from tests.conftest import MP4_DATA, post_upload
+
+H264_PROBE = {
+    "video_codec": "h264",
+    "audio_codec": "aac",
+    "container_format": "mov,mp4,m4a,3gp,3g2,mj2",
+    "duration": 10.0,
+}
+
+MPEG1_PROBE = {
+    "video_codec": "mpeg1video",
+    "audio_codec": "mp2",
+    "container_format": "mpeg",
+    "duration": 10.0,
+}
+
+
+class FakeProcess:
+    """Stand-in for a running ffmpeg process."""
+
+    def __init__(self, lines, returncode):
+        self.stdout = lines
+        self.returncode = returncode
+        self.killed = False
+
+    def wait(self):
+        return -9 if self.killed else self.returncode
+
+    def poll(self):
+        return self.wait()
+
+    def kill(self):
+        self.killed = True
+
+    terminate = kill
+
+
+class FakeFfmpeg:
+    """Replacement for subprocess.Popen that writes ffmpeg's output file."""
+
+    def __init__(self, returncode=0, lines=None):
+        self.returncode = returncode
+        self.lines = lines
+        self.commands = []
+
+    def __call__(self, command, stdout, stderr, text):
+        self.commands.append(command)
+        if self.returncode == 0:
+            Path(command[-1]).write_bytes(b"transcoded")
+        else:
+            stderr.write(b"Unknown encoder 'libx264'\n")
+        lines = self.lines
+        if lines is None:
+            lines = ["out_time_us=5000000\n", "progress=continue\n", "progress=end\n"]
+        return FakeProcess(lines, self.returncode)
+
+
+@pytest.fixture(autouse=True)
+def transcode_config(app, isolated_storage, monkeypatch):
+    """Enable transcoding, without renditions, for each test."""
+    monkeypatch.setitem(app.config, "VIDEO_TRANSCODE_ENABLED", True)
+    monkeypatch.setitem(app.config, "VIDEO_TRANSCODE_RENDITIONS", "")
+
+
+@pytest.fixture
+def ffmpeg():
+    """Replace ffmpeg with a fake that succeeds."""
+    fake = FakeFfmpeg()
+    with patch("kiosk_show_replacement.transcode.subprocess.Popen", fake):
+        yield fake
+
+
+@pytest.fixture
+def admin_events(authenticated_user):
+    """Collect SSE events sent to an admin connection."""
+    connection = sse_manager.create_connection(
+        user_id=authenticated_user.id, connection_type="admin"
+    )
+    yield connection
+    sse_manager.remove_connection(connection.connection_id)
+
+
+def _run_queued_transcodes(app):
+    """Run every queued transcode job, as the worker pool would."""
+    with app.app_context():
+        job_ids = [
+            job.id
+            for job in MediaTranscode.query.filter_by(status="queued").order_by(
+                MediaTranscode.id
+            )
+        ]
+        for job_id in job_ids:
+            run_transcode(job_id)
+
+
+def _drain_events(connection):
+    """Return the events queued for a connection."""
+    events = []
+    while not connection.event_queue.empty():
+        events.append(connection.event_queue.get_nowait())
+    return events
+
+
+class TestBuildFfmpegCommand:
+    """Tests for the ffmpeg command line."""
+
+    def test_mp4_uses_h264_and_aac(self):
+        """Test MP4 output is H.264/AAC with a capped bitrate and progress."""
+        command = build_ffmpeg_command(
+            Path("in.avi"), Path("out.mp4"), "mp4", 720, 2500
+        )
+
+        assert command[0] == "ffmpeg"
+        assert command[-1] == "out.mp4"
+        assert command[command.index("-c:v") + 1] == "libx264"
+        assert command[command.index("-c:a") + 1] == "aac"
+        assert command[command.index("-b:v") + 1] == "2500k"
+        assert command[command.index("-maxrate") + 1] == "2500k"
+        assert "min(720," in command[command.index("-vf") + 1]
+        assert command[command.index("-progress") + 1] == "pipe:1"
+
+    def test_webm_uses_vp9_and_opus(self):
+        """Test WebM output is VP9/Opus."""
+        command = build_ffmpeg_command(
+            Path("in.avi"), Path("out.webm"), "webm", 1080, 5000
+        )
+
+        assert command[command.index("-c:v") + 1] == "libvpx-vp9"
+        assert command[command.index("-c:a") + 1] == "libopus"
+        assert command[command.index("-f") + 1] == "webm"
+
+
+@patch.object(StorageManager, "probe_video", return_value=MPEG1_PROBE)
+class TestUnsupportedCodecTranscoding:
+    """Tests for converting videos browsers cannot play."""
+
+    def test_unsupported_video_is_converted(
+        self,
+        mock_probe,
+        app,
+        client,
+        sample_slideshow,
+        ffmpeg,
+        admin_events,
+        isolated_storage,
+    ):
+        """Test the video is converted and slides play the converted copy."""
+        response = post_upload(client, sample_slideshow.id, "video")
+
+        assert response.status_code == 201
+        data = response.get_json()["data"]
+        # The upload does not wait for the conversion
+        assert data["probe_status"] == "transcoding"
+        assert ffmpeg.commands == []
+
+        _run_queued_transcodes(app)
+
+        with app.app_context():
+            blob = db.session.get(MediaBlob, data["media_blob_id"])
+            job = blob.transcodes[0]
+            assert job.kind == "primary"
+            assert job.status == "completed"
+            assert job.progress == 1.0
+            assert job.file_path.endswith("_1080p_5000k.mp4")
+            assert (Path(isolated_storage) / job.file_path).read_bytes() == (
+                b"transcoded"
+            )
+            assert (Path(isolated_storage) / blob.file_path).exists()
+            catalogued = db.session.execute(
+                select(StoredFile).where(StoredFile.path == job.file_path)
+            ).scalar_one()
+            assert catalogued.content_type == "video"
+            assert catalogued.file_size == len(b"transcoded")
+
+        events = _drain_events(admin_events)
+        statuses = [
+            e.data["status"] for e in events if e.event_type == "media.transcode"
+        ]
+        assert statuses == ["queued", "running", "completed"]
+        probed = [e.data for e in events if e.event_type == "media.probed"]
+        assert [e["probe_status"] for e in probed] == ["transcoding", "ready"]
+
+        response = client.post(
+            f"/api/v1/slideshows/{sample_slideshow.id}/items",
+            json={
+                "title": "Converted",
+                "content_type": "video",
+                "content_file_path": data["file_path"],
+            },
+        )
+        assert response.status_code == 201
+        assert response.get_json()["data"]["display_url"] == f"/uploads/{job.file_path}"
+
+    def test_item_listing_loads_transcodes_in_bulk(
+        self, mock_probe, app, client, authenticated_user, sample_slideshow, ffmpeg
+    ):
+        """Test listing items does not query each video's blob and transcodes."""
+        for i in range(3):
+            response = post_upload(
+                client, sample_slideshow.id, "video", MP4_DATA + bytes([i])
+            )
+            response = client.post(
+                f"/api/v1/slideshows/{sample_slideshow.id}/items",
+                json={
+                    "title": f"Video {i}",
+                    "content_type": "video",
+                    "content_file_path": response.get_json()["data"]["file_path"],
+                },
+            )
+            assert response.status_code == 201
+        _run_queued_transcodes(app)
+
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            if "FROM media_" in statement:
+                statements.append(statement)
+
+        with app.app_context():
+            sa_event.listen(db.engine, "before_cursor_execute", record)
+            try:
+                response = client.get(f"/api/v1/slideshows/{sample_slideshow.id}/items")
+            finally:
+                sa_event.remove(db.engine, "before_cursor_execute", record)
+
+        videos = [
+            i for i in response.get_json()["data"] if i["content_type"] == "video"
+        ]
+        assert len(videos) == 3
+        assert all("_1080p_5000k.mp4" in item["display_url"] for item in videos)
+        assert len(statements) == 2
+
+    def test_failed_conversion_rejects_video(
+        self,
+        mock_probe,
+        app,
+        client,
+        authenticated_user,
+        sample_slideshow,
+        isolated_storage,
+    ):
+        """Test an ffmpeg failure rejects the uploaded video."""
+        response = post_upload(client, sample_slideshow.id, "video")
+        assert response.status_code == 201
+        blob_id = response.get_json()["data"]["media_blob_id"]
+
+        with patch(
+            "kiosk_show_replacement.transcode.subprocess.Popen",
+            FakeFfmpeg(returncode=1),
+        ):
+            _run_queued_transcodes(app)
+
+        with app.app_context():
+            blob = db.session.get(MediaBlob, blob_id)
+            assert blob.probe_status == "rejected"
+            assert "could not be converted" in blob.probe_error
+            assert "Unknown encoder" in blob.probe_error
+            job = MediaTranscode.query.one()
+            assert job.status == "failed"
+            output_dir = (Path(isolated_storage) / job.file_path).parent
+            assert not list(output_dir.glob("*"))
+            assert not list(Path(isolated_storage).glob("media/videos/*/*"))
+
+    def test_failed_conversion_keeps_file_used_by_items(
+        self,
+        mock_probe,
+        app,
+        client,
+        authenticated_user,
+        sample_slideshow,
+        isolated_storage,
+    ):
+        """Test a video rejected after conversion keeps its file for items."""
+        data = post_upload(client, sample_slideshow.id, "video").get_json()["data"]
+        response = client.post(
+            f"/api/v1/slideshows/{sample_slideshow.id}/items",
+            json={
+                "title": "Converting",
+                "content_type": "video",
+                "content_file_path": data["file_path"],
+            },
+        )
+        assert response.status_code == 201
+
+        with patch(
+            "kiosk_show_replacement.transcode.subprocess.Popen",
+            FakeFfmpeg(returncode=1),
+        ):
+            _run_queued_transcodes(app)
+
+        with app.app_context():
+            blob = db.session.get(MediaBlob, data["media_blob_id"])
+            assert blob.probe_status == "rejected"
+            assert blob.ref_count == 1
+        assert (Path(isolated_storage) / data["file_path"]).exists()
+
+    def test_disabled_transcoding_rejects_video(
+        self, mock_probe, app, client, authenticated_user, sample_slideshow, monkeypatch
+    ):
+        """Test unsupported codecs are still rejected unless transcoding is on."""
+        monkeypatch.setitem(app.config, "VIDEO_TRANSCODE_ENABLED", False)
+
+        response = post_upload(client, sample_slideshow.id, "video")
+
+        assert response.status_code == 400
+        assert "mpeg1video" in response.get_json()["error"]
+        with app.app_context():
+            assert MediaTranscode.query.count() == 0
+
+
+@patch.object(StorageManager, "probe_video", return_value=H264_PROBE)
+class TestRenditions:
+    """Tests for lower-bitrate renditions."""
+
+    def test_display_plays_rendition_for_its_resolution(
+        self,
+        mock_probe,
+        app,
+        client,
+        authenticated_user,
+        sample_slideshow,
+        ffmpeg,
+        monkeypatch,
+    ):
+        """Test small displays get the smallest rendition covering their height."""
+        monkeypatch.setitem(
+            app.config, "VIDEO_TRANSCODE_RENDITIONS", "720:2500,480:1000"
+        )
+        data = post_upload(client, sample_slideshow.id, "video").get_json()["data"]
+        _run_queued_transcodes(app)
+        response = client.post(
+            f"/api/v1/slideshows/{sample_slideshow.id}/items",
+            json={
+                "title": "Clip",
+                "content_type": "video",
+                "content_file_path": data["file_path"],
+            },
+        )
+        item = response.get_json()["data"]
+        assert item["display_url"].endswith(".mp4")
+        assert "transcodes" not in item["display_url"]
+
+        with app.app_context():
+            jobs = MediaTranscode.query.order_by(MediaTranscode.max_height).all()
+            assert [(j.kind, j.max_height, j.status) for j in jobs] == [
+                ("rendition", 480, "completed"),
+                ("rendition", 720, "completed"),
+            ]
+            db.session.add_all(
+                [
+                    Display(
+                        name="small-kiosk",
+                        resolution_width=800,
+                        resolution_height=480,
+                        current_slideshow_id=sample_slideshow.id,
+                    ),
+                    Display(
+                        name="portrait-kiosk",
+                        resolution_width=1280,
+                        resolution_height=720,
+                        rotation=90,
+                        current_slideshow_id=sample_slideshow.id,
+                    ),
+                ]
+            )
+            db.session.commit()
+
+        def slide_url(display_name):
+            slides = client.get(f"/display/{display_name}/slideshow/current")
+            slide = next(
+                s for s in slides.get_json()["slides"] if s["id"] == item["id"]
+            )
+            return slide["display_url"]
+
+        assert slide_url("small-kiosk").endswith("_480p_1000k.mp4")
+        # Rotated to portrait, the content area is 1280 pixels tall
+        assert slide_url("portrait-kiosk") == item["display_url"]
+
+    def test_renditions_requested_through_api(
+        self, mock_probe, app, client, authenticated_user, sample_slideshow, ffmpeg
+    ):
+        """Test renditions can be added to an uploaded video."""
+        data = post_upload(client, sample_slideshow.id, "video").get_json()["data"]
+
+        response = client.post(
+            f"/api/v1/media/{data['media_blob_id']}/transcodes",
+            json={"max_height": 360, "bitrate_kbps": 600},
+        )
+
+        assert response.status_code == 202
+        jobs = response.get_json()["data"]
+        assert len(jobs) == 1
+        assert jobs[0]["status"] == "queued"
+        assert ffmpeg.commands == []
+
+        _run_queued_transcodes(app)
+        assert "-b:v" in ffmpeg.commands[0]
+
+        media = client.get(f"/api/v1/media/{data['media_blob_id']}").get_json()
+        transcodes = media["data"]["transcodes"]
+        assert [t["max_height"] for t in transcodes] == [360]
+        assert transcodes[0]["status"] == "completed"
+        assert transcodes[0]["url"].endswith("_360p_600k.mp4")
+
+        response = client.post(
+            f"/api/v1/media/{data['media_blob_id']}/transcodes",
+            json={"max_height": 50, "bitrate_kbps": 600},
+        )
+        assert response.status_code == 400
+
+
+@patch.object(StorageManager, "probe_video", return_value=H264_PROBE)
+class TestCancellation:
+    """Tests for cancelling transcode jobs."""
+
+    def _queued_job(self, app, client, sample_slideshow, kind="rendition"):
+        """Upload a video and add a queued job for it without running it."""
+        data = post_upload(client, sample_slideshow.id, "video").get_json()["data"]
+        with app.app_context():
+            job = MediaTranscode(
+                media_blob_id=data["media_blob_id"],
+                kind=kind,
+                format="mp4",
+                max_height=480,
+                bitrate_kbps=1000,
+                file_path=f"media/transcodes/test_{kind}.mp4",
+            )
+            db.session.add(job)
+            if kind == "primary":
+                db.session.get(MediaBlob, data["media_blob_id"]).probe_status = (
+                    "transcoding"
+                )
+            db.session.commit()
+            return data["media_blob_id"], job.id
+
+    def test_cancel_queued_job(
+        self, mock_probe, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test a queued job is cancelled and skipped by the worker."""
+        blob_id, job_id = self._queued_job(app, client, sample_slideshow)
+
+        response = client.post(f"/api/v1/media/{blob_id}/transcodes/{job_id}/cancel")
+
+        assert response.status_code == 200
+        assert response.get_json()["data"]["status"] == "cancelled"
+        with app.app_context():
+            assert run_transcode(job_id).status == "cancelled"
+
+        response = client.post(f"/api/v1/media/{blob_id}/transcodes/{job_id}/cancel")
+        assert response.status_code == 409
+
+    def test_cancelling_conversion_rejects_video(
+        self, mock_probe, app, client, authenticated_user, sample_slideshow
+    ):
+        """Test cancelling a primary job rejects the unplayable video."""
+        blob_id, job_id = self._queued_job(
+            app, client, sample_slideshow, kind="primary"
+        )
+
+        client.post(f"/api/v1/media/{blob_id}/transcodes/{job_id}/cancel")
+
+        with app.app_context():
+            blob = db.session.get(MediaBlob, blob_id)
+            assert blob.probe_status == "rejected"
+            assert "cancelled" in blob.probe_error
+
+    def test_running_job_reports_progress_and_stops_when_cancelled(
+        self,
+        mock_probe,
+        app,
+        client,
+        authenticated_user,
+        sample_slideshow,
+        admin_events,
+        isolated_storage,
+        monkeypatch,
+    ):
+        """Test progress is pushed and a cancellation stops ffmpeg."""
+        monkeypatch.setattr(transcode, "PROGRESS_INTERVAL", 0)
+        blob_id, job_id = self._queued_job(app, client, sample_slideshow)
+        _drain_events(admin_events)
+
+        def ffmpeg_output():
+            yield "out_time_us=2500000\n"
+            yield "progress=continue\n"
+            # Another request cancels the job while ffmpeg runs
+            db.session.execute(
+                update(MediaTranscode)
+                .where(MediaTranscode.id == job_id)
+                .values(status="cancelled", error="Cancelled")
+            )
+            yield "out_time_us=5000000\n"
+            yield "progress=continue\n"
+            yield "out_time_us=7500000\n"
+
+        fake = FakeFfmpeg(lines=ffmpeg_output())
+        with (
+            app.app_context(),
+            patch("kiosk_show_replacement.transcode.subprocess.Popen", fake),
+        ):
+            job = run_transcode(job_id)
+
+            assert job.status == "cancelled"
+            assert not (Path(isolated_storage) / job.file_path).exists()
+            assert not list(
+                (Path(isolated_storage) / job.file_path).parent.glob(".*.part")
+            )
+
+        progress = [
+            (e.data["status"], e.data["progress"])
+            for e in _drain_events(admin_events)
+            if e.event_type == "media.transcode"
+        ]
+        assert progress[0] == ("running", 0.0)
+        assert ("running", 0.25) in progress
+        assert progress[-1][0] == "cancelled"
+        assert ("running", 0.75) not in progress
+
+
+@patch.object(StorageManager, "probe_video", return_value=H264_PROBE)
+class TestDispatch:
+    """Tests for handing queued jobs to the worker pool."""
+
+    def test_full_pool_leaves_jobs_queued(
+        self,
+        mock_probe,
+        app,
+        client,
+        authenticated_user,
+        sample_slideshow,
+        ffmpeg,
+        monkeypatch,
+    ):
+        """Test jobs the pool cannot take are not run by the caller."""
+        monkeypatch.setitem(
+            app.config, "VIDEO_TRANSCODE_RENDITIONS", "720:2500,480:1000"
+        )
+        monkeypatch.setitem(app.config, "VIDEO_TRANSCODE_WORKERS", 1)
+        with patch.object(transcode.transcode_pool, "submit", return_value=False):
+            post_upload(client, sample_slideshow.id, "video")
+
+        assert ffmpeg.commands == []
+        with app.app_context():
+            assert {j.status for j in MediaTranscode.query.all()} == {"queued"}
+
+    def test_dispatch_submits_queued_jobs_once(
+        self,
+        mock_probe,
+        app,
+        client,
+        authenticated_user,
+        sample_slideshow,
+        ffmpeg,
+        monkeypatch,
+    ):
+        """Test queued jobs are submitted oldest first while the pool has room."""
+        monkeypatch.setitem(
+            app.config, "VIDEO_TRANSCODE_RENDITIONS", "720:2500,480:1000"
+        )
+        post_upload(client, sample_slideshow.id, "video")
+        submitted = []
+
+        def submit(func, app_arg, job_id, storage_arg):
+            if len(submitted) == 1:
+                return False
+            submitted.append(job_id)
+            return True
+
+        monkeypatch.setitem(app.config, "VIDEO_TRANSCODE_WORKERS", 1)
+        monkeypatch.setattr(transcode.transcode_pool, "submit", submit)
+        monkeypatch.setattr(transcode, "_dispatched", set())
+        with app.app_context():
+            first, second = [j.id for j in MediaTranscode.query.order_by("id")]
+
+            assert transcode.dispatch_queued_transcodes() == 1
+            # The submitted job is not handed over again while it waits
+            assert transcode.dispatch_queued_transcodes() == 0
+            assert submitted == [first]
+
+            # The worker runs the first job, freeing its slot
+            run_transcode(first)
+            transcode._dispatched.discard(first)
+            submitted.clear()
+
+            assert transcode.dispatch_queued_transcodes() == 1
+            assert submitted == [second]
+
+    def test_claimed_job_is_not_run_twice(
+        self,
+        mock_probe,
+        app,
+        client,
+        authenticated_user,
+        sample_slideshow,
+        ffmpeg,
+        monkeypatch,
+    ):
+        """Test a job is run by only one of two workers picking it up."""
+        monkeypatch.setitem(app.config, "VIDEO_TRANSCODE_RENDITIONS", "480:1000")
+        post_upload(client, sample_slideshow.id, "video")
+
+        with app.app_context():
+            job_id = MediaTranscode.query.one().id
+            assert run_transcode(job_id).status == "completed"
+            assert run_transcode(job_id).status == "completed"
+
+        assert len(ffmpeg.commands) == 1